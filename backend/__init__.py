@@ -1,6 +1,6 @@
-import secure
-from flasgger import Swagger
+import click
 from flask import Flask
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 from backend.blueprints.animal import animal_bp
 from backend.blueprints.adocao import adocao_bp
@@ -15,12 +15,28 @@ from backend.blueprints.despesa import despesa_bp
 from backend.blueprints.estoque import estoque_bp
 from backend.blueprints.tarefa import tarefa_bp
 from backend.blueprints.voluntario import voluntario_bp
+from backend.blueprints.job import job_bp
+from backend.blueprints.dashboard import dashboard_bp
+from backend.blueprints.events import events_bp
+from backend.blueprints.sync import sync_bp
+from backend.blueprints.auditoria import auditoria_bp
+from backend.blueprints.rate_limit import rate_limit_bp
 from backend.blueprints.home import home_bp
 from backend.blueprints.auth import auth
+from backend.commands import auditoria_cli, campanhas_cli, custos_cli, duplicados_cli, jobs_cli, lixeira_cli, localizacao_cli, seed
 from backend.config import get_config
 from backend.db import db
-from backend.extention import cors, migrate
+from backend.extention import cors, init_migrate
+from backend.utils.compression import Compress
+from backend.utils.json_provider import init_json_provider
 from backend.utils.logging import configure_logging
+from backend.utils.rate_limit import RateLimiter
+from backend.utils.replicas import init_read_replicas
+from backend.utils.security_headers import SecurityHeaders, default_security_headers
+from backend.utils.swagger import init_lazy_swagger, init_swagger
+
+# Registra as tarefas executadas pelos workers de jobs
+import backend.tasks  # noqa: F401
 
 def create_app():
     app = Flask(__name__)
@@ -29,9 +45,22 @@ def create_app():
     config, env = get_config()
     app.config.from_object(config)
 
+    # Atrás do balanceador, o IP do cliente (limite de requisições) e o esquema (cookies
+    # Secure) vêm dos cabeçalhos X-Forwarded-* adicionados pelos proxies confiáveis
+    if app.config["PROXY_FIX_X_FOR"] or app.config["PROXY_FIX_X_PROTO"]:
+        app.wsgi_app = ProxyFix(
+            app.wsgi_app, x_for=app.config["PROXY_FIX_X_FOR"], x_proto=app.config["PROXY_FIX_X_PROTO"]
+        )
+
+    # Serialização JSON (orjson/msgspec quando instalados)
+    init_json_provider(app)
+
     # Initialize the extensions
     db.init_app(app)
-    migrate.init_app(app, db)
+    init_read_replicas(app, db)
+    # No modo LAZY_STARTUP o alembic só é carregado pelos comandos da CLI (ex.: `flask db upgrade`)
+    if not app.config["LAZY_STARTUP"] or click.get_current_context(silent=True) is not None:
+        init_migrate(app, db)
     cors.init_app(app, supports_credentials="true", resources={r"*": {"origins": "*"}})
 
     # Registering blueprints
@@ -48,9 +77,25 @@ def create_app():
     app.register_blueprint(estoque_bp)
     app.register_blueprint(tarefa_bp)
     app.register_blueprint(voluntario_bp)
+    app.register_blueprint(job_bp)
+    app.register_blueprint(dashboard_bp)
+    app.register_blueprint(events_bp)
+    app.register_blueprint(sync_bp)
+    app.register_blueprint(auditoria_bp)
+    app.register_blueprint(rate_limit_bp)
     app.register_blueprint(home_bp)
     app.register_blueprint(auth)
 
+    # Registering CLI commands
+    app.cli.add_command(custos_cli)
+    app.cli.add_command(campanhas_cli)
+    app.cli.add_command(jobs_cli)
+    app.cli.add_command(lixeira_cli)
+    app.cli.add_command(auditoria_cli)
+    app.cli.add_command(duplicados_cli)
+    app.cli.add_command(localizacao_cli)
+    app.cli.add_command(seed)
+
     # Logging configuration
     configure_logging(app)
 
@@ -59,49 +104,40 @@ def create_app():
             "APIKeyHeader": {"type": "apiKey", "name": "Authorization", "in": "header"}
         }
     }
-    swagger = Swagger(app, template=SWAGGER_TEMPLATE)
-
-    # change STS Security
-    # Forces the browser to communicate with the website only via HTTPS, even if the user types the address with HTTP
-    hsts_value = (
-        secure.StrictTransportSecurity().include_subdomains().preload().max_age(2592000)
+    # No modo LAZY_STARTUP a especificação é gerada no primeiro acesso à documentação
+    if app.config["LAZY_STARTUP"]:
+        init_lazy_swagger(app, SWAGGER_TEMPLATE)
+    else:
+        init_swagger(app, SWAGGER_TEMPLATE)
+
+    # Cabeçalhos de segurança calculados uma vez e aplicados em todas as respostas
+    security_headers = SecurityHeaders(app, default_security_headers())
+
+    # A foto pública do animal pode ser exibida por outras origens (ex.: <img> do site)
+    security_headers.override(
+        "animal.get_animal_foto",
+        {"Cross-Origin-Resource-Policy": "cross-origin", "Cache-Control": "public, max-age=300"},
     )
 
-    # add Referrer Policy
-    # Controls the amount of information the browser sends in the Referer header when a link is clicked.
-    # The Referer indicates where the user came from, and this information can be used to track users.
-    # By default, the header will not be sent
-    referrer_value = secure.ReferrerPolicy().no_referrer()
-
-    # add X frame options
-    # Determines whether a page can be embedded in an iframe.
-    # By default, only on same-origin pages.
-    xfo_value = secure.XFrameOptions().sameorigin()
-
-    # add xxss protection
-    # Instructs the browser to enable XSS (Cross-Site Scripting) protection.
-    # This protection helps prevent malicious code from being injected into a web page.
-    xxss_value = secure.XXSSProtection().set("1")
-
-    secure_headers = secure.Secure(
-        hsts=hsts_value, referrer=referrer_value, xfo=xfo_value, xxp=xxss_value
-    )
-
-    # setting to use secure headers in all requests
-    @app.after_request
-    def set_secure_headers(response):
-        secure_headers.framework.flask(response)
-
-        # add custom headers
-        # These are security policies that restrict how a document can be embedded or open pop-ups from other websites.
-        # By default, the site need to be in same origin.
-        response.headers.set("Cross-Origin-Opener-Policy", "same-origin")
-        response.headers.set("Cross-Origin-Embedder-Policy", "require-corp")
-
-        # Allows you to specify which types of resources can be accessed by other websites.
-        # This helps prevent CSRF (Cross-Site Request Forgery) attacks.
-        response.headers.set("Cross-Origin-Resource-Policy", "same-origin")
-
-        return response
+    # Compressão negociada pelo Accept-Encoding
+    Compress(app)
+
+    # Limite de requisições por usuário (JWT) ou IP
+    rate_limiter = RateLimiter(app)
+
+    # Login e cadastro têm orçamento próprio, por IP: cada tentativa calcula um hash PBKDF2
+    for endpoint in ("auth.login", "auth.register"):
+        rate_limiter.limit(
+            endpoint,
+            balde="auth",
+            capacidade=app.config["RATE_LIMIT_AUTH_CAPACIDADE"],
+            por_segundo=app.config["RATE_LIMIT_AUTH_POR_MINUTO"] / 60,
+            por_ip=True,
+        )
+
+    # Rotas que leem tabelas inteiras (a listagem de animais inclui as fotos) custam mais
+    rate_limiter.limit("animal.list_animals", custo=10)
+    rate_limiter.limit("sync.get_sync", custo=5)
+    rate_limiter.limit("auditoria.get_auditoria", custo=5)
 
     return app
@@ -6,6 +6,9 @@ from backend.services.adocao_service import (
     delete_adocao_service,
     update_adocao_service
 )
+from backend.utils.concurrency import get_if_match, with_etag
+from backend.utils.projection import get_fields
+from backend.utils.idempotency import idempotent
 
 adocao_bp = Blueprint("adocao", __name__, url_prefix="/adocoes")
 
@@ -16,6 +19,12 @@ def list_adocoes():
     ---
     tags:
       - Adoções
+    parameters:
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: "Campos retornados, separados por vírgula (ex.: adocao_id,version)."
     definitions:
       AdocaoSchema:
         type: object
@@ -40,7 +49,7 @@ def list_adocoes():
       404:
         description: Nenhuma adoção encontrada no banco de dados.
     """
-    response = list_adocoes_service()
+    response = list_adocoes_service(get_fields())
 
     if response["status"] == 200:
         return jsonify(response["data"])
@@ -60,6 +69,11 @@ def get_adocao(adocao_id):
         name: adocao_id
         type: integer
         required: true
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: "Campos retornados, separados por vírgula (ex.: adocao_id,version). Inclua version para receber o ETag."
     definitions:
       AdocaoSchema:
         type: object
@@ -82,15 +96,16 @@ def get_adocao(adocao_id):
       404:
         description: Adoção não encontrada
     """
-    response = get_adocao_service(adocao_id)
+    response = get_adocao_service(adocao_id, get_fields())
 
     if response["status"] == 200:
-        return jsonify(response["data"])
+        return with_etag(jsonify(response["data"]), response["data"])
 
     return jsonify({"message": response["message"]}), response["status"]
 
 
 @adocao_bp.route("/", methods=["POST"])
+@idempotent
 def create_adocao():
     """
     Cria uma nova adoção no banco de dados.
@@ -102,6 +117,11 @@ def create_adocao():
         name: adocao
         schema:
           $ref: '#/definitions/AdocaoSchema'
+      - in: header
+        name: Idempotency-Key
+        type: string
+        required: false
+        description: Chave para repetir a requisição sem criar o registro de novo
     responses:
       201:
         description: Adoção criada com sucesso
@@ -109,13 +129,15 @@ def create_adocao():
           $ref: '#/definitions/AdocaoSchema'
       400:
         description: Erro ao criar adoção
+      422:
+        description: Idempotency-Key já usada com outra requisição
     """
     adocao_data = request.get_json()
 
     response = create_adocao_service(adocao_data)
 
     if response["status"] == 201:
-        return jsonify(response["data"]), response["status"]
+        return with_etag(jsonify(response["data"]), response["data"]), response["status"]
 
     return jsonify({"message": response["message"]}), response["status"]
 
@@ -132,13 +154,20 @@ def delete_adocao(adocao_id):
         name: adocao_id
         type: integer
         required: true
+      - in: header
+        name: If-Match
+        type: string
+        required: false
+        description: Versão (ETag) esperada do registro
     responses:
       204:
         description: Adoção deletada com sucesso
       404:
         description: Adoção não encontrada
+      412:
+        description: Versão do registro não confere (If-Match)
     """
-    response = delete_adocao_service(adocao_id)
+    response = delete_adocao_service(adocao_id, if_match=get_if_match())
     return jsonify({"message": response["message"]}), response["status"]
 
 
@@ -154,6 +183,11 @@ def update_adocao(adocao_id):
         name: adocao_id
         type: integer
         required: true
+      - in: header
+        name: If-Match
+        type: string
+        required: false
+        description: Versão (ETag) esperada do registro
       - in: body
         name: adocao
         schema:
@@ -165,12 +199,14 @@ def update_adocao(adocao_id):
           $ref: '#/definitions/AdocaoSchema'
       400:
         description: Erro ao atualizar adoção
+      412:
+        description: Versão do registro não confere (If-Match)
     """
     adocao_data = request.get_json()
 
-    response = update_adocao_service(adocao_id, adocao_data)
+    response = update_adocao_service(adocao_id, adocao_data, if_match=get_if_match())
 
     if response["status"] == 200:
-        return jsonify(response["data"])
+        return with_etag(jsonify(response["data"]), response["data"])
 
     return jsonify({"message": response["message"]}), response["status"]
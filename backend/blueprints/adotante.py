@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, url_for
 from backend.services.adotante_service import (
     list_adotantes_service,
     get_adotante_service,
@@ -6,6 +6,11 @@ from backend.services.adotante_service import (
     delete_adotante_service,
     update_adotante_service
 )
+from backend.external.model import AdotanteModel
+from backend.services.dedup_service import dedup_check_service, enqueue_duplicados_service
+from backend.utils.concurrency import get_if_match, with_etag
+from backend.utils.projection import get_fields
+from backend.utils.idempotency import idempotent
 
 adotante_bp = Blueprint("adotante", __name__, url_prefix="/adotantes")
 
@@ -16,6 +21,12 @@ def list_adotantes():
     ---
     tags:
       - Adotantes
+    parameters:
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: "Campos retornados, separados por vírgula (ex.: adotante_id,version)."
     definitions:
       AdotanteSchema:
         type: object
@@ -30,6 +41,10 @@ def list_adotantes():
             type: string
           moradia:
             type: string
+          latitude:
+            type: number
+          longitude:
+            type: number
     responses:
       200:
         description: Lista de adotantes
@@ -40,7 +55,7 @@ def list_adotantes():
       404:
         description: Nenhum adotante encontrado no banco de dados.
     """
-    response = list_adotantes_service()
+    response = list_adotantes_service(get_fields())
 
     if response["status"] == 200:
         return jsonify(response["data"])
@@ -60,6 +75,11 @@ def get_adotante(adotante_id):
         name: adotante_id
         type: integer
         required: true
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: "Campos retornados, separados por vírgula (ex.: adotante_id,version). Inclua version para receber o ETag."
     definitions:
       AdotanteSchema:
         type: object
@@ -74,6 +94,10 @@ def get_adotante(adotante_id):
             type: string
           moradia:
             type: string
+          latitude:
+            type: number
+          longitude:
+            type: number
     responses:
       200:
         description: Adotante encontrado
@@ -82,15 +106,16 @@ def get_adotante(adotante_id):
       404:
         description: Adotante não encontrado
     """
-    response = get_adotante_service(adotante_id)
+    response = get_adotante_service(adotante_id, get_fields())
 
     if response["status"] == 200:
-        return jsonify(response["data"])
+        return with_etag(jsonify(response["data"]), response["data"])
 
     return jsonify({"message": response["message"]}), response["status"]
 
 
 @adotante_bp.route("/", methods=["POST"])
+@idempotent
 def create_adotante():
     """
     Cria um novo adotante no banco de dados.
@@ -102,6 +127,11 @@ def create_adotante():
         name: adotante
         schema:
           $ref: '#/definitions/AdotanteSchema'
+      - in: header
+        name: Idempotency-Key
+        type: string
+        required: false
+        description: Chave para repetir a requisição sem criar o registro de novo
     responses:
       201:
         description: Adotante criado com sucesso
@@ -109,12 +139,14 @@ def create_adotante():
           $ref: '#/definitions/AdotanteSchema'
       400:
         description: Erro ao criar adotante
+      422:
+        description: Idempotency-Key já usada com outra requisição
     """
     adotante_data = request.get_json()
     response = create_adotante_service(adotante_data)
 
     if response["status"] == 201:
-        return jsonify(response["data"]), response["status"]
+        return with_etag(jsonify(response["data"]), response["data"]), response["status"]
 
     return jsonify({"message": response["message"]}), response["status"]
 
@@ -131,13 +163,20 @@ def delete_adotante(adotante_id):
         name: adotante_id
         type: integer
         required: true
+      - in: header
+        name: If-Match
+        type: string
+        required: false
+        description: Versão (ETag) esperada do registro
     responses:
       204:
         description: Adotante deletado com sucesso
       404:
         description: Adotante não encontrado
+      412:
+        description: Versão do registro não confere (If-Match)
     """
-    response = delete_adotante_service(adotante_id)
+    response = delete_adotante_service(adotante_id, if_match=get_if_match())
     return jsonify({"message": response["message"]}), response["status"]
 
 
@@ -153,6 +192,11 @@ def update_adotante(adotante_id):
         name: adotante_id
         type: integer
         required: true
+      - in: header
+        name: If-Match
+        type: string
+        required: false
+        description: Versão (ETag) esperada do registro
       - in: body
         name: adotante
         schema:
@@ -164,11 +208,76 @@ def update_adotante(adotante_id):
           $ref: '#/definitions/AdotanteSchema'
       400:
         description: Erro ao atualizar adotante
+      412:
+        description: Versão do registro não confere (If-Match)
     """
     adotante_data = request.get_json()
-    response = update_adotante_service(adotante_id, adotante_data)
+    response = update_adotante_service(adotante_id, adotante_data, if_match=get_if_match())
+
+    if response["status"] == 200:
+        return with_etag(jsonify(response["data"]), response["data"])
+
+    return jsonify({"message": response["message"]}), response["status"]
+
+
+@adotante_bp.route("/dedup-check", methods=["POST"])
+def dedup_check_adotante():
+    """
+    Verifica se já existe um adotante com o mesmo e-mail ou telefone, antes do cadastro.
+    ---
+    tags:
+      - Adotantes
+    parameters:
+      - in: body
+        name: contato
+        schema:
+          type: object
+          properties:
+            email:
+              type: string
+            telefone:
+              type: string
+    responses:
+      200:
+        description: "Cadastros com o mesmo contato (motivos: email e/ou telefone)"
+        schema:
+          type: object
+          properties:
+            duplicado:
+              type: boolean
+            candidatos:
+              type: array
+              items:
+                $ref: '#/definitions/AdotanteSchema'
+      400:
+        description: Nem e-mail nem telefone informados
+    """
+    response = dedup_check_service(AdotanteModel, request.get_json(silent=True))
 
     if response["status"] == 200:
         return jsonify(response["data"])
 
     return jsonify({"message": response["message"]}), response["status"]
+
+
+@adotante_bp.route("/duplicados", methods=["POST"])
+def find_duplicados_adotante():
+    """
+    Procura em segundo plano cadastros de adotantes provavelmente duplicados.
+    Responde 202 com o job criado; os pares encontrados ficam no resultado de `/jobs/<job_id>`.
+    ---
+    tags:
+      - Adotantes
+    responses:
+      202:
+        description: Busca agendada
+        schema:
+          $ref: '#/definitions/JobSchema'
+    """
+    response = enqueue_duplicados_service(AdotanteModel)
+
+    if response["status"] == 202:
+        job = response["data"]
+        return jsonify(job), 202, {"Location": url_for("job.get_job", job_id=job["job_id"])}
+
+    return jsonify({"message": response["message"]}), response["status"]
@@ -1,12 +1,18 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, url_for
 import base64
 from backend.services.animal_service import (
     list_animals_service,
     get_animal_service,
     create_animal_service,
     update_animal_service,
-    delete_animal_service
+    delete_animal_service,
+    enqueue_foto_animal_service,
+    get_foto_animal_service,
 )
+from backend.services.custo_animal_service import get_custo_animal_service
+from backend.utils.concurrency import get_if_match, with_etag
+from backend.utils.projection import get_fields
+from backend.utils.idempotency import idempotent
 
 animal_bp = Blueprint("animal", __name__, url_prefix="/animals")
 
@@ -31,8 +37,12 @@ def prepare_response_data(animal):
     # Se for um único animal
     data = dict(animal)
     
+    # Foto não pedida em ?fields=
+    if 'foto' not in data:
+        return data
+
     # Converter a foto de bytes para uma string base64
-    if 'foto' in data and data['foto']:
+    if data['foto']:
         if isinstance(data['foto'], (bytes, bytearray)):
             data['foto'] = base64.b64encode(data['foto']).decode('utf-8')
     else:
@@ -45,8 +55,13 @@ def prepare_response_data(animal):
 def list_animals():
     """
     Lista todos os animais armazenados no banco de dados.
+    Aceita `sort` (animal_id, nome, data_cadastro ou custo_total), `order` (asc ou desc)
+    e `fields` com os campos retornados (ex.: `?fields=animal_id,nome,status`).
     """
-    response = list_animals_service()
+    sort = request.args.get("sort")
+    order = request.args.get("order", "asc")
+
+    response = list_animals_service(sort, order, get_fields())
     if response["status"] == 200:
         # Preparar os dados antes de enviar
         prepared_data = prepare_response_data(response["data"])
@@ -57,15 +72,17 @@ def list_animals():
 def get_animal(animal_id):
     """
     Retorna um animal específico do banco de dados.
+    Aceita `fields` com os campos retornados; inclua `version` para receber o ETag.
     """
-    response = get_animal_service(animal_id)
+    response = get_animal_service(animal_id, get_fields())
     if response["status"] == 200:
         # Preparar os dados antes de enviar
         prepared_data = prepare_response_data(response["data"])
-        return jsonify(prepared_data)
+        return with_etag(jsonify(prepared_data), prepared_data)
     return jsonify({"message": response["message"]}), response["status"]
 
 @animal_bp.route("/", methods=["POST"])
+@idempotent
 def create_animal():
     """
     Cria um novo animal no banco de dados.
@@ -85,7 +102,7 @@ def create_animal():
         if response["status"] == 201:
             # Preparar os dados antes de enviar na resposta
             prepared_data = prepare_response_data(response["data"])
-            return jsonify(prepared_data), response["status"]
+            return with_etag(jsonify(prepared_data), prepared_data), response["status"]
         return jsonify({"message": response["message"]}), response["status"]
     
     except Exception as e:
@@ -110,11 +127,11 @@ def update_animal(animal_id):
             except ValueError as ve:
                 return jsonify({"message": str(ve)}), 400
         
-        response = update_animal_service(animal_id, animal_data)
+        response = update_animal_service(animal_id, animal_data, if_match=get_if_match())
         if response["status"] == 200:
             # Preparar os dados antes de enviar
             prepared_data = prepare_response_data(response["data"])
-            return jsonify(prepared_data)
+            return with_etag(jsonify(prepared_data), prepared_data)
         return jsonify({"message": response["message"]}), response["status"]
     
     except Exception as e:
@@ -128,5 +145,40 @@ def delete_animal(animal_id):
     """
     Deleta um animal específico do banco de dados.
     """
-    response = delete_animal_service(animal_id)
-    return jsonify({"message": response["message"]}), response["status"]
\ No newline at end of file
+    response = delete_animal_service(animal_id, if_match=get_if_match())
+    return jsonify({"message": response["message"]}), response["status"]
+
+@animal_bp.route("/<int:animal_id>/custos", methods=["GET"])
+def get_animal_custos(animal_id):
+    """
+    Retorna o custo total de um animal (despesas + procedimentos).
+    """
+    response = get_custo_animal_service(animal_id)
+    if response["status"] == 200:
+        return jsonify(response["data"])
+    return jsonify({"message": response["message"]}), response["status"]
+
+@animal_bp.route("/<int:animal_id>/foto", methods=["GET"])
+def get_animal_foto(animal_id):
+    """
+    Retorna a foto do animal como imagem, para uso direto em `<img>` por outras origens.
+    """
+    response = get_foto_animal_service(animal_id)
+    if response["status"] == 200:
+        foto = response["data"]
+        resp = Response(foto["conteudo"], mimetype=foto["mimetype"])
+        resp.set_etag(str(foto["version"]))
+        return resp.make_conditional(request)
+    return jsonify({"message": response["message"]}), response["status"]
+
+@animal_bp.route("/<int:animal_id>/foto", methods=["PUT"])
+def update_animal_foto(animal_id):
+    """
+    Envia a foto do animal (base64) para processamento em segundo plano.
+    Responde 202 com o job criado; o status pode ser acompanhado em `/jobs/<job_id>`.
+    """
+    response = enqueue_foto_animal_service(animal_id, request.get_json(silent=True))
+    if response["status"] == 202:
+        job = response["data"]
+        return jsonify(job), 202, {"Location": url_for("job.get_job", job_id=job["job_id"])}
+    return jsonify({"message": response["message"]}), response["status"]
@@ -6,6 +6,9 @@ from backend.services.apadrinhamento_service import (
     update_apadrinhamento_service,
     delete_apadrinhamento_service,
 )
+from backend.utils.concurrency import get_if_match, with_etag
+from backend.utils.projection import get_fields
+from backend.utils.idempotency import idempotent
 
 apadrinhamento_bp = Blueprint("apadrinhamento", __name__, url_prefix="/apadrinhamentos")
 
@@ -17,6 +20,12 @@ def list_apadrinhamentos():
     ---
     tags:
       - Apadrinhamentos
+    parameters:
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: "Campos retornados, separados por vírgula (ex.: apadrinhamento_id,version)."
     definitions:
       ApadrinhamentoSchema:
         type: object
@@ -41,7 +50,7 @@ def list_apadrinhamentos():
       404:
         description: Nenhum apadrinhamento encontrado
     """
-    response = list_apadrinhamentos_service()
+    response = list_apadrinhamentos_service(get_fields())
 
     if response["status"] == 200:
         return jsonify(response["data"])
@@ -61,6 +70,11 @@ def get_apadrinhamento(apadrinhamento_id):
         name: apadrinhamento_id
         type: integer
         required: true
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: "Campos retornados, separados por vírgula (ex.: apadrinhamento_id,version). Inclua version para receber o ETag."
     definitions:
       ApadrinhamentoSchema:
         type: object
@@ -83,15 +97,16 @@ def get_apadrinhamento(apadrinhamento_id):
       404:
         description: Apadrinhamento não encontrado
     """
-    response = get_apadrinhamento_service(apadrinhamento_id)
+    response = get_apadrinhamento_service(apadrinhamento_id, get_fields())
 
     if response["status"] == 200:
-        return jsonify(response["data"])
+        return with_etag(jsonify(response["data"]), response["data"])
 
     return jsonify({"message": response["message"]}), response["status"]
 
 
 @apadrinhamento_bp.route("/", methods=["POST"])
+@idempotent
 def create_apadrinhamento():
     """
     Cria um novo apadrinhamento no banco de dados.
@@ -103,6 +118,11 @@ def create_apadrinhamento():
         name: apadrinhamento
         schema:
           $ref: '#/definitions/ApadrinhamentoSchema'
+      - in: header
+        name: Idempotency-Key
+        type: string
+        required: false
+        description: Chave para repetir a requisição sem criar o registro de novo
     responses:
       201:
         description: Apadrinhamento criado com sucesso
@@ -110,13 +130,15 @@ def create_apadrinhamento():
           $ref: '#/definitions/ApadrinhamentoSchema'
       400:
         description: Erro de validação ou de request
+      422:
+        description: Idempotency-Key já usada com outra requisição
     """
     apadrinhamento_data = request.get_json()
 
     response = create_apadrinhamento_service(apadrinhamento_data)
 
     if response["status"] == 201:
-        return jsonify(response["data"]), response["status"]
+        return with_etag(jsonify(response["data"]), response["data"]), response["status"]
 
     return jsonify({"message": response["message"]}), response["status"]
 
@@ -133,6 +155,11 @@ def update_apadrinhamento(apadrinhamento_id):
         name: apadrinhamento_id
         type: integer
         required: true
+      - in: header
+        name: If-Match
+        type: string
+        required: false
+        description: Versão (ETag) esperada do registro
       - in: body
         name: apadrinhamento
         schema:
@@ -146,13 +173,15 @@ def update_apadrinhamento(apadrinhamento_id):
         description: Erro de validação ou de request
       404:
         description: Apadrinhamento não encontrado
+      412:
+        description: Versão do registro não confere (If-Match)
     """
     apadrinhamento_data = request.get_json()
 
-    response = update_apadrinhamento_service(apadrinhamento_id, apadrinhamento_data)
+    response = update_apadrinhamento_service(apadrinhamento_id, apadrinhamento_data, if_match=get_if_match())
 
     if response["status"] == 200:
-        return jsonify(response["data"])
+        return with_etag(jsonify(response["data"]), response["data"])
 
     return jsonify({"message": response["message"]}), response["status"]
 
@@ -169,11 +198,18 @@ def delete_apadrinhamento(apadrinhamento_id):
         name: apadrinhamento_id
         type: integer
         required: true
+      - in: header
+        name: If-Match
+        type: string
+        required: false
+        description: Versão (ETag) esperada do registro
     responses:
       204:
         description: Apadrinhamento deletado com sucesso
       404:
         description: Apadrinhamento não encontrado
+      412:
+        description: Versão do registro não confere (If-Match)
     """
-    response = delete_apadrinhamento_service(apadrinhamento_id)
+    response = delete_apadrinhamento_service(apadrinhamento_id, if_match=get_if_match())
     return jsonify({"message": response["message"]}), response["status"]
@@ -0,0 +1,110 @@
+from flask import Blueprint, jsonify, request
+from backend.services.auditoria_service import get_auditoria_service
+from backend.utils.decorators import jwt_required
+
+auditoria_bp = Blueprint("auditoria", __name__)
+
+
+@auditoria_bp.route("/auditoria", methods=["GET"])
+@jwt_required
+def get_auditoria(current_user):
+    """
+    Trilha de auditoria: quem alterou cada registro, quando e os valores antes e depois.
+    Das entradas mais recentes para as mais antigas; para a próxima página, envie em
+    `cursor` o `next_cursor` da resposta anterior.
+    ---
+    tags:
+      - Auditoria
+    security:
+      - APIKeyHeader: [ 'Authorization' ]
+    definitions:
+      AuditoriaSchema:
+        type: object
+        properties:
+          items:
+            type: array
+            items:
+              type: object
+              properties:
+                auditoria_id:
+                  type: string
+                criado_em:
+                  type: string
+                  format: date-time
+                tabela:
+                  type: string
+                registro_id:
+                  type: integer
+                operacao:
+                  type: string
+                  enum: [create, update, delete, purge]
+                usuario:
+                  type: string
+                origem:
+                  type: string
+                version:
+                  type: integer
+                alteracoes:
+                  type: object
+                  description: "Campo alterado -> [valor antes, valor depois]"
+          next_cursor:
+            type: string
+          has_more:
+            type: boolean
+    parameters:
+      - in: query
+        name: tabela
+        type: string
+        required: false
+        description: "Tabela do registro (ex.: tab_doacao)."
+      - in: query
+        name: registro_id
+        type: integer
+        required: false
+      - in: query
+        name: usuario
+        type: string
+        required: false
+      - in: query
+        name: de
+        type: string
+        required: false
+        description: "Data e hora ISO 8601 (UTC), inclusiva."
+      - in: query
+        name: ate
+        type: string
+        required: false
+        description: "Data e hora ISO 8601 (UTC), exclusiva."
+      - in: query
+        name: cursor
+        type: string
+        required: false
+      - in: query
+        name: limit
+        type: integer
+        required: false
+        description: "Entradas por página (padrão AUDITORIA_LIMITE_PADRAO)."
+    responses:
+        200:
+            description: Página da trilha de auditoria
+            schema:
+              $ref: '#/definitions/AuditoriaSchema'
+        400:
+            description: Parâmetros inválidos
+        401:
+            description: Token ausente ou inválido
+    """
+    response = get_auditoria_service(
+        tabela=request.args.get("tabela"),
+        registro_id=request.args.get("registro_id", type=int),
+        usuario=request.args.get("usuario"),
+        de=request.args.get("de"),
+        ate=request.args.get("ate"),
+        cursor=request.args.get("cursor"),
+        limit=request.args.get("limit", type=int),
+    )
+
+    if response["status"] == 200:
+        return jsonify(response["data"])
+
+    return jsonify({"message": response["message"]}), response["status"]
@@ -129,11 +129,16 @@ def login():
             return jsonify({"mensagem": "Senha inválida"}), 400
 
         config, _ = get_config()
+        claims = {
+            "user_id": db_user.user_id,
+            "username": db_user.username,
+            "exp": datetime.datetime.now(timezone.utc) + datetime.timedelta(hours=999)
+        }
+        if config.AUDIENCE:
+            claims["aud"] = config.AUDIENCE
+
         token = jwt.encode(
-            {
-                "user_id": db_user.user_id,
-                "exp": datetime.datetime.now(timezone.utc) + datetime.timedelta(hours=999)
-            },
+            claims,
             config.SECRET_KEY
         )
 
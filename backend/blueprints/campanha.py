@@ -6,6 +6,15 @@ from backend.services.campanha_service import (
     delete_campanha_service,
     update_campanha_service,
 )
+from backend.services.progresso_campanha_service import (
+    get_progresso_campanha_service,
+    list_progresso_campanhas_service,
+)
+from backend.external.model import CampanhaModel
+from backend.services.geo_service import proximos_service, raio_service
+from backend.utils.concurrency import get_if_match, with_etag
+from backend.utils.projection import get_fields
+from backend.utils.idempotency import idempotent
 
 campanha_bp = Blueprint("campanha", __name__, url_prefix="/campanhas")
 
@@ -16,6 +25,12 @@ def list_campanhas():
     ---
     tags:
       - Campanhas
+    parameters:
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: "Campos retornados, separados por vírgula (ex.: campanha_id,version)."
     definitions:
       CampanhaSchema:
         type: object
@@ -34,6 +49,10 @@ def list_campanhas():
             type: string
           local:
             type: string
+          latitude:
+            type: number
+          longitude:
+            type: number
     responses:
       200:
         description: Lista de campanhas
@@ -44,7 +63,7 @@ def list_campanhas():
       404:
         description: Nenhuma campanha encontrada no banco de dados.
     """
-    response = list_campanhas_service()
+    response = list_campanhas_service(get_fields())
     if response["status"] == 200:
         return jsonify(response["data"])
     return jsonify({"message": response["message"]}), response["status"]
@@ -62,6 +81,11 @@ def get_campanha(campanha_id):
         name: campanha_id
         type: integer
         required: true
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: "Campos retornados, separados por vírgula (ex.: campanha_id,version). Inclua version para receber o ETag."
     definitions:
       CampanhaSchema:
         type: object
@@ -80,6 +104,10 @@ def get_campanha(campanha_id):
             type: string
           local:
             type: string
+          latitude:
+            type: number
+          longitude:
+            type: number
     responses:
       200:
         description: Campanha encontrada
@@ -88,13 +116,14 @@ def get_campanha(campanha_id):
       404:
         description: Campanha não encontrada
     """
-    response = get_campanha_service(campanha_id)
+    response = get_campanha_service(campanha_id, get_fields())
     if response["status"] == 200:
-        return jsonify(response["data"])
+        return with_etag(jsonify(response["data"]), response["data"])
     return jsonify({"message": response["message"]}), response["status"]
 
 
 @campanha_bp.route("/", methods=["POST"])
+@idempotent
 def create_campanha():
     """
     Cria uma nova campanha no banco de dados.
@@ -106,6 +135,11 @@ def create_campanha():
         name: campanha
         schema:
           $ref: '#/definitions/CampanhaSchema'
+      - in: header
+        name: Idempotency-Key
+        type: string
+        required: false
+        description: Chave para repetir a requisição sem criar o registro de novo
     responses:
       201:
         description: Campanha criada com sucesso
@@ -113,12 +147,14 @@ def create_campanha():
           $ref: '#/definitions/CampanhaSchema'
       400:
         description: Erro ao criar campanha
+      422:
+        description: Idempotency-Key já usada com outra requisição
     """
     campanha_data = request.get_json()
     response = create_campanha_service(campanha_data)
 
     if response["status"] == 201:
-        return jsonify(response["data"]), response["status"]
+        return with_etag(jsonify(response["data"]), response["data"]), response["status"]
 
     return jsonify({"message": response["message"]}), response["status"]
 
@@ -135,13 +171,20 @@ def delete_campanha(campanha_id):
         name: campanha_id
         type: integer
         required: true
+      - in: header
+        name: If-Match
+        type: string
+        required: false
+        description: Versão (ETag) esperada do registro
     responses:
       204:
         description: Campanha deletada com sucesso
       404:
         description: Campanha não encontrada
+      412:
+        description: Versão do registro não confere (If-Match)
     """
-    response = delete_campanha_service(campanha_id)
+    response = delete_campanha_service(campanha_id, if_match=get_if_match())
     return jsonify({"message": response["message"]}), response["status"]
 
 
@@ -157,6 +200,11 @@ def update_campanha(campanha_id):
         name: campanha_id
         type: integer
         required: true
+      - in: header
+        name: If-Match
+        type: string
+        required: false
+        description: Versão (ETag) esperada do registro
       - in: body
         name: campanha
         schema:
@@ -168,10 +216,174 @@ def update_campanha(campanha_id):
           $ref: '#/definitions/CampanhaSchema'
       400:
         description: Erro ao atualizar campanha
+      412:
+        description: Versão do registro não confere (If-Match)
     """
     campanha_data = request.get_json()
-    response = update_campanha_service(campanha_id, campanha_data)
+    response = update_campanha_service(campanha_id, campanha_data, if_match=get_if_match())
+
+    if response["status"] == 200:
+        return with_etag(jsonify(response["data"]), response["data"])
+    return jsonify({"message": response["message"]}), response["status"]
+
+@campanha_bp.route("/progresso", methods=["GET"])
+def list_progresso_campanhas():
+    """
+    Lista quanto cada campanha já arrecadou.
+    ---
+    tags:
+      - Campanhas
+    definitions:
+      ProgressoCampanhaSchema:
+        type: object
+        properties:
+          campanha_id:
+            type: integer
+          nome:
+            type: string
+          total_arrecadado:
+            type: string
+          quantidade_doacoes:
+            type: integer
+    responses:
+      200:
+        description: Progresso de arrecadação das campanhas
+        schema:
+          type: array
+          items:
+            $ref: '#/definitions/ProgressoCampanhaSchema'
+      404:
+        description: Nenhuma campanha encontrada
+    """
+    response = list_progresso_campanhas_service()
+
+    if response["status"] == 200:
+        return jsonify(response["data"])
+
+    return jsonify({"message": response["message"]}), response["status"]
+
+@campanha_bp.route("/<int:campanha_id>/progresso", methods=["GET"])
+def get_progresso_campanha(campanha_id):
+    """
+    Retorna quanto uma campanha já arrecadou.
+    ---
+    tags:
+      - Campanhas
+    parameters:
+      - in: path
+        name: campanha_id
+        type: integer
+        required: true
+    responses:
+      200:
+        description: Progresso de arrecadação da campanha
+        schema:
+          $ref: '#/definitions/ProgressoCampanhaSchema'
+      404:
+        description: Campanha não encontrada
+    """
+    response = get_progresso_campanha_service(campanha_id)
 
     if response["status"] == 200:
         return jsonify(response["data"])
+
+    return jsonify({"message": response["message"]}), response["status"]
+
+
+@campanha_bp.route("/proximos", methods=["GET"])
+def list_campanhas_proximas():
+    """
+    Lista as campanhas mais próximas de um ponto, com a distância em km.
+    ---
+    tags:
+      - Campanhas
+    parameters:
+      - in: query
+        name: latitude
+        type: number
+        required: true
+      - in: query
+        name: longitude
+        type: number
+        required: true
+      - in: query
+        name: limit
+        type: integer
+        required: false
+        description: Quantidade (padrão GEO_LIMITE_PADRAO)
+      - in: query
+        name: raio_maximo_km
+        type: number
+        required: false
+        description: Distância máxima (padrão GEO_RAIO_MAXIMO_KM)
+    responses:
+      200:
+        description: Campanhas do mais próximo ao mais distante
+        schema:
+          type: array
+          items:
+            $ref: '#/definitions/CampanhaSchema'
+      400:
+        description: Coordenada ou parâmetros inválidos
+    """
+    response = proximos_service(
+        CampanhaModel,
+        request.args.get("latitude"),
+        request.args.get("longitude"),
+        request.args.get("limit", type=int),
+        request.args.get("raio_maximo_km", type=float),
+    )
+
+    if response["status"] == 200:
+        return jsonify(response["data"])
+
+    return jsonify({"message": response["message"]}), response["status"]
+
+
+@campanha_bp.route("/raio", methods=["GET"])
+def list_campanhas_no_raio():
+    """
+    Lista as campanhas a até `raio_km` de um ponto, com a distância em km.
+    ---
+    tags:
+      - Campanhas
+    parameters:
+      - in: query
+        name: latitude
+        type: number
+        required: true
+      - in: query
+        name: longitude
+        type: number
+        required: true
+      - in: query
+        name: raio_km
+        type: number
+        required: true
+      - in: query
+        name: limit
+        type: integer
+        required: false
+        description: Quantidade máxima (padrão GEO_LIMITE_MAXIMO)
+    responses:
+      200:
+        description: Campanhas dentro do raio, do mais próximo ao mais distante
+        schema:
+          type: array
+          items:
+            $ref: '#/definitions/CampanhaSchema'
+      400:
+        description: Coordenada ou raio inválidos
+    """
+    response = raio_service(
+        CampanhaModel,
+        request.args.get("latitude"),
+        request.args.get("longitude"),
+        request.args.get("raio_km", type=float),
+        request.args.get("limit", type=int),
+    )
+
+    if response["status"] == 200:
+        return jsonify(response["data"])
+
     return jsonify({"message": response["message"]}), response["status"]
@@ -0,0 +1,61 @@
+from flask import Blueprint, jsonify
+from backend.services.dashboard_service import get_dashboard_service
+
+dashboard_bp = Blueprint("dashboard", __name__)
+
+
+@dashboard_bp.route("/dashboard", methods=["GET"])
+def get_dashboard():
+    """
+    Retorna as contagens do painel inicial (animais por status e espécie, tarefas dos
+    próximos dias e total de adoções), mantidas em cache por alguns segundos.
+    ---
+    tags:
+      - Dashboard
+    definitions:
+      DashboardSchema:
+        type: object
+        properties:
+          animais:
+            type: object
+            properties:
+              total:
+                type: integer
+              por_status:
+                type: object
+                additionalProperties:
+                  type: integer
+              por_especie:
+                type: object
+                additionalProperties:
+                  type: integer
+              disponiveis_por_especie:
+                type: object
+                additionalProperties:
+                  type: integer
+          tarefas:
+            type: object
+            properties:
+              hoje:
+                type: integer
+              proximos_dias:
+                type: object
+                additionalProperties:
+                  type: integer
+          adocoes:
+            type: object
+            properties:
+              total:
+                type: integer
+    responses:
+        200:
+            description: Contagens do painel
+            schema:
+              $ref: '#/definitions/DashboardSchema'
+    """
+    response = get_dashboard_service()
+
+    if response["status"] == 200:
+        return jsonify(response["data"])
+
+    return jsonify({"message": response["message"]}), response["status"]
@@ -6,6 +6,9 @@ from backend.services.despesa_service import (
     delete_despesa_service,
     update_despesa_service,
 )
+from backend.utils.concurrency import get_if_match, with_etag
+from backend.utils.projection import get_fields
+from backend.utils.idempotency import idempotent
 
 despesa_bp = Blueprint("despesa", __name__, url_prefix="/despesas")
 
@@ -17,6 +20,12 @@ def list_despesas():
     ---
     tags:
       - Despesas
+    parameters:
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: "Campos retornados, separados por vírgula (ex.: despesa_id,version)."
     definitions:
       DespesaSchema:
         type: object
@@ -43,7 +52,7 @@ def list_despesas():
         404:
             description: Nenhuma despesa encontrada no banco de dados.
     """
-    response = list_despesas_service()
+    response = list_despesas_service(get_fields())
 
     if response["status"] == 200:
         return jsonify(response["data"])
@@ -63,6 +72,11 @@ def get_despesa(despesa_id):
         name: despesa_id
         type: integer
         required: true
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: "Campos retornados, separados por vírgula (ex.: despesa_id,version). Inclua version para receber o ETag."
     definitions:
       DespesaSchema:
         type: object
@@ -87,15 +101,16 @@ def get_despesa(despesa_id):
         404:
             description: Despesa não encontrada
     """
-    response = get_despesa_service(despesa_id)
+    response = get_despesa_service(despesa_id, get_fields())
 
     if response["status"] == 200:
-        return jsonify(response["data"])
+        return with_etag(jsonify(response["data"]), response["data"])
 
     return jsonify({"message": response["message"]}), response["status"]
 
 
 @despesa_bp.route("/", methods=["POST"])
+@idempotent
 def create_despesa():
     """
     Cria uma nova despesa no banco de dados.
@@ -107,6 +122,11 @@ def create_despesa():
         name: despesa
         schema:
           $ref: '#/definitions/DespesaSchema'
+      - in: header
+        name: Idempotency-Key
+        type: string
+        required: false
+        description: Chave para repetir a requisição sem criar o registro de novo
     responses:
       201:
         description: Despesa criada com sucesso
@@ -114,13 +134,15 @@ def create_despesa():
           $ref: '#/definitions/DespesaSchema'
       400:
         description: Erro ao criar despesa
+      422:
+        description: Idempotency-Key já usada com outra requisição
     """
     despesa_data = request.get_json()
 
     response = create_despesa_service(despesa_data)
 
     if response["status"] == 201:
-        return jsonify(response["data"]), response["status"]
+        return with_etag(jsonify(response["data"]), response["data"]), response["status"]
 
     return jsonify({"message": response["message"]}), response["status"]
 
@@ -137,13 +159,20 @@ def delete_despesa(despesa_id):
         name: despesa_id
         type: integer
         required: true
+      - in: header
+        name: If-Match
+        type: string
+        required: false
+        description: Versão (ETag) esperada do registro
     responses:
       204:
         description: Despesa deletada com sucesso
       404:
         description: Despesa não encontrada
+      412:
+        description: Versão do registro não confere (If-Match)
     """
-    response = delete_despesa_service(despesa_id)
+    response = delete_despesa_service(despesa_id, if_match=get_if_match())
 
     return jsonify({"message": response["message"]}), response["status"]
 
@@ -160,6 +189,11 @@ def update_despesa(despesa_id):
         name: despesa_id
         type: integer
         required: true
+      - in: header
+        name: If-Match
+        type: string
+        required: false
+        description: Versão (ETag) esperada do registro
       - in: body
         name: despesa
         schema:
@@ -171,12 +205,14 @@ def update_despesa(despesa_id):
           $ref: '#/definitions/DespesaSchema'
       400:
         description: Erro ao atualizar despesa
+      412:
+        description: Versão do registro não confere (If-Match)
     """
     despesa_data = request.get_json()
 
-    response = update_despesa_service(despesa_id, despesa_data)
+    response = update_despesa_service(despesa_id, despesa_data, if_match=get_if_match())
 
     if response["status"] == 200:
-        return jsonify(response["data"])
+        return with_etag(jsonify(response["data"]), response["data"])
 
     return jsonify({"message": response["message"]}), response["status"]
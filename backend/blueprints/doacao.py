@@ -1,6 +1,9 @@
 from flask import Blueprint, request, jsonify
 from backend.services.doacao_service import list_doacoes_service, get_doacao_service
 from backend.services.doacao_service import create_doacao_service, delete_doacao_service, update_doacao_service
+from backend.utils.concurrency import get_if_match, with_etag
+from backend.utils.projection import get_fields
+from backend.utils.idempotency import idempotent
 
 doacao_bp = Blueprint("doacao", __name__, url_prefix="/doacoes")
 
@@ -11,6 +14,12 @@ def list_doacoes():
     ---
     tags:
       - Doações
+    parameters:
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: "Campos retornados, separados por vírgula (ex.: doacao_id,version)."
     definitions:
       DoacaoSchema:
         type: object
@@ -39,7 +48,7 @@ def list_doacoes():
         404:
             description: Nenhuma doação encontrada no banco de dados.
     """
-    response = list_doacoes_service()
+    response = list_doacoes_service(get_fields())
 
     if response["status"] == 200:
         return jsonify(response["data"])
@@ -58,6 +67,11 @@ def get_doacao(doacao_id):
         name: doacao_id
         type: integer
         required: true
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: "Campos retornados, separados por vírgula (ex.: doacao_id,version). Inclua version para receber o ETag."
     definitions:
       DoacaoSchema:
         type: object
@@ -84,14 +98,15 @@ def get_doacao(doacao_id):
         404:
             description: Doação não encontrada
     """
-    response = get_doacao_service(doacao_id)
+    response = get_doacao_service(doacao_id, get_fields())
 
     if response["status"] == 200:
-        return jsonify(response["data"])
+        return with_etag(jsonify(response["data"]), response["data"])
 
     return jsonify({"message": response["message"]}), response["status"]
 
 @doacao_bp.route("/", methods=["POST"])
+@idempotent
 def create_doacao():
     """
     Cria uma nova doação no banco de dados.
@@ -103,6 +118,11 @@ def create_doacao():
         name: doacao
         schema:
           $ref: '#/definitions/DoacaoSchema'
+      - in: header
+        name: Idempotency-Key
+        type: string
+        required: false
+        description: Chave para repetir a requisição sem criar o registro de novo
     responses:
       201:
         description: Doação criada com sucesso
@@ -110,13 +130,15 @@ def create_doacao():
           $ref: '#/definitions/DoacaoSchema'
       400:
         description: Erro ao criar doação
+      422:
+        description: Idempotency-Key já usada com outra requisição
     """
     doacao_data = request.get_json()
 
     response = create_doacao_service(doacao_data)
 
     if response["status"] == 201:
-        return jsonify(response["data"]), response["status"]
+        return with_etag(jsonify(response["data"]), response["data"]), response["status"]
 
     return jsonify({"message": response["message"]}), response["status"]
 
@@ -132,13 +154,20 @@ def delete_doacao(doacao_id):
         name: doacao_id
         type: integer
         required: true
+      - in: header
+        name: If-Match
+        type: string
+        required: false
+        description: Versão (ETag) esperada do registro
     responses:
       204:
         description: Doação deletada com sucesso
       404:
         description: Doação não encontrada
+      412:
+        description: Versão do registro não confere (If-Match)
     """
-    response = delete_doacao_service(doacao_id)
+    response = delete_doacao_service(doacao_id, if_match=get_if_match())
 
     return jsonify({"message": response["message"]}), response["status"]
 
@@ -154,6 +183,11 @@ def update_doacao(doacao_id):
         name: doacao_id
         type: integer
         required: true
+      - in: header
+        name: If-Match
+        type: string
+        required: false
+        description: Versão (ETag) esperada do registro
       - in: body
         name: doacao
         schema:
@@ -165,12 +199,14 @@ def update_doacao(doacao_id):
           $ref: '#/definitions/DoacaoSchema'
       400:
         description: Erro ao atualizar doação
+      412:
+        description: Versão do registro não confere (If-Match)
     """
     doacao_data = request.get_json()
 
-    response = update_doacao_service(doacao_id, doacao_data)
+    response = update_doacao_service(doacao_id, doacao_data, if_match=get_if_match())
 
     if response["status"] == 200:
-        return jsonify(response["data"])
+        return with_etag(jsonify(response["data"]), response["data"])
 
     return jsonify({"message": response["message"]}), response["status"]
@@ -1,6 +1,10 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from backend.services.estoque_service import list_estoque_service, get_estoque_service
 from backend.services.estoque_service import create_estoque_service, delete_estoque_service, update_estoque_service
+from backend.services.estoque_service import create_movimento_service, list_movimentos_service, list_estoque_baixo_service
+from backend.utils.concurrency import get_if_match, with_etag
+from backend.utils.projection import get_fields
+from backend.utils.idempotency import idempotent
 
 estoque_bp = Blueprint("estoque", __name__, url_prefix="/estoque")
 
@@ -11,6 +15,12 @@ def list_estoque():
     ---
     tags:
       - Estoque
+    parameters:
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: "Campos retornados, separados por vírgula (ex.: estoque_id,version)."
     definitions:
       EstoqueSchema:
         type: object
@@ -37,7 +47,7 @@ def list_estoque():
         404:
             description: Nenhum item encontrado no estoque.
     """
-    response = list_estoque_service()
+    response = list_estoque_service(get_fields())
 
     if response["status"] == 200:
         return jsonify(response["data"])
@@ -56,6 +66,11 @@ def get_estoque(estoque_id):
         name: estoque_id
         type: integer
         required: true
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: "Campos retornados, separados por vírgula (ex.: estoque_id,version). Inclua version para receber o ETag."
     definitions:
       EstoqueSchema:
         type: object
@@ -80,14 +95,15 @@ def get_estoque(estoque_id):
         404:
             description: Item não encontrado no estoque.
     """
-    response = get_estoque_service(estoque_id)
+    response = get_estoque_service(estoque_id, get_fields())
 
     if response["status"] == 200:
-        return jsonify(response["data"])
+        return with_etag(jsonify(response["data"]), response["data"])
 
     return jsonify({"message": response["message"]}), response["status"]
 
 @estoque_bp.route("/", methods=["POST"])
+@idempotent
 def create_estoque():
     """
     Cria um novo item no estoque.
@@ -99,6 +115,11 @@ def create_estoque():
         name: estoque
         schema:
           $ref: '#/definitions/EstoqueSchema'
+      - in: header
+        name: Idempotency-Key
+        type: string
+        required: false
+        description: Chave para repetir a requisição sem criar o registro de novo
     responses:
       201:
         description: Item criado com sucesso
@@ -106,13 +127,15 @@ def create_estoque():
           $ref: '#/definitions/EstoqueSchema'
       400:
         description: Erro ao criar item no estoque.
+      422:
+        description: Idempotency-Key já usada com outra requisição
     """
     estoque_data = request.get_json()
 
     response = create_estoque_service(estoque_data)
 
     if response["status"] == 201:
-        return jsonify(response["data"]), response["status"]
+        return with_etag(jsonify(response["data"]), response["data"]), response["status"]
 
     return jsonify({"message": response["message"]}), response["status"]
 
@@ -128,6 +151,11 @@ def update_estoque(estoque_id):
         name: estoque_id
         type: integer
         required: true
+      - in: header
+        name: If-Match
+        type: string
+        required: false
+        description: Versão (ETag) esperada do registro
       - in: body
         name: estoque
         schema:
@@ -139,13 +167,15 @@ def update_estoque(estoque_id):
           $ref: '#/definitions/EstoqueSchema'
       400:
         description: Erro ao atualizar item no estoque.
+      412:
+        description: Versão do registro não confere (If-Match)
     """
     estoque_data = request.get_json()
 
-    response = update_estoque_service(estoque_id, estoque_data)
+    response = update_estoque_service(estoque_id, estoque_data, if_match=get_if_match())
 
     if response["status"] == 200:
-        return jsonify(response["data"])
+        return with_etag(jsonify(response["data"]), response["data"])
 
     return jsonify({"message": response["message"]}), response["status"]
 
@@ -161,12 +191,150 @@ def delete_estoque(estoque_id):
         name: estoque_id
         type: integer
         required: true
+      - in: header
+        name: If-Match
+        type: string
+        required: false
+        description: Versão (ETag) esperada do registro
     responses:
       204:
         description: Item deletado com sucesso
       404:
         description: Item não encontrado no estoque.
+      412:
+        description: Versão do registro não confere (If-Match)
+    """
+    response = delete_estoque_service(estoque_id, if_match=get_if_match())
+
+    return jsonify({"message": response["message"]}), response["status"]
+
+@estoque_bp.route("/<int:estoque_id>/movimentos", methods=["POST"])
+@idempotent
+def create_movimento(estoque_id):
+    """
+    Registra uma entrada ou saída de um item do estoque.
+    ---
+    tags:
+      - Estoque
+    parameters:
+      - in: path
+        name: estoque_id
+        type: integer
+        required: true
+      - in: body
+        name: movimento
+        schema:
+          type: object
+          properties:
+            tipo:
+              type: string
+              enum: [entrada, saida]
+            quantidade:
+              type: integer
+              minimum: 1
+            observacao:
+              type: string
+      - in: header
+        name: Idempotency-Key
+        type: string
+        required: false
+        description: Chave para repetir a requisição sem criar o registro de novo
+    definitions:
+      MovimentoEstoqueSchema:
+        type: object
+        properties:
+          movimento_id:
+            type: integer
+          estoque_id:
+            type: integer
+          tipo:
+            type: string
+          quantidade:
+            type: integer
+            description: Variação do saldo (negativa para saídas)
+          saldo_apos:
+            type: integer
+          observacao:
+            type: string
+          data_movimento:
+            type: string
+    responses:
+      201:
+        description: Movimentação registrada com sucesso
+        schema:
+          $ref: '#/definitions/MovimentoEstoqueSchema'
+      400:
+        description: Dados da movimentação inválidos.
+      404:
+        description: Item não encontrado no estoque.
+      409:
+        description: Saldo insuficiente para a saída.
+      422:
+        description: Idempotency-Key já usada com outra requisição
     """
-    response = delete_estoque_service(estoque_id)
+    movimento_data = request.get_json()
+
+    response = create_movimento_service(estoque_id, movimento_data)
+
+    if response["status"] == 201:
+        return jsonify(response["data"]), response["status"]
+
+    return jsonify({"message": response["message"]}), response["status"]
+
+@estoque_bp.route("/<int:estoque_id>/movimentos", methods=["GET"])
+def list_movimentos(estoque_id):
+    """
+    Lista o histórico de movimentações de um item do estoque.
+    ---
+    tags:
+      - Estoque
+    parameters:
+      - in: path
+        name: estoque_id
+        type: integer
+        required: true
+    responses:
+      200:
+        description: Histórico de movimentações
+        schema:
+          type: array
+          items:
+            $ref: '#/definitions/MovimentoEstoqueSchema'
+      404:
+        description: Item não encontrado no estoque.
+    """
+    response = list_movimentos_service(estoque_id)
+
+    if response["status"] == 200:
+        return jsonify(response["data"])
+
+    return jsonify({"message": response["message"]}), response["status"]
+
+@estoque_bp.route("/baixo", methods=["GET"])
+def list_estoque_baixo():
+    """
+    Lista os itens com saldo baixo, para a reposição diária.
+    ---
+    tags:
+      - Estoque
+    parameters:
+      - in: query
+        name: limite
+        type: integer
+        description: Saldo máximo considerado baixo (padrão = ESTOQUE_LIMITE_BAIXO)
+    responses:
+      200:
+        description: Itens com saldo menor ou igual ao limite
+        schema:
+          type: array
+          items:
+            $ref: '#/definitions/EstoqueSchema'
+    """
+    limite = request.args.get("limite", default=current_app.config["ESTOQUE_LIMITE_BAIXO"], type=int)
+
+    response = list_estoque_baixo_service(limite)
+
+    if response["status"] == 200:
+        return jsonify(response["data"])
 
     return jsonify({"message": response["message"]}), response["status"]
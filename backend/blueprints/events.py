@@ -0,0 +1,72 @@
+import json
+import time
+
+from flask import Blueprint, Response, current_app, request
+from backend.utils.events import get_broker
+
+events_bp = Blueprint("events", __name__)
+
+
+def _stream(assinatura, tabelas, keepalive: int, duracao: int):
+    # O navegador espera `retry` milissegundos antes de reconectar
+    yield "retry: 1000\n\n"
+
+    fim = time.monotonic() + duracao
+    while True:
+        restante = fim - time.monotonic()
+        if restante <= 0:
+            break
+
+        evento = assinatura.get(timeout=min(keepalive, restante))
+
+        if evento is None:
+            yield ": keepalive\n\n"
+        elif tabelas is None or evento["tabela"] in tabelas:
+            yield f"event: change\ndata: {json.dumps(evento, separators=(',', ':'))}\n\n"
+
+
+@events_bp.route("/events", methods=["GET"])
+def stream_events():
+    """
+    Fluxo (Server-Sent Events) das alterações feitas pelos serviços de escrita.
+    Cada evento `change` traz a tabela, o id, a operação (create, update ou delete) e a
+    versão do registro. Alterações feitas enquanto o cliente estava desconectado não são
+    reenviadas: ao (re)conectar, recarregue os dados e aplique os eventos seguintes.
+    ---
+    tags:
+      - Eventos
+    produces:
+      - text/event-stream
+    parameters:
+      - in: query
+        name: tabelas
+        type: string
+        required: false
+        description: "Tabelas de interesse, separadas por vírgula (ex.: tab_animal,tab_estoque). Sem o parâmetro, todas."
+    responses:
+        200:
+            description: "Fluxo de eventos, ex.: data: {\\"tabela\\":\\"tab_animal\\",\\"id\\":12,\\"op\\":\\"update\\",\\"version\\":3}"
+    """
+    tabelas = request.args.get("tabelas")
+    if tabelas is not None:
+        tabelas = {tabela.strip() for tabela in tabelas.split(",") if tabela.strip()}
+
+    # A assinatura é feita antes da resposta, para não perder eventos do início da conexão
+    assinatura = get_broker().subscribe()
+
+    response = Response(
+        _stream(
+            assinatura,
+            tabelas,
+            current_app.config["EVENTS_KEEPALIVE_SEGUNDOS"],
+            current_app.config["EVENTS_STREAM_SEGUNDOS"],
+        ),
+        mimetype="text/event-stream",
+    )
+    response.headers["Cache-Control"] = "no-cache"
+    # Desativa o buffer de proxies (nginx) para que cada evento chegue na hora
+    response.headers["X-Accel-Buffering"] = "no"
+    # Encerra a assinatura quando o cliente desconecta, mesmo antes do primeiro evento
+    response.call_on_close(assinatura.close)
+
+    return response
@@ -1,11 +1,19 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, url_for
 from backend.services.hospedeiro_service import (
     list_hospedeiros_service,
     get_hospedeiro_service,
     create_hospedeiro_service,
     update_hospedeiro_service,
     delete_hospedeiro_service,
+    list_hospedeiros_disponiveis_service,
 )
+from backend.external.model import HospedeiroModel
+from backend.services.dedup_service import dedup_check_service, enqueue_duplicados_service
+from backend.services.geo_service import proximos_service, raio_service
+from backend.utils.concurrency import get_if_match, with_etag
+from backend.utils.projection import get_fields
+from backend.utils.utils import parse_data
+from backend.utils.idempotency import idempotent
 
 hospedeiro_bp = Blueprint("hospedeiro", __name__, url_prefix="/hospedeiros")
 
@@ -17,6 +25,12 @@ def list_hospedeiros():
     ---
     tags:
       - Hospedeiros
+    parameters:
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: "Campos retornados, separados por vírgula (ex.: hospedeiro_id,version)."
     definitions:
       HospedeiroSchema:
         type: object
@@ -31,6 +45,10 @@ def list_hospedeiros():
             type: string
           moradia:
             type: string
+          latitude:
+            type: number
+          longitude:
+            type: number
     responses:
         200:
             description: Lista de hospedeiros
@@ -41,7 +59,7 @@ def list_hospedeiros():
         404:
             description: Nenhum hospedeiro encontrado
     """
-    response = list_hospedeiros_service()
+    response = list_hospedeiros_service(get_fields())
 
     if response["status"] == 200:
         return jsonify(response["data"]), 200
@@ -61,6 +79,11 @@ def get_hospedeiro(hospedeiro_id):
         name: hospedeiro_id
         type: integer
         required: true
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: "Campos retornados, separados por vírgula (ex.: hospedeiro_id,version). Inclua version para receber o ETag."
     definitions:
       HospedeiroSchema:
         type: object
@@ -75,6 +98,10 @@ def get_hospedeiro(hospedeiro_id):
             type: string
           moradia:
             type: string
+          latitude:
+            type: number
+          longitude:
+            type: number
     responses:
       200:
         description: Hospedeiro encontrado
@@ -83,15 +110,16 @@ def get_hospedeiro(hospedeiro_id):
       404:
         description: Hospedeiro não encontrado
     """
-    response = get_hospedeiro_service(hospedeiro_id)
+    response = get_hospedeiro_service(hospedeiro_id, get_fields())
 
     if response["status"] == 200:
-        return jsonify(response["data"]), 200
+        return with_etag(jsonify(response["data"]), response["data"]), 200
 
     return jsonify({"message": response["message"]}), response["status"]
 
 
 @hospedeiro_bp.route("/", methods=["POST"])
+@idempotent
 def create_hospedeiro():
     """
     Cria um novo hospedeiro no banco de dados.
@@ -103,6 +131,11 @@ def create_hospedeiro():
         name: hospedeiro
         schema:
           $ref: '#/definitions/HospedeiroSchema'
+      - in: header
+        name: Idempotency-Key
+        type: string
+        required: false
+        description: Chave para repetir a requisição sem criar o registro de novo
     responses:
       201:
         description: Hospedeiro criado com sucesso
@@ -110,12 +143,14 @@ def create_hospedeiro():
           $ref: '#/definitions/HospedeiroSchema'
       400:
         description: Erro ao criar hospedeiro
+      422:
+        description: Idempotency-Key já usada com outra requisição
     """
     hospedeiro_data = request.get_json()
     response = create_hospedeiro_service(hospedeiro_data)
 
     if response["status"] == 201:
-        return jsonify(response["data"]), 201
+        return with_etag(jsonify(response["data"]), response["data"]), 201
 
     return jsonify({"message": response["message"]}), response["status"]
 
@@ -132,6 +167,11 @@ def update_hospedeiro(hospedeiro_id):
         name: hospedeiro_id
         type: integer
         required: true
+      - in: header
+        name: If-Match
+        type: string
+        required: false
+        description: Versão (ETag) esperada do registro
       - in: body
         name: hospedeiro
         schema:
@@ -143,12 +183,14 @@ def update_hospedeiro(hospedeiro_id):
           $ref: '#/definitions/HospedeiroSchema'
       400:
         description: Erro ao atualizar hospedeiro
+      412:
+        description: Versão do registro não confere (If-Match)
     """
     hospedeiro_data = request.get_json()
-    response = update_hospedeiro_service(hospedeiro_id, hospedeiro_data)
+    response = update_hospedeiro_service(hospedeiro_id, hospedeiro_data, if_match=get_if_match())
 
     if response["status"] == 200:
-        return jsonify(response["data"]), 200
+        return with_etag(jsonify(response["data"]), response["data"]), 200
 
     return jsonify({"message": response["message"]}), response["status"]
 
@@ -165,12 +207,224 @@ def delete_hospedeiro(hospedeiro_id):
         name: hospedeiro_id
         type: integer
         required: true
+      - in: header
+        name: If-Match
+        type: string
+        required: false
+        description: Versão (ETag) esperada do registro
     responses:
       204:
         description: Hospedeiro deletado com sucesso
       404:
         description: Hospedeiro não encontrado
+      412:
+        description: Versão do registro não confere (If-Match)
+    """
+    response = delete_hospedeiro_service(hospedeiro_id, if_match=get_if_match())
+
+    return jsonify({"message": response["message"]}), response["status"]
+
+
+@hospedeiro_bp.route("/disponiveis", methods=["GET"])
+def list_hospedeiros_disponiveis():
+    """
+    Lista os hospedeiros livres em um período.
+    ---
+    tags:
+      - Hospedeiros
+    parameters:
+      - in: query
+        name: de
+        type: string
+        format: date
+        required: true
+        description: Início do período (AAAA-MM-DD)
+      - in: query
+        name: ate
+        type: string
+        format: date
+        description: Fim do período (AAAA-MM-DD); padrão é o mesmo dia de `de`
+    responses:
+        200:
+            description: Hospedeiros sem hospedagem no período
+            schema:
+              type: array
+              items:
+                $ref: '#/definitions/HospedeiroSchema'
+        400:
+            description: Período inválido
+    """
+    try:
+        de = parse_data(request.args["de"])
+        ate = parse_data(request.args["ate"]) if request.args.get("ate") else de
+    except (KeyError, ValueError):
+        return jsonify({"message": "Informe o período com `de` e `ate` no formato AAAA-MM-DD."}), 400
+
+    response = list_hospedeiros_disponiveis_service(de, ate)
+
+    if response["status"] == 200:
+        return jsonify(response["data"]), 200
+
+    return jsonify({"message": response["message"]}), response["status"]
+
+
+@hospedeiro_bp.route("/dedup-check", methods=["POST"])
+def dedup_check_hospedeiro():
+    """
+    Verifica se já existe um hospedeiro com o mesmo e-mail ou telefone, antes do cadastro.
+    ---
+    tags:
+      - Hospedeiros
+    parameters:
+      - in: body
+        name: contato
+        schema:
+          type: object
+          properties:
+            email:
+              type: string
+            telefone:
+              type: string
+    responses:
+      200:
+        description: "Cadastros com o mesmo contato (motivos: email e/ou telefone)"
+        schema:
+          type: object
+          properties:
+            duplicado:
+              type: boolean
+            candidatos:
+              type: array
+              items:
+                $ref: '#/definitions/HospedeiroSchema'
+      400:
+        description: Nem e-mail nem telefone informados
+    """
+    response = dedup_check_service(HospedeiroModel, request.get_json(silent=True))
+
+    if response["status"] == 200:
+        return jsonify(response["data"])
+
+    return jsonify({"message": response["message"]}), response["status"]
+
+
+@hospedeiro_bp.route("/duplicados", methods=["POST"])
+def find_duplicados_hospedeiro():
+    """
+    Procura em segundo plano cadastros de hospedeiros provavelmente duplicados.
+    Responde 202 com o job criado; os pares encontrados ficam no resultado de `/jobs/<job_id>`.
+    ---
+    tags:
+      - Hospedeiros
+    responses:
+      202:
+        description: Busca agendada
+        schema:
+          $ref: '#/definitions/JobSchema'
+    """
+    response = enqueue_duplicados_service(HospedeiroModel)
+
+    if response["status"] == 202:
+        job = response["data"]
+        return jsonify(job), 202, {"Location": url_for("job.get_job", job_id=job["job_id"])}
+
+    return jsonify({"message": response["message"]}), response["status"]
+
+
+@hospedeiro_bp.route("/proximos", methods=["GET"])
+def list_hospedeiros_proximos():
+    """
+    Lista os hospedeiros mais próximos de um ponto, com a distância em km.
+    ---
+    tags:
+      - Hospedeiros
+    parameters:
+      - in: query
+        name: latitude
+        type: number
+        required: true
+      - in: query
+        name: longitude
+        type: number
+        required: true
+      - in: query
+        name: limit
+        type: integer
+        required: false
+        description: Quantidade (padrão GEO_LIMITE_PADRAO)
+      - in: query
+        name: raio_maximo_km
+        type: number
+        required: false
+        description: Distância máxima (padrão GEO_RAIO_MAXIMO_KM)
+    responses:
+      200:
+        description: Hospedeiros do mais próximo ao mais distante
+        schema:
+          type: array
+          items:
+            $ref: '#/definitions/HospedeiroSchema'
+      400:
+        description: Coordenada ou parâmetros inválidos
+    """
+    response = proximos_service(
+        HospedeiroModel,
+        request.args.get("latitude"),
+        request.args.get("longitude"),
+        request.args.get("limit", type=int),
+        request.args.get("raio_maximo_km", type=float),
+    )
+
+    if response["status"] == 200:
+        return jsonify(response["data"])
+
+    return jsonify({"message": response["message"]}), response["status"]
+
+
+@hospedeiro_bp.route("/raio", methods=["GET"])
+def list_hospedeiros_no_raio():
+    """
+    Lista os hospedeiros a até `raio_km` de um ponto, com a distância em km.
+    ---
+    tags:
+      - Hospedeiros
+    parameters:
+      - in: query
+        name: latitude
+        type: number
+        required: true
+      - in: query
+        name: longitude
+        type: number
+        required: true
+      - in: query
+        name: raio_km
+        type: number
+        required: true
+      - in: query
+        name: limit
+        type: integer
+        required: false
+        description: Quantidade máxima (padrão GEO_LIMITE_MAXIMO)
+    responses:
+      200:
+        description: Hospedeiros dentro do raio, do mais próximo ao mais distante
+        schema:
+          type: array
+          items:
+            $ref: '#/definitions/HospedeiroSchema'
+      400:
+        description: Coordenada ou raio inválidos
     """
-    response = delete_hospedeiro_service(hospedeiro_id)
+    response = raio_service(
+        HospedeiroModel,
+        request.args.get("latitude"),
+        request.args.get("longitude"),
+        request.args.get("raio_km", type=float),
+        request.args.get("limit", type=int),
+    )
+
+    if response["status"] == 200:
+        return jsonify(response["data"])
 
     return jsonify({"message": response["message"]}), response["status"]
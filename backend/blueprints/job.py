@@ -0,0 +1,60 @@
+from flask import Blueprint, jsonify
+from backend.services.job_service import get_job_service
+
+job_bp = Blueprint("job", __name__, url_prefix="/jobs")
+
+
+@job_bp.route("/<job_id>", methods=["GET"])
+def get_job(job_id):
+    """
+    Retorna o status de um job em segundo plano.
+    ---
+    tags:
+      - Jobs
+    definitions:
+      JobSchema:
+        type: object
+        properties:
+          job_id:
+            type: string
+          nome:
+            type: string
+          status:
+            type: string
+            enum: [pendente, executando, concluido, falhou]
+          tentativas:
+            type: integer
+          max_tentativas:
+            type: integer
+          resultado:
+            type: object
+          erro:
+            type: string
+          criado_em:
+            type: string
+            format: date-time
+          iniciado_em:
+            type: string
+            format: date-time
+          concluido_em:
+            type: string
+            format: date-time
+    parameters:
+      - in: path
+        name: job_id
+        type: string
+        required: true
+    responses:
+        200:
+            description: Status do job
+            schema:
+              $ref: '#/definitions/JobSchema'
+        404:
+            description: Job não encontrado
+    """
+    response = get_job_service(job_id)
+
+    if response["status"] == 200:
+        return jsonify(response["data"])
+
+    return jsonify({"message": response["message"]}), response["status"]
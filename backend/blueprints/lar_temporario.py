@@ -6,6 +6,9 @@ from backend.services.lar_temporario_service import (
     delete_lar_temporario_service,
     update_lar_temporario_service
 )
+from backend.utils.concurrency import get_if_match, with_etag
+from backend.utils.projection import get_fields
+from backend.utils.idempotency import idempotent
 
 lar_temporario_bp = Blueprint("lar_temporario", __name__, url_prefix="/temporary_shelters")
 
@@ -16,6 +19,12 @@ def list_lar_temporarios():
     ---
     tags:
       - Lar Temporário
+    parameters:
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: "Campos retornados, separados por vírgula (ex.: lar_temporario_id,version)."
     definitions:
       LarTemporarioSchema:
         type: object
@@ -42,7 +51,7 @@ def list_lar_temporarios():
         404:
             description: Nenhum lar temporário encontrado no banco de dados.
     """
-    response = list_lar_temporarios_service()
+    response = list_lar_temporarios_service(get_fields())
 
     if response["status"] == 200:
         return jsonify(response["data"])
@@ -62,6 +71,11 @@ def get_lar_temporario(lar_temporario_id):
         name: lar_temporario_id
         type: integer
         required: true
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: "Campos retornados, separados por vírgula (ex.: lar_temporario_id,version). Inclua version para receber o ETag."
     definitions:
       LarTemporarioSchema:
         type: object
@@ -86,15 +100,16 @@ def get_lar_temporario(lar_temporario_id):
         404:
             description: Lar temporário não encontrado
     """
-    response = get_lar_temporario_service(lar_temporario_id)
+    response = get_lar_temporario_service(lar_temporario_id, get_fields())
 
     if response["status"] == 200:
-        return jsonify(response["data"])
+        return with_etag(jsonify(response["data"]), response["data"])
 
     return jsonify({"message": response["message"]}), response["status"]
 
 
 @lar_temporario_bp.route("/", methods=["POST"])
+@idempotent
 def create_lar_temporario():
     """
     Cria um novo registro de lar temporário no banco de dados.
@@ -106,6 +121,11 @@ def create_lar_temporario():
         name: lar_temporario
         schema:
           $ref: '#/definitions/LarTemporarioSchema'
+      - in: header
+        name: Idempotency-Key
+        type: string
+        required: false
+        description: Chave para repetir a requisição sem criar o registro de novo
     responses:
       201:
         description: Lar temporário criado com sucesso
@@ -113,12 +133,14 @@ def create_lar_temporario():
           $ref: '#/definitions/LarTemporarioSchema'
       400:
         description: Erro de validação ou ao criar o registro
+      422:
+        description: Idempotency-Key já usada com outra requisição
     """
     lar_temporario_data = request.get_json()
     response = create_lar_temporario_service(lar_temporario_data)
 
     if response["status"] == 201:
-        return jsonify(response["data"]), response["status"]
+        return with_etag(jsonify(response["data"]), response["data"]), response["status"]
 
     return jsonify({"message": response["message"]}), response["status"]
 
@@ -135,6 +157,11 @@ def update_lar_temporario(lar_temporario_id):
         name: lar_temporario_id
         type: integer
         required: true
+      - in: header
+        name: If-Match
+        type: string
+        required: false
+        description: Versão (ETag) esperada do registro
       - in: body
         name: lar_temporario
         schema:
@@ -146,12 +173,14 @@ def update_lar_temporario(lar_temporario_id):
           $ref: '#/definitions/LarTemporarioSchema'
       400:
         description: Erro de validação ou ao atualizar
+      412:
+        description: Versão do registro não confere (If-Match)
     """
     lar_temporario_data = request.get_json()
-    response = update_lar_temporario_service(lar_temporario_id, lar_temporario_data)
+    response = update_lar_temporario_service(lar_temporario_id, lar_temporario_data, if_match=get_if_match())
 
     if response["status"] == 200:
-        return jsonify(response["data"])
+        return with_etag(jsonify(response["data"]), response["data"])
 
     return jsonify({"message": response["message"]}), response["status"]
 
@@ -168,11 +197,18 @@ def delete_lar_temporario(lar_temporario_id):
         name: lar_temporario_id
         type: integer
         required: true
+      - in: header
+        name: If-Match
+        type: string
+        required: false
+        description: Versão (ETag) esperada do registro
     responses:
       204:
         description: Lar temporário deletado com sucesso
       404:
         description: Lar temporário não encontrado
+      412:
+        description: Versão do registro não confere (If-Match)
     """
-    response = delete_lar_temporario_service(lar_temporario_id)
+    response = delete_lar_temporario_service(lar_temporario_id, if_match=get_if_match())
     return jsonify({"message": response["message"]}), response["status"]
@@ -6,6 +6,9 @@ from backend.services.procedimento_service import (
     update_procedimento_service,
     delete_procedimento_service
 )
+from backend.utils.concurrency import get_if_match, with_etag
+from backend.utils.projection import get_fields
+from backend.utils.idempotency import idempotent
 
 procedimento_bp = Blueprint("procedimento", __name__, url_prefix="/procedimentos")
 
@@ -16,6 +19,12 @@ def list_procedimentos():
     ---
     tags:
       - Procedimentos
+    parameters:
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: "Campos retornados, separados por vírgula (ex.: procedimento_id,version)."
     definitions:
       ProcedimentoSchema:
         type: object
@@ -44,7 +53,7 @@ def list_procedimentos():
       404:
         description: Nenhum procedimento encontrado no banco de dados.
     """
-    response = list_procedimentos_service()
+    response = list_procedimentos_service(get_fields())
 
     if response["status"] == 200:
         return jsonify(response["data"]), response["status"]
@@ -64,6 +73,11 @@ def get_procedimento(procedimento_id):
         name: procedimento_id
         type: integer
         required: true
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: "Campos retornados, separados por vírgula (ex.: procedimento_id,version). Inclua version para receber o ETag."
     definitions:
       ProcedimentoSchema:
         type: object
@@ -90,15 +104,16 @@ def get_procedimento(procedimento_id):
       404:
         description: Procedimento não encontrado
     """
-    response = get_procedimento_service(procedimento_id)
+    response = get_procedimento_service(procedimento_id, get_fields())
 
     if response["status"] == 200:
-        return jsonify(response["data"]), response["status"]
+        return with_etag(jsonify(response["data"]), response["data"]), response["status"]
 
     return jsonify({"message": response["message"]}), response["status"]
 
 
 @procedimento_bp.route("/", methods=["POST"])
+@idempotent
 def create_procedimento():
     """
     Cria um novo procedimento no banco de dados.
@@ -110,6 +125,11 @@ def create_procedimento():
         name: procedimento
         schema:
           $ref: '#/definitions/ProcedimentoSchema'
+      - in: header
+        name: Idempotency-Key
+        type: string
+        required: false
+        description: Chave para repetir a requisição sem criar o registro de novo
     responses:
       201:
         description: Procedimento criado com sucesso
@@ -117,12 +137,14 @@ def create_procedimento():
           $ref: '#/definitions/ProcedimentoSchema'
       400:
         description: Erro ao criar procedimento
+      422:
+        description: Idempotency-Key já usada com outra requisição
     """
     data = request.get_json()
     response = create_procedimento_service(data)
 
     if response["status"] == 201:
-        return jsonify(response["data"]), response["status"]
+        return with_etag(jsonify(response["data"]), response["data"]), response["status"]
 
     return jsonify({"message": response["message"]}), response["status"]
 
@@ -139,6 +161,11 @@ def update_procedimento(procedimento_id):
         name: procedimento_id
         type: integer
         required: true
+      - in: header
+        name: If-Match
+        type: string
+        required: false
+        description: Versão (ETag) esperada do registro
       - in: body
         name: procedimento
         schema:
@@ -150,12 +177,14 @@ def update_procedimento(procedimento_id):
           $ref: '#/definitions/ProcedimentoSchema'
       400:
         description: Erro ao atualizar procedimento
+      412:
+        description: Versão do registro não confere (If-Match)
     """
     data = request.get_json()
-    response = update_procedimento_service(procedimento_id, data)
+    response = update_procedimento_service(procedimento_id, data, if_match=get_if_match())
 
     if response["status"] == 200:
-        return jsonify(response["data"]), response["status"]
+        return with_etag(jsonify(response["data"]), response["data"]), response["status"]
 
     return jsonify({"message": response["message"]}), response["status"]
 
@@ -172,12 +201,19 @@ def delete_procedimento(procedimento_id):
         name: procedimento_id
         type: integer
         required: true
+      - in: header
+        name: If-Match
+        type: string
+        required: false
+        description: Versão (ETag) esperada do registro
     responses:
       204:
         description: Procedimento deletado com sucesso
       404:
         description: Procedimento não encontrado
+      412:
+        description: Versão do registro não confere (If-Match)
     """
-    response = delete_procedimento_service(procedimento_id)
+    response = delete_procedimento_service(procedimento_id, if_match=get_if_match())
 
     return jsonify({"message": response["message"]}), response["status"]
@@ -0,0 +1,39 @@
+from flask import Blueprint, current_app, jsonify
+
+from backend.utils.decorators import jwt_required
+
+rate_limit_bp = Blueprint("rate_limit", __name__)
+
+
+@rate_limit_bp.route("/rate-limit/contadores", methods=["GET"])
+@jwt_required
+def get_rate_limit_contadores(current_user):
+    """
+    Contadores do limite de requisições por endpoint: requisições permitidas, bloqueadas
+    (429) e custo consumido. Com o backend Redis os contadores somam todos os workers;
+    com o backend memória, só o processo que respondeu.
+    ---
+    tags:
+      - Limite de requisições
+    security:
+      - APIKeyHeader: [ 'Authorization' ]
+    responses:
+        200:
+            description: "Contadores por endpoint, ex.: {\\"animal.list_animals\\": {\\"permitidas\\": 40, \\"bloqueadas\\": 3, \\"custo\\": 400}}"
+        401:
+            description: Token ausente ou inválido
+        500:
+            description: Erro ao consultar os contadores
+    """
+    rate_limiter = current_app.extensions["rate_limit"]
+
+    try:
+        contadores = rate_limiter.counters()
+    except Exception as e:
+        return jsonify({"message": f"Erro ao consultar os contadores: {str(e)}"}), 500
+
+    return jsonify({
+        "ativo": rate_limiter.ativo,
+        "backend": current_app.config["RATE_LIMIT_BACKEND"],
+        "contadores": contadores,
+    })
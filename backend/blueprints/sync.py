@@ -0,0 +1,78 @@
+from flask import Blueprint, jsonify, request
+from backend.services.sync_service import get_sync_service
+
+sync_bp = Blueprint("sync", __name__)
+
+
+@sync_bp.route("/sync", methods=["GET"])
+def get_sync():
+    """
+    Sincronização incremental: alterações de todos os recursos desde o último checkpoint.
+    Envie em `since` o `next_since` da resposta anterior (sem `since`, tudo desde o início)
+    e repita enquanto `has_more` for verdadeiro.
+    ---
+    tags:
+      - Sincronização
+    definitions:
+      SyncSchema:
+        type: object
+        properties:
+          changes:
+            type: array
+            items:
+              type: object
+              properties:
+                tabela:
+                  type: string
+                id:
+                  type: integer
+                op:
+                  type: string
+                  enum: [upsert, delete]
+                version:
+                  type: integer
+                updated_at:
+                  type: string
+                  format: date-time
+                data:
+                  type: object
+          next_since:
+            type: string
+          has_more:
+            type: boolean
+    parameters:
+      - in: query
+        name: since
+        type: string
+        required: false
+        description: "Cursor `next_since` da página anterior, ou uma data e hora ISO 8601 (UTC)."
+      - in: query
+        name: tabelas
+        type: string
+        required: false
+        description: "Tabelas de interesse, separadas por vírgula (ex.: tab_animal,tab_tarefa). Sem o parâmetro, todas."
+      - in: query
+        name: limit
+        type: integer
+        required: false
+        description: "Alterações por página (padrão SYNC_LIMITE_PADRAO)."
+    responses:
+        200:
+            description: Página de alterações
+            schema:
+              $ref: '#/definitions/SyncSchema'
+        400:
+            description: Parâmetros inválidos
+        410:
+            description: Checkpoint mais antigo que a retenção da lixeira (LIXEIRA_RETENCAO_DIAS); sincronize do zero
+    """
+    tabelas = request.args.get("tabelas")
+    if tabelas is not None:
+        tabelas = [tabela.strip() for tabela in tabelas.split(",") if tabela.strip()]
+
+    response = get_sync_service(request.args.get("since"), tabelas, request.args.get("limit", type=int))
+
+    if response["status"] == 200:
+        return jsonify(response["data"])
+
+    return jsonify({"message": response["message"]}), response["status"]
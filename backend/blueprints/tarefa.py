@@ -6,6 +6,14 @@ from backend.services.tarefa_service import (
     update_tarefa_service,
     delete_tarefa_service,
 )
+from backend.services.agenda_service import (
+    list_tarefas_recorrentes_service,
+    create_tarefa_recorrente_service,
+    delete_tarefa_recorrente_service,
+)
+from backend.utils.concurrency import get_if_match, with_etag
+from backend.utils.projection import get_fields
+from backend.utils.idempotency import idempotent
 
 tarefa_bp = Blueprint("tarefa", __name__, url_prefix="/tarefas")
 
@@ -16,6 +24,12 @@ def list_tarefas():
     ---
     tags:
       - Tarefas
+    parameters:
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: "Campos retornados, separados por vírgula (ex.: tarefa_id,version)."
     definitions:
       TarefaSchema:
         type: object
@@ -32,6 +46,12 @@ def list_tarefas():
             type: integer
           animal_id:
             type: integer
+          inicio:
+            type: string
+            format: date-time
+          fim:
+            type: string
+            format: date-time
     responses:
         200:
             description: Lista de tarefas
@@ -42,7 +62,7 @@ def list_tarefas():
         404:
             description: Nenhuma tarefa encontrada no banco de dados.
     """
-    response = list_tarefas_service()
+    response = list_tarefas_service(get_fields())
 
     if response["status"] == 200:
         return jsonify(response["data"])
@@ -61,6 +81,11 @@ def get_tarefa(tarefa_id):
         name: tarefa_id
         type: integer
         required: true
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: "Campos retornados, separados por vírgula (ex.: tarefa_id,version). Inclua version para receber o ETag."
     definitions:
       TarefaSchema:
         type: object
@@ -85,14 +110,15 @@ def get_tarefa(tarefa_id):
         404:
             description: Tarefa não encontrada
     """
-    response = get_tarefa_service(tarefa_id)
+    response = get_tarefa_service(tarefa_id, get_fields())
 
     if response["status"] == 200:
-        return jsonify(response["data"])
+        return with_etag(jsonify(response["data"]), response["data"])
 
     return jsonify({"message": response["message"]}), response["status"]
 
 @tarefa_bp.route("/", methods=["POST"])
+@idempotent
 def create_tarefa():
     """
     Cria uma nova tarefa no banco de dados.
@@ -104,6 +130,11 @@ def create_tarefa():
         name: tarefa
         schema:
           $ref: '#/definitions/TarefaSchema'
+      - in: header
+        name: Idempotency-Key
+        type: string
+        required: false
+        description: Chave para repetir a requisição sem criar o registro de novo
     responses:
       201:
         description: Tarefa criada com sucesso
@@ -111,13 +142,17 @@ def create_tarefa():
           $ref: '#/definitions/TarefaSchema'
       400:
         description: Erro ao criar tarefa
+      409:
+        description: O voluntário já possui uma tarefa nesse horário
+      422:
+        description: Idempotency-Key já usada com outra requisição
     """
     tarefa_data = request.get_json()
 
     response = create_tarefa_service(tarefa_data)
 
     if response["status"] == 201:
-        return jsonify(response["data"]), response["status"]
+        return with_etag(jsonify(response["data"]), response["data"]), response["status"]
 
     return jsonify({"message": response["message"]}), response["status"]
 
@@ -133,6 +168,11 @@ def update_tarefa(tarefa_id):
         name: tarefa_id
         type: integer
         required: true
+      - in: header
+        name: If-Match
+        type: string
+        required: false
+        description: Versão (ETag) esperada do registro
       - in: body
         name: tarefa
         schema:
@@ -144,13 +184,17 @@ def update_tarefa(tarefa_id):
           $ref: '#/definitions/TarefaSchema'
       400:
         description: Erro ao atualizar tarefa
+      409:
+        description: O voluntário já possui uma tarefa nesse horário
+      412:
+        description: Versão do registro não confere (If-Match)
     """
     tarefa_data = request.get_json()
 
-    response = update_tarefa_service(tarefa_id, tarefa_data)
+    response = update_tarefa_service(tarefa_id, tarefa_data, if_match=get_if_match())
 
     if response["status"] == 200:
-        return jsonify(response["data"])
+        return with_etag(jsonify(response["data"]), response["data"])
 
     return jsonify({"message": response["message"]}), response["status"]
 
@@ -166,12 +210,124 @@ def delete_tarefa(tarefa_id):
         name: tarefa_id
         type: integer
         required: true
+      - in: header
+        name: If-Match
+        type: string
+        required: false
+        description: Versão (ETag) esperada do registro
     responses:
       204:
         description: Tarefa deletada com sucesso
       404:
         description: Tarefa não encontrada
+      412:
+        description: Versão do registro não confere (If-Match)
+    """
+    response = delete_tarefa_service(tarefa_id, if_match=get_if_match())
+
+    return jsonify({"message": response["message"]}), response["status"]
+
+@tarefa_bp.route("/recorrentes", methods=["GET"])
+def list_tarefas_recorrentes():
+    """
+    Lista os modelos de tarefa recorrente.
+    ---
+    tags:
+      - Tarefas
+    definitions:
+      TarefaRecorrenteSchema:
+        type: object
+        properties:
+          tarefa_recorrente_id:
+            type: integer
+          tipo:
+            type: string
+          descricao:
+            type: string
+          voluntario_id:
+            type: integer
+          animal_id:
+            type: integer
+          inicio:
+            type: string
+            format: date-time
+          duracao_minutos:
+            type: integer
+          intervalo_dias:
+            type: integer
+          data_termino:
+            type: string
+            format: date
+    responses:
+        200:
+            description: Lista de tarefas recorrentes
+            schema:
+              type: array
+              items:
+                $ref: '#/definitions/TarefaRecorrenteSchema'
+    """
+    response = list_tarefas_recorrentes_service()
+
+    if response["status"] == 200:
+        return jsonify(response["data"])
+
+    return jsonify({"message": response["message"]}), response["status"]
+
+@tarefa_bp.route("/recorrentes", methods=["POST"])
+@idempotent
+def create_tarefa_recorrente():
+    """
+    Cria um modelo de tarefa recorrente. As ocorrências aparecem na agenda do voluntário.
+    ---
+    tags:
+      - Tarefas
+    parameters:
+      - in: body
+        name: tarefa_recorrente
+        schema:
+          $ref: '#/definitions/TarefaRecorrenteSchema'
+      - in: header
+        name: Idempotency-Key
+        type: string
+        required: false
+        description: Chave para repetir a requisição sem criar o registro de novo
+    responses:
+      201:
+        description: Tarefa recorrente criada com sucesso
+        schema:
+          $ref: '#/definitions/TarefaRecorrenteSchema'
+      400:
+        description: Erro ao criar tarefa recorrente
+      409:
+        description: O voluntário já possui uma tarefa nesse horário
+      422:
+        description: Idempotency-Key já usada com outra requisição
+    """
+    response = create_tarefa_recorrente_service(request.get_json())
+
+    if response["status"] == 201:
+        return jsonify(response["data"]), response["status"]
+
+    return jsonify({"message": response["message"]}), response["status"]
+
+@tarefa_bp.route("/recorrentes/<int:tarefa_recorrente_id>", methods=["DELETE"])
+def delete_tarefa_recorrente(tarefa_recorrente_id):
+    """
+    Deleta um modelo de tarefa recorrente.
+    ---
+    tags:
+      - Tarefas
+    parameters:
+      - in: path
+        name: tarefa_recorrente_id
+        type: integer
+        required: true
+    responses:
+      204:
+        description: Tarefa recorrente deletada com sucesso
+      404:
+        description: Tarefa recorrente não encontrada
     """
-    response = delete_tarefa_service(tarefa_id)
+    response = delete_tarefa_recorrente_service(tarefa_recorrente_id)
 
     return jsonify({"message": response["message"]}), response["status"]
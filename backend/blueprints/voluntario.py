@@ -6,6 +6,11 @@ from backend.services.voluntario_service import (
     delete_voluntario_service,
     update_voluntario_service,
 )
+from backend.services.agenda_service import get_agenda_voluntario_service
+from backend.utils.concurrency import get_if_match, with_etag
+from backend.utils.projection import get_fields
+from backend.utils.utils import parse_data
+from backend.utils.idempotency import idempotent
 
 voluntario_bp = Blueprint("voluntario", __name__, url_prefix="/voluntarios")
 
@@ -17,6 +22,12 @@ def list_voluntarios():
     ---
     tags:
       - Voluntários
+    parameters:
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: "Campos retornados, separados por vírgula (ex.: voluntario_id,version)."
     definitions:
       VoluntarioSchema:
         type: object
@@ -41,7 +52,7 @@ def list_voluntarios():
         404:
             description: Nenhum voluntário encontrado no banco de dados.
     """
-    response = list_voluntarios_service()
+    response = list_voluntarios_service(get_fields())
 
     if response["status"] == 200:
         return jsonify(response["data"])
@@ -61,6 +72,11 @@ def get_voluntario(voluntario_id):
         name: voluntario_id
         type: integer
         required: true
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: "Campos retornados, separados por vírgula (ex.: voluntario_id,version). Inclua version para receber o ETag."
     definitions:
       VoluntarioSchema:
         type: object
@@ -83,15 +99,16 @@ def get_voluntario(voluntario_id):
         404:
             description: Voluntário não encontrado
     """
-    response = get_voluntario_service(voluntario_id)
+    response = get_voluntario_service(voluntario_id, get_fields())
 
     if response["status"] == 200:
-        return jsonify(response["data"])
+        return with_etag(jsonify(response["data"]), response["data"])
 
     return jsonify({"message": response["message"]}), response["status"]
 
 
 @voluntario_bp.route("/", methods=["POST"])
+@idempotent
 def create_voluntario():
     """
     Cria um novo voluntário no banco de dados.
@@ -103,6 +120,11 @@ def create_voluntario():
         name: voluntario
         schema:
           $ref: '#/definitions/VoluntarioSchema'
+      - in: header
+        name: Idempotency-Key
+        type: string
+        required: false
+        description: Chave para repetir a requisição sem criar o registro de novo
     responses:
       201:
         description: Voluntário criado com sucesso
@@ -110,13 +132,15 @@ def create_voluntario():
           $ref: '#/definitions/VoluntarioSchema'
       400:
         description: Erro ao criar voluntário
+      422:
+        description: Idempotency-Key já usada com outra requisição
     """
     voluntario_data = request.get_json()
 
     response = create_voluntario_service(voluntario_data)
 
     if response["status"] == 201:
-        return jsonify(response["data"]), response["status"]
+        return with_etag(jsonify(response["data"]), response["data"]), response["status"]
 
     return jsonify({"message": response["message"]}), response["status"]
 
@@ -133,13 +157,20 @@ def delete_voluntario(voluntario_id):
         name: voluntario_id
         type: integer
         required: true
+      - in: header
+        name: If-Match
+        type: string
+        required: false
+        description: Versão (ETag) esperada do registro
     responses:
       204:
         description: Voluntário deletado com sucesso
       404:
         description: Voluntário não encontrado
+      412:
+        description: Versão do registro não confere (If-Match)
     """
-    response = delete_voluntario_service(voluntario_id)
+    response = delete_voluntario_service(voluntario_id, if_match=get_if_match())
 
     return jsonify({"message": response["message"]}), response["status"]
 
@@ -156,6 +187,11 @@ def update_voluntario(voluntario_id):
         name: voluntario_id
         type: integer
         required: true
+      - in: header
+        name: If-Match
+        type: string
+        required: false
+        description: Versão (ETag) esperada do registro
       - in: body
         name: voluntario
         schema:
@@ -167,12 +203,59 @@ def update_voluntario(voluntario_id):
           $ref: '#/definitions/VoluntarioSchema'
       400:
         description: Erro ao atualizar voluntário
+      412:
+        description: Versão do registro não confere (If-Match)
     """
     voluntario_data = request.get_json()
 
-    response = update_voluntario_service(voluntario_id, voluntario_data)
+    response = update_voluntario_service(voluntario_id, voluntario_data, if_match=get_if_match())
 
     if response["status"] == 200:
-        return jsonify(response["data"])
+        return with_etag(jsonify(response["data"]), response["data"])
+
+    return jsonify({"message": response["message"]}), response["status"]
+
+
+@voluntario_bp.route("/<int:voluntario_id>/agenda", methods=["GET"])
+def get_agenda_voluntario(voluntario_id):
+    """
+    Retorna a agenda do voluntário no período, incluindo as ocorrências das tarefas recorrentes.
+    ---
+    tags:
+      - Voluntários
+    parameters:
+      - in: path
+        name: voluntario_id
+        type: integer
+        required: true
+      - in: query
+        name: de
+        type: string
+        format: date
+        required: true
+        description: Início do período (AAAA-MM-DD)
+      - in: query
+        name: ate
+        type: string
+        format: date
+        description: Fim do período, inclusive (AAAA-MM-DD); padrão é o mesmo dia de `de`
+    responses:
+        200:
+            description: Compromissos do voluntário ordenados por início
+        400:
+            description: Período inválido
+        404:
+            description: Voluntário não encontrado
+    """
+    try:
+        de = parse_data(request.args["de"])
+        ate = parse_data(request.args["ate"]) if request.args.get("ate") else de
+    except (KeyError, ValueError):
+        return jsonify({"message": "Informe o período com `de` e `ate` no formato AAAA-MM-DD."}), 400
+
+    response = get_agenda_voluntario_service(voluntario_id, de, ate)
+
+    if response["status"] == 200:
+        return jsonify(response["data"]), 200
 
     return jsonify({"message": response["message"]}), response["status"]
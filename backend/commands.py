@@ -0,0 +1,208 @@
+import multiprocessing
+import signal
+import threading
+import time
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from backend.db import db
+from backend.seed import PERFIS, TAMANHO_FOTO, seed_database
+from backend.services.auditoria_service import criar_particoes
+from backend.services.custo_animal_service import rebuild_custos_animais
+from backend.services.dedup_service import DEDUP_MODELS, find_duplicados
+from backend.services.geo_service import geocodificar_pendentes
+from backend.services.lixeira_service import purge_lixeira
+from backend.services.progresso_campanha_service import rebuild_progresso_campanhas
+from backend.utils.jobs import enqueue, purge_jobs, run_worker
+
+custos_cli = AppGroup("custos", help="Comandos do resumo de custos por animal.")
+campanhas_cli = AppGroup("campanhas", help="Comandos dos contadores de arrecadação das campanhas.")
+jobs_cli = AppGroup("jobs", help="Comandos da fila de jobs em segundo plano.")
+lixeira_cli = AppGroup("lixeira", help="Comandos da lixeira (registros removidos).")
+auditoria_cli = AppGroup("auditoria", help="Comandos da trilha de auditoria.")
+duplicados_cli = AppGroup("duplicados", help="Comandos de cadastros duplicados de adotantes e hospedeiros.")
+localizacao_cli = AppGroup("localizacao", help="Comandos das coordenadas de adotantes, hospedeiros e campanhas.")
+
+
+def _volume(ctx, param, valores):
+    # "--volume tab_doacao=1000000" -> {"tab_doacao": 1000000}
+    volumes = {}
+    for valor in valores:
+        tabela, _, quantidade = valor.partition("=")
+
+        if tabela not in PERFIS["pequeno"] or not quantidade.isdigit():
+            tabelas = ", ".join(PERFIS["pequeno"])
+            raise click.BadParameter(f"use TABELA=QUANTIDADE, com uma destas tabelas: {tabelas}.")
+
+        volumes[tabela] = int(quantidade)
+
+    return volumes
+
+
+@click.command("seed")
+@click.option("--perfil", type=click.Choice(list(PERFIS)), default="pequeno", show_default=True, help="Volumes base por tabela.")
+@click.option("--volume", "volumes", multiple=True, callback=_volume, metavar="TABELA=QUANTIDADE", help="Sobrescreve o volume de uma tabela (pode repetir).")
+@click.option("--semente", default=42, show_default=True, help="Semente do gerador; a mesma semente gera os mesmos dados.")
+@click.option("--lote", default=5000, show_default=True, help="Linhas por insert (ou COPY).")
+def seed(perfil, volumes, semente, lote):
+    """
+    Preenche o banco (vazio) com dados sintéticos de todas as tabelas.
+    """
+    volumes = {**PERFIS[perfil], **volumes}
+
+    def progresso(tabela, linhas):
+        click.echo(f"{tabela}: {linhas} linhas ({time.perf_counter() - inicio:.1f}s)")
+
+    inicio = time.perf_counter()
+    try:
+        inseridos = seed_database(volumes, semente, TAMANHO_FOTO[perfil], lote, progresso)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    click.echo(f"{sum(inseridos.values())} linhas inseridas em {time.perf_counter() - inicio:.1f}s.")
+
+
+@custos_cli.command("rebuild")
+def rebuild_custos():
+    """
+    Recalcula do zero o resumo de custos por animal.
+    """
+    total = rebuild_custos_animais()
+    click.echo(f"Resumo de custos recalculado para {total} animais.")
+
+
+@campanhas_cli.command("rebuild")
+def rebuild_campanhas():
+    """
+    Recalcula do zero os contadores de arrecadação das campanhas.
+    """
+    total = rebuild_progresso_campanhas()
+    click.echo(f"Progresso recalculado para {total} campanhas.")
+
+
+@lixeira_cli.command("purge")
+@click.option("--retencao-dias", type=int, default=None, help="Padrão: LIXEIRA_RETENCAO_DIAS.")
+@click.option("--lote", type=click.IntRange(min=1), default=None, help="Linhas apagadas por transação. Padrão: LIXEIRA_LOTE.")
+def purge(retencao_dias, lote):
+    """
+    Apaga de vez os registros removidos há mais tempo que a retenção (ex.: via cron).
+    """
+    try:
+        apagados = purge_lixeira(retencao_dias, lote)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    for tabela, total in apagados.items():
+        if total:
+            click.echo(f"{tabela}: {total} registros apagados")
+    click.echo(f"{sum(apagados.values())} registros apagados da lixeira.")
+
+
+@lixeira_cli.command("agendar")
+def agendar():
+    """
+    Coloca na fila de jobs a limpeza da lixeira, que se reagenda a cada
+    LIXEIRA_INTERVALO_SEGUNDOS. Se já houver uma execução pendente, nenhuma outra é criada.
+    """
+    job = enqueue("lixeira.purge", {}, chave_unica="lixeira.purge")
+    db.session.commit()
+    click.echo(f"Limpeza da lixeira agendada no job {job.job_id}.")
+
+
+@auditoria_cli.command("particoes")
+@click.option("--meses", default=3, show_default=True, help="Meses à frente, além do atual.")
+def particoes(meses):
+    """
+    Cria as partições mensais da tab_auditoria no PostgreSQL (ex.: via cron, todo mês).
+    """
+    criadas = criar_particoes(meses)
+
+    if not criadas:
+        click.echo("O banco não é PostgreSQL; a tab_auditoria não é particionada.")
+        return
+
+    click.echo(f"Partições disponíveis: {', '.join(criadas)}.")
+
+
+@duplicados_cli.command("buscar")
+@click.option("--tabela", type=click.Choice(list(DEDUP_MODELS)), multiple=True, help="Padrão: todas.")
+@click.option("--limiar", type=float, default=None, help="Similaridade mínima dos nomes. Padrão: DEDUP_SIMILARIDADE_MINIMA.")
+def buscar(tabela, limiar):
+    """
+    Lista os pares de cadastros provavelmente duplicados.
+    """
+    for nome in tabela or DEDUP_MODELS:
+        pares = find_duplicados(DEDUP_MODELS[nome], limiar)
+
+        for par in pares:
+            click.echo(f"{nome}: {par['ids'][0]} e {par['ids'][1]} ({', '.join(par['motivos'])}, similaridade {par['similaridade']})")
+        click.echo(f"{nome}: {len(pares)} pares provavelmente duplicados.")
+
+
+@localizacao_cli.command("geocodificar")
+@click.option("--lote", default=1000, show_default=True, help="Registros por transação.")
+def geocodificar(lote):
+    """
+    Preenche a coordenada dos registros sem latitude/longitude a partir do endereço.
+    """
+    geocodificados = geocodificar_pendentes(lote)
+
+    for tabela, total in geocodificados.items():
+        click.echo(f"{tabela}: {total} registros geocodificados")
+
+
+def _executar_worker(app, intervalo):
+    """
+    Executa o laço do worker até receber SIGTERM ou SIGINT, terminando o job em andamento.
+    """
+    parar = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *args: parar.set())
+    signal.signal(signal.SIGINT, lambda *args: parar.set())
+
+    run_worker(app, parar, intervalo)
+
+
+def _processo_worker(intervalo):
+    # Cada processo cria a própria aplicação e conexões com o banco
+    from backend import create_app
+
+    _executar_worker(create_app(), intervalo)
+
+
+@jobs_cli.command("purge")
+@click.option("--lote", type=click.IntRange(min=1), default=None, help="Linhas apagadas por transação. Padrão: LIXEIRA_LOTE.")
+def purge_jobs_finalizados(lote):
+    """
+    Apaga os jobs finalizados há mais de JOBS_TTL_SEGUNDOS (também feito pelo job da lixeira).
+    """
+    click.echo(f"{purge_jobs(lote)} jobs finalizados apagados.")
+
+
+@jobs_cli.command("worker")
+@click.option("--processos", default=1, show_default=True, help="Quantidade de processos worker.")
+@click.option("--intervalo", default=1.0, show_default=True, help="Espera, em segundos, quando a fila está vazia.")
+def worker(processos, intervalo):
+    """
+    Processa os jobs da fila configurada em JOBS_BACKEND.
+    """
+    if processos <= 1:
+        _executar_worker(current_app._get_current_object(), intervalo)
+        return
+
+    contexto = multiprocessing.get_context("spawn")
+    workers = [contexto.Process(target=_processo_worker, args=(intervalo,)) for _ in range(processos)]
+
+    for processo in workers:
+        processo.start()
+
+    click.echo(f"{processos} workers de jobs iniciados.")
+
+    try:
+        for processo in workers:
+            processo.join()
+    except KeyboardInterrupt:
+        for processo in workers:
+            processo.terminate()
+            processo.join()
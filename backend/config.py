@@ -2,6 +2,8 @@ import os
 
 from dotenv import load_dotenv
 
+from backend.utils.utils import strtobool
+
 load_dotenv()
 
 
@@ -25,6 +27,36 @@ class DefaultConfig:
     API_VERSION = os.environ.get("API_VERSION")
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Quantidade de proxies confiáveis (ex.: 1 atrás do balanceador) cujos X-Forwarded-For e
+    # X-Forwarded-Proto são usados como IP e esquema do cliente. 0 ignora os cabeçalhos, que
+    # o próprio cliente poderia forjar sem um proxy na frente
+    PROXY_FIX_X_FOR = int(os.getenv("PROXY_FIX_X_FOR", "0"))
+    PROXY_FIX_X_PROTO = int(os.getenv("PROXY_FIX_X_PROTO", "0"))
+
+    # Compressão das respostas: algoritmos em ordem de preferência (br e zstd exigem os
+    # pacotes `brotli` e `zstandard`), tamanho mínimo em bytes e nível de cada algoritmo
+    COMPRESS_ALGORITHMS = os.getenv("COMPRESS_ALGORITHMS", "zstd,br,gzip")
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "500"))
+    COMPRESS_LEVEL_GZIP = int(os.getenv("COMPRESS_LEVEL_GZIP", "6"))
+    COMPRESS_LEVEL_BR = int(os.getenv("COMPRESS_LEVEL_BR", "4"))
+    COMPRESS_LEVEL_ZSTD = int(os.getenv("COMPRESS_LEVEL_ZSTD", "3"))
+    # Cache dos corpos já comprimidos (0 desativa)
+    COMPRESS_CACHE_SIZE = int(os.getenv("COMPRESS_CACHE_SIZE", "128"))
+    COMPRESS_CACHE_MAX_BYTES = int(os.getenv("COMPRESS_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+    # Tempo (segundos) em que as contagens do GET /dashboard ficam em cache (0 desativa). Com
+    # "redis", a invalidação feita por uma escrita vale para todos os workers; com "memoria",
+    # só para o worker que atendeu a escrita (os demais esperam o TTL)
+    DASHBOARD_CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", "30"))
+    DASHBOARD_CACHE_BACKEND = os.getenv("DASHBOARD_CACHE_BACKEND", "redis" if os.getenv("REDIS_URL") else "memoria").lower()
+
+    # Serialização JSON das respostas: "orjson", "msgspec", "stdlib" ou "auto" (o primeiro
+    # instalado entre orjson e msgspec, com a biblioteca padrão como alternativa)
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "auto")
+
+    # Adia o carregamento do flasgger e do alembic para reduzir o tempo de inicialização dos workers
+    LAZY_STARTUP = strtobool(os.getenv("LAZY_STARTUP", "false"))
     SHOW_SQLALCHEMY_LOG_MESSAGES = False
 
     SWAGGER = {
@@ -35,14 +67,110 @@ class DefaultConfig:
 
     # Configuration to JWT
     SECRET_KEY = os.environ.get("SECRET_KEY")
-    # AUDIENCE = os.environ.get("AUDIENCE")
+    # Audiência (claim `aud`) dos tokens; opcional, validada só quando configurada
+    AUDIENCE = os.environ.get("AUDIENCE")
     
     DATABASE_URL = os.getenv("DATABASE_URL")
 
+    # Réplicas de leitura (URLs separadas por vírgula): requisições GET leem delas e
+    # escritas vão para o primário. Após uma escrita, o cliente lê do primário por
+    # REPLICA_STICKY_SECONDS; réplicas com falha são ignoradas até a próxima checagem.
+    DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+    SQLALCHEMY_BINDS = {f"replica_{i}": url for i, url in enumerate(DATABASE_REPLICA_URLS)}
+    REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+    REPLICA_HEALTH_INTERVAL = int(os.getenv("REPLICA_HEALTH_INTERVAL", "10"))
+
+    # Saldo a partir do qual um item aparece na lista de estoque baixo
+    ESTOQUE_LIMITE_BAIXO = int(os.getenv("ESTOQUE_LIMITE_BAIXO", "5"))
+
+    # Fila de jobs em segundo plano: "redis" ou "database" (tabela tab_job, para execuções locais)
+    REDIS_URL = os.getenv("REDIS_URL")
+    JOBS_BACKEND = os.getenv("JOBS_BACKEND", "redis" if REDIS_URL else "database").lower()
+    JOBS_MAX_TENTATIVAS = int(os.getenv("JOBS_MAX_TENTATIVAS", "3"))
+    # Espera antes da nova tentativa; dobra a cada falha
+    JOBS_BACKOFF_SEGUNDOS = int(os.getenv("JOBS_BACKOFF_SEGUNDOS", "5"))
+    # Job em execução há mais tempo que isso volta para a fila (worker interrompido)
+    JOBS_TIMEOUT_SEGUNDOS = int(os.getenv("JOBS_TIMEOUT_SEGUNDOS", "300"))
+    # Tempo que jobs finalizados ficam disponíveis para consulta (no banco, apagados pela limpeza da lixeira)
+    JOBS_TTL_SEGUNDOS = int(os.getenv("JOBS_TTL_SEGUNDOS", "86400"))
+    # Processa os jobs em uma thread do próprio processo da API, sem `flask jobs worker`
+    JOBS_WORKER_INPROCESS = strtobool(os.getenv("JOBS_WORKER_INPROCESS", "false"))
+
+    # Eventos de alteração do GET /events: "redis" (pub/sub, entre todos os workers) ou
+    # "memoria" (só entre as conexões do mesmo processo)
+    EVENTS_BACKEND = os.getenv("EVENTS_BACKEND", "redis" if REDIS_URL else "memoria").lower()
+    # Comentário enviado a cada N segundos sem eventos, para manter a conexão aberta
+    EVENTS_KEEPALIVE_SEGUNDOS = int(os.getenv("EVENTS_KEEPALIVE_SEGUNDOS", "15"))
+    # Duração máxima de cada conexão; o navegador reconecta sozinho. Com workers síncronos
+    # do Gunicorn (GUNICORN_WORKER_CLASS=sync), precisa ser menor que GUNICORN_TIMEOUT
+    EVENTS_STREAM_SEGUNDOS = int(os.getenv("EVENTS_STREAM_SEGUNDOS", "60"))
+    # Eventos pendentes por conexão (backend memória); acima disso, os novos são descartados
+    EVENTS_MAX_PENDENTES = int(os.getenv("EVENTS_MAX_PENDENTES", "1000"))
+
+    # GET /sync: alterações por página (padrão e máximo) e margem, em segundos, antes de
+    # "agora" para não pular transações que ainda não fizeram commit
+    SYNC_LIMITE_PADRAO = int(os.getenv("SYNC_LIMITE_PADRAO", "500"))
+    SYNC_LIMITE_MAXIMO = int(os.getenv("SYNC_LIMITE_MAXIMO", "2000"))
+    SYNC_MARGEM_SEGUNDOS = int(os.getenv("SYNC_MARGEM_SEGUNDOS", "5"))
+
+    # Lixeira: registros removidos há mais de LIXEIRA_RETENCAO_DIAS são apagados de vez, em
+    # lotes de LIXEIRA_LOTE linhas. Clientes do GET /sync com checkpoint mais antigo que a
+    # retenção precisam sincronizar do zero. O job agendado roda a cada LIXEIRA_INTERVALO_SEGUNDOS
+    LIXEIRA_RETENCAO_DIAS = int(os.getenv("LIXEIRA_RETENCAO_DIAS", "30"))
+    LIXEIRA_LOTE = int(os.getenv("LIXEIRA_LOTE", "1000"))
+    LIXEIRA_INTERVALO_SEGUNDOS = int(os.getenv("LIXEIRA_INTERVALO_SEGUNDOS", "86400"))
+
+    # Trilha de auditoria: "database" (tab_auditoria, na transação da alteração) ou "arquivo"
+    # (JSONL com gzip em AUDITORIA_DIRETORIO, gravado em lotes de AUDITORIA_LOTE entradas)
+    AUDITORIA_BACKEND = os.getenv("AUDITORIA_BACKEND", "database").lower()
+    AUDITORIA_DIRETORIO = os.getenv("AUDITORIA_DIRETORIO", "auditoria")
+    AUDITORIA_LOTE = int(os.getenv("AUDITORIA_LOTE", "100"))
+    # Entradas por página do GET /auditoria (padrão e máximo)
+    AUDITORIA_LIMITE_PADRAO = int(os.getenv("AUDITORIA_LIMITE_PADRAO", "100"))
+    AUDITORIA_LIMITE_MAXIMO = int(os.getenv("AUDITORIA_LIMITE_MAXIMO", "1000"))
+
+    # Limite de requisições por balde de tokens: "redis" (compartilhado entre os workers) ou
+    # "memoria" (por processo). Cada cliente (usuário do JWT ou IP) acumula até
+    # RATE_LIMIT_CAPACIDADE tokens, repostos a RATE_LIMIT_POR_SEGUNDO; rotas caras custam mais
+    RATE_LIMIT_ENABLED = strtobool(os.getenv("RATE_LIMIT_ENABLED", "true"))
+    RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "redis" if REDIS_URL else "memoria").lower()
+    RATE_LIMIT_CAPACIDADE = float(os.getenv("RATE_LIMIT_CAPACIDADE", "120"))
+    RATE_LIMIT_POR_SEGUNDO = float(os.getenv("RATE_LIMIT_POR_SEGUNDO", "2"))
+    # Login e cadastro, por IP: cada tentativa calcula um hash PBKDF2
+    RATE_LIMIT_AUTH_CAPACIDADE = float(os.getenv("RATE_LIMIT_AUTH_CAPACIDADE", "10"))
+    RATE_LIMIT_AUTH_POR_MINUTO = float(os.getenv("RATE_LIMIT_AUTH_POR_MINUTO", "10"))
+    # Custos por endpoint, sobrescrevendo os do código (ex.: "animal.list_animals=10,sync.get_sync=5")
+    RATE_LIMIT_CUSTOS = os.getenv("RATE_LIMIT_CUSTOS", "")
+
+    # Idempotency-Key nos POST de criação: "redis" ou "database" (tab_idempotencia). A resposta
+    # fica guardada por IDEMPOTENCIA_TTL_SEGUNDOS; uma requisição em andamento segura a chave
+    # por até IDEMPOTENCIA_RESERVA_SEGUNDOS
+    IDEMPOTENCIA_BACKEND = os.getenv("IDEMPOTENCIA_BACKEND", "redis" if REDIS_URL else "database").lower()
+    IDEMPOTENCIA_TTL_SEGUNDOS = int(os.getenv("IDEMPOTENCIA_TTL_SEGUNDOS", "86400"))
+    IDEMPOTENCIA_RESERVA_SEGUNDOS = int(os.getenv("IDEMPOTENCIA_RESERVA_SEGUNDOS", "60"))
+
+    # Cadastros duplicados de adotantes e hospedeiros: candidatos devolvidos pelo dedup-check e,
+    # na busca em lote, similaridade mínima dos nomes (trigramas, 0 a 1) e tamanho máximo de bloco
+    DEDUP_CANDIDATOS_MAXIMO = int(os.getenv("DEDUP_CANDIDATOS_MAXIMO", "20"))
+    DEDUP_SIMILARIDADE_MINIMA = float(os.getenv("DEDUP_SIMILARIDADE_MINIMA", "0.6"))
+    DEDUP_BLOCO_MAXIMO = int(os.getenv("DEDUP_BLOCO_MAXIMO", "500"))
+    # Pares guardados no resultado do job (o total encontrado vem à parte)
+    DEDUP_PARES_MAXIMO = int(os.getenv("DEDUP_PARES_MAXIMO", "1000"))
+
+    # Coordenadas de adotantes, hospedeiros e campanhas: "offline" (locais conhecidos) preenche
+    # a latitude/longitude a partir do endereço quando não são enviadas; "nenhum" só aceita as manuais
+    GEOCODER = os.getenv("GEOCODER", "offline").lower()
+    GEO_RAIO_MAXIMO_KM = float(os.getenv("GEO_RAIO_MAXIMO_KM", "500"))
+    GEO_LIMITE_PADRAO = int(os.getenv("GEO_LIMITE_PADRAO", "10"))
+    GEO_LIMITE_MAXIMO = int(os.getenv("GEO_LIMITE_MAXIMO", "100"))
+
 
 class LocalConfig(DefaultConfig):
     DEBUG = True
 
+    JOBS_WORKER_INPROCESS = strtobool(os.getenv("JOBS_WORKER_INPROCESS", "true"))
+    AUDITORIA_BACKEND = os.getenv("AUDITORIA_BACKEND", "arquivo").lower()
+
     SQLALCHEMY_DATABASE_URI = DefaultConfig.DATABASE_URL
 
 
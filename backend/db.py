@@ -1,9 +1,20 @@
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.orm import DeclarativeBase
 
+from backend.utils.auditoria import register_auditoria
+from backend.utils.replicas import RoutingSession
+from backend.utils.soft_delete import register_soft_delete
+
 
 class Base(DeclarativeBase):
     pass
 
 
-db = SQLAlchemy(model_class=Base)
+# A sessão envia as leituras das requisições GET para as réplicas, quando configuradas
+db = SQLAlchemy(model_class=Base, session_options={"class_": RoutingSession})
+
+# Registros removidos (deleted_at preenchido) ficam fora das consultas da aplicação
+register_soft_delete(RoutingSession, Base.registry)
+
+# Diffs de cada flush vão para a trilha de auditoria (AUDITORIA_BACKEND)
+register_auditoria(RoutingSession)
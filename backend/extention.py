@@ -1,5 +1,13 @@
 from flask_cors import CORS
-from flask_migrate import Migrate
 
-migrate = Migrate()
-cors = CORS()
\ No newline at end of file
+cors = CORS()
+
+
+def init_migrate(app, db):
+    """
+    Configura o Flask-Migrate. A importação fica aqui dentro para que o alembic
+    só seja carregado quando a aplicação realmente precisar dos comandos `flask db`.
+    """
+    from flask_migrate import Migrate
+
+    return Migrate(app, db)
@@ -1,7 +1,18 @@
-from sqlalchemy.orm import Mapped, mapped_column
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy.orm import Mapped, mapped_column, validates
 from backend.db import db
+from backend.utils.dedup import normalizar_email, normalizar_telefone
+from backend.utils.geo import codificar_geohash
+from backend.utils.utils import agora_utc
 from werkzeug.security import generate_password_hash, check_password_hash
 
+# Índices parciais: ATIVOS cobre só os registros não removidos, que são os lidos pela
+# aplicação; REMOVIDOS cobre só a lixeira, lida pela limpeza dos registros antigos
+ATIVOS = {"postgresql_where": db.text("deleted_at IS NULL"), "sqlite_where": db.text("deleted_at IS NULL")}
+REMOVIDOS = {"postgresql_where": db.text("deleted_at IS NOT NULL"), "sqlite_where": db.text("deleted_at IS NOT NULL")}
+
 # === User ===
 from backend.external.schemas import UserSchema
 
@@ -38,6 +49,12 @@ from backend.external.schemas import AnimalSchema
 
 class AnimalModel(db.Model):
     __tablename__ = "tab_animal"
+    __table_args__ = (
+        # Contagens do painel por status e espécie
+        db.Index("ix_tab_animal_status_especie", "status", "especie", **ATIVOS),
+        db.Index("ix_tab_animal_updated_at", "updated_at", "animal_id"),
+        db.Index("ix_tab_animal_deleted_at", "deleted_at", **REMOVIDOS),
+    )
 
     animal_id: Mapped[int] = mapped_column("animal_id", primary_key=True)
     nome: Mapped[str] = mapped_column("nome", nullable=False)
@@ -49,6 +66,11 @@ class AnimalModel(db.Model):
     status: Mapped[str] = mapped_column("status", nullable=False)
     especie: Mapped[str] = mapped_column("especie", nullable=False)
     data_cadastro: Mapped[str] = mapped_column("data_cadastro", nullable=False)
+    version: Mapped[int] = mapped_column("version", nullable=False)
+    updated_at: Mapped[datetime] = mapped_column("updated_at", nullable=False, default=agora_utc, onupdate=agora_utc)
+    deleted_at: Mapped[Optional[datetime]] = mapped_column("deleted_at", nullable=True)
+
+    __mapper_args__ = {"version_id_col": version}
 
     def __init__(self, nome, idade, foto, descricao, sexo, castracao, status, especie, data_cadastro):
         self.nome = nome
@@ -71,12 +93,21 @@ from backend.external.schemas import AdocaoSchema
 
 class AdocaoModel(db.Model):
     __tablename__ = "tab_adocao"
+    __table_args__ = (
+        db.Index("ix_tab_adocao_updated_at", "updated_at", "adocao_id"),
+        db.Index("ix_tab_adocao_deleted_at", "deleted_at", **REMOVIDOS),
+    )
 
     adocao_id: Mapped[int] = mapped_column("adocao_id", primary_key=True)
     animal_id: Mapped[int] = mapped_column("animal_id", nullable=False)
     adotante_id: Mapped[int] = mapped_column("adotante_id", nullable=False)
     data_adocao: Mapped[str] = mapped_column("data_adocao", nullable=False)
     data_cadastro: Mapped[str] = mapped_column("data_cadastro", nullable=False)
+    version: Mapped[int] = mapped_column("version", nullable=False)
+    updated_at: Mapped[datetime] = mapped_column("updated_at", nullable=False, default=agora_utc, onupdate=agora_utc)
+    deleted_at: Mapped[Optional[datetime]] = mapped_column("deleted_at", nullable=True)
+
+    __mapper_args__ = {"version_id_col": version}
 
     def __init__(self, animal_id, adotante_id, data_adocao, data_cadastro):
         self.animal_id = animal_id
@@ -94,18 +125,52 @@ from backend.external.schemas import AdotanteSchema
 
 class AdotanteModel(db.Model):
     __tablename__ = "tab_adotante"
+    __table_args__ = (
+        db.Index("ix_tab_adotante_updated_at", "updated_at", "adotante_id"),
+        db.Index("ix_tab_adotante_deleted_at", "deleted_at", **REMOVIDOS),
+        db.Index("ix_tab_adotante_geohash", "geohash", **ATIVOS),
+        db.Index("ix_tab_adotante_email_normalizado", "email_normalizado", **ATIVOS),
+        db.Index("ix_tab_adotante_telefone_normalizado", "telefone_normalizado", **ATIVOS),
+    )
 
     adotante_id: Mapped[int] = mapped_column("adotante_id", primary_key=True)
     nome: Mapped[str] = mapped_column("nome", nullable=False)
     telefone: Mapped[str] = mapped_column("telefone", nullable=False)
     email: Mapped[str] = mapped_column("email", nullable=False)
     moradia: Mapped[str] = mapped_column("moradia", nullable=False)
+    # Chaves de comparação para encontrar cadastros duplicados (ver backend.utils.dedup)
+    email_normalizado: Mapped[Optional[str]] = mapped_column("email_normalizado", nullable=True)
+    telefone_normalizado: Mapped[Optional[str]] = mapped_column("telefone_normalizado", nullable=True)
+    # Coordenada do endereço (manual ou geocodificada) e o geohash dela, usado nas buscas por distância
+    latitude: Mapped[Optional[float]] = mapped_column("latitude", nullable=True)
+    longitude: Mapped[Optional[float]] = mapped_column("longitude", nullable=True)
+    geohash: Mapped[Optional[str]] = mapped_column("geohash", nullable=True)
+    version: Mapped[int] = mapped_column("version", nullable=False)
+    updated_at: Mapped[datetime] = mapped_column("updated_at", nullable=False, default=agora_utc, onupdate=agora_utc)
+    deleted_at: Mapped[Optional[datetime]] = mapped_column("deleted_at", nullable=True)
+
+    __mapper_args__ = {"version_id_col": version}
 
     def __init__(self, nome, telefone, email, moradia):
         self.nome = nome
         self.telefone = telefone
         self.email = email
         self.moradia = moradia
+
+    @validates("email", "telefone")
+    def _normalizar(self, chave, valor):
+        if chave == "email":
+            self.email_normalizado = normalizar_email(valor)
+        else:
+            self.telefone_normalizado = normalizar_telefone(valor)
+        return valor
+
+    @validates("latitude", "longitude")
+    def _geohash(self, chave, valor):
+        latitude = valor if chave == "latitude" else self.latitude
+        longitude = valor if chave == "longitude" else self.longitude
+        self.geohash = codificar_geohash(latitude, longitude) if latitude is not None and longitude is not None else None
+        return valor
         
     @property
     def serialize(self):
@@ -117,6 +182,11 @@ from backend.external.schemas import LarTemporarioSchema
 
 class LarTemporarioModel(db.Model):
     __tablename__ = "tab_lar_temporario"
+    __table_args__ = (
+        db.Index("ix_tab_lar_temporario_hospedeiro_periodo", "hospedeiro_id", "data_inicio", "data_fim", **ATIVOS),
+        db.Index("ix_tab_lar_temporario_updated_at", "updated_at", "lar_temporario_id"),
+        db.Index("ix_tab_lar_temporario_deleted_at", "deleted_at", **REMOVIDOS),
+    )
 
     lar_temporario_id: Mapped[int] = mapped_column("lar_temporario_id", primary_key=True)
     animal_id: Mapped[int] = mapped_column("animal_id", nullable=False)
@@ -124,13 +194,23 @@ class LarTemporarioModel(db.Model):
     periodo: Mapped[str] = mapped_column("periodo", nullable=False)
     data_hospedagem: Mapped[str] = mapped_column("data_hospedagem", nullable=False)
     data_cadastro: Mapped[str] = mapped_column("data_cadastro", nullable=False)
+    # Período tipado da hospedagem; data_fim nula significa hospedagem em aberto
+    data_inicio: Mapped[Optional[date]] = mapped_column("data_inicio", nullable=True)
+    data_fim: Mapped[Optional[date]] = mapped_column("data_fim", nullable=True)
+    version: Mapped[int] = mapped_column("version", nullable=False)
+    updated_at: Mapped[datetime] = mapped_column("updated_at", nullable=False, default=agora_utc, onupdate=agora_utc)
+    deleted_at: Mapped[Optional[datetime]] = mapped_column("deleted_at", nullable=True)
 
-    def __init__(self, animal_id, hospedeiro_id, periodo, data_hospedagem, data_cadastro):
+    __mapper_args__ = {"version_id_col": version}
+
+    def __init__(self, animal_id, hospedeiro_id, periodo, data_hospedagem, data_cadastro, data_inicio=None, data_fim=None):
         self.animal_id = animal_id
         self.hospedeiro_id = hospedeiro_id
         self.periodo = periodo
         self.data_hospedagem = data_hospedagem
         self.data_cadastro = data_cadastro
+        self.data_inicio = data_inicio
+        self.data_fim = data_fim
         
     @property
     def serialize(self):
@@ -142,18 +222,52 @@ from backend.external.schemas import HospedeiroSchema
 
 class HospedeiroModel(db.Model):
     __tablename__ = "tab_hospedeiro"
+    __table_args__ = (
+        db.Index("ix_tab_hospedeiro_updated_at", "updated_at", "hospedeiro_id"),
+        db.Index("ix_tab_hospedeiro_deleted_at", "deleted_at", **REMOVIDOS),
+        db.Index("ix_tab_hospedeiro_geohash", "geohash", **ATIVOS),
+        db.Index("ix_tab_hospedeiro_email_normalizado", "email_normalizado", **ATIVOS),
+        db.Index("ix_tab_hospedeiro_telefone_normalizado", "telefone_normalizado", **ATIVOS),
+    )
 
     hospedeiro_id: Mapped[int] = mapped_column("hospedeiro_id", primary_key=True)
     nome: Mapped[str] = mapped_column("nome", nullable=False)
     telefone: Mapped[str] = mapped_column("telefone", nullable=False)
     email: Mapped[str] = mapped_column("email", nullable=False)
     moradia: Mapped[str] = mapped_column("moradia", nullable=False)
+    # Chaves de comparação para encontrar cadastros duplicados (ver backend.utils.dedup)
+    email_normalizado: Mapped[Optional[str]] = mapped_column("email_normalizado", nullable=True)
+    telefone_normalizado: Mapped[Optional[str]] = mapped_column("telefone_normalizado", nullable=True)
+    # Coordenada do endereço (manual ou geocodificada) e o geohash dela, usado nas buscas por distância
+    latitude: Mapped[Optional[float]] = mapped_column("latitude", nullable=True)
+    longitude: Mapped[Optional[float]] = mapped_column("longitude", nullable=True)
+    geohash: Mapped[Optional[str]] = mapped_column("geohash", nullable=True)
+    version: Mapped[int] = mapped_column("version", nullable=False)
+    updated_at: Mapped[datetime] = mapped_column("updated_at", nullable=False, default=agora_utc, onupdate=agora_utc)
+    deleted_at: Mapped[Optional[datetime]] = mapped_column("deleted_at", nullable=True)
+
+    __mapper_args__ = {"version_id_col": version}
 
     def __init__(self, nome, telefone, email, moradia):
         self.nome = nome
         self.telefone = telefone
         self.email = email
         self.moradia = moradia
+
+    @validates("email", "telefone")
+    def _normalizar(self, chave, valor):
+        if chave == "email":
+            self.email_normalizado = normalizar_email(valor)
+        else:
+            self.telefone_normalizado = normalizar_telefone(valor)
+        return valor
+
+    @validates("latitude", "longitude")
+    def _geohash(self, chave, valor):
+        latitude = valor if chave == "latitude" else self.latitude
+        longitude = valor if chave == "longitude" else self.longitude
+        self.geohash = codificar_geohash(latitude, longitude) if latitude is not None and longitude is not None else None
+        return valor
         
     @property
     def serialize(self):
@@ -165,12 +279,21 @@ from backend.external.schemas import ApadrinhamentoSchema
 
 class ApadrinhamentoModel(db.Model):
     __tablename__ = "tab_apadrinhamento"
+    __table_args__ = (
+        db.Index("ix_tab_apadrinhamento_updated_at", "updated_at", "apadrinhamento_id"),
+        db.Index("ix_tab_apadrinhamento_deleted_at", "deleted_at", **REMOVIDOS),
+    )
 
     apadrinhamento_id: Mapped[int] = mapped_column("apadrinhamento_id", primary_key=True)
     animal_id: Mapped[int] = mapped_column("animal_id", nullable=False)
     nome_apadrinhador: Mapped[str] = mapped_column("nome_apadrinhador", nullable=False)
     valor: Mapped[str] = mapped_column("valor", nullable=False)
     regularidade: Mapped[str] = mapped_column("regularidade", nullable=False)
+    version: Mapped[int] = mapped_column("version", nullable=False)
+    updated_at: Mapped[datetime] = mapped_column("updated_at", nullable=False, default=agora_utc, onupdate=agora_utc)
+    deleted_at: Mapped[Optional[datetime]] = mapped_column("deleted_at", nullable=True)
+
+    __mapper_args__ = {"version_id_col": version}
 
     def __init__(self, animal_id, nome_apadrinhador, valor, regularidade):
         self.animal_id = animal_id
@@ -188,6 +311,10 @@ from backend.external.schemas import ProcedimentoSchema
 
 class ProcedimentoModel(db.Model):
     __tablename__ = "tab_procedimento"
+    __table_args__ = (
+        db.Index("ix_tab_procedimento_updated_at", "updated_at", "procedimento_id"),
+        db.Index("ix_tab_procedimento_deleted_at", "deleted_at", **REMOVIDOS),
+    )
 
     procedimento_id: Mapped[int] = mapped_column("procedimento_id", primary_key=True)
     tipo: Mapped[str] = mapped_column("tipo", nullable=False)
@@ -196,6 +323,11 @@ class ProcedimentoModel(db.Model):
     data_procedimento: Mapped[str] = mapped_column("data_procedimento", nullable=False)
     animal_id: Mapped[int] = mapped_column("animal_id", nullable=False)
     voluntario_id: Mapped[int] = mapped_column("voluntario_id", nullable=False)
+    version: Mapped[int] = mapped_column("version", nullable=False)
+    updated_at: Mapped[datetime] = mapped_column("updated_at", nullable=False, default=agora_utc, onupdate=agora_utc)
+    deleted_at: Mapped[Optional[datetime]] = mapped_column("deleted_at", nullable=True)
+
+    __mapper_args__ = {"version_id_col": version}
 
     def __init__(self, tipo, descricao, valor, data_procedimento, animal_id, voluntario_id):
         self.tipo = tipo
@@ -215,6 +347,11 @@ from backend.external.schemas import CampanhaSchema
 
 class CampanhaModel(db.Model):
     __tablename__ = "tab_campanha"
+    __table_args__ = (
+        db.Index("ix_tab_campanha_updated_at", "updated_at", "campanha_id"),
+        db.Index("ix_tab_campanha_deleted_at", "deleted_at", **REMOVIDOS),
+        db.Index("ix_tab_campanha_geohash", "geohash", **ATIVOS),
+    )
 
     campanha_id: Mapped[int] = mapped_column("campanha_id", primary_key=True)
     nome: Mapped[str] = mapped_column("nome", nullable=False)
@@ -223,6 +360,15 @@ class CampanhaModel(db.Model):
     data_termino: Mapped[str] = mapped_column("data_termino", nullable=False)
     descricao: Mapped[str] = mapped_column("descricao", nullable=False)
     local: Mapped[str] = mapped_column("local", nullable=False)
+    # Coordenada do endereço (manual ou geocodificada) e o geohash dela, usado nas buscas por distância
+    latitude: Mapped[Optional[float]] = mapped_column("latitude", nullable=True)
+    longitude: Mapped[Optional[float]] = mapped_column("longitude", nullable=True)
+    geohash: Mapped[Optional[str]] = mapped_column("geohash", nullable=True)
+    version: Mapped[int] = mapped_column("version", nullable=False)
+    updated_at: Mapped[datetime] = mapped_column("updated_at", nullable=False, default=agora_utc, onupdate=agora_utc)
+    deleted_at: Mapped[Optional[datetime]] = mapped_column("deleted_at", nullable=True)
+
+    __mapper_args__ = {"version_id_col": version}
 
     def __init__(self, nome, tipo, data_inicio, data_termino, descricao, local):
         self.nome = nome
@@ -231,6 +377,13 @@ class CampanhaModel(db.Model):
         self.data_termino = data_termino
         self.descricao = descricao
         self.local = local
+
+    @validates("latitude", "longitude")
+    def _geohash(self, chave, valor):
+        latitude = valor if chave == "latitude" else self.latitude
+        longitude = valor if chave == "longitude" else self.longitude
+        self.geohash = codificar_geohash(latitude, longitude) if latitude is not None and longitude is not None else None
+        return valor
         
     @property
     def serialize(self):
@@ -242,6 +395,10 @@ from backend.external.schemas import DoacaoSchema
 
 class DoacaoModel(db.Model):
     __tablename__ = "tab_doacao"
+    __table_args__ = (
+        db.Index("ix_tab_doacao_updated_at", "updated_at", "doacao_id"),
+        db.Index("ix_tab_doacao_deleted_at", "deleted_at", **REMOVIDOS),
+    )
 
     doacao_id: Mapped[int] = mapped_column("doacao_id", primary_key=True)
     doador: Mapped[str] = mapped_column("doador", nullable=False)
@@ -250,6 +407,11 @@ class DoacaoModel(db.Model):
     animal_id: Mapped[int] = mapped_column("animal_id", nullable=False)
     companha_id: Mapped[int] = mapped_column("companha_id", nullable=False)
     comprovante: Mapped[str] = mapped_column("comprovante", nullable=False)
+    version: Mapped[int] = mapped_column("version", nullable=False)
+    updated_at: Mapped[datetime] = mapped_column("updated_at", nullable=False, default=agora_utc, onupdate=agora_utc)
+    deleted_at: Mapped[Optional[datetime]] = mapped_column("deleted_at", nullable=True)
+
+    __mapper_args__ = {"version_id_col": version}
 
     def __init__(self, doador, valor, data_doacao, animal_id, companha_id, comprovante):
         self.doador = doador
@@ -269,6 +431,10 @@ from backend.external.schemas import DespesaSchema
 
 class DespesaModel(db.Model):
     __tablename__ = "tab_despesa"
+    __table_args__ = (
+        db.Index("ix_tab_despesa_updated_at", "updated_at", "despesa_id"),
+        db.Index("ix_tab_despesa_deleted_at", "deleted_at", **REMOVIDOS),
+    )
 
     despesa_id: Mapped[int] = mapped_column("despesa_id", primary_key=True)
     valor: Mapped[str] = mapped_column("valor", nullable=False)
@@ -276,6 +442,11 @@ class DespesaModel(db.Model):
     tipo: Mapped[str] = mapped_column("tipo", nullable=False)
     animal_id: Mapped[int] = mapped_column("animal_id", nullable=False)
     comprovante: Mapped[str] = mapped_column("comprovante", nullable=False)
+    version: Mapped[int] = mapped_column("version", nullable=False)
+    updated_at: Mapped[datetime] = mapped_column("updated_at", nullable=False, default=agora_utc, onupdate=agora_utc)
+    deleted_at: Mapped[Optional[datetime]] = mapped_column("deleted_at", nullable=True)
+
+    __mapper_args__ = {"version_id_col": version}
 
     def __init__(self, valor, data_despesa, tipo, animal_id, comprovante):
         self.valor = valor
@@ -294,6 +465,10 @@ from backend.external.schemas import EstoqueSchema
 
 class EstoqueModel(db.Model):
     __tablename__ = "tab_estoque"
+    __table_args__ = (
+        db.Index("ix_tab_estoque_updated_at", "updated_at", "estoque_id"),
+        db.Index("ix_tab_estoque_deleted_at", "deleted_at", **REMOVIDOS),
+    )
 
     estoque_id: Mapped[int] = mapped_column("estoque_id", primary_key=True)
     categoria: Mapped[str] = mapped_column("categoria", nullable=False)
@@ -301,6 +476,12 @@ class EstoqueModel(db.Model):
     descricao: Mapped[str] = mapped_column("descricao", nullable=False)
     especie_animal: Mapped[str] = mapped_column("especie_animal", nullable=False)
     quantidade: Mapped[str] = mapped_column("quantidade", nullable=False)
+    saldo: Mapped[int] = mapped_column("saldo", nullable=False, default=0, index=True)
+    version: Mapped[int] = mapped_column("version", nullable=False)
+    updated_at: Mapped[datetime] = mapped_column("updated_at", nullable=False, default=agora_utc, onupdate=agora_utc)
+    deleted_at: Mapped[Optional[datetime]] = mapped_column("deleted_at", nullable=True)
+
+    __mapper_args__ = {"version_id_col": version}
 
     def __init__(self, categoria, tipo_item, descricao, especie_animal, quantidade):
         self.categoria = categoria
@@ -313,12 +494,52 @@ class EstoqueModel(db.Model):
     def serialize(self):
         schema = EstoqueSchema()
         return schema.dump(self)
+
+# === Movimento de Estoque ===
+from backend.external.schemas import MovimentoEstoqueSchema
+
+class MovimentoEstoqueModel(db.Model):
+    __tablename__ = "tab_movimento_estoque"
+    __table_args__ = (
+        db.Index("ix_tab_movimento_estoque_estoque_id", "estoque_id", "movimento_id", **ATIVOS),
+        db.Index("ix_tab_movimento_estoque_updated_at", "updated_at", "movimento_id"),
+        db.Index("ix_tab_movimento_estoque_deleted_at", "deleted_at", **REMOVIDOS),
+    )
+
+    movimento_id: Mapped[int] = mapped_column("movimento_id", primary_key=True)
+    estoque_id: Mapped[int] = mapped_column("estoque_id", nullable=False)
+    tipo: Mapped[str] = mapped_column("tipo", nullable=False)
+    quantidade: Mapped[int] = mapped_column("quantidade", nullable=False)
+    saldo_apos: Mapped[int] = mapped_column("saldo_apos", nullable=False)
+    observacao: Mapped[Optional[str]] = mapped_column("observacao", nullable=True)
+    data_movimento: Mapped[datetime] = mapped_column("data_movimento", nullable=False)
+    updated_at: Mapped[datetime] = mapped_column("updated_at", nullable=False, default=agora_utc, onupdate=agora_utc)
+    deleted_at: Mapped[Optional[datetime]] = mapped_column("deleted_at", nullable=True)
+
+    def __init__(self, estoque_id, tipo, quantidade, saldo_apos, observacao, data_movimento):
+        self.estoque_id = estoque_id
+        self.tipo = tipo
+        self.quantidade = quantidade
+        self.saldo_apos = saldo_apos
+        self.observacao = observacao
+        self.data_movimento = data_movimento
+
+    @property
+    def serialize(self):
+        schema = MovimentoEstoqueSchema()
+        return schema.dump(self)
     
 # === Tarefa ===
 from backend.external.schemas import TarefaSchema
 
 class TarefaModel(db.Model):
     __tablename__ = "tab_tarefa"
+    __table_args__ = (
+        db.Index("ix_tab_tarefa_voluntario_inicio", "voluntario_id", "inicio", "fim", **ATIVOS),
+        db.Index("ix_tab_tarefa_data_tarefa", "data_tarefa", **ATIVOS),
+        db.Index("ix_tab_tarefa_updated_at", "updated_at", "tarefa_id"),
+        db.Index("ix_tab_tarefa_deleted_at", "deleted_at", **REMOVIDOS),
+    )
 
     tarefa_id: Mapped[int] = mapped_column("tarefa_id", primary_key=True)
     tipo: Mapped[str] = mapped_column("tipo", nullable=False)
@@ -326,30 +547,91 @@ class TarefaModel(db.Model):
     data_tarefa: Mapped[str] = mapped_column("data_tarefa", nullable=False)
     voluntario_id: Mapped[int] = mapped_column("voluntario_id", nullable=False)
     animal_id: Mapped[int] = mapped_column("animal_id", nullable=False)
+    # Horário tipado da tarefa, usado pela agenda e pela detecção de conflitos
+    inicio: Mapped[Optional[datetime]] = mapped_column("inicio", nullable=True)
+    fim: Mapped[Optional[datetime]] = mapped_column("fim", nullable=True)
+    version: Mapped[int] = mapped_column("version", nullable=False)
+    updated_at: Mapped[datetime] = mapped_column("updated_at", nullable=False, default=agora_utc, onupdate=agora_utc)
+    deleted_at: Mapped[Optional[datetime]] = mapped_column("deleted_at", nullable=True)
+
+    __mapper_args__ = {"version_id_col": version}
 
-    def __init__(self, tipo, descricao, data_tarefa, voluntario_id, animal_id):
+    def __init__(self, tipo, descricao, data_tarefa, voluntario_id, animal_id, inicio=None, fim=None):
         self.tipo = tipo
         self.descricao = descricao
         self.data_tarefa = data_tarefa
         self.voluntario_id = voluntario_id
         self.animal_id = animal_id
+        self.inicio = inicio
+        self.fim = fim
         
     @property
     def serialize(self):
         schema = TarefaSchema()
         return schema.dump(self)
     
+# === Tarefa Recorrente ===
+from backend.external.schemas import TarefaRecorrenteSchema
+
+class TarefaRecorrenteModel(db.Model):
+    """
+    Modelo de tarefa que se repete a cada `intervalo_dias`. As ocorrências não são
+    gravadas: a agenda as calcula apenas dentro do período consultado.
+    """
+    __tablename__ = "tab_tarefa_recorrente"
+    __table_args__ = (
+        db.Index("ix_tab_tarefa_recorrente_voluntario_inicio", "voluntario_id", "inicio", **ATIVOS),
+        db.Index("ix_tab_tarefa_recorrente_updated_at", "updated_at", "tarefa_recorrente_id"),
+        db.Index("ix_tab_tarefa_recorrente_deleted_at", "deleted_at", **REMOVIDOS),
+    )
+
+    tarefa_recorrente_id: Mapped[int] = mapped_column("tarefa_recorrente_id", primary_key=True)
+    tipo: Mapped[str] = mapped_column("tipo", nullable=False)
+    descricao: Mapped[str] = mapped_column("descricao", nullable=False)
+    voluntario_id: Mapped[int] = mapped_column("voluntario_id", nullable=False)
+    animal_id: Mapped[int] = mapped_column("animal_id", nullable=False)
+    inicio: Mapped[datetime] = mapped_column("inicio", nullable=False)
+    duracao_minutos: Mapped[int] = mapped_column("duracao_minutos", nullable=False)
+    intervalo_dias: Mapped[int] = mapped_column("intervalo_dias", nullable=False)
+    data_termino: Mapped[Optional[date]] = mapped_column("data_termino", nullable=True)
+    updated_at: Mapped[datetime] = mapped_column("updated_at", nullable=False, default=agora_utc, onupdate=agora_utc)
+    deleted_at: Mapped[Optional[datetime]] = mapped_column("deleted_at", nullable=True)
+
+    def __init__(self, tipo, descricao, voluntario_id, animal_id, inicio, duracao_minutos, intervalo_dias, data_termino=None):
+        self.tipo = tipo
+        self.descricao = descricao
+        self.voluntario_id = voluntario_id
+        self.animal_id = animal_id
+        self.inicio = inicio
+        self.duracao_minutos = duracao_minutos
+        self.intervalo_dias = intervalo_dias
+        self.data_termino = data_termino
+
+    @property
+    def serialize(self):
+        schema = TarefaRecorrenteSchema()
+        return schema.dump(self)
+
 # === Voluntário ===
 from backend.external.schemas import VoluntarioSchema
 
 class VoluntarioModel(db.Model):
     __tablename__ = "tab_voluntario"
+    __table_args__ = (
+        db.Index("ix_tab_voluntario_updated_at", "updated_at", "voluntario_id"),
+        db.Index("ix_tab_voluntario_deleted_at", "deleted_at", **REMOVIDOS),
+    )
 
     voluntario_id: Mapped[int] = mapped_column("voluntario_id", primary_key=True)
     nome: Mapped[str] = mapped_column("nome", nullable=False)
     foto: Mapped[str] = mapped_column("foto", nullable=False)
     email: Mapped[str] = mapped_column("email", nullable=False)
     telefone: Mapped[str] = mapped_column("telefone", nullable=False)
+    version: Mapped[int] = mapped_column("version", nullable=False)
+    updated_at: Mapped[datetime] = mapped_column("updated_at", nullable=False, default=agora_utc, onupdate=agora_utc)
+    deleted_at: Mapped[Optional[datetime]] = mapped_column("deleted_at", nullable=True)
+
+    __mapper_args__ = {"version_id_col": version}
 
     def __init__(self, nome, foto, email, telefone):
         self.nome = nome
@@ -360,4 +642,162 @@ class VoluntarioModel(db.Model):
     @property
     def serialize(self):
         schema = VoluntarioSchema()
-        return schema.dump(self)
\ No newline at end of file
+        return schema.dump(self)
+# === Custo por Animal ===
+from backend.external.schemas import CustoAnimalSchema
+
+class CustoAnimalModel(db.Model):
+    """
+    Resumo materializado dos custos (despesas + procedimentos) de cada animal,
+    mantido incrementalmente pelos serviços de despesa e procedimento.
+    Os valores são armazenados em centavos.
+    """
+    __tablename__ = "tab_custo_animal"
+
+    animal_id: Mapped[int] = mapped_column("animal_id", primary_key=True, autoincrement=False)
+    total_despesas: Mapped[int] = mapped_column("total_despesas", nullable=False, default=0)
+    total_procedimentos: Mapped[int] = mapped_column("total_procedimentos", nullable=False, default=0)
+    total: Mapped[int] = mapped_column("total", nullable=False, default=0, index=True)
+
+    def __init__(self, animal_id, total_despesas=0, total_procedimentos=0):
+        self.animal_id = animal_id
+        self.total_despesas = total_despesas
+        self.total_procedimentos = total_procedimentos
+        self.total = total_despesas + total_procedimentos
+
+    @property
+    def serialize(self):
+        schema = CustoAnimalSchema()
+        return schema.dump(self)
+
+# === Progresso de Campanha ===
+from backend.external.schemas import ProgressoCampanhaSchema
+
+class ProgressoCampanhaModel(db.Model):
+    """
+    Contadores de arrecadação de cada campanha, mantidos na mesma transação
+    das escritas de doação. O total arrecadado é armazenado em centavos.
+    """
+    __tablename__ = "tab_progresso_campanha"
+
+    campanha_id: Mapped[int] = mapped_column("campanha_id", primary_key=True, autoincrement=False)
+    total_arrecadado: Mapped[int] = mapped_column("total_arrecadado", nullable=False, default=0)
+    quantidade_doacoes: Mapped[int] = mapped_column("quantidade_doacoes", nullable=False, default=0)
+
+    def __init__(self, campanha_id, total_arrecadado=0, quantidade_doacoes=0):
+        self.campanha_id = campanha_id
+        self.total_arrecadado = total_arrecadado
+        self.quantidade_doacoes = quantidade_doacoes
+
+    @property
+    def serialize(self):
+        schema = ProgressoCampanhaSchema()
+        return schema.dump(self)
+
+# === Job ===
+from backend.external.schemas import JobSchema
+
+class JobModel(db.Model):
+    """
+    Job em segundo plano da fila local (backend "database"). Com o backend Redis os
+    jobs ficam no Redis e este modelo é usado apenas para serializá-los.
+    """
+    __tablename__ = "tab_job"
+    __table_args__ = (
+        db.Index("ix_tab_job_status_disponivel_em", "status", "disponivel_em"),
+        # No máximo um job pendente por chave única (ex.: a limpeza periódica da lixeira)
+        db.Index(
+            "ix_tab_job_chave_unica_pendente",
+            "chave_unica",
+            unique=True,
+            postgresql_where=db.text("status = 'pendente'"),
+            sqlite_where=db.text("status = 'pendente'"),
+        ),
+    )
+
+    job_id: Mapped[str] = mapped_column("job_id", primary_key=True)
+    nome: Mapped[str] = mapped_column("nome", nullable=False)
+    payload: Mapped[str] = mapped_column("payload", db.Text, nullable=False)
+    status: Mapped[str] = mapped_column("status", nullable=False)
+    tentativas: Mapped[int] = mapped_column("tentativas", nullable=False, default=0)
+    max_tentativas: Mapped[int] = mapped_column("max_tentativas", nullable=False)
+    resultado: Mapped[Optional[str]] = mapped_column("resultado", db.Text, nullable=True)
+    erro: Mapped[Optional[str]] = mapped_column("erro", db.Text, nullable=True)
+    criado_em: Mapped[datetime] = mapped_column("criado_em", nullable=False)
+    disponivel_em: Mapped[datetime] = mapped_column("disponivel_em", nullable=False)
+    iniciado_em: Mapped[Optional[datetime]] = mapped_column("iniciado_em", nullable=True)
+    concluido_em: Mapped[Optional[datetime]] = mapped_column("concluido_em", nullable=True)
+    chave_unica: Mapped[Optional[str]] = mapped_column("chave_unica", nullable=True)
+
+    def __init__(self, job_id, nome, payload, status, max_tentativas, criado_em, disponivel_em, tentativas=0,
+                 resultado=None, erro=None, iniciado_em=None, concluido_em=None, chave_unica=None):
+        self.job_id = job_id
+        self.nome = nome
+        self.payload = payload
+        self.status = status
+        self.max_tentativas = max_tentativas
+        self.criado_em = criado_em
+        self.disponivel_em = disponivel_em
+        self.tentativas = tentativas
+        self.resultado = resultado
+        self.erro = erro
+        self.iniciado_em = iniciado_em
+        self.concluido_em = concluido_em
+        self.chave_unica = chave_unica
+
+    @property
+    def serialize(self):
+        schema = JobSchema()
+        return schema.dump(self)
+
+# === Auditoria ===
+from backend.external.schemas import AuditoriaSchema
+
+class AuditoriaModel(db.Model):
+    """
+    Trilha de auditoria das escritas, só de inserção: quem alterou o registro, quando e
+    os valores antes e depois de cada campo. No PostgreSQL a tabela é particionada por
+    mês de `criado_em` (partições criadas com `flask auditoria particoes`).
+    """
+    __tablename__ = "tab_auditoria"
+    __table_args__ = (
+        # Histórico de um registro
+        db.Index("ix_tab_auditoria_registro", "tabela", "registro_id", "criado_em"),
+        {"postgresql_partition_by": "RANGE (criado_em)"},
+    )
+
+    criado_em: Mapped[datetime] = mapped_column("criado_em", primary_key=True)
+    auditoria_id: Mapped[str] = mapped_column("auditoria_id", primary_key=True)
+    tabela: Mapped[str] = mapped_column("tabela", nullable=False)
+    registro_id: Mapped[int] = mapped_column("registro_id", nullable=False)
+    operacao: Mapped[str] = mapped_column("operacao", nullable=False)
+    usuario: Mapped[Optional[str]] = mapped_column("usuario", nullable=True)
+    origem: Mapped[Optional[str]] = mapped_column("origem", nullable=True)
+    version: Mapped[Optional[int]] = mapped_column("version", nullable=True)
+    alteracoes: Mapped[dict] = mapped_column("alteracoes", db.JSON, nullable=False)
+
+    @property
+    def serialize(self):
+        schema = AuditoriaSchema()
+        return schema.dump(self)
+
+# === Idempotência ===
+
+class IdempotenciaModel(db.Model):
+    """
+    Respostas dos POST enviados com Idempotency-Key (backend "database"), para responder
+    às repetições sem executar a criação de novo. Registros vencidos são descartados.
+    """
+    __tablename__ = "tab_idempotencia"
+    __table_args__ = (
+        db.Index("ix_tab_idempotencia_expira_em", "expira_em"),
+    )
+
+    chave: Mapped[str] = mapped_column("chave", primary_key=True)
+    fingerprint: Mapped[str] = mapped_column("fingerprint", nullable=False)
+    status: Mapped[str] = mapped_column("status", nullable=False)
+    status_code: Mapped[Optional[int]] = mapped_column("status_code", nullable=True)
+    corpo: Mapped[Optional[bytes]] = mapped_column("corpo", db.LargeBinary, nullable=True)
+    headers: Mapped[Optional[dict]] = mapped_column("headers", db.JSON, nullable=True)
+    criado_em: Mapped[datetime] = mapped_column("criado_em", nullable=False)
+    expira_em: Mapped[datetime] = mapped_column("expira_em", nullable=False)
@@ -6,20 +6,30 @@ class UserSchema(Schema):
     password = fields.Str(required=True)
     email = fields.Str(required=True)
     
-from marshmallow import Schema, fields, pre_load, post_dump
+from marshmallow import Schema, fields, pre_load, post_dump, validate
 import base64
+import json
+from decimal import Decimal
 
 class AnimalSchema(Schema):
     animal_id = fields.Int(dump_only=True)
     nome = fields.Str(required=True)
     idade = fields.Str(required=True)
-    foto = fields.Raw(required=True)  # Changed to Raw to handle binary data
+    foto = fields.Method("dump_foto")  # Bytes no banco, base64 no JSON
     descricao = fields.Str(required=True)
     sexo = fields.Str(required=True)
     castracao = fields.Str(required=True)
     status = fields.Str(required=True)
     especie = fields.Str(required=True)
     data_cadastro = fields.Str(required=True)
+    version = fields.Int(dump_only=True)
+
+    def dump_foto(self, animal):
+        if not animal.foto:
+            return ""
+        if isinstance(animal.foto, (bytes, bytearray)):
+            return base64.b64encode(animal.foto).decode("utf-8")
+        return animal.foto
 
 class AdocaoSchema(Schema):
     adocao_id = fields.Int(dump_only=True)
@@ -27,6 +37,7 @@ class AdocaoSchema(Schema):
     adotante_id = fields.Int(required=True)
     data_adocao = fields.Str(required=True)
     data_cadastro = fields.Str(required=True)
+    version = fields.Int(dump_only=True)
 
 class AdotanteSchema(Schema):
     adotante_id = fields.Int(dump_only=True)
@@ -34,6 +45,9 @@ class AdotanteSchema(Schema):
     telefone = fields.Str(required=True)
     email = fields.Str(required=True)
     moradia = fields.Str(required=True)
+    latitude = fields.Float(allow_none=True)
+    longitude = fields.Float(allow_none=True)
+    version = fields.Int(dump_only=True)
 
 class LarTemporarioSchema(Schema):
     lar_temporario_id = fields.Int(dump_only=True)
@@ -42,6 +56,9 @@ class LarTemporarioSchema(Schema):
     periodo = fields.Str(required=True)
     data_hospedagem = fields.Str(required=True)
     data_cadastro = fields.Str(required=True)
+    data_inicio = fields.Date(allow_none=True, load_default=None)
+    data_fim = fields.Date(allow_none=True, load_default=None)
+    version = fields.Int(dump_only=True)
 
 class HospedeiroSchema(Schema):
     hospedeiro_id = fields.Int(dump_only=True)
@@ -49,6 +66,9 @@ class HospedeiroSchema(Schema):
     telefone = fields.Str(required=True)
     email = fields.Str(required=True)
     moradia = fields.Str(required=True)
+    latitude = fields.Float(allow_none=True)
+    longitude = fields.Float(allow_none=True)
+    version = fields.Int(dump_only=True)
 
 class ApadrinhamentoSchema(Schema):
     apadrinhamento_id = fields.Int(dump_only=True)
@@ -56,6 +76,7 @@ class ApadrinhamentoSchema(Schema):
     nome_apadrinhador = fields.Str(required=True)
     valor = fields.Str(required=True)
     regularidade = fields.Str(required=True)
+    version = fields.Int(dump_only=True)
 
 class ProcedimentoSchema(Schema):
     procedimento_id = fields.Int(dump_only=True)
@@ -65,6 +86,7 @@ class ProcedimentoSchema(Schema):
     data_procedimento = fields.Str(required=True)
     animal_id = fields.Int(required=True)
     voluntario_id = fields.Int(required=True)
+    version = fields.Int(dump_only=True)
 
 class CampanhaSchema(Schema):
     campanha_id = fields.Int(dump_only=True)
@@ -74,6 +96,9 @@ class CampanhaSchema(Schema):
     data_termino = fields.Str(required=True)
     descricao = fields.Str(required=True)
     local = fields.Str(required=True)
+    latitude = fields.Float(allow_none=True)
+    longitude = fields.Float(allow_none=True)
+    version = fields.Int(dump_only=True)
 
 class DoacaoSchema(Schema):
     doacao_id = fields.Int(dump_only=True)
@@ -83,6 +108,7 @@ class DoacaoSchema(Schema):
     animal_id = fields.Int(required=True)
     companha_id = fields.Int(required=True)
     comprovante = fields.Str(required=True)
+    version = fields.Int(dump_only=True)
 
 class DespesaSchema(Schema):
     despesa_id = fields.Int(dump_only=True)
@@ -90,7 +116,9 @@ class DespesaSchema(Schema):
     data_despesa = fields.Str(required=True)
     tipo = fields.Str(required=True)
     animal_id = fields.Int(required=True)
+    procedimento_id = fields.Int(required=True)
     comprovante = fields.Str(required=True)
+    version = fields.Int(dump_only=True)
 
 class EstoqueSchema(Schema):
     estoque_id = fields.Int(dump_only=True)
@@ -99,6 +127,18 @@ class EstoqueSchema(Schema):
     descricao = fields.Str(required=True)
     especie_animal = fields.Str(required=True)
     quantidade = fields.Str(required=True)
+    quantidade_total = fields.Str(required=True)
+    saldo = fields.Int(dump_only=True)
+    version = fields.Int(dump_only=True)
+
+class MovimentoEstoqueSchema(Schema):
+    movimento_id = fields.Int(dump_only=True)
+    estoque_id = fields.Int(dump_only=True)
+    tipo = fields.Str(required=True, validate=validate.OneOf(["entrada", "saida"]))
+    quantidade = fields.Int(required=True, validate=validate.Range(min=1))
+    saldo_apos = fields.Int(dump_only=True)
+    observacao = fields.Str(load_default=None, allow_none=True)
+    data_movimento = fields.DateTime(dump_only=True)
 
 class TarefaSchema(Schema):
     tarefa_id = fields.Int(dump_only=True)
@@ -107,43 +147,62 @@ class TarefaSchema(Schema):
     data_tarefa = fields.Str(required=True)
     voluntario_id = fields.Int(required=True)
     animal_id = fields.Int(required=True)
+    inicio = fields.DateTime(allow_none=True, load_default=None)
+    fim = fields.DateTime(allow_none=True, load_default=None)
+    version = fields.Int(dump_only=True)
 
-class VoluntarioSchema(Schema):
-    voluntario_id = fields.Int(dump_only=True)
-    nome = fields.Str(required=True)
-    foto = fields.Str(required=True)
-    email = fields.Str(required=True)
-    telefone = fields.Str(required=True)
-
-class DespesaSchema(Schema):
-    despesa_id = fields.Int(dump_only=True)
-    valor = fields.Str(required=True)
-    data_despesa = fields.Str(required=True)
+class TarefaRecorrenteSchema(Schema):
+    tarefa_recorrente_id = fields.Int(dump_only=True)
     tipo = fields.Str(required=True)
-    animal_id = fields.Int(required=True)
-    procedimento_id = fields.Int(required=True)
-    comprovante = fields.Str(required=True)
-
-class EstoqueSchema(Schema):
-    estoque_id = fields.Int(dump_only=True)
-    categoria = fields.Str(required=True)
-    tipo_item = fields.Str(required=True)
     descricao = fields.Str(required=True)
-    especie_animal = fields.Str(required=True)
-    quantidade = fields.Str(required=True)
-    quantidade_total = fields.Str(required=True)
-
-class TarefaSchema(Schema):
-    tarefa_id = fields.Int(dump_only=True)
-    tipo = fields.Str(required=True)
-    descricao = fields.Str(required=True)
-    data_tarefa = fields.Str(required=True)
     voluntario_id = fields.Int(required=True)
     animal_id = fields.Int(required=True)
+    inicio = fields.DateTime(required=True)
+    duracao_minutos = fields.Int(required=True, validate=validate.Range(min=1))
+    intervalo_dias = fields.Int(required=True, validate=validate.Range(min=1))
+    data_termino = fields.Date(allow_none=True, load_default=None)
 
 class VoluntarioSchema(Schema):
     voluntario_id = fields.Int(dump_only=True)
     nome = fields.Str(required=True)
     foto = fields.Str(required=True)
     email = fields.Str(required=True)
-    telefone = fields.Str(required=True)
\ No newline at end of file
+    telefone = fields.Str(required=True)
+    version = fields.Int(dump_only=True)
+
+def centavos_para_reais(centavos):
+    return str(Decimal(centavos).scaleb(-2))
+
+class CustoAnimalSchema(Schema):
+    animal_id = fields.Int(dump_only=True)
+    total_despesas = fields.Function(lambda obj: centavos_para_reais(obj.total_despesas))
+    total_procedimentos = fields.Function(lambda obj: centavos_para_reais(obj.total_procedimentos))
+    total = fields.Function(lambda obj: centavos_para_reais(obj.total))
+
+class ProgressoCampanhaSchema(Schema):
+    campanha_id = fields.Int(dump_only=True)
+    total_arrecadado = fields.Function(lambda obj: centavos_para_reais(obj.total_arrecadado))
+    quantidade_doacoes = fields.Int(dump_only=True)
+
+class JobSchema(Schema):
+    job_id = fields.Str(dump_only=True)
+    nome = fields.Str(dump_only=True)
+    status = fields.Str(dump_only=True)
+    tentativas = fields.Int(dump_only=True)
+    max_tentativas = fields.Int(dump_only=True)
+    resultado = fields.Function(lambda obj: json.loads(obj.resultado) if obj.resultado else None)
+    erro = fields.Str(dump_only=True)
+    criado_em = fields.DateTime(dump_only=True)
+    iniciado_em = fields.DateTime(dump_only=True)
+    concluido_em = fields.DateTime(dump_only=True)
+
+class AuditoriaSchema(Schema):
+    auditoria_id = fields.Str(dump_only=True)
+    criado_em = fields.DateTime(dump_only=True)
+    tabela = fields.Str(dump_only=True)
+    registro_id = fields.Int(dump_only=True)
+    operacao = fields.Str(dump_only=True)
+    usuario = fields.Str(dump_only=True)
+    origem = fields.Str(dump_only=True)
+    version = fields.Int(dump_only=True)
+    alteracoes = fields.Dict(dump_only=True)
@@ -0,0 +1,541 @@
+import base64
+import csv
+import io
+import random
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import Integer, column, func, insert, inspect, select, table, text
+from werkzeug.security import generate_password_hash
+
+from backend.db import db
+from backend.external.model import (
+    AdocaoModel,
+    AdotanteModel,
+    AnimalModel,
+    ApadrinhamentoModel,
+    CampanhaModel,
+    DespesaModel,
+    DoacaoModel,
+    EstoqueModel,
+    HospedeiroModel,
+    LarTemporarioModel,
+    MovimentoEstoqueModel,
+    ProcedimentoModel,
+    TarefaModel,
+    TarefaRecorrenteModel,
+    UserModel,
+    VoluntarioModel,
+)
+from backend.services.custo_animal_service import rebuild_custos_animais
+from backend.services.progresso_campanha_service import rebuild_progresso_campanhas
+from backend.utils.dedup import normalizar_email, normalizar_telefone
+from backend.utils.geo import OfflineGeocoder, codificar_geohash
+from backend.utils.utils import agora_utc
+
+# Volumes (linhas por tabela) de cada perfil. "producao" segue a ordem de grandeza do banco real.
+PERFIS = {
+    "pequeno": {
+        "tab_user": 10,
+        "tab_voluntario": 50,
+        "tab_animal": 1_000,
+        "tab_adotante": 400,
+        "tab_hospedeiro": 100,
+        "tab_campanha": 20,
+        "tab_movimento_estoque": 1_000,
+        "tab_estoque": 100,
+        "tab_adocao": 300,
+        "tab_lar_temporario": 200,
+        "tab_apadrinhamento": 100,
+        "tab_procedimento": 2_000,
+        "tab_doacao": 10_000,
+        "tab_despesa": 2_000,
+        "tab_tarefa": 2_000,
+        "tab_tarefa_recorrente": 20,
+    },
+    "producao": {
+        "tab_user": 50,
+        "tab_voluntario": 500,
+        "tab_animal": 50_000,
+        "tab_adotante": 20_000,
+        "tab_hospedeiro": 2_000,
+        "tab_campanha": 200,
+        "tab_movimento_estoque": 50_000,
+        "tab_estoque": 2_000,
+        "tab_adocao": 15_000,
+        "tab_lar_temporario": 10_000,
+        "tab_apadrinhamento": 5_000,
+        "tab_procedimento": 100_000,
+        "tab_doacao": 500_000,
+        "tab_despesa": 100_000,
+        "tab_tarefa": 100_000,
+        "tab_tarefa_recorrente": 1_000,
+    },
+}
+
+# Tamanho (bytes, antes do base64) das fotos dos animais em cada perfil
+TAMANHO_FOTO = {
+    "pequeno": (4 * 1024, 16 * 1024),
+    "producao": (40 * 1024, 160 * 1024),
+}
+
+# Senha de todos os usuários gerados
+SENHA_USUARIOS = "patas123"
+
+# Data de referência fixa, para que a mesma semente gere sempre os mesmos dados
+DATA_REFERENCIA = date(2024, 9, 17)
+
+NOMES_ANIMAIS = [
+    "Amora", "Bidu", "Bolinha", "Caramelo", "Chico", "Cookie", "Dengo", "Estopa", "Faísca", "Frida",
+    "Garoa", "Jujuba", "Luna", "Mel", "Mingau", "Nina", "Paçoca", "Pipoca", "Rabisco", "Tico",
+]
+NOMES = [
+    "Ana", "Beatriz", "Bruno", "Camila", "Carlos", "Fernanda", "Gabriel", "João", "Juliana", "Lucas",
+    "Mariana", "Mateus", "Paula", "Pedro", "Rafael", "Renata", "Rodrigo", "Sofia", "Tiago", "Vitória",
+]
+SOBRENOMES = [
+    "Almeida", "Barbosa", "Cardoso", "Costa", "Ferreira", "Gomes", "Lima", "Martins", "Oliveira", "Pereira",
+    "Ribeiro", "Rocha", "Santos", "Silva", "Souza",
+]
+BAIRROS = ["Centro", "Jardim América", "Vila Nova", "Boa Vista", "Santa Cruz", "São José", "Primavera"]
+ESPECIES = ["Cachorro", "Gato"]
+STATUS_ANIMAL = ["Disponível", "Adotado", "Em tratamento", "Lar temporário"]
+PESOS_STATUS = [5, 3, 1, 1]
+TIPOS_PROCEDIMENTO = ["Vacinação", "Castração", "Vermifugação", "Consulta", "Cirurgia"]
+TIPOS_DESPESA = ["Ração", "Medicamento", "Veterinário", "Transporte", "Areia"]
+TIPOS_TAREFA = ["Alimentação", "Limpeza", "Passeio", "Banho", "Medicação"]
+TIPOS_CAMPANHA = ["Arrecadação", "Feira de adoção", "Vacinação", "Castração"]
+CATEGORIAS_ESTOQUE = [("Alimento", "Ração"), ("Higiene", "Areia"), ("Saúde", "Vermífugo"), ("Acessório", "Coleira")]
+
+
+def _nome_pessoa(rng):
+    return f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)}"
+
+
+def _email(nome, i):
+    return f"{nome.lower().replace(' ', '.')}.{i}@exemplo.com.br"
+
+
+def _telefone(rng):
+    return f"(11) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}"
+
+
+def _data(rng, dias_antes=720, dias_depois=0):
+    return DATA_REFERENCIA + timedelta(days=rng.randint(-dias_antes, dias_depois))
+
+
+def _valor(rng, minimo, maximo):
+    return f"{rng.uniform(minimo, maximo):.2f}"
+
+
+def _fotos(rng, quantidade, tamanho):
+    """
+    Fotos sintéticas em base64, com o cabeçalho e o marcador final de um JPEG e o tamanho
+    de uma foto real. Um conjunto pequeno é reaproveitado entre os registros.
+    """
+    fotos = []
+    for _ in range(quantidade):
+        corpo = rng.randbytes(rng.randint(*tamanho))
+        fotos.append(base64.b64encode(b"\xff\xd8\xff\xe0" + corpo + b"\xff\xd9").decode())
+
+    return fotos
+
+
+class Gerador:
+    """
+    Gera as linhas de cada tabela com ids explícitos (1..N), de forma que as referências
+    (animal_id, campanha, voluntário...) sempre apontem para registros existentes.
+    """
+
+    def __init__(self, volumes: dict, semente: int, tamanho_foto):
+        self.volumes = volumes
+        self.rng = random.Random(semente)
+        self.fotos = _fotos(self.rng, 32, tamanho_foto)
+        self.avatares = _fotos(self.rng, 8, (1024, 4 * 1024))
+        # Um único hash: PBKDF2 para cada usuário deixaria a geração lenta
+        self.senha = generate_password_hash(SENHA_USUARIOS)
+        self.saldos = {}
+        self.fim_hospedagem = {}
+        self.fim_tarefa = {}
+
+    def _id(self, tabela):
+        return self.rng.randint(1, self.volumes[tabela])
+
+    def tab_user(self, i):
+        nome = _nome_pessoa(self.rng)
+        return {"user_id": i, "username": f"usuario{i}", "password": self.senha, "email": _email(nome, i)}
+
+    def tab_voluntario(self, i):
+        nome = _nome_pessoa(self.rng)
+        return {
+            "voluntario_id": i,
+            "nome": nome,
+            "foto": self.rng.choice(self.avatares),
+            "email": _email(nome, i),
+            "telefone": _telefone(self.rng),
+        }
+
+    def tab_animal(self, i):
+        rng = self.rng
+        return {
+            "animal_id": i,
+            "nome": rng.choice(NOMES_ANIMAIS),
+            "idade": f"{rng.randint(1, 15)} anos",
+            "foto": rng.choice(self.fotos),
+            "descricao": "Resgatado em " + rng.choice(BAIRROS) + ", dócil e acostumado com outros animais.",
+            "sexo": rng.choice(["Macho", "Fêmea"]),
+            "castracao": rng.choice(["Sim", "Não"]),
+            "status": rng.choices(STATUS_ANIMAL, PESOS_STATUS)[0],
+            "especie": rng.choice(ESPECIES),
+            "data_cadastro": _data(rng).isoformat(),
+        }
+
+    def _coordenada(self, bairro):
+        # Ponto espalhado em até ~3 km do centro do bairro
+        latitude, longitude = OfflineGeocoder.LOCAIS[bairro]
+        latitude += self.rng.uniform(-0.03, 0.03)
+        longitude += self.rng.uniform(-0.03, 0.03)
+        return {"latitude": latitude, "longitude": longitude, "geohash": codificar_geohash(latitude, longitude)}
+
+    def _pessoa(self, chave, i):
+        nome = _nome_pessoa(self.rng)
+        telefone, email = _telefone(self.rng), _email(nome, i)
+        bairro = self.rng.choice(BAIRROS)
+        return {
+            chave: i,
+            "nome": nome,
+            "telefone": telefone,
+            "email": email,
+            "email_normalizado": normalizar_email(email),
+            "telefone_normalizado": normalizar_telefone(telefone),
+            "moradia": f"Rua {self.rng.choice(SOBRENOMES)}, {self.rng.randint(1, 2000)} - {bairro}",
+            **self._coordenada(bairro),
+        }
+
+    def tab_adotante(self, i):
+        return self._pessoa("adotante_id", i)
+
+    def tab_hospedeiro(self, i):
+        return self._pessoa("hospedeiro_id", i)
+
+    def tab_campanha(self, i):
+        inicio = _data(self.rng)
+        bairro = self.rng.choice(BAIRROS)
+        return {
+            "campanha_id": i,
+            "nome": f"Campanha {i}",
+            "tipo": self.rng.choice(TIPOS_CAMPANHA),
+            "data_inicio": inicio.isoformat(),
+            "data_termino": (inicio + timedelta(days=self.rng.randint(7, 90))).isoformat(),
+            "descricao": "Campanha do abrigo Patas Felizes",
+            "local": bairro,
+            **self._coordenada(bairro),
+        }
+
+    def tab_movimento_estoque(self, i):
+        # O saldo de cada item é acumulado aqui e gravado depois em tab_estoque
+        estoque_id = self._id("tab_estoque")
+        saldo = self.saldos.get(estoque_id, 0)
+
+        if saldo > 0 and self.rng.random() < 0.4:
+            tipo, quantidade = "saida", self.rng.randint(1, saldo)
+            saldo -= quantidade
+        else:
+            tipo, quantidade = "entrada", self.rng.randint(1, 50)
+            saldo += quantidade
+
+        self.saldos[estoque_id] = saldo
+        return {
+            "movimento_id": i,
+            "estoque_id": estoque_id,
+            "tipo": tipo,
+            "quantidade": quantidade,
+            "saldo_apos": saldo,
+            "observacao": None,
+            "data_movimento": datetime.combine(_data(self.rng), time(9)) + timedelta(minutes=i),
+        }
+
+    def tab_estoque(self, i):
+        categoria, tipo_item = self.rng.choice(CATEGORIAS_ESTOQUE)
+        saldo = self.saldos.get(i, 0)
+        return {
+            "estoque_id": i,
+            "categoria": categoria,
+            "tipo_item": tipo_item,
+            "descricao": f"{tipo_item} lote {i}",
+            "especie_animal": self.rng.choice(ESPECIES),
+            "quantidade": str(saldo),
+            "saldo": saldo,
+        }
+
+    def tab_adocao(self, i):
+        data = _data(self.rng)
+        return {
+            "adocao_id": i,
+            "animal_id": self._id("tab_animal"),
+            "adotante_id": self._id("tab_adotante"),
+            "data_adocao": data.isoformat(),
+            "data_cadastro": data.isoformat(),
+        }
+
+    def tab_lar_temporario(self, i):
+        # Hospedagens de um mesmo hospedeiro em sequência, sem sobreposição
+        hospedeiro_id = (i - 1) % self.volumes["tab_hospedeiro"] + 1
+        inicio = self.fim_hospedagem.get(hospedeiro_id, DATA_REFERENCIA - timedelta(days=1500))
+        inicio += timedelta(days=self.rng.randint(1, 30))
+        dias = self.rng.randint(7, 90)
+        self.fim_hospedagem[hospedeiro_id] = inicio + timedelta(days=dias)
+
+        return {
+            "lar_temporario_id": i,
+            "animal_id": self._id("tab_animal"),
+            "hospedeiro_id": hospedeiro_id,
+            "periodo": f"{dias} dias",
+            "data_hospedagem": inicio.isoformat(),
+            "data_cadastro": inicio.isoformat(),
+            "data_inicio": inicio,
+            "data_fim": inicio + timedelta(days=dias),
+        }
+
+    def tab_apadrinhamento(self, i):
+        return {
+            "apadrinhamento_id": i,
+            "animal_id": self._id("tab_animal"),
+            "nome_apadrinhador": _nome_pessoa(self.rng),
+            "valor": _valor(self.rng, 20, 200),
+            "regularidade": self.rng.choice(["Mensal", "Trimestral", "Anual"]),
+        }
+
+    def tab_procedimento(self, i):
+        return {
+            "procedimento_id": i,
+            "tipo": self.rng.choice(TIPOS_PROCEDIMENTO),
+            "descricao": "Procedimento veterinário",
+            "valor": _valor(self.rng, 30, 800),
+            "data_procedimento": _data(self.rng).isoformat(),
+            "animal_id": self._id("tab_animal"),
+            "voluntario_id": self._id("tab_voluntario"),
+        }
+
+    def tab_doacao(self, i):
+        return {
+            "doacao_id": i,
+            "doador": _nome_pessoa(self.rng),
+            "valor": _valor(self.rng, 5, 500),
+            "data_doacao": _data(self.rng).isoformat(),
+            "animal_id": self._id("tab_animal"),
+            "companha_id": self._id("tab_campanha"),
+            "comprovante": f"comprovantes/doacao-{i:07d}.pdf",
+        }
+
+    def tab_despesa(self, i):
+        return {
+            "despesa_id": i,
+            "valor": _valor(self.rng, 10, 1500),
+            "data_despesa": _data(self.rng).isoformat(),
+            "tipo": self.rng.choice(TIPOS_DESPESA),
+            "animal_id": self._id("tab_animal"),
+            "comprovante": f"comprovantes/despesa-{i:07d}.pdf",
+        }
+
+    def tab_tarefa(self, i):
+        # Tarefas de um mesmo voluntário em sequência, sem sobreposição de horário
+        voluntario_id = (i - 1) % self.volumes["tab_voluntario"] + 1
+        inicio = self.fim_tarefa.get(voluntario_id, datetime.combine(DATA_REFERENCIA - timedelta(days=180), time(8)))
+        inicio += timedelta(hours=self.rng.randint(2, 36))
+        fim = inicio + timedelta(minutes=self.rng.choice([30, 60, 90, 120]))
+        self.fim_tarefa[voluntario_id] = fim
+
+        return {
+            "tarefa_id": i,
+            "tipo": self.rng.choice(TIPOS_TAREFA),
+            "descricao": "Tarefa do abrigo",
+            "data_tarefa": inicio.date().isoformat(),
+            "voluntario_id": voluntario_id,
+            "animal_id": self._id("tab_animal"),
+            "inicio": inicio,
+            "fim": fim,
+        }
+
+    def tab_tarefa_recorrente(self, i):
+        return {
+            "tarefa_recorrente_id": i,
+            "tipo": self.rng.choice(TIPOS_TAREFA),
+            "descricao": "Tarefa recorrente do abrigo",
+            "voluntario_id": self._id("tab_voluntario"),
+            "animal_id": self._id("tab_animal"),
+            "inicio": datetime.combine(_data(self.rng, 90), time(self.rng.randint(7, 18))),
+            "duracao_minutos": self.rng.choice([30, 60]),
+            "intervalo_dias": self.rng.choice([1, 2, 7]),
+            "data_termino": None,
+        }
+
+
+# Tabelas na ordem de geração, com as tabelas que cada uma referencia
+TABELAS = [
+    (UserModel, ()),
+    (VoluntarioModel, ()),
+    (AnimalModel, ()),
+    (AdotanteModel, ()),
+    (HospedeiroModel, ()),
+    (CampanhaModel, ()),
+    (MovimentoEstoqueModel, ("tab_estoque",)),
+    (EstoqueModel, ()),
+    (AdocaoModel, ("tab_animal", "tab_adotante")),
+    (LarTemporarioModel, ("tab_animal", "tab_hospedeiro")),
+    (ApadrinhamentoModel, ("tab_animal",)),
+    (ProcedimentoModel, ("tab_animal", "tab_voluntario")),
+    (DoacaoModel, ("tab_animal", "tab_campanha")),
+    (DespesaModel, ("tab_animal",)),
+    (TarefaModel, ("tab_animal", "tab_voluntario")),
+    (TarefaRecorrenteModel, ("tab_animal", "tab_voluntario")),
+]
+
+
+def validar_volumes(volumes: dict):
+    """
+    Garante que toda tabela com registros tenha as tabelas referenciadas preenchidas.
+    """
+    for model, referencias in TABELAS:
+        tabela = model.__tablename__
+        if volumes.get(tabela, 0) <= 0:
+            continue
+
+        for referencia in referencias:
+            if volumes.get(referencia, 0) <= 0:
+                raise ValueError(f"{tabela} referencia {referencia}, que precisa ter ao menos um registro.")
+
+
+def _ajustar_sequencias():
+    # Com ids explícitos, as sequências do PostgreSQL precisam continuar do maior id gravado
+    for model, _ in TABELAS:
+        coluna = model.__table__.autoincrement_column
+        if coluna is None:
+            continue
+
+        tabela = model.__tablename__
+        db.session.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence('{tabela}', '{coluna.name}'), "
+                f"COALESCE(MAX({coluna.name}), 0) + 1, false) FROM {tabela}"
+            )
+        )
+
+
+def _colunas_legadas(tabela) -> dict:
+    """
+    Colunas NOT NULL sem default que existem no banco mas não no modelo (ex.: as colunas
+    antigas de tab_adocao criadas pela migração inicial), com um valor neutro para o insert.
+    """
+    valores = {}
+    for coluna in inspect(db.session.connection()).get_columns(tabela.name):
+        if coluna["name"] in tabela.c or coluna["nullable"] or coluna.get("default") is not None:
+            continue
+        valores[coluna["name"]] = 0 if isinstance(coluna["type"], Integer) else ""
+
+    return valores
+
+
+def _suporta_copy():
+    # COPY ... FROM STDIN só existe no PostgreSQL, pelo psycopg2 (copy_expert) ou psycopg 3 (copy)
+    if db.session.get_bind().dialect.name != "postgresql":
+        return False
+
+    cursor = db.session.connection().connection.cursor()
+    try:
+        return hasattr(cursor, "copy_expert") or hasattr(cursor, "copy")
+    finally:
+        cursor.close()
+
+
+def _copiar(tabela, lote):
+    """
+    Grava o lote com COPY em formato CSV. Textos vão entre aspas e None sem aspas,
+    que o COPY lê como NULL.
+    """
+    colunas = list(lote[0])
+    comando = f"COPY {tabela.name} ({', '.join(colunas)}) FROM STDIN WITH (FORMAT csv)"
+
+    cursor = db.session.connection().connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+            writer.writerows([row[coluna] for coluna in colunas] for row in lote)
+            buffer.seek(0)
+            cursor.copy_expert(comando, buffer)
+        else:
+            with cursor.copy(comando.replace("WITH (FORMAT csv)", "")) as copy:
+                for row in lote:
+                    copy.write_row([row[coluna] for coluna in colunas])
+    finally:
+        cursor.close()
+
+
+def seed_database(
+    volumes: dict,
+    semente: int = 42,
+    tamanho_foto=TAMANHO_FOTO["pequeno"],
+    tamanho_lote: int = 5000,
+    progresso=None,
+    usar_copy=None,
+):
+    """
+    Preenche um banco vazio com dados sintéticos, determinísticos para a mesma semente.
+    Os inserts são feitos em lotes, com COPY no PostgreSQL (`usar_copy=None` detecta o
+    suporte do driver) ou executemany, e os resumos materializados (custos por animal e
+    progresso das campanhas) são recalculados no final. `progresso(tabela, linhas)` é
+    chamado ao fim de cada tabela. Retorna a quantidade de linhas por tabela.
+    """
+    validar_volumes(volumes)
+
+    if usar_copy is None:
+        usar_copy = _suporta_copy()
+
+    for model, _ in TABELAS:
+        if volumes.get(model.__tablename__, 0) and db.session.scalar(select(func.count()).select_from(model.__table__)):
+            raise ValueError(f"A tabela {model.__tablename__} já tem registros; use um banco vazio.")
+
+    gerador = Gerador(volumes, semente, tamanho_foto)
+
+    inseridos = {}
+    for model, _ in TABELAS:
+        tabela = model.__table__
+        total = volumes.get(tabela.name, 0)
+        gerar = getattr(gerador, tabela.name)
+        versionado = "version" in tabela.c
+        # O COPY não aplica os defaults do modelo
+        atualizado_em = agora_utc() if "updated_at" in tabela.c else None
+
+        # O esquema do banco pode ter colunas obrigatórias que o modelo não conhece
+        legadas = _colunas_legadas(tabela) if total else {}
+        destino = table(tabela.name, *[column(c.name, c.type) for c in tabela.c], *map(column, legadas)) if legadas else tabela
+
+        for inicio in range(1, total + 1, tamanho_lote):
+            lote = [gerar(i) for i in range(inicio, min(inicio + tamanho_lote, total + 1))]
+
+            for row in lote:
+                if versionado:
+                    row["version"] = 1
+                if atualizado_em:
+                    row["updated_at"] = atualizado_em
+                row.update(legadas)
+
+            if usar_copy:
+                _copiar(tabela, lote)
+            else:
+                db.session.execute(insert(destino), lote)
+
+        db.session.commit()
+        inseridos[tabela.name] = total
+
+        if progresso:
+            progresso(tabela.name, total)
+
+    if db.session.get_bind().dialect.name == "postgresql":
+        _ajustar_sequencias()
+        db.session.commit()
+
+    rebuild_custos_animais()
+    rebuild_progresso_campanhas()
+
+    return inseridos
@@ -1,28 +1,39 @@
 import logging
 import traceback
 from marshmallow import ValidationError
+from sqlalchemy.orm.exc import StaleDataError
 
 from backend.external.schemas import AdocaoSchema
 from backend.db import db
 from backend.external.model import AdocaoModel
+from backend.services.dashboard_service import invalidate_dashboard
+from backend.utils.events import ATUALIZADO, CRIADO, REMOVIDO, publish_change
+from backend.utils.soft_delete import soft_delete
+from backend.utils.concurrency import precondition_failed, version_matches
+from backend.utils.projection import query_fields, serialize_fields, validate_fields
 
 # Create logger for this module
 logger = logging.getLogger(__name__)
 
 
-def get_all_adocoes():
+def get_all_adocoes(fields=None):
     """
     Consulta ao banco de dados para obter todas as adoções.
     """
-    return AdocaoModel.query.all()
+    return query_fields(AdocaoModel, fields).all()
 
 
-def list_adocoes_service():
+def list_adocoes_service(fields=None):
     """
     Retorna a lista de todas as adoções armazenadas no banco de dados.
     """
     try:
-        adocao_list = get_all_adocoes()
+        # Valida os campos pedidos em ?fields=
+        error = validate_fields(AdocaoModel, AdocaoSchema, fields)
+        if error:
+            return error
+
+        adocao_list = get_all_adocoes(fields)
 
         if not adocao_list:
             return {
@@ -30,7 +41,7 @@ def list_adocoes_service():
                 "message": "Nenhuma adoção encontrada no banco de dados.",
             }
 
-        response_list = [adocao.serialize for adocao in adocao_list]
+        response_list = serialize_fields(adocao_list, AdocaoSchema, fields, many=True)
         return {"status": 200, "data": response_list}
 
     except Exception as e:
@@ -55,6 +66,8 @@ def create_adocao_service(adocao_data: AdocaoSchema):
 
         db.session.add(new_adocao)
         db.session.commit()
+        invalidate_dashboard("adocoes")
+        publish_change(new_adocao, CRIADO)
 
         return {"status": 201, "data": new_adocao.serialize}
 
@@ -69,17 +82,21 @@ def create_adocao_service(adocao_data: AdocaoSchema):
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
-def get_adocao_service(adocao_id: int):
+def get_adocao_service(adocao_id: int, fields=None):
     """
     Retorna uma adoção específica do banco de dados.
     """
     try:
-        adocao = AdocaoModel.query.get(adocao_id)
+        error = validate_fields(AdocaoModel, AdocaoSchema, fields)
+        if error:
+            return error
+
+        adocao = query_fields(AdocaoModel, fields).get(adocao_id)
 
         if not adocao:
             return {"status": 404, "message": "Adoção não encontrada no banco de dados."}
 
-        return {"status": 200, "data": adocao.serialize}
+        return {"status": 200, "data": serialize_fields(adocao, AdocaoSchema, fields)}
 
     except Exception as e:
         error_message = f"Erro ao consultar a adoção: {str(e)}"
@@ -89,7 +106,7 @@ def get_adocao_service(adocao_id: int):
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
-def update_adocao_service(adocao_id: int, adocao_data: AdocaoSchema):
+def update_adocao_service(adocao_id: int, adocao_data: AdocaoSchema, if_match=None):
     """
     Atualiza uma adoção específica no banco de dados.
     """
@@ -99,18 +116,27 @@ def update_adocao_service(adocao_id: int, adocao_data: AdocaoSchema):
         if not adocao_to_update:
             return {"status": 404, "message": "Adoção não encontrada no banco de dados."}
 
+        if not version_matches(adocao_to_update, if_match):
+            return precondition_failed()
+
         adocao_to_update.animal_id = adocao_data["animal_id"]
         adocao_to_update.adotante_id = adocao_data["adotante_id"]
         adocao_to_update.data_adocao = adocao_data["data_adocao"]
         adocao_to_update.data_cadastro = adocao_data["data_cadastro"]
 
         db.session.commit()
+        invalidate_dashboard("adocoes")
+        publish_change(adocao_to_update, ATUALIZADO)
 
         return {"status": 200, "data": adocao_to_update.serialize}
 
     except ValidationError as e:
         return {"status": 400, "message": str(e)}
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
+
     except Exception as e:
         error_message = f"Erro ao atualizar a adoção: {str(e)}"
         traceback_message = traceback.format_exc()
@@ -119,7 +145,7 @@ def update_adocao_service(adocao_id: int, adocao_data: AdocaoSchema):
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
-def delete_adocao_service(adocao_id: int):
+def delete_adocao_service(adocao_id: int, if_match=None):
     """
     Deleta uma adoção específica do banco de dados.
     """
@@ -129,11 +155,20 @@ def delete_adocao_service(adocao_id: int):
         if not adocao_to_delete:
             return {"status": 404, "message": "Adoção não encontrada no banco de dados."}
 
-        db.session.delete(adocao_to_delete)
+        if not version_matches(adocao_to_delete, if_match):
+            return precondition_failed()
+
+        soft_delete(adocao_to_delete)
         db.session.commit()
+        invalidate_dashboard("adocoes")
+        publish_change(adocao_to_delete, REMOVIDO)
 
         return {"status": 204, "message": "Adoção deletada com sucesso."}
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
+
     except Exception as e:
         error_message = f"Erro ao deletar a adoção: {str(e)}"
         traceback_message = traceback.format_exc()
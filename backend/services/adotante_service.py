@@ -1,26 +1,37 @@
 import logging
 import traceback
 from marshmallow import ValidationError
+from sqlalchemy.orm.exc import StaleDataError
 
 from backend.external.schemas import AdotanteSchema
 from backend.db import db
 from backend.external.model import AdotanteModel
+from backend.utils.events import ATUALIZADO, CRIADO, REMOVIDO, publish_change
+from backend.utils.soft_delete import soft_delete
+from backend.utils.concurrency import precondition_failed, version_matches
+from backend.utils.geo import aplicar_localizacao
+from backend.utils.projection import query_fields, serialize_fields, validate_fields
 
 logger = logging.getLogger(__name__)
 
-def get_all_adotantes():
+def get_all_adotantes(fields=None):
     """
     Consulta ao banco de dados para obter todos os adotantes.
     """
-    return AdotanteModel.query.all()
+    return query_fields(AdotanteModel, fields).all()
 
 
-def list_adotantes_service():
+def list_adotantes_service(fields=None):
     """
     Retorna a lista de todos os adotantes armazenados no banco de dados.
     """
     try:
-        adotante_list = get_all_adotantes()
+        # Valida os campos pedidos em ?fields=
+        error = validate_fields(AdotanteModel, AdotanteSchema, fields)
+        if error:
+            return error
+
+        adotante_list = get_all_adotantes(fields)
 
         if not adotante_list:
             return {
@@ -28,7 +39,7 @@ def list_adotantes_service():
                 "message": "Nenhum adotante encontrado no banco de dados.",
             }
 
-        response_list = [adotante.serialize for adotante in adotante_list]
+        response_list = serialize_fields(adotante_list, AdotanteSchema, fields, many=True)
         return {"status": 200, "data": response_list}
 
     except Exception as e:
@@ -51,8 +62,11 @@ def create_adotante_service(adotante_data: AdotanteSchema):
             moradia=adotante_data["moradia"],
         )
 
+        aplicar_localizacao(new_adotante, adotante_data, adotante_data["moradia"])
+
         db.session.add(new_adotante)
         db.session.commit()
+        publish_change(new_adotante, CRIADO)
 
         return {"status": 201, "data": new_adotante.serialize}
 
@@ -67,17 +81,21 @@ def create_adotante_service(adotante_data: AdotanteSchema):
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
-def get_adotante_service(adotante_id: int):
+def get_adotante_service(adotante_id: int, fields=None):
     """
     Retorna um adotante específico do banco de dados.
     """
     try:
-        adotante = AdotanteModel.query.get(adotante_id)
+        error = validate_fields(AdotanteModel, AdotanteSchema, fields)
+        if error:
+            return error
+
+        adotante = query_fields(AdotanteModel, fields).get(adotante_id)
 
         if not adotante:
             return {"status": 404, "message": "Adotante não encontrado no banco de dados."}
 
-        return {"status": 200, "data": adotante.serialize}
+        return {"status": 200, "data": serialize_fields(adotante, AdotanteSchema, fields)}
 
     except Exception as e:
         error_message = f"Erro ao consultar o adotante: {str(e)}"
@@ -87,7 +105,7 @@ def get_adotante_service(adotante_id: int):
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
-def update_adotante_service(adotante_id: int, adotante_data: AdotanteSchema):
+def update_adotante_service(adotante_id: int, adotante_data: AdotanteSchema, if_match=None):
     """
     Atualiza um adotante específico no banco de dados.
     """
@@ -97,18 +115,30 @@ def update_adotante_service(adotante_id: int, adotante_data: AdotanteSchema):
         if not adotante_to_update:
             return {"status": 404, "message": "Adotante não encontrado no banco de dados."}
 
+        if not version_matches(adotante_to_update, if_match):
+            return precondition_failed()
+
+        # Coordenada enviada ou, se o endereço mudou, geocodificada de novo
+        endereco_alterado = adotante_to_update.moradia != adotante_data["moradia"]
+        aplicar_localizacao(adotante_to_update, adotante_data, adotante_data["moradia"], endereco_alterado)
+
         adotante_to_update.nome = adotante_data["nome"]
         adotante_to_update.telefone = adotante_data["telefone"]
         adotante_to_update.email = adotante_data["email"]
         adotante_to_update.moradia = adotante_data["moradia"]
 
         db.session.commit()
+        publish_change(adotante_to_update, ATUALIZADO)
 
         return {"status": 200, "data": adotante_to_update.serialize}
 
     except ValidationError as e:
         return {"status": 400, "message": str(e)}
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
+
     except Exception as e:
         error_message = f"Erro ao atualizar o adotante: {str(e)}"
         traceback_message = traceback.format_exc()
@@ -117,7 +147,7 @@ def update_adotante_service(adotante_id: int, adotante_data: AdotanteSchema):
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
-def delete_adotante_service(adotante_id: int):
+def delete_adotante_service(adotante_id: int, if_match=None):
     """
     Deleta um adotante específico do banco de dados.
     """
@@ -127,11 +157,19 @@ def delete_adotante_service(adotante_id: int):
         if not adotante_to_delete:
             return {"status": 404, "message": "Adotante não encontrado no banco de dados."}
 
-        db.session.delete(adotante_to_delete)
+        if not version_matches(adotante_to_delete, if_match):
+            return precondition_failed()
+
+        soft_delete(adotante_to_delete)
         db.session.commit()
+        publish_change(adotante_to_delete, REMOVIDO)
 
         return {"status": 204, "message": "Adotante deletado com sucesso."}
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
+
     except Exception as e:
         error_message = f"Erro ao deletar o adotante: {str(e)}"
         traceback_message = traceback.format_exc()
@@ -0,0 +1,295 @@
+import logging
+import traceback
+from datetime import datetime, timedelta
+from math import lcm
+
+from marshmallow import ValidationError
+from sqlalchemy import or_
+
+from backend.db import db
+from backend.external.model import TarefaModel, TarefaRecorrenteModel, VoluntarioModel
+from backend.external.schemas import TarefaRecorrenteSchema
+from backend.utils.events import CRIADO, REMOVIDO, publish_change
+from backend.utils.soft_delete import soft_delete
+
+logger = logging.getLogger(__name__)
+
+# Maior período aceito por consulta de agenda, para limitar a expansão das recorrências
+AGENDA_MAX_DIAS = 92
+
+
+def expandir_ocorrencias(recorrente: TarefaRecorrenteModel, de: datetime, ate: datetime):
+    """
+    Gera, sob demanda, as ocorrências do modelo recorrente que se sobrepõem a [de, ate).
+    A primeira ocorrência é calculada diretamente, sem percorrer as anteriores ao período.
+    """
+    passo = timedelta(days=recorrente.intervalo_dias)
+    duracao = timedelta(minutes=recorrente.duracao_minutos)
+
+    # Menor k tal que inicio + k * passo + duracao > de
+    k = max(0, (de - duracao - recorrente.inicio) // passo + 1)
+    ocorrencia = recorrente.inicio + k * passo
+
+    while ocorrencia < ate:
+        if recorrente.data_termino and ocorrencia.date() > recorrente.data_termino:
+            break
+
+        yield ocorrencia, ocorrencia + duracao
+        ocorrencia += passo
+
+
+def termino_recorrente(recorrente: TarefaRecorrenteModel):
+    """
+    Instante em que termina a última ocorrência possível do modelo recorrente, ou None
+    se ele não tem data_termino.
+    """
+    if recorrente.data_termino is None:
+        return None
+
+    ultimo_inicio = datetime.combine(recorrente.data_termino + timedelta(days=1), datetime.min.time())
+    return ultimo_inicio + timedelta(minutes=recorrente.duracao_minutos)
+
+
+def recorrentes_se_sobrepoem(a: TarefaRecorrenteModel, b: TarefaRecorrenteModel) -> bool:
+    """
+    Indica se alguma ocorrência de `a` se sobrepõe a alguma de `b`. Depois que os dois
+    começam, as posições relativas das ocorrências se repetem a cada mmc dos intervalos,
+    então basta comparar um ciclo (mais a maior duração) a partir do início mais tardio.
+    """
+    de = max(a.inicio, b.inicio)
+    ate = de + timedelta(
+        days=lcm(a.intervalo_dias, b.intervalo_dias),
+        minutes=max(a.duracao_minutos, b.duracao_minutos),
+    )
+
+    for termino in (termino_recorrente(a), termino_recorrente(b)):
+        if termino is not None:
+            ate = min(ate, termino)
+
+    ocorrencias_a = list(expandir_ocorrencias(a, de, ate))
+    ocorrencias_b = list(expandir_ocorrencias(b, de, ate))
+
+    # As duas listas estão ordenadas por início e por fim: basta percorrê-las juntas
+    i = j = 0
+    while i < len(ocorrencias_a) and j < len(ocorrencias_b):
+        inicio_a, fim_a = ocorrencias_a[i]
+        inicio_b, fim_b = ocorrencias_b[j]
+
+        if inicio_a < fim_b and inicio_b < fim_a:
+            return True
+
+        if fim_a <= fim_b:
+            i += 1
+        else:
+            j += 1
+
+    return False
+
+
+def find_conflito_recorrente(voluntario_id: int, inicio, fim):
+    """
+    Retorna um modelo recorrente do voluntário com alguma ocorrência sobreposta a
+    [inicio, fim), se houver. A consulta usa o índice (voluntario_id, inicio) e as
+    ocorrências são calculadas só dentro do intervalo.
+    """
+    if inicio is None:
+        return None
+
+    recorrentes = TarefaRecorrenteModel.query.filter(
+        TarefaRecorrenteModel.voluntario_id == voluntario_id,
+        TarefaRecorrenteModel.inicio < fim,
+    )
+
+    for recorrente in recorrentes:
+        if next(expandir_ocorrencias(recorrente, inicio, fim), None) is not None:
+            return recorrente
+
+    return None
+
+
+def find_conflitos_do_recorrente(recorrente: TarefaRecorrenteModel):
+    """
+    Retorna a primeira tarefa ou modelo recorrente do voluntário que se sobrepõe a alguma
+    ocorrência do novo modelo, se houver. As tarefas são lidas pelo índice
+    (voluntario_id, inicio, fim), só no período em que o modelo gera ocorrências.
+    """
+    termino = termino_recorrente(recorrente)
+
+    tarefas = TarefaModel.query.filter(
+        TarefaModel.voluntario_id == recorrente.voluntario_id,
+        TarefaModel.inicio.is_not(None),
+        TarefaModel.fim > recorrente.inicio,
+    )
+    if termino is not None:
+        tarefas = tarefas.filter(TarefaModel.inicio < termino)
+
+    for tarefa in tarefas.order_by(TarefaModel.inicio):
+        if next(expandir_ocorrencias(recorrente, tarefa.inicio, tarefa.fim), None) is not None:
+            return tarefa
+
+    outros = TarefaRecorrenteModel.query.filter(TarefaRecorrenteModel.voluntario_id == recorrente.voluntario_id)
+    if termino is not None:
+        outros = outros.filter(TarefaRecorrenteModel.inicio < termino)
+
+    for outro in outros:
+        if recorrentes_se_sobrepoem(recorrente, outro):
+            return outro
+
+    return None
+
+
+def conflict_response_recorrente(conflito):
+    if isinstance(conflito, TarefaModel):
+        descricao = f"tarefa {conflito.tarefa_id}"
+    else:
+        descricao = f"tarefa recorrente {conflito.tarefa_recorrente_id}"
+
+    return {
+        "status": 409,
+        "message": f"O voluntário já possui uma tarefa nesse horário ({descricao}).",
+    }
+
+
+def get_agenda_voluntario_service(voluntario_id: int, de, ate):
+    """
+    Retorna a agenda do voluntário entre as datas `de` e `ate` (inclusive), unindo as
+    tarefas com horário e as ocorrências dos modelos recorrentes.
+    """
+    try:
+        if ate < de:
+            return {"status": 400, "message": "`ate` não pode ser anterior a `de`."}
+
+        if (ate - de).days + 1 > AGENDA_MAX_DIAS:
+            return {"status": 400, "message": f"O período da agenda é limitado a {AGENDA_MAX_DIAS} dias."}
+
+        if not VoluntarioModel.query.get(voluntario_id):
+            return {"status": 404, "message": "Voluntário não encontrado no banco de dados."}
+
+        inicio = datetime.combine(de, datetime.min.time())
+        fim = datetime.combine(ate, datetime.min.time()) + timedelta(days=1)
+
+        # Ambas as consultas usam os índices (voluntario_id, inicio)
+        tarefas = TarefaModel.query.filter(
+            TarefaModel.voluntario_id == voluntario_id,
+            TarefaModel.inicio < fim,
+            TarefaModel.fim > inicio,
+        ).all()
+
+        recorrentes = TarefaRecorrenteModel.query.filter(
+            TarefaRecorrenteModel.voluntario_id == voluntario_id,
+            TarefaRecorrenteModel.inicio < fim,
+            or_(TarefaRecorrenteModel.data_termino.is_(None), TarefaRecorrenteModel.data_termino >= de),
+        ).all()
+
+        agenda = [
+            {
+                "origem": "tarefa",
+                "id": tarefa.tarefa_id,
+                "tipo": tarefa.tipo,
+                "descricao": tarefa.descricao,
+                "animal_id": tarefa.animal_id,
+                "inicio": tarefa.inicio.isoformat(),
+                "fim": tarefa.fim.isoformat(),
+            }
+            for tarefa in tarefas
+        ]
+
+        for recorrente in recorrentes:
+            for ocorrencia_inicio, ocorrencia_fim in expandir_ocorrencias(recorrente, inicio, fim):
+                agenda.append(
+                    {
+                        "origem": "recorrente",
+                        "id": recorrente.tarefa_recorrente_id,
+                        "tipo": recorrente.tipo,
+                        "descricao": recorrente.descricao,
+                        "animal_id": recorrente.animal_id,
+                        "inicio": ocorrencia_inicio.isoformat(),
+                        "fim": ocorrencia_fim.isoformat(),
+                    }
+                )
+
+        agenda.sort(key=lambda item: item["inicio"])
+
+        return {"status": 200, "data": agenda}
+
+    except Exception as e:
+        error_message = f"Erro ao consultar a agenda do voluntário: {str(e)}"
+        traceback_message = traceback.format_exc()
+        logger.error(error_message)
+        return {"status": 500, "message": error_message, "traceback": traceback_message}
+
+
+def list_tarefas_recorrentes_service():
+    """
+    Retorna todos os modelos de tarefa recorrente.
+    """
+    try:
+        recorrentes = TarefaRecorrenteModel.query.order_by(TarefaRecorrenteModel.tarefa_recorrente_id).all()
+
+        return {"status": 200, "data": [recorrente.serialize for recorrente in recorrentes]}
+
+    except Exception as e:
+        error_message = f"Erro ao listar as tarefas recorrentes: {str(e)}"
+        traceback_message = traceback.format_exc()
+        logger.error(error_message)
+        return {"status": 500, "message": error_message, "traceback": traceback_message}
+
+
+def create_tarefa_recorrente_service(data: dict):
+    """
+    Cria um modelo de tarefa recorrente. As ocorrências são calculadas na consulta da agenda.
+    """
+    try:
+        recorrente = TarefaRecorrenteSchema().load(data or {})
+
+        if recorrente["inicio"].tzinfo is not None:
+            raise ValidationError("Informe `inicio` sem fuso horário.", "inicio")
+
+        if recorrente["data_termino"] and recorrente["data_termino"] < recorrente["inicio"].date():
+            raise ValidationError("data_termino não pode ser anterior ao início.", "data_termino")
+
+        new_recorrente = TarefaRecorrenteModel(**recorrente)
+
+        conflito = find_conflitos_do_recorrente(new_recorrente)
+        if conflito:
+            return conflict_response_recorrente(conflito)
+
+        db.session.add(new_recorrente)
+        db.session.commit()
+        publish_change(new_recorrente, CRIADO)
+
+        return {"status": 201, "data": new_recorrente.serialize}
+
+    except ValidationError as e:
+        return {"status": 400, "message": str(e)}
+
+    except Exception as e:
+        db.session.rollback()
+        error_message = f"Erro ao criar a tarefa recorrente: {str(e)}"
+        traceback_message = traceback.format_exc()
+        logger.error(error_message)
+        return {"status": 500, "message": error_message, "traceback": traceback_message}
+
+
+def delete_tarefa_recorrente_service(tarefa_recorrente_id: int):
+    """
+    Remove um modelo de tarefa recorrente e, com ele, suas ocorrências futuras.
+    """
+    try:
+        recorrente = TarefaRecorrenteModel.query.get(tarefa_recorrente_id)
+
+        if not recorrente:
+            return {"status": 404, "message": "Tarefa recorrente não encontrada no banco de dados."}
+
+        soft_delete(recorrente)
+        db.session.commit()
+        publish_change(recorrente, REMOVIDO)
+
+        return {"status": 204, "message": "Tarefa recorrente deletada com sucesso."}
+
+    except Exception as e:
+        db.session.rollback()
+        error_message = f"Erro ao deletar a tarefa recorrente: {str(e)}"
+        traceback_message = traceback.format_exc()
+        logger.error(error_message)
+        return {"status": 500, "message": error_message, "traceback": traceback_message}
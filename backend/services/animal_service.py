@@ -1,12 +1,23 @@
+import base64
+import binascii
 import logging
 import traceback
 from marshmallow import ValidationError
+from sqlalchemy import func
+from sqlalchemy.orm.exc import StaleDataError
 
-from backend.external.schemas import AnimalSchema
+from backend.external.schemas import AnimalSchema, centavos_para_reais
 from backend.db import db
 from backend.external.model import (
     AnimalModel,
+    CustoAnimalModel,
 )
+from backend.services.dashboard_service import invalidate_dashboard
+from backend.utils.events import ATUALIZADO, CRIADO, REMOVIDO, publish_change
+from backend.utils.soft_delete import soft_delete
+from backend.utils.concurrency import precondition_failed, version_matches
+from backend.utils.jobs import enqueue
+from backend.utils.projection import load_only_fields, query_fields, serialize_fields, validate_fields
 
 from backend.utils.pagination import build_pagination
 
@@ -14,20 +25,52 @@ from backend.utils.pagination import build_pagination
 logger = logging.getLogger(__name__)
 
 
-def get_all_animals():
-    # Consulta ao banco de dados para obter todos os animais
-    animal_list = AnimalModel.query.all()
+# Colunas aceitas no parâmetro `sort` da listagem de animais
+SORT_COLUMNS = {
+    "animal_id": AnimalModel.animal_id,
+    "nome": AnimalModel.nome,
+    "data_cadastro": AnimalModel.data_cadastro,
+    "custo_total": func.coalesce(CustoAnimalModel.total, 0),
+}
 
-    return animal_list
+def get_all_animals(sort=None, order="asc", fields=None):
+    # Consulta ao banco de dados para obter todos os animais com o custo total de cada um
+    query = db.session.query(AnimalModel, CustoAnimalModel.total).outerjoin(
+        CustoAnimalModel, CustoAnimalModel.animal_id == AnimalModel.animal_id
+    )
 
-def list_animals_service():
+    if fields is not None:
+        query = query.options(load_only_fields(AnimalModel, fields))
+
+    if sort:
+        column = SORT_COLUMNS[sort]
+        query = query.order_by(column.desc() if order == "desc" else column.asc(), AnimalModel.animal_id)
+
+    return query.all()
+
+def list_animals_service(sort=None, order="asc", fields=None):
     """
     Retorna a lista de todos os animais armazenados no banco de dados.
     """
     try:
         logger.info("Listando animais...")
+
+        # Valida os campos pedidos em ?fields= (custo_total vem do resumo materializado)
+        error = validate_fields(AnimalModel, AnimalSchema, fields, extras=("custo_total",))
+        if error:
+            return error
+
+        if sort and sort not in SORT_COLUMNS:
+            return {
+                "status": 400,
+                "message": f"Ordenação inválida. Use um dos campos: {', '.join(SORT_COLUMNS)}.",
+            }
+
+        if order not in ("asc", "desc"):
+            return {"status": 400, "message": "A ordem deve ser 'asc' ou 'desc'."}
+
         # Consulta ao banco de dados para obter todos os animais
-        animal_list = get_all_animals()
+        animal_list = get_all_animals(sort, order, fields)
 
         # Verifica se a lista está vazia
         if not animal_list:
@@ -37,8 +80,13 @@ def list_animals_service():
                 "message": "Nenhum animal encontrado no banco de dados.",
             }
 
-        # Serializa os animais
-        response_list = [animal.serialize for animal in animal_list]
+        # Serializa os animais, incluindo o custo total materializado
+        response_list = []
+        for animal, custo_total in animal_list:
+            data = serialize_fields(animal, AnimalSchema, fields)
+            if fields is None or "custo_total" in fields:
+                data["custo_total"] = centavos_para_reais(custo_total or 0)
+            response_list.append(data)
 
         # Retorna os dados serializados e o status de sucesso
         logger.info("Animais listados com sucesso.")
@@ -73,6 +121,8 @@ def create_animal_service(animal: AnimalSchema):
         # Adiciona o novo animal ao banco de dados
         db.session.add(new_animal)
         db.session.commit()
+        invalidate_dashboard("animais")
+        publish_change(new_animal, CRIADO)
 
         # Retorna o animal criado com sucesso
         logger.info("Novo animal criado com sucesso.")
@@ -90,14 +140,18 @@ def create_animal_service(animal: AnimalSchema):
         logger.error(error_message)
         return {"status": 500, "message": error_message, "traceback": traceback_message}
     
-def get_animal_service(animal_id: int):
+def get_animal_service(animal_id: int, fields=None):
     """
     Retorna um animal específico do banco de dados.
     """
     try:
+        error = validate_fields(AnimalModel, AnimalSchema, fields)
+        if error:
+            return error
+
         logger.info(f"Consultando animal com ID {animal_id}...")
         # Consulta ao banco de dados para obter o animal com o ID fornecido
-        animal = AnimalModel.query.get(animal_id)
+        animal = query_fields(AnimalModel, fields).get(animal_id)
 
         # Verifica se o animal existe
         if not animal:
@@ -106,7 +160,7 @@ def get_animal_service(animal_id: int):
 
         # Retorna o animal encontrado e o status de sucesso
         logger.info("Animal encontrado com sucesso.")
-        return {"status": 200, "data": animal.serialize}
+        return {"status": 200, "data": serialize_fields(animal, AnimalSchema, fields)}
 
     except Exception as e:
         # Se ocorrer qualquer erro, retorna uma mensagem de erro com o traceback
@@ -115,7 +169,7 @@ def get_animal_service(animal_id: int):
         logger.error(error_message)
         return {"status": 500, "message": error_message, "traceback": traceback_message}
     
-def update_animal_service(animal_id: int, animal: AnimalSchema):
+def update_animal_service(animal_id: int, animal: AnimalSchema, if_match=None):
     """
     Atualiza um animal específico no banco de dados.
     """
@@ -129,6 +183,9 @@ def update_animal_service(animal_id: int, animal: AnimalSchema):
             logger.error("Animal não encontrado no banco de dados.")
             return {"status": 404, "message": "Animal não encontrado no banco de dados."}
 
+        if not version_matches(animal_to_update, if_match):
+            return precondition_failed()
+
         # Atualiza os dados do animal
         animal_to_update.nome = animal["nome"]
         animal_to_update.idade = animal["idade"]
@@ -142,6 +199,8 @@ def update_animal_service(animal_id: int, animal: AnimalSchema):
 
         # Salva as alterações no banco de dados
         db.session.commit()
+        invalidate_dashboard("animais")
+        publish_change(animal_to_update, ATUALIZADO)
 
         # Retorna o animal atualizado e o status de sucesso
         logger.info("Animal atualizado com sucesso.")
@@ -152,6 +211,10 @@ def update_animal_service(animal_id: int, animal: AnimalSchema):
         logger.error(f"Erro de validação ao atualizar o animal: {str(e)}")
         return {"status": 400, "message": str(e)}
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
+
     except Exception as e:
         # Se ocorrer qualquer outro erro, retorna uma mensagem de erro com o traceback
         error_message = f"Erro ao atualizar o animal: {str(e)}"
@@ -159,7 +222,7 @@ def update_animal_service(animal_id: int, animal: AnimalSchema):
         logger.error(error_message)
         return {"status": 500, "message": error_message, "traceback": traceback_message}
     
-def delete_animal_service(animal_id: int):
+def delete_animal_service(animal_id: int, if_match=None):
     """
     Deleta um animal específico do banco de dados.
     """
@@ -173,17 +236,118 @@ def delete_animal_service(animal_id: int):
             logger.error("Animal não encontrado no banco de dados.")
             return {"status": 404, "message": "Animal não encontrado no banco de dados."}
 
-        # Deleta o animal do banco de dados
-        db.session.delete(animal_to_delete)
+        if not version_matches(animal_to_delete, if_match):
+            return precondition_failed()
+
+        # Marca o animal como removido (vai para a lixeira)
+        soft_delete(animal_to_delete)
         db.session.commit()
+        invalidate_dashboard("animais")
+        publish_change(animal_to_delete, REMOVIDO)
 
         # Retorna o status de sucesso
         logger.info("Animal deletado com sucesso.")
         return {"status": 204, "message": "Animal deletado com sucesso."}
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
+
     except Exception as e:
         # Se ocorrer qualquer erro, retorna uma mensagem de erro com o traceback
         error_message = f"Erro ao deletar o animal: {str(e)}"
         traceback_message = traceback.format_exc()
         logger.error(error_message)
-        return {"status": 500, "message": error_message, "traceback": traceback_message}
\ No newline at end of file
+        return {"status": 500, "message": error_message, "traceback": traceback_message}
+
+
+# Assinaturas dos formatos de imagem aceitos para a foto
+FOTO_MIMETYPES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF8", "image/gif"),
+)
+
+
+def foto_mimetype(conteudo: bytes) -> str:
+    """
+    Identifica o tipo da imagem pelos primeiros bytes.
+    """
+    for assinatura, mimetype in FOTO_MIMETYPES:
+        if conteudo.startswith(assinatura):
+            return mimetype
+
+    if conteudo[:4] == b"RIFF" and conteudo[8:12] == b"WEBP":
+        return "image/webp"
+
+    return "application/octet-stream"
+
+
+def get_foto_animal_service(animal_id: int):
+    """
+    Retorna a foto do animal em bytes, com o tipo da imagem e a versão do registro.
+    """
+    try:
+        animal = AnimalModel.query.get(animal_id)
+
+        if not animal or not animal.foto:
+            return {"status": 404, "message": "Foto do animal não encontrada."}
+
+        conteudo = animal.foto if isinstance(animal.foto, bytes) else str(animal.foto).encode()
+
+        return {
+            "status": 200,
+            "data": {"conteudo": conteudo, "mimetype": foto_mimetype(conteudo), "version": animal.version},
+        }
+
+    except Exception as e:
+        error_message = f"Erro ao consultar a foto do animal: {str(e)}"
+        traceback_message = traceback.format_exc()
+        logger.error(error_message)
+        return {"status": 500, "message": error_message, "traceback": traceback_message}
+
+
+def enqueue_foto_animal_service(animal_id: int, data: dict):
+    """
+    Agenda a decodificação e gravação da foto do animal em segundo plano.
+    """
+    try:
+        if not AnimalModel.query.get(animal_id):
+            return {"status": 404, "message": "Animal não encontrado no banco de dados."}
+
+        foto = (data or {}).get("foto")
+        if not foto or not isinstance(foto, str):
+            return {"status": 400, "message": "Informe a foto em base64 no campo `foto`."}
+
+        job = enqueue("animais.foto", {"animal_id": animal_id, "foto": foto})
+        db.session.commit()
+
+        logger.info(f"Processamento da foto do animal {animal_id} agendado no job {job.job_id}.")
+        return {"status": 202, "data": job.serialize}
+
+    except Exception as e:
+        error_message = f"Erro ao agendar o processamento da foto: {str(e)}"
+        traceback_message = traceback.format_exc()
+        logger.error(error_message)
+        return {"status": 500, "message": error_message, "traceback": traceback_message}
+
+
+def update_foto_animal(animal_id: int, foto: str):
+    """
+    Decodifica a foto em base64 e grava no animal. Executada pelo worker de jobs;
+    os erros são propagados para que o job registre a falha.
+    """
+    try:
+        conteudo = base64.b64decode(foto, validate=True)
+    except (binascii.Error, ValueError) as e:
+        raise ValidationError(f"Foto em base64 inválida: {e}", "foto")
+
+    animal = AnimalModel.query.get(animal_id)
+    if not animal:
+        raise ValidationError("Animal não encontrado no banco de dados.", "animal_id")
+
+    animal.foto = conteudo
+    db.session.commit()
+    publish_change(animal, ATUALIZADO)
+
+    return {"animal_id": animal.animal_id, "version": animal.version, "bytes": len(conteudo)}
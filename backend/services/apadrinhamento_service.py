@@ -1,26 +1,36 @@
 import logging
 import traceback
 from marshmallow import ValidationError
+from sqlalchemy.orm.exc import StaleDataError
 
 from backend.external.schemas import ApadrinhamentoSchema
 from backend.db import db
 from backend.external.model import ApadrinhamentoModel
+from backend.utils.events import ATUALIZADO, CRIADO, REMOVIDO, publish_change
+from backend.utils.soft_delete import soft_delete
+from backend.utils.concurrency import precondition_failed, version_matches
+from backend.utils.projection import query_fields, serialize_fields, validate_fields
 
 # Exemplo de logger para o módulo
 logger = logging.getLogger(__name__)
 
 
-def get_all_apadrinhamentos():
+def get_all_apadrinhamentos(fields=None):
     """Consulta ao banco de dados para obter todos os apadrinhamentos."""
-    return ApadrinhamentoModel.query.all()
+    return query_fields(ApadrinhamentoModel, fields).all()
 
 
-def list_apadrinhamentos_service():
+def list_apadrinhamentos_service(fields=None):
     """
     Retorna a lista de todos os apadrinhamentos armazenados no banco de dados.
     """
     try:
-        apadrinhamento_list = get_all_apadrinhamentos()
+        # Valida os campos pedidos em ?fields=
+        error = validate_fields(ApadrinhamentoModel, ApadrinhamentoSchema, fields)
+        if error:
+            return error
+
+        apadrinhamento_list = get_all_apadrinhamentos(fields)
 
         if not apadrinhamento_list:
             return {
@@ -28,7 +38,7 @@ def list_apadrinhamentos_service():
                 "message": "Nenhum apadrinhamento encontrado no banco de dados.",
             }
 
-        response_list = [apadrinhamento.serialize for apadrinhamento in apadrinhamento_list]
+        response_list = serialize_fields(apadrinhamento_list, ApadrinhamentoSchema, fields, many=True)
         return {"status": 200, "data": response_list}
 
     except Exception as e:
@@ -59,6 +69,7 @@ def create_apadrinhamento_service(apadrinhamento_data: dict):
 
         db.session.add(new_apadrinhamento)
         db.session.commit()
+        publish_change(new_apadrinhamento, CRIADO)
 
         return {"status": 201, "data": new_apadrinhamento.serialize}
 
@@ -76,12 +87,16 @@ def create_apadrinhamento_service(apadrinhamento_data: dict):
         }
 
 
-def get_apadrinhamento_service(apadrinhamento_id: int):
+def get_apadrinhamento_service(apadrinhamento_id: int, fields=None):
     """
     Retorna um apadrinhamento específico do banco de dados.
     """
     try:
-        apadrinhamento = ApadrinhamentoModel.query.get(apadrinhamento_id)
+        error = validate_fields(ApadrinhamentoModel, ApadrinhamentoSchema, fields)
+        if error:
+            return error
+
+        apadrinhamento = query_fields(ApadrinhamentoModel, fields).get(apadrinhamento_id)
 
         if not apadrinhamento:
             return {
@@ -89,7 +104,7 @@ def get_apadrinhamento_service(apadrinhamento_id: int):
                 "message": "Apadrinhamento não encontrado no banco de dados.",
             }
 
-        return {"status": 200, "data": apadrinhamento.serialize}
+        return {"status": 200, "data": serialize_fields(apadrinhamento, ApadrinhamentoSchema, fields)}
 
     except Exception as e:
         error_message = f"Erro ao consultar o apadrinhamento: {str(e)}"
@@ -102,7 +117,7 @@ def get_apadrinhamento_service(apadrinhamento_id: int):
         }
 
 
-def update_apadrinhamento_service(apadrinhamento_id: int, apadrinhamento_data: dict):
+def update_apadrinhamento_service(apadrinhamento_id: int, apadrinhamento_data: dict, if_match=None):
     """
     Atualiza um apadrinhamento específico no banco de dados.
     """
@@ -115,18 +130,26 @@ def update_apadrinhamento_service(apadrinhamento_id: int, apadrinhamento_data: d
                 "message": "Apadrinhamento não encontrado no banco de dados.",
             }
 
+        if not version_matches(apadrinhamento_to_update, if_match):
+            return precondition_failed()
+
         apadrinhamento_to_update.animal_id = apadrinhamento_data["animal_id"]
         apadrinhamento_to_update.nome_apadrinhador = apadrinhamento_data["nome_apadrinhador"]
         apadrinhamento_to_update.valor = apadrinhamento_data["valor"]
         apadrinhamento_to_update.regularidade = apadrinhamento_data["regularidade"]
 
         db.session.commit()
+        publish_change(apadrinhamento_to_update, ATUALIZADO)
 
         return {"status": 200, "data": apadrinhamento_to_update.serialize}
 
     except ValidationError as e:
         return {"status": 400, "message": str(e)}
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
+
     except Exception as e:
         error_message = f"Erro ao atualizar o apadrinhamento: {str(e)}"
         traceback_message = traceback.format_exc()
@@ -138,7 +161,7 @@ def update_apadrinhamento_service(apadrinhamento_id: int, apadrinhamento_data: d
         }
 
 
-def delete_apadrinhamento_service(apadrinhamento_id: int):
+def delete_apadrinhamento_service(apadrinhamento_id: int, if_match=None):
     """
     Deleta um apadrinhamento específico do banco de dados.
     """
@@ -151,11 +174,19 @@ def delete_apadrinhamento_service(apadrinhamento_id: int):
                 "message": "Apadrinhamento não encontrado no banco de dados.",
             }
 
-        db.session.delete(apadrinhamento_to_delete)
+        if not version_matches(apadrinhamento_to_delete, if_match):
+            return precondition_failed()
+
+        soft_delete(apadrinhamento_to_delete)
         db.session.commit()
+        publish_change(apadrinhamento_to_delete, REMOVIDO)
 
         return {"status": 204, "message": "Apadrinhamento deletado com sucesso."}
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
+
     except Exception as e:
         error_message = f"Erro ao deletar o apadrinhamento: {str(e)}"
         traceback_message = traceback.format_exc()
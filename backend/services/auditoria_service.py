@@ -0,0 +1,140 @@
+import logging
+import traceback
+from datetime import date, datetime, timezone
+
+from flask import current_app
+from sqlalchemy import text
+
+from backend.db import db
+from backend.external.model import AuditoriaModel
+from backend.utils.auditoria import get_sink
+
+# Create logger for this module
+logger = logging.getLogger(__name__)
+
+
+def _data_hora(valor: str) -> datetime:
+    data_hora = datetime.fromisoformat(valor)
+    if data_hora.tzinfo is not None:
+        data_hora = data_hora.astimezone(timezone.utc).replace(tzinfo=None)
+    return data_hora
+
+
+def parse_cursor(cursor):
+    """
+    Converte o cursor "<criado_em>|<auditoria_id>" em tupla. Lança ValueError se for inválido.
+    """
+    criado_em, separador, auditoria_id = cursor.partition("|")
+    if not separador or not auditoria_id:
+        raise ValueError(cursor)
+
+    return _data_hora(criado_em), auditoria_id
+
+
+def get_auditoria_service(tabela=None, registro_id=None, usuario=None, de=None, ate=None, cursor=None, limit=None):
+    """
+    Retorna as entradas da trilha de auditoria, das mais recentes para as mais antigas,
+    filtradas por tabela, registro, usuário e período (`de` inclusivo, `ate` exclusivo).
+    """
+    try:
+        limite_maximo = current_app.config["AUDITORIA_LIMITE_MAXIMO"]
+        limit = current_app.config["AUDITORIA_LIMITE_PADRAO"] if limit is None else limit
+
+        if not 1 <= limit <= limite_maximo:
+            return {"status": 400, "message": f"`limit` deve estar entre 1 e {limite_maximo}."}
+
+        try:
+            filtros = {
+                "tabela": tabela,
+                "registro_id": registro_id,
+                "usuario": usuario,
+                "de": _data_hora(de) if de else None,
+                "ate": _data_hora(ate) if ate else None,
+            }
+            cursor = parse_cursor(cursor) if cursor else None
+        except ValueError:
+            return {
+                "status": 400,
+                "message": "Parâmetros inválidos. Use datas ISO 8601 em `de`/`ate` e o `next_cursor` da página anterior.",
+            }
+
+        # Uma entrada a mais indica se há próxima página
+        entradas = get_sink().query(filtros, cursor, limit + 1)
+        pagina = entradas[:limit]
+
+        return {
+            "status": 200,
+            "data": {
+                "items": pagina,
+                "next_cursor": f"{pagina[-1]['criado_em']}|{pagina[-1]['auditoria_id']}" if pagina else None,
+                "has_more": len(entradas) > limit,
+            },
+        }
+
+    except Exception as e:
+        # Se ocorrer qualquer erro, retorna um dicionário com o erro e o traceback
+        error_message = f"Erro ao consultar a auditoria: {str(e)}"
+        traceback_message = traceback.format_exc()
+        logger.error(error_message)
+        return {"status": 500, "message": error_message, "traceback": traceback_message}
+
+
+def _inicio_do_mes(dia: date, meses: int = 0) -> date:
+    indice = dia.year * 12 + dia.month - 1 + meses
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def criar_particoes(meses: int = 3) -> list:
+    """
+    Cria, no PostgreSQL, as partições mensais da tab_auditoria do mês atual e dos
+    próximos `meses` meses que ainda não existem. Retorna os nomes das partições.
+    Em outros bancos a tabela não é particionada e nada é feito.
+
+    Entradas de um mês sem partição ficam na partição padrão, e o PostgreSQL recusa criar
+    a partição do mês enquanto elas estiverem lá. Nesse caso a partição padrão é desanexada,
+    recriada vazia depois das novas partições e tem as entradas reinseridas na tab_auditoria,
+    tudo na mesma transação (as escritas na auditoria esperam até o commit).
+    """
+    if db.engine.dialect.name != "postgresql":
+        return []
+
+    hoje = date.today()
+    tabela = AuditoriaModel.__tablename__
+    padrao = f"{tabela}_padrao"
+    particoes, novas = [], []
+
+    for mes in range(meses + 1):
+        inicio, fim = _inicio_do_mes(hoje, mes), _inicio_do_mes(hoje, mes + 1)
+        particao = f"{tabela}_p{inicio:%Y%m}"
+        particoes.append(particao)
+
+        if db.session.execute(text("SELECT to_regclass(:particao)"), {"particao": particao}).scalar() is None:
+            novas.append((particao, inicio, fim))
+
+    ocupada = any(
+        db.session.execute(
+            text(f"SELECT EXISTS (SELECT 1 FROM {padrao} WHERE criado_em >= :inicio AND criado_em < :fim)"),
+            {"inicio": inicio, "fim": fim},
+        ).scalar()
+        for _, inicio, fim in novas
+    )
+
+    if ocupada:
+        # A partição padrão recusa DELETE (só inserção), então é trocada por uma vazia
+        logger.info(f"Movendo as entradas de {padrao} para as novas partições da {tabela}.")
+        db.session.execute(text(f"ALTER TABLE {tabela} DETACH PARTITION {padrao}"))
+        db.session.execute(text(f"CREATE TEMPORARY TABLE auditoria_mover ON COMMIT DROP AS SELECT * FROM {padrao}"))
+        db.session.execute(text(f"DROP TABLE {padrao}"))
+
+    for particao, inicio, fim in novas:
+        db.session.execute(text(
+            f"CREATE TABLE {particao} PARTITION OF {tabela} "
+            f"FOR VALUES FROM ('{inicio.isoformat()}') TO ('{fim.isoformat()}')"
+        ))
+
+    if ocupada:
+        db.session.execute(text(f"CREATE TABLE {padrao} PARTITION OF {tabela} DEFAULT"))
+        db.session.execute(text(f"INSERT INTO {tabela} SELECT * FROM auditoria_mover"))
+
+    db.session.commit()
+    return particoes
@@ -1,27 +1,38 @@
 import logging
 import traceback
 from marshmallow import ValidationError
+from sqlalchemy.orm.exc import StaleDataError
 
 from backend.external.schemas import CampanhaSchema
 from backend.db import db
 from backend.external.model import CampanhaModel
+from backend.utils.events import ATUALIZADO, CRIADO, REMOVIDO, publish_change
+from backend.utils.soft_delete import soft_delete
+from backend.utils.concurrency import precondition_failed, version_matches
+from backend.utils.geo import aplicar_localizacao
+from backend.utils.projection import query_fields, serialize_fields, validate_fields
 
 logger = logging.getLogger(__name__)
 
-def get_all_campanhas():
+def get_all_campanhas(fields=None):
     """
     Retorna todas as campanhas do banco de dados.
     """
-    campanha_list = CampanhaModel.query.all()
+    campanha_list = query_fields(CampanhaModel, fields).all()
     return campanha_list
 
 
-def list_campanhas_service():
+def list_campanhas_service(fields=None):
     """
     Retorna a lista de todas as campanhas armazenadas no banco de dados.
     """
     try:
-        campanha_list = get_all_campanhas()
+        # Valida os campos pedidos em ?fields=
+        error = validate_fields(CampanhaModel, CampanhaSchema, fields)
+        if error:
+            return error
+
+        campanha_list = get_all_campanhas(fields)
 
         if not campanha_list:
             return {
@@ -29,7 +40,7 @@ def list_campanhas_service():
                 "message": "Nenhuma campanha encontrada no banco de dados.",
             }
 
-        response_list = [campanha.serialize for campanha in campanha_list]
+        response_list = serialize_fields(campanha_list, CampanhaSchema, fields, many=True)
 
         return {"status": 200, "data": response_list}
 
@@ -53,8 +64,11 @@ def create_campanha_service(campanha: CampanhaSchema):
             local=campanha["local"],
         )
 
+        aplicar_localizacao(new_campanha, campanha, campanha["local"])
+
         db.session.add(new_campanha)
         db.session.commit()
+        publish_change(new_campanha, CRIADO)
 
         return {"status": 201, "data": new_campanha.serialize}
 
@@ -67,16 +81,20 @@ def create_campanha_service(campanha: CampanhaSchema):
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
-def get_campanha_service(campanha_id: int):
+def get_campanha_service(campanha_id: int, fields=None):
     """
     Retorna uma campanha específica do banco de dados.
     """
     try:
-        campanha = CampanhaModel.query.get(campanha_id)
+        error = validate_fields(CampanhaModel, CampanhaSchema, fields)
+        if error:
+            return error
+
+        campanha = query_fields(CampanhaModel, fields).get(campanha_id)
         if not campanha:
             return {"status": 404, "message": "Campanha não encontrada no banco de dados."}
 
-        return {"status": 200, "data": campanha.serialize}
+        return {"status": 200, "data": serialize_fields(campanha, CampanhaSchema, fields)}
 
     except Exception as e:
         error_message = f"Erro ao consultar a campanha: {str(e)}"
@@ -84,7 +102,7 @@ def get_campanha_service(campanha_id: int):
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
-def update_campanha_service(campanha_id: int, data: CampanhaSchema):
+def update_campanha_service(campanha_id: int, data: CampanhaSchema, if_match=None):
     """
     Atualiza uma campanha específica no banco de dados.
     """
@@ -93,6 +111,13 @@ def update_campanha_service(campanha_id: int, data: CampanhaSchema):
         if not campanha_to_update:
             return {"status": 404, "message": "Campanha não encontrada no banco de dados."}
 
+        if not version_matches(campanha_to_update, if_match):
+            return precondition_failed()
+
+        # Coordenada enviada ou, se o endereço mudou, geocodificada de novo
+        endereco_alterado = campanha_to_update.local != data["local"]
+        aplicar_localizacao(campanha_to_update, data, data["local"], endereco_alterado)
+
         campanha_to_update.nome = data["nome"]
         campanha_to_update.tipo = data["tipo"]
         campanha_to_update.data_inicio = data["data_inicio"]
@@ -101,19 +126,24 @@ def update_campanha_service(campanha_id: int, data: CampanhaSchema):
         campanha_to_update.local = data["local"]
 
         db.session.commit()
+        publish_change(campanha_to_update, ATUALIZADO)
 
         return {"status": 200, "data": campanha_to_update.serialize}
 
     except ValidationError as e:
         return {"status": 400, "message": str(e)}
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
+
     except Exception as e:
         error_message = f"Erro ao atualizar a campanha: {str(e)}"
         traceback_message = traceback.format_exc()
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
-def delete_campanha_service(campanha_id: int):
+def delete_campanha_service(campanha_id: int, if_match=None):
     """
     Deleta uma campanha específica do banco de dados.
     """
@@ -122,11 +152,19 @@ def delete_campanha_service(campanha_id: int):
         if not campanha_to_delete:
             return {"status": 404, "message": "Campanha não encontrada no banco de dados."}
 
-        db.session.delete(campanha_to_delete)
+        if not version_matches(campanha_to_delete, if_match):
+            return precondition_failed()
+
+        soft_delete(campanha_to_delete)
         db.session.commit()
+        publish_change(campanha_to_delete, REMOVIDO)
 
         return {"status": 204, "message": "Campanha deletada com sucesso."}
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
+
     except Exception as e:
         error_message = f"Erro ao deletar a campanha: {str(e)}"
         traceback_message = traceback.format_exc()
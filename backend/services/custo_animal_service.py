@@ -0,0 +1,92 @@
+import logging
+import traceback
+from collections import defaultdict
+
+from backend.db import db
+from backend.external.model import AnimalModel, CustoAnimalModel, DespesaModel, ProcedimentoModel
+from backend.utils.counters import upsert_increment
+from backend.utils.utils import parse_valor_centavos
+
+# Create logger for this module
+logger = logging.getLogger(__name__)
+
+
+def upsert_custo_animal(animal_id: int, despesas: int = 0, procedimentos: int = 0):
+    """
+    Soma (ou subtrai) os valores em centavos ao resumo de custos do animal.
+    Deve ser chamada dentro da mesma transação da escrita que originou a variação;
+    o commit fica a cargo do serviço chamador.
+    """
+    upsert_increment(
+        CustoAnimalModel.__table__,
+        "animal_id",
+        animal_id,
+        {
+            "total_despesas": despesas,
+            "total_procedimentos": procedimentos,
+            "total": despesas + procedimentos,
+        },
+    )
+
+
+def get_custo_animal_service(animal_id: int):
+    """
+    Retorna o resumo de custos de um animal.
+    """
+    try:
+        # Só o id: a foto do animal não precisa ser carregada
+        if not db.session.query(AnimalModel.animal_id).filter_by(animal_id=animal_id).first():
+            logger.error("Animal não encontrado no banco de dados.")
+            return {"status": 404, "message": "Animal não encontrado no banco de dados."}
+
+        custo = CustoAnimalModel.query.get(animal_id)
+
+        # Animal sem despesas nem procedimentos tem custo zero
+        if not custo:
+            custo = CustoAnimalModel(animal_id=animal_id)
+
+        return {"status": 200, "data": custo.serialize}
+
+    except Exception as e:
+        error_message = f"Erro ao consultar os custos do animal: {str(e)}"
+        traceback_message = traceback.format_exc()
+        logger.error(error_message)
+        return {"status": 500, "message": error_message, "traceback": traceback_message}
+
+
+def rebuild_custos_animais():
+    """
+    Recalcula a tabela de custos por animal a partir de todas as despesas e procedimentos.
+    Retorna a quantidade de animais com custo registrado.
+    """
+    despesas = defaultdict(int)
+    procedimentos = defaultdict(int)
+
+    for animal_id, valor in db.session.query(DespesaModel.animal_id, DespesaModel.valor).yield_per(1000):
+        try:
+            despesas[animal_id] += parse_valor_centavos(valor)
+        except ValueError:
+            logger.warning(f"Valor de despesa inválido ignorado para o animal {animal_id}: {valor!r}")
+
+    for animal_id, valor in db.session.query(ProcedimentoModel.animal_id, ProcedimentoModel.valor).yield_per(1000):
+        try:
+            procedimentos[animal_id] += parse_valor_centavos(valor)
+        except ValueError:
+            logger.warning(f"Valor de procedimento inválido ignorado para o animal {animal_id}: {valor!r}")
+
+    rows = [
+        {
+            "animal_id": animal_id,
+            "total_despesas": despesas[animal_id],
+            "total_procedimentos": procedimentos[animal_id],
+            "total": despesas[animal_id] + procedimentos[animal_id],
+        }
+        for animal_id in despesas.keys() | procedimentos.keys()
+    ]
+
+    db.session.execute(CustoAnimalModel.__table__.delete())
+    if rows:
+        db.session.execute(CustoAnimalModel.__table__.insert(), rows)
+    db.session.commit()
+
+    return len(rows)
@@ -0,0 +1,134 @@
+import logging
+import traceback
+import unicodedata
+from datetime import date, timedelta
+
+from flask import current_app
+from sqlalchemy import func
+
+from backend.db import db
+from backend.external.model import AdocaoModel, AnimalModel, TarefaModel
+from backend.utils.cache import CACHES
+
+# Create logger for this module
+logger = logging.getLogger(__name__)
+
+# Dias (a partir de hoje) com a contagem de tarefas
+DIAS_TAREFAS = 7
+
+
+def get_dashboard_cache():
+    """
+    Retorna o cache das contagens do painel, por seção ("animais", "tarefas", "adocoes"),
+    no backend de DASHBOARD_CACHE_BACKEND. Criado no primeiro uso, depois do fork dos
+    workers do Gunicorn.
+    """
+    app = current_app._get_current_object()
+
+    if "dashboard_cache" not in app.extensions:
+        backend = app.config["DASHBOARD_CACHE_BACKEND"]
+
+        if backend not in CACHES:
+            raise ValueError(f"DASHBOARD_CACHE_BACKEND inválido: {backend!r}")
+
+        app.extensions["dashboard_cache"] = CACHES[backend](app.config, "dashboard")
+
+    return app.extensions["dashboard_cache"]
+
+
+def invalidate_dashboard(section: str):
+    """
+    Descarta as contagens em cache de uma seção do painel. Chamada pelos serviços de escrita,
+    depois do commit: uma falha aqui não desfaz a escrita, e a seção expira pelo TTL.
+    """
+    try:
+        get_dashboard_cache().invalidate(section)
+    except Exception as e:
+        logger.warning(f"Erro ao invalidar o cache do painel ({section}): {str(e)}")
+
+
+def _normalizar(texto: str) -> str:
+    # "Disponível", "disponivel" e " DISPONÍVEL " contam como o mesmo status
+    sem_acento = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode()
+    return sem_acento.strip().lower()
+
+
+def contar_animais():
+    """
+    Animais por status e espécie, em um único GROUP BY coberto pelo índice (status, especie).
+    """
+    rows = (
+        db.session.query(AnimalModel.status, AnimalModel.especie, func.count())
+        .group_by(AnimalModel.status, AnimalModel.especie)
+        .all()
+    )
+
+    por_status, por_especie, disponiveis_por_especie = {}, {}, {}
+    for status, especie, quantidade in rows:
+        por_status[status] = por_status.get(status, 0) + quantidade
+        por_especie[especie] = por_especie.get(especie, 0) + quantidade
+
+        if _normalizar(status) == "disponivel":
+            disponiveis_por_especie[especie] = disponiveis_por_especie.get(especie, 0) + quantidade
+
+    return {
+        "total": sum(por_status.values()),
+        "por_status": por_status,
+        "por_especie": por_especie,
+        "disponiveis_por_especie": disponiveis_por_especie,
+    }
+
+
+def contar_tarefas(hoje: date):
+    """
+    Tarefas de hoje e dos próximos dias. data_tarefa é texto ("AAAA-MM-DD" ou "DD/MM/AAAA"),
+    então a consulta busca as duas grafias de cada dia pelo índice de data_tarefa.
+    """
+    dias = {}
+    for i in range(DIAS_TAREFAS):
+        dia = hoje + timedelta(days=i)
+        dias[dia.isoformat()] = dia
+        dias[dia.strftime("%d/%m/%Y")] = dia
+
+    rows = (
+        db.session.query(TarefaModel.data_tarefa, func.count())
+        .filter(TarefaModel.data_tarefa.in_(list(dias)))
+        .group_by(TarefaModel.data_tarefa)
+        .all()
+    )
+
+    por_dia = {dia.isoformat(): 0 for dia in dias.values()}
+    for data_tarefa, quantidade in rows:
+        por_dia[dias[data_tarefa].isoformat()] += quantidade
+
+    return {"hoje": por_dia[hoje.isoformat()], "proximos_dias": por_dia}
+
+
+def contar_adocoes():
+    return {"total": db.session.query(func.count(AdocaoModel.adocao_id)).scalar()}
+
+
+def get_dashboard_service():
+    """
+    Retorna as contagens do painel inicial. Cada seção fica em cache por DASHBOARD_CACHE_TTL
+    segundos e é descartada pelos serviços que alteram animais, tarefas ou adoções.
+    """
+    try:
+        ttl = current_app.config["DASHBOARD_CACHE_TTL"]
+        dashboard_cache = get_dashboard_cache()
+        hoje = date.today()
+
+        data = {
+            "animais": dashboard_cache.get_or_set(("animais",), contar_animais, ttl),
+            "tarefas": dashboard_cache.get_or_set(("tarefas", hoje), lambda: contar_tarefas(hoje), ttl),
+            "adocoes": dashboard_cache.get_or_set(("adocoes",), contar_adocoes, ttl),
+        }
+
+        return {"status": 200, "data": data}
+
+    except Exception as e:
+        # Se ocorrer qualquer erro, retorna um dicionário com o erro e o traceback
+        error_message = f"Erro ao consultar o painel: {str(e)}"
+        traceback_message = traceback.format_exc()
+        logger.error(error_message)
+        return {"status": 500, "message": error_message, "traceback": traceback_message}
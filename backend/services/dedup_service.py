@@ -0,0 +1,150 @@
+import logging
+import traceback
+from itertools import combinations
+
+from flask import current_app
+from sqlalchemy import inspect, or_, select
+
+from backend.db import db
+from backend.external.model import AdotanteModel, HospedeiroModel
+from backend.utils.dedup import normalizar_email, normalizar_nome, normalizar_telefone, similaridade, trigramas
+from backend.utils.jobs import enqueue
+
+# Create logger for this module
+logger = logging.getLogger(__name__)
+
+# Cadastros de pessoas verificados, pelo nome da tabela
+DEDUP_MODELS = {model.__tablename__: model for model in (AdotanteModel, HospedeiroModel)}
+
+
+def dedup_check_service(model, data: dict):
+    """
+    Procura cadastros com o mesmo e-mail ou telefone (depois de normalizados) dos dados
+    enviados, antes de criar um novo. Cada comparação usa o índice da chave normalizada.
+    """
+    try:
+        data = data or {}
+        email = normalizar_email(data.get("email"))
+        telefone = normalizar_telefone(data.get("telefone"))
+
+        if email is None and telefone is None:
+            return {"status": 400, "message": "Informe `email` e/ou `telefone`."}
+
+        filtros = []
+        if email is not None:
+            filtros.append(model.email_normalizado == email)
+        if telefone is not None:
+            filtros.append(model.telefone_normalizado == telefone)
+
+        candidatos = []
+        for registro in model.query.filter(or_(*filtros)).limit(current_app.config["DEDUP_CANDIDATOS_MAXIMO"]):
+            motivos = []
+            if email is not None and registro.email_normalizado == email:
+                motivos.append("email")
+            if telefone is not None and registro.telefone_normalizado == telefone:
+                motivos.append("telefone")
+
+            candidatos.append({**registro.serialize, "motivos": motivos})
+
+        return {"status": 200, "data": {"duplicado": bool(candidatos), "candidatos": candidatos}}
+
+    except Exception as e:
+        # Se ocorrer qualquer erro, retorna um dicionário com o erro e o traceback
+        error_message = f"Erro ao verificar cadastros duplicados: {str(e)}"
+        traceback_message = traceback.format_exc()
+        logger.error(error_message)
+        return {"status": 500, "message": error_message, "traceback": traceback_message}
+
+
+def _blocos(registros: dict) -> dict:
+    """
+    Agrupa os registros por chaves de bloco: e-mail, telefone, parte local do e-mail e
+    primeiro nome + outro nome. Só registros que dividem algum bloco são comparados.
+    """
+    blocos = {}
+    for registro_id, (nome, email, telefone, _) in registros.items():
+        chaves = []
+        if email:
+            chaves += [("email", email), ("email_local", email.partition("@")[0])]
+        if telefone:
+            chaves.append(("telefone", telefone))
+
+        # Primeiro nome com cada um dos outros: "maria souza" e "maria souza lima" dividem um bloco
+        primeiro, *outros = nome.split() or [""]
+        chaves += [("nome", f"{primeiro} {outro}") for outro in outros]
+
+        for chave in chaves:
+            blocos.setdefault(chave, []).append(registro_id)
+
+    return blocos
+
+
+def find_duplicados(model, limiar=None, bloco_maximo=None) -> list:
+    """
+    Encontra pares de cadastros provavelmente duplicados: mesmo e-mail ou telefone
+    normalizado, ou nomes parecidos (similaridade de trigramas >= `limiar`) dentro de um
+    mesmo bloco. Os pares são comparados só dentro dos blocos, não todos contra todos;
+    blocos maiores que `bloco_maximo` (ex.: um sobrenome muito comum) são ignorados.
+    """
+    limiar = current_app.config["DEDUP_SIMILARIDADE_MINIMA"] if limiar is None else limiar
+    bloco_maximo = current_app.config["DEDUP_BLOCO_MAXIMO"] if bloco_maximo is None else bloco_maximo
+    chave = inspect(model).primary_key[0]
+
+    registros = {}
+    consulta = select(chave, model.nome, model.email_normalizado, model.telefone_normalizado)
+    for registro_id, nome, email, telefone in db.session.execute(consulta.execution_options(yield_per=5000)):
+        nome = normalizar_nome(nome)
+        registros[registro_id] = (nome, email, telefone, trigramas(nome))
+
+    pares = {}
+    comparados = set()
+    for (tipo, valor), ids in _blocos(registros).items():
+        if len(ids) > bloco_maximo:
+            logger.info(f"Duplicados: bloco {tipo}={valor!r} de {model.__tablename__} ignorado ({len(ids)} registros).")
+            continue
+
+        for a, b in combinations(ids, 2):
+            par = (min(a, b), max(a, b))
+            if par in comparados:
+                continue
+            comparados.add(par)
+
+            nome_a, email_a, telefone_a, trigramas_a = registros[a]
+            nome_b, email_b, telefone_b, trigramas_b = registros[b]
+
+            motivos = []
+            if email_a and email_a == email_b:
+                motivos.append("email")
+            if telefone_a and telefone_a == telefone_b:
+                motivos.append("telefone")
+
+            nota = similaridade(trigramas_a, trigramas_b)
+            if nota >= limiar:
+                motivos.append("nome")
+
+            if motivos:
+                pares[par] = {"ids": list(par), "similaridade": round(nota, 3), "motivos": motivos}
+
+    # Contato igual primeiro, depois os nomes mais parecidos
+    return sorted(
+        pares.values(),
+        key=lambda par: (len(set(par["motivos"]) - {"nome"}), par["similaridade"]),
+        reverse=True,
+    )
+
+
+def enqueue_duplicados_service(model):
+    """
+    Coloca na fila o job que procura cadastros duplicados na tabela do modelo.
+    """
+    try:
+        job = enqueue("dedup.duplicados", {"tabela": model.__tablename__})
+        db.session.commit()
+        return {"status": 202, "data": job.serialize}
+
+    except Exception as e:
+        # Se ocorrer qualquer erro, retorna um dicionário com o erro e o traceback
+        error_message = f"Erro ao agendar a busca de duplicados: {str(e)}"
+        traceback_message = traceback.format_exc()
+        logger.error(error_message)
+        return {"status": 500, "message": error_message, "traceback": traceback_message}
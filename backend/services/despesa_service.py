@@ -1,27 +1,39 @@
 import logging
 import traceback
 from marshmallow import ValidationError
+from sqlalchemy.orm.exc import StaleDataError
 
 from backend.external.schemas import DespesaSchema
 from backend.db import db
 from backend.external.model import DespesaModel
+from backend.services.custo_animal_service import upsert_custo_animal
+from backend.utils.events import ATUALIZADO, CRIADO, REMOVIDO, publish_change
+from backend.utils.soft_delete import soft_delete
+from backend.utils.concurrency import precondition_failed, version_matches
+from backend.utils.projection import query_fields, serialize_fields, validate_fields
+from backend.utils.counters import valor_em_centavos
 
 logger = logging.getLogger(__name__)
 
 
-def get_all_despesas():
+def get_all_despesas(fields=None):
     # Consulta ao banco de dados para obter todas as despesas
-    despesa_list = DespesaModel.query.all()
+    despesa_list = query_fields(DespesaModel, fields).all()
 
     return despesa_list
 
 
-def list_despesas_service():
+def list_despesas_service(fields=None):
     """
     Retorna a lista de todas as despesas armazenadas no banco de dados.
     """
     try:
-        despesa_list = get_all_despesas()
+        # Valida os campos pedidos em ?fields=
+        error = validate_fields(DespesaModel, DespesaSchema, fields)
+        if error:
+            return error
+
+        despesa_list = get_all_despesas(fields)
 
         if not despesa_list:
             return {
@@ -29,7 +41,7 @@ def list_despesas_service():
                 "message": "Nenhuma despesa encontrada no banco de dados.",
             }
 
-        response_list = [despesa.serialize for despesa in despesa_list]
+        response_list = serialize_fields(despesa_list, DespesaSchema, fields, many=True)
 
         return {"status": 200, "data": response_list}
 
@@ -53,7 +65,9 @@ def create_despesa_service(despesa: DespesaSchema):
         )
 
         db.session.add(new_despesa)
+        upsert_custo_animal(new_despesa.animal_id, despesas=valor_em_centavos(new_despesa.valor))
         db.session.commit()
+        publish_change(new_despesa, CRIADO)
 
         return {"status": 201, "data": new_despesa.serialize}
 
@@ -66,17 +80,21 @@ def create_despesa_service(despesa: DespesaSchema):
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
-def get_despesa_service(despesa_id: int):
+def get_despesa_service(despesa_id: int, fields=None):
     """
     Retorna uma despesa específica do banco de dados.
     """
     try:
-        despesa = DespesaModel.query.get(despesa_id)
+        error = validate_fields(DespesaModel, DespesaSchema, fields)
+        if error:
+            return error
+
+        despesa = query_fields(DespesaModel, fields).get(despesa_id)
 
         if not despesa:
             return {"status": 404, "message": "Despesa não encontrada no banco de dados."}
 
-        return {"status": 200, "data": despesa.serialize}
+        return {"status": 200, "data": serialize_fields(despesa, DespesaSchema, fields)}
 
     except Exception as e:
         error_message = f"Erro ao consultar a despesa: {str(e)}"
@@ -84,7 +102,7 @@ def get_despesa_service(despesa_id: int):
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
-def update_despesa_service(despesa_id: int, despesa: DespesaSchema):
+def update_despesa_service(despesa_id: int, despesa: DespesaSchema, if_match=None):
     """
     Atualiza uma despesa específica no banco de dados.
     """
@@ -94,26 +112,41 @@ def update_despesa_service(despesa_id: int, despesa: DespesaSchema):
         if not despesa_to_update:
             return {"status": 404, "message": "Despesa não encontrada no banco de dados."}
 
+        if not version_matches(despesa_to_update, if_match):
+            return precondition_failed()
+
+        animal_id_antigo = despesa_to_update.animal_id
+        valor_antigo = valor_em_centavos(despesa_to_update.valor, strict=False)
+
         despesa_to_update.valor = despesa["valor"]
         despesa_to_update.data_despesa = despesa["data_despesa"]
         despesa_to_update.tipo = despesa["tipo"]
         despesa_to_update.animal_id = despesa["animal_id"]
         despesa_to_update.comprovante = despesa["comprovante"]
 
+        # Move o valor antigo para fora do resumo de custos e aplica o novo
+        valor_novo = valor_em_centavos(despesa_to_update.valor)
+        upsert_custo_animal(animal_id_antigo, despesas=-valor_antigo)
+        upsert_custo_animal(despesa_to_update.animal_id, despesas=valor_novo)
         db.session.commit()
+        publish_change(despesa_to_update, ATUALIZADO)
 
         return {"status": 200, "data": despesa_to_update.serialize}
 
     except ValidationError as e:
         return {"status": 400, "message": str(e)}
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
+
     except Exception as e:
         error_message = f"Erro ao atualizar a despesa: {str(e)}"
         traceback_message = traceback.format_exc()
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
-def delete_despesa_service(despesa_id: int):
+def delete_despesa_service(despesa_id: int, if_match=None):
     """
     Deleta uma despesa específica do banco de dados.
     """
@@ -123,11 +156,23 @@ def delete_despesa_service(despesa_id: int):
         if not despesa_to_delete:
             return {"status": 404, "message": "Despesa não encontrada no banco de dados."}
 
-        db.session.delete(despesa_to_delete)
+        if not version_matches(despesa_to_delete, if_match):
+            return precondition_failed()
+
+        upsert_custo_animal(
+            despesa_to_delete.animal_id,
+            despesas=-valor_em_centavos(despesa_to_delete.valor, strict=False),
+        )
+        soft_delete(despesa_to_delete)
         db.session.commit()
+        publish_change(despesa_to_delete, REMOVIDO)
 
         return {"status": 204, "message": "Despesa deletada com sucesso."}
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
+
     except Exception as e:
         error_message = f"Erro ao deletar a despesa: {str(e)}"
         traceback_message = traceback.format_exc()
@@ -1,29 +1,41 @@
 import logging
 import traceback
 from marshmallow import ValidationError
+from sqlalchemy.orm.exc import StaleDataError
 
 from backend.external.schemas import DoacaoSchema
 from backend.db import db
 from backend.external.model import DoacaoModel
+from backend.services.progresso_campanha_service import upsert_progresso_campanha
+from backend.utils.events import ATUALIZADO, CRIADO, REMOVIDO, publish_change
+from backend.utils.soft_delete import soft_delete
+from backend.utils.concurrency import precondition_failed, version_matches
+from backend.utils.projection import query_fields, serialize_fields, validate_fields
+from backend.utils.counters import valor_em_centavos
 
 # Create logger for this module
 logger = logging.getLogger(__name__)
 
 
-def get_all_doacoes():
+def get_all_doacoes(fields=None):
     # Consulta ao banco de dados para obter todas as doações
-    doacao_list = DoacaoModel.query.all()
+    doacao_list = query_fields(DoacaoModel, fields).all()
 
     return doacao_list
 
 
-def list_doacoes_service():
+def list_doacoes_service(fields=None):
     """
     Retorna a lista de todas as doações armazenadas no banco de dados.
     """
     try:
+        # Valida os campos pedidos em ?fields=
+        error = validate_fields(DoacaoModel, DoacaoSchema, fields)
+        if error:
+            return error
+
         # Consulta ao banco de dados para obter todas as doações
-        doacao_list = get_all_doacoes()
+        doacao_list = get_all_doacoes(fields)
 
         # Verifica se a lista está vazia
         if not doacao_list:
@@ -33,7 +45,7 @@ def list_doacoes_service():
             }
 
         # Serializa as doações
-        response_list = [doacao.serialize for doacao in doacao_list]
+        response_list = serialize_fields(doacao_list, DoacaoSchema, fields, many=True)
 
         # Retorna os dados serializados e o status de sucesso
         return {"status": 200, "data": response_list}
@@ -62,7 +74,9 @@ def create_doacao_service(doacao: DoacaoSchema):
 
         # Adiciona a nova doação ao banco de dados
         db.session.add(new_doacao)
+        upsert_progresso_campanha(new_doacao.companha_id, valor_em_centavos(new_doacao.valor), 1)
         db.session.commit()
+        publish_change(new_doacao, CRIADO)
 
         # Retorna a doação criada com sucesso
         return {"status": 201, "data": new_doacao.serialize}
@@ -78,20 +92,24 @@ def create_doacao_service(doacao: DoacaoSchema):
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
-def get_doacao_service(doacao_id: int):
+def get_doacao_service(doacao_id: int, fields=None):
     """
     Retorna uma doação específica do banco de dados.
     """
     try:
+        error = validate_fields(DoacaoModel, DoacaoSchema, fields)
+        if error:
+            return error
+
         # Consulta ao banco de dados para obter a doação com o ID fornecido
-        doacao = DoacaoModel.query.get(doacao_id)
+        doacao = query_fields(DoacaoModel, fields).get(doacao_id)
 
         # Verifica se a doação existe
         if not doacao:
             return {"status": 404, "message": "Doação não encontrada no banco de dados."}
 
         # Retorna a doação encontrada e o status de sucesso
-        return {"status": 200, "data": doacao.serialize}
+        return {"status": 200, "data": serialize_fields(doacao, DoacaoSchema, fields)}
 
     except Exception as e:
         # Se ocorrer qualquer erro, retorna uma mensagem de erro com o traceback
@@ -100,7 +118,7 @@ def get_doacao_service(doacao_id: int):
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
-def update_doacao_service(doacao_id: int, doacao: DoacaoSchema):
+def update_doacao_service(doacao_id: int, doacao: DoacaoSchema, if_match=None):
     """
     Atualiza uma doação específica no banco de dados.
     """
@@ -112,6 +130,12 @@ def update_doacao_service(doacao_id: int, doacao: DoacaoSchema):
         if not doacao_to_update:
             return {"status": 404, "message": "Doação não encontrada no banco de dados."}
 
+        if not version_matches(doacao_to_update, if_match):
+            return precondition_failed()
+
+        campanha_id_antiga = doacao_to_update.companha_id
+        valor_antigo = valor_em_centavos(doacao_to_update.valor, strict=False)
+
         # Atualiza os dados da doação
         doacao_to_update.doador = doacao["doador"]
         doacao_to_update.valor = doacao["valor"]
@@ -120,8 +144,14 @@ def update_doacao_service(doacao_id: int, doacao: DoacaoSchema):
         doacao_to_update.companha_id = doacao["companha_id"]
         doacao_to_update.comprovante = doacao["comprovante"]
 
+        # Move a doação entre os contadores das campanhas (ou só ajusta o valor)
+        valor_novo = valor_em_centavos(doacao_to_update.valor)
+        upsert_progresso_campanha(campanha_id_antiga, -valor_antigo, -1)
+        upsert_progresso_campanha(doacao_to_update.companha_id, valor_novo, 1)
+
         # Salva as alterações no banco de dados
         db.session.commit()
+        publish_change(doacao_to_update, ATUALIZADO)
 
         # Retorna a doação atualizada e o status de sucesso
         return {"status": 200, "data": doacao_to_update.serialize}
@@ -130,6 +160,10 @@ def update_doacao_service(doacao_id: int, doacao: DoacaoSchema):
         # Se ocorrer um erro de validação, retorna uma mensagem de erro
         return {"status": 400, "message": str(e)}
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
+
     except Exception as e:
         # Se ocorrer qualquer outro erro, retorna uma mensagem de erro com o traceback
         error_message = f"Erro ao atualizar a doação: {str(e)}"
@@ -137,7 +171,7 @@ def update_doacao_service(doacao_id: int, doacao: DoacaoSchema):
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
-def delete_doacao_service(doacao_id: int):
+def delete_doacao_service(doacao_id: int, if_match=None):
     """
     Deleta uma doação específica do banco de dados.
     """
@@ -149,13 +183,26 @@ def delete_doacao_service(doacao_id: int):
         if not doacao_to_delete:
             return {"status": 404, "message": "Doação não encontrada no banco de dados."}
 
-        # Deleta a doação do banco de dados
-        db.session.delete(doacao_to_delete)
+        if not version_matches(doacao_to_delete, if_match):
+            return precondition_failed()
+
+        # Deleta a doação do banco de dados e a retira dos contadores da campanha
+        upsert_progresso_campanha(
+            doacao_to_delete.companha_id,
+            -valor_em_centavos(doacao_to_delete.valor, strict=False),
+            -1,
+        )
+        soft_delete(doacao_to_delete)
         db.session.commit()
+        publish_change(doacao_to_delete, REMOVIDO)
 
         # Retorna o status de sucesso
         return {"status": 204, "message": "Doação deletada com sucesso."}
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
+
     except Exception as e:
         # Se ocorrer qualquer erro, retorna uma mensagem de erro com o traceback
         error_message = f"Erro ao deletar a doação: {str(e)}"
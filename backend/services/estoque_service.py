@@ -1,26 +1,54 @@
 import logging
 import traceback
+
 from marshmallow import ValidationError
+from sqlalchemy import String, cast, update
+from sqlalchemy.orm.exc import StaleDataError
 
-from backend.external.schemas import EstoqueSchema
+from backend.external.schemas import EstoqueSchema, MovimentoEstoqueSchema
 from backend.db import db
-from backend.external.model import EstoqueModel
+from backend.external.model import EstoqueModel, MovimentoEstoqueModel
+from backend.utils.auditoria import auditar_em_massa
+from backend.utils.events import ATUALIZADO, CRIADO, REMOVIDO, publish_change, publish_event
+from backend.utils.soft_delete import soft_delete
+from backend.utils.concurrency import precondition_failed, version_matches
+from backend.utils.projection import query_fields, serialize_fields, validate_fields
+from backend.utils.utils import agora_utc
 
 # Create logger for this module
 logger = logging.getLogger(__name__)
 
-def get_all_estoque():
+def get_all_estoque(fields=None):
     # Consulta ao banco de dados para obter todos os itens de estoque
-    estoque_list = EstoqueModel.query.all()
+    estoque_list = query_fields(EstoqueModel, fields).all()
     return estoque_list
 
-def list_estoque_service():
+def parse_quantidade(quantidade) -> int:
+    """
+    Converte a quantidade recebida pela API (string) para o saldo inteiro do item.
+    """
+    try:
+        saldo = int(str(quantidade).strip())
+    except ValueError:
+        raise ValidationError("A quantidade deve ser um número inteiro.", "quantidade")
+
+    if saldo < 0:
+        raise ValidationError("A quantidade não pode ser negativa.", "quantidade")
+
+    return saldo
+
+def list_estoque_service(fields=None):
     """
     Retorna a lista de todos os itens no estoque.
     """
     try:
+        # Valida os campos pedidos em ?fields=
+        error = validate_fields(EstoqueModel, EstoqueSchema, fields)
+        if error:
+            return error
+
         # Consulta ao banco de dados para obter todos os itens
-        estoque_list = get_all_estoque()
+        estoque_list = get_all_estoque(fields)
 
         # Verifica se a lista está vazia
         if not estoque_list:
@@ -30,7 +58,7 @@ def list_estoque_service():
             }
 
         # Serializa os itens
-        response_list = [estoque.serialize for estoque in estoque_list]
+        response_list = serialize_fields(estoque_list, EstoqueSchema, fields, many=True)
 
         # Retorna os dados serializados e o status de sucesso
         return {"status": 200, "data": response_list}
@@ -45,17 +73,21 @@ def create_estoque_service(estoque_data: EstoqueSchema):
     Cria um novo item no estoque.
     """
     try:
+        saldo = parse_quantidade(estoque_data["quantidade"])
+
         new_estoque = EstoqueModel(
             categoria=estoque_data["categoria"],
             tipo_item=estoque_data["tipo_item"],
             descricao=estoque_data["descricao"],
             especie_animal=estoque_data["especie_animal"],
-            quantidade=estoque_data["quantidade"],
+            quantidade=str(saldo),
         )
+        new_estoque.saldo = saldo
 
         # Adiciona ao banco de dados
         db.session.add(new_estoque)
         db.session.commit()
+        publish_change(new_estoque, CRIADO)
 
         return {"status": 201, "data": new_estoque.serialize}
 
@@ -67,24 +99,28 @@ def create_estoque_service(estoque_data: EstoqueSchema):
         traceback_message = traceback.format_exc()
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
-def get_estoque_service(estoque_id: int):
+def get_estoque_service(estoque_id: int, fields=None):
     """
     Retorna um item específico do estoque.
     """
     try:
-        estoque = EstoqueModel.query.get(estoque_id)
+        error = validate_fields(EstoqueModel, EstoqueSchema, fields)
+        if error:
+            return error
+
+        estoque = query_fields(EstoqueModel, fields).get(estoque_id)
 
         if not estoque:
             return {"status": 404, "message": "Item não encontrado no estoque."}
 
-        return {"status": 200, "data": estoque.serialize}
+        return {"status": 200, "data": serialize_fields(estoque, EstoqueSchema, fields)}
 
     except Exception as e:
         error_message = f"Erro ao consultar o item no estoque: {str(e)}"
         traceback_message = traceback.format_exc()
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
-def update_estoque_service(estoque_id: int, estoque_data: EstoqueSchema):
+def update_estoque_service(estoque_id: int, estoque_data: EstoqueSchema, if_match=None):
     """
     Atualiza um item específico do estoque.
     """
@@ -94,25 +130,47 @@ def update_estoque_service(estoque_id: int, estoque_data: EstoqueSchema):
         if not estoque_to_update:
             return {"status": 404, "message": "Item não encontrado no estoque."}
 
+        if not version_matches(estoque_to_update, if_match):
+            return precondition_failed()
+
+        saldo = parse_quantidade(estoque_data["quantidade"])
+
         estoque_to_update.categoria = estoque_data["categoria"]
         estoque_to_update.tipo_item = estoque_data["tipo_item"]
         estoque_to_update.descricao = estoque_data["descricao"]
         estoque_to_update.especie_animal = estoque_data["especie_animal"]
-        estoque_to_update.quantidade = estoque_data["quantidade"]
+
+        # Alterações de quantidade pelo PUT ficam registradas como ajuste no histórico
+        if saldo != estoque_to_update.saldo:
+            db.session.add(MovimentoEstoqueModel(
+                estoque_id=estoque_id,
+                tipo="ajuste",
+                quantidade=saldo - estoque_to_update.saldo,
+                saldo_apos=saldo,
+                observacao="Ajuste manual de quantidade",
+                data_movimento=agora_utc(),
+            ))
+            estoque_to_update.saldo = saldo
+            estoque_to_update.quantidade = str(saldo)
 
         db.session.commit()
+        publish_change(estoque_to_update, ATUALIZADO)
 
         return {"status": 200, "data": estoque_to_update.serialize}
 
     except ValidationError as e:
         return {"status": 400, "message": str(e)}
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
+
     except Exception as e:
         error_message = f"Erro ao atualizar o item no estoque: {str(e)}"
         traceback_message = traceback.format_exc()
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
-def delete_estoque_service(estoque_id: int):
+def delete_estoque_service(estoque_id: int, if_match=None):
     """
     Deleta um item específico do estoque.
     """
@@ -122,12 +180,146 @@ def delete_estoque_service(estoque_id: int):
         if not estoque_to_delete:
             return {"status": 404, "message": "Item não encontrado no estoque."}
 
-        db.session.delete(estoque_to_delete)
+        if not version_matches(estoque_to_delete, if_match):
+            return precondition_failed()
+
+        # O histórico de movimentações vai para a lixeira junto com o item
+        soft_delete(estoque_to_delete)
+        movimentos = db.session.execute(
+            update(MovimentoEstoqueModel)
+            .where(MovimentoEstoqueModel.estoque_id == estoque_id)
+            .values(deleted_at=estoque_to_delete.deleted_at)
+            .returning(MovimentoEstoqueModel.movimento_id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+
+        # UPDATE em massa não passa pelo after_flush da auditoria
+        auditar_em_massa(
+            db.session,
+            MovimentoEstoqueModel,
+            {movimento_id: {"deleted_at": [None, estoque_to_delete.deleted_at]} for movimento_id in movimentos},
+            operacao=REMOVIDO,
+        )
         db.session.commit()
+        publish_change(estoque_to_delete, REMOVIDO)
 
         return {"status": 204, "message": "Item deletado com sucesso."}
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
+
     except Exception as e:
         error_message = f"Erro ao deletar o item no estoque: {str(e)}"
         traceback_message = traceback.format_exc()
         return {"status": 500, "message": error_message, "traceback": traceback_message}
+
+def create_movimento_service(estoque_id: int, movimento_data: MovimentoEstoqueSchema):
+    """
+    Registra uma entrada ou saída no estoque.
+    O saldo é atualizado em um único UPDATE atômico (saldo = saldo + delta),
+    sem ler o item antes, para que movimentações concorrentes não se sobrescrevam.
+    """
+    try:
+        movimento = MovimentoEstoqueSchema().load(movimento_data)
+
+        delta = movimento["quantidade"] if movimento["tipo"] == "entrada" else -movimento["quantidade"]
+
+        stmt = (
+            update(EstoqueModel)
+            .where(EstoqueModel.estoque_id == estoque_id)
+            .where(EstoqueModel.saldo + delta >= 0)
+            .values(
+                saldo=EstoqueModel.saldo + delta,
+                quantidade=cast(EstoqueModel.saldo + delta, String),
+                version=EstoqueModel.version + 1,
+            )
+            .returning(EstoqueModel.saldo, EstoqueModel.version)
+        )
+        estoque = db.session.execute(stmt).one_or_none()
+
+        if estoque is None:
+            db.session.rollback()
+
+            if not EstoqueModel.query.get(estoque_id):
+                return {"status": 404, "message": "Item não encontrado no estoque."}
+
+            return {"status": 409, "message": "Saldo insuficiente para a saída solicitada."}
+
+        # UPDATE atômico não passa pelo after_flush da auditoria
+        auditar_em_massa(
+            db.session,
+            EstoqueModel,
+            {estoque_id: {"saldo": [estoque.saldo - delta, estoque.saldo]}},
+            versoes={estoque_id: estoque.version},
+        )
+
+        new_movimento = MovimentoEstoqueModel(
+            estoque_id=estoque_id,
+            tipo=movimento["tipo"],
+            quantidade=delta,
+            saldo_apos=estoque.saldo,
+            observacao=movimento["observacao"],
+            data_movimento=agora_utc(),
+        )
+
+        db.session.add(new_movimento)
+        db.session.commit()
+        publish_change(new_movimento, CRIADO)
+        publish_event(EstoqueModel.__tablename__, estoque_id, ATUALIZADO, estoque.version)
+
+        return {"status": 201, "data": new_movimento.serialize}
+
+    except ValidationError as e:
+        return {"status": 400, "message": str(e)}
+
+    except Exception as e:
+        db.session.rollback()
+        error_message = f"Erro ao registrar movimentação no estoque: {str(e)}"
+        traceback_message = traceback.format_exc()
+        return {"status": 500, "message": error_message, "traceback": traceback_message}
+
+def list_movimentos_service(estoque_id: int):
+    """
+    Retorna o histórico de movimentações de um item do estoque, da mais recente para a mais antiga.
+    """
+    try:
+        if not EstoqueModel.query.get(estoque_id):
+            return {"status": 404, "message": "Item não encontrado no estoque."}
+
+        movimento_list = (
+            MovimentoEstoqueModel.query
+            .filter(MovimentoEstoqueModel.estoque_id == estoque_id)
+            .order_by(MovimentoEstoqueModel.movimento_id.desc())
+            .all()
+        )
+
+        response_list = [movimento.serialize for movimento in movimento_list]
+
+        return {"status": 200, "data": response_list}
+
+    except Exception as e:
+        error_message = f"Erro ao listar movimentações do estoque: {str(e)}"
+        traceback_message = traceback.format_exc()
+        return {"status": 500, "message": error_message, "traceback": traceback_message}
+
+def list_estoque_baixo_service(limite: int):
+    """
+    Retorna os itens com saldo menor ou igual ao limite, usando o índice de saldo.
+    """
+    try:
+        estoque_list = (
+            EstoqueModel.query
+            .filter(EstoqueModel.saldo <= limite)
+            .order_by(EstoqueModel.saldo)
+            .all()
+        )
+
+        response_list = [estoque.serialize for estoque in estoque_list]
+
+        return {"status": 200, "data": response_list}
+
+    except Exception as e:
+        error_message = f"Erro ao listar itens com estoque baixo: {str(e)}"
+        traceback_message = traceback.format_exc()
+        return {"status": 500, "message": error_message, "traceback": traceback_message}
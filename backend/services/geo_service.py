@@ -0,0 +1,184 @@
+import logging
+import traceback
+
+from flask import current_app
+from marshmallow import ValidationError
+from sqlalchemy import inspect
+
+from backend.db import db
+from backend.external.model import AdotanteModel, CampanhaModel, HospedeiroModel
+from backend.utils.geo import celulas_no_raio, distancia_km, get_geocoder, parse_coordenada, proximo_prefixo
+
+# Create logger for this module
+logger = logging.getLogger(__name__)
+
+# Raio da primeira tentativa da busca dos mais próximos; a cada tentativa o raio é multiplicado
+RAIO_INICIAL_KM = 1.0
+FATOR_RAIO = 4
+
+# Modelos com coordenada e a coluna do endereço de cada um
+GEO_MODELS = [
+    (AdotanteModel, AdotanteModel.moradia),
+    (HospedeiroModel, HospedeiroModel.moradia),
+    (CampanhaModel, CampanhaModel.local),
+]
+
+
+def _intervalos(latitude: float, longitude: float, raio_km: float):
+    """
+    Intervalos [início, fim) de geohash que cobrem o raio: as células em volta do ponto,
+    com as vizinhas consecutivas unidas em um só intervalo. None quando o raio exige
+    ler todos os registros com coordenada.
+    """
+    celulas = celulas_no_raio(latitude, longitude, raio_km)
+    if celulas is None:
+        return None
+
+    intervalos = []
+    for prefixo in celulas:
+        if intervalos and intervalos[-1][1] == prefixo:
+            intervalos[-1][1] = proximo_prefixo(prefixo)
+        else:
+            intervalos.append([prefixo, proximo_prefixo(prefixo)])
+
+    return intervalos
+
+
+def buscar_no_raio(model, latitude: float, longitude: float, raio_km: float) -> list:
+    """
+    Registros a até `raio_km` do ponto, do mais próximo ao mais distante, como pares
+    (distância, registro). O índice do geohash seleciona só as células em volta do
+    ponto; a distância exata é conferida depois.
+    """
+    intervalos = _intervalos(latitude, longitude, raio_km)
+
+    # Uma consulta por intervalo: com OR, os bancos deixam de usar o índice parcial
+    if intervalos is None:
+        consultas = [model.query.filter(model.geohash.is_not(None))]
+    else:
+        consultas = []
+        for inicio, fim in intervalos:
+            consulta = model.query.filter(model.geohash >= inicio)
+            if fim is not None:
+                consulta = consulta.filter(model.geohash < fim)
+            consultas.append(consulta)
+
+    encontrados = []
+    for consulta in consultas:
+        for registro in consulta:
+            distancia = distancia_km(latitude, longitude, registro.latitude, registro.longitude)
+            if distancia <= raio_km:
+                encontrados.append((distancia, registro))
+
+    encontrados.sort(key=lambda encontrado: encontrado[0])
+    return encontrados
+
+
+def _serializar(encontrados: list) -> list:
+    return [{**registro.serialize, "distancia_km": round(distancia, 3)} for distancia, registro in encontrados]
+
+
+def raio_service(model, latitude, longitude, raio_km, limit=None):
+    """
+    Retorna os registros a até `raio_km` do ponto, com a distância, dos mais próximos
+    aos mais distantes.
+    """
+    try:
+        latitude, longitude = parse_coordenada(latitude, longitude)
+        raio_maximo = current_app.config["GEO_RAIO_MAXIMO_KM"]
+        limite_maximo = current_app.config["GEO_LIMITE_MAXIMO"]
+        limit = limite_maximo if limit is None else limit
+
+        if raio_km is None or not 0 < raio_km <= raio_maximo:
+            return {"status": 400, "message": f"`raio_km` deve ser maior que 0 e no máximo {raio_maximo}."}
+        if not 1 <= limit <= limite_maximo:
+            return {"status": 400, "message": f"`limit` deve estar entre 1 e {limite_maximo}."}
+
+        encontrados = buscar_no_raio(model, latitude, longitude, raio_km)
+        return {"status": 200, "data": _serializar(encontrados[:limit])}
+
+    except ValidationError as e:
+        return {"status": 400, "message": str(e)}
+
+    except Exception as e:
+        # Se ocorrer qualquer erro, retorna um dicionário com o erro e o traceback
+        error_message = f"Erro ao buscar registros no raio: {str(e)}"
+        traceback_message = traceback.format_exc()
+        logger.error(error_message)
+        return {"status": 500, "message": error_message, "traceback": traceback_message}
+
+
+def proximos_service(model, latitude, longitude, limit=None, raio_maximo_km=None):
+    """
+    Retorna os `limit` registros mais próximos do ponto, até `raio_maximo_km`. A busca
+    começa em um raio pequeno e aumenta até achar registros suficientes, então
+    pontos com vizinhos perto só leem as células em volta.
+    """
+    try:
+        latitude, longitude = parse_coordenada(latitude, longitude)
+        raio_maximo = current_app.config["GEO_RAIO_MAXIMO_KM"]
+        limite_maximo = current_app.config["GEO_LIMITE_MAXIMO"]
+        limit = current_app.config["GEO_LIMITE_PADRAO"] if limit is None else limit
+        raio_maximo_km = raio_maximo if raio_maximo_km is None else raio_maximo_km
+
+        if not 1 <= limit <= limite_maximo:
+            return {"status": 400, "message": f"`limit` deve estar entre 1 e {limite_maximo}."}
+        if not 0 < raio_maximo_km <= raio_maximo:
+            return {"status": 400, "message": f"`raio_maximo_km` deve ser maior que 0 e no máximo {raio_maximo}."}
+
+        # Todos os registros dentro do raio são encontrados, então os `limit` primeiros são os mais próximos
+        raio = min(RAIO_INICIAL_KM, raio_maximo_km)
+        while True:
+            encontrados = buscar_no_raio(model, latitude, longitude, raio)
+            if len(encontrados) >= limit or raio >= raio_maximo_km:
+                break
+            raio = min(raio * FATOR_RAIO, raio_maximo_km)
+
+        return {"status": 200, "data": _serializar(encontrados[:limit])}
+
+    except ValidationError as e:
+        return {"status": 400, "message": str(e)}
+
+    except Exception as e:
+        # Se ocorrer qualquer erro, retorna um dicionário com o erro e o traceback
+        error_message = f"Erro ao buscar os registros mais próximos: {str(e)}"
+        traceback_message = traceback.format_exc()
+        logger.error(error_message)
+        return {"status": 500, "message": error_message, "traceback": traceback_message}
+
+
+def geocodificar_pendentes(lote: int = 1000) -> dict:
+    """
+    Preenche, com o geocodificador configurado, a coordenada dos registros que ainda não
+    têm (ex.: cadastrados antes da coluna existir). Um commit por lote. Retorna a
+    quantidade geocodificada por tabela.
+    """
+    geocoder = get_geocoder()
+    geocodificados = {}
+
+    for model, endereco in GEO_MODELS:
+        chave = inspect(model).primary_key[0]
+        ultimo, total = None, 0
+
+        while True:
+            query = model.query.filter(model.latitude.is_(None))
+            if ultimo is not None:
+                query = query.filter(chave > ultimo)
+
+            registros = query.order_by(chave).limit(lote).all()
+            if not registros:
+                break
+
+            for registro in registros:
+                coordenada = geocoder.geocode(getattr(registro, endereco.key))
+                if coordenada is not None:
+                    registro.latitude, registro.longitude = coordenada
+                    total += 1
+
+            # Endereços sem local conhecido ficam para trás: a próxima página começa depois deles
+            ultimo = getattr(registros[-1], chave.key)
+            db.session.commit()
+
+        geocodificados[model.__tablename__] = total
+
+    return geocodificados
@@ -1,28 +1,40 @@
 import logging
 import traceback
 from marshmallow import ValidationError
+from sqlalchemy.orm.exc import StaleDataError
 
 from backend.external.schemas import HospedeiroSchema
 from backend.db import db
-from backend.external.model import HospedeiroModel
+from backend.external.model import HospedeiroModel, LarTemporarioModel
+from backend.services.lar_temporario_service import overlapping_filter
+from backend.utils.events import ATUALIZADO, CRIADO, REMOVIDO, publish_change
+from backend.utils.soft_delete import soft_delete
+from backend.utils.concurrency import precondition_failed, version_matches
+from backend.utils.geo import aplicar_localizacao
+from backend.utils.projection import query_fields, serialize_fields, validate_fields
 
 # Crie um logger para este módulo (opcional, caso queira acompanhar logs)
 logger = logging.getLogger(__name__)
 
 
-def get_all_hospedeiros():
+def get_all_hospedeiros(fields=None):
     """
     Consulta ao banco de dados para obter todos os hospedeiros
     """
-    return HospedeiroModel.query.all()
+    return query_fields(HospedeiroModel, fields).all()
 
 
-def list_hospedeiros_service():
+def list_hospedeiros_service(fields=None):
     """
     Retorna a lista de todos os hospedeiros armazenados no banco de dados.
     """
     try:
-        hospedeiro_list = get_all_hospedeiros()
+        # Valida os campos pedidos em ?fields=
+        error = validate_fields(HospedeiroModel, HospedeiroSchema, fields)
+        if error:
+            return error
+
+        hospedeiro_list = get_all_hospedeiros(fields)
 
         if not hospedeiro_list:
             return {
@@ -30,7 +42,7 @@ def list_hospedeiros_service():
                 "message": "Nenhum hospedeiro encontrado no banco de dados.",
             }
 
-        response_list = [hospedeiro.serialize for hospedeiro in hospedeiro_list]
+        response_list = serialize_fields(hospedeiro_list, HospedeiroSchema, fields, many=True)
         return {"status": 200, "data": response_list}
 
     except Exception as e:
@@ -39,6 +51,35 @@ def list_hospedeiros_service():
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
+def list_hospedeiros_disponiveis_service(de, ate):
+    """
+    Retorna os hospedeiros sem hospedagem que se sobreponha ao intervalo [de, ate].
+    O NOT EXISTS é resolvido pelo índice (hospedeiro_id, data_inicio, data_fim) de tab_lar_temporario.
+    """
+    try:
+        if ate < de:
+            return {"status": 400, "message": "A data final não pode ser anterior à inicial."}
+
+        ocupado = (
+            db.session.query(LarTemporarioModel.lar_temporario_id)
+            .filter(
+                LarTemporarioModel.hospedeiro_id == HospedeiroModel.hospedeiro_id,
+                *overlapping_filter(de, ate),
+            )
+            .exists()
+        )
+
+        hospedeiro_list = HospedeiroModel.query.filter(~ocupado).all()
+
+        response_list = [hospedeiro.serialize for hospedeiro in hospedeiro_list]
+        return {"status": 200, "data": response_list}
+
+    except Exception as e:
+        error_message = f"Erro ao listar hospedeiros disponíveis: {str(e)}"
+        traceback_message = traceback.format_exc()
+        return {"status": 500, "message": error_message, "traceback": traceback_message}
+
+
 def create_hospedeiro_service(hospedeiro_data: dict):
     """
     Cria um novo hospedeiro no banco de dados.
@@ -56,8 +97,11 @@ def create_hospedeiro_service(hospedeiro_data: dict):
             moradia=hospedeiro_data["moradia"],
         )
 
+        aplicar_localizacao(new_hospedeiro, hospedeiro_data, hospedeiro_data["moradia"])
+
         db.session.add(new_hospedeiro)
         db.session.commit()
+        publish_change(new_hospedeiro, CRIADO)
 
         return {"status": 201, "data": new_hospedeiro.serialize}
 
@@ -70,12 +114,16 @@ def create_hospedeiro_service(hospedeiro_data: dict):
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
-def get_hospedeiro_service(hospedeiro_id: int):
+def get_hospedeiro_service(hospedeiro_id: int, fields=None):
     """
     Retorna um hospedeiro específico do banco de dados.
     """
     try:
-        hospedeiro = HospedeiroModel.query.get(hospedeiro_id)
+        error = validate_fields(HospedeiroModel, HospedeiroSchema, fields)
+        if error:
+            return error
+
+        hospedeiro = query_fields(HospedeiroModel, fields).get(hospedeiro_id)
 
         if not hospedeiro:
             return {
@@ -83,7 +131,7 @@ def get_hospedeiro_service(hospedeiro_id: int):
                 "message": "Hospedeiro não encontrado no banco de dados.",
             }
 
-        return {"status": 200, "data": hospedeiro.serialize}
+        return {"status": 200, "data": serialize_fields(hospedeiro, HospedeiroSchema, fields)}
 
     except Exception as e:
         error_message = f"Erro ao consultar o hospedeiro: {str(e)}"
@@ -91,7 +139,7 @@ def get_hospedeiro_service(hospedeiro_id: int):
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
-def update_hospedeiro_service(hospedeiro_id: int, hospedeiro_data: dict):
+def update_hospedeiro_service(hospedeiro_id: int, hospedeiro_data: dict, if_match=None):
     """
     Atualiza um hospedeiro específico no banco de dados.
     """
@@ -104,25 +152,37 @@ def update_hospedeiro_service(hospedeiro_id: int, hospedeiro_data: dict):
                 "message": "Hospedeiro não encontrado no banco de dados.",
             }
 
+        if not version_matches(hospedeiro_to_update, if_match):
+            return precondition_failed()
+
+        # Coordenada enviada ou, se o endereço mudou, geocodificada de novo
+        endereco_alterado = hospedeiro_to_update.moradia != hospedeiro_data["moradia"]
+        aplicar_localizacao(hospedeiro_to_update, hospedeiro_data, hospedeiro_data["moradia"], endereco_alterado)
+
         hospedeiro_to_update.nome = hospedeiro_data["nome"]
         hospedeiro_to_update.telefone = hospedeiro_data["telefone"]
         hospedeiro_to_update.email = hospedeiro_data["email"]
         hospedeiro_to_update.moradia = hospedeiro_data["moradia"]
 
         db.session.commit()
+        publish_change(hospedeiro_to_update, ATUALIZADO)
 
         return {"status": 200, "data": hospedeiro_to_update.serialize}
 
     except ValidationError as e:
         return {"status": 400, "message": str(e)}
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
+
     except Exception as e:
         error_message = f"Erro ao atualizar o hospedeiro: {str(e)}"
         traceback_message = traceback.format_exc()
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
-def delete_hospedeiro_service(hospedeiro_id: int):
+def delete_hospedeiro_service(hospedeiro_id: int, if_match=None):
     """
     Deleta um hospedeiro específico do banco de dados.
     """
@@ -135,11 +195,19 @@ def delete_hospedeiro_service(hospedeiro_id: int):
                 "message": "Hospedeiro não encontrado no banco de dados.",
             }
 
-        db.session.delete(hospedeiro_to_delete)
+        if not version_matches(hospedeiro_to_delete, if_match):
+            return precondition_failed()
+
+        soft_delete(hospedeiro_to_delete)
         db.session.commit()
+        publish_change(hospedeiro_to_delete, REMOVIDO)
 
         return {"status": 204, "message": "Hospedeiro deletado com sucesso."}
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
+
     except Exception as e:
         error_message = f"Erro ao deletar o hospedeiro: {str(e)}"
         traceback_message = traceback.format_exc()
@@ -0,0 +1,25 @@
+import logging
+import traceback
+
+from backend.utils.jobs import get_queue
+
+logger = logging.getLogger(__name__)
+
+
+def get_job_service(job_id: str):
+    """
+    Retorna o status de um job em segundo plano.
+    """
+    try:
+        job = get_queue().get(job_id)
+
+        if not job:
+            return {"status": 404, "message": "Job não encontrado."}
+
+        return {"status": 200, "data": job.serialize}
+
+    except Exception as e:
+        error_message = f"Erro ao consultar o job: {str(e)}"
+        traceback_message = traceback.format_exc()
+        logger.error(error_message)
+        return {"status": 500, "message": error_message, "traceback": traceback_message}
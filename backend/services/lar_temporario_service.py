@@ -1,25 +1,107 @@
 import logging
 import traceback
+from datetime import date
+
 from marshmallow import ValidationError
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
 
 from backend.external.schemas import LarTemporarioSchema
 from backend.db import db
 from backend.external.model import LarTemporarioModel
+from backend.utils.events import ATUALIZADO, CRIADO, REMOVIDO, publish_change
+from backend.utils.soft_delete import soft_delete
+from backend.utils.concurrency import precondition_failed, version_matches
+from backend.utils.projection import query_fields, serialize_fields, validate_fields
+from backend.utils.utils import parse_data, violou_restricao
 
 logger = logging.getLogger(__name__)
 
-def get_all_lar_temporarios():
+# Restrição de exclusão (PostgreSQL) que impede hospedagens sobrepostas do mesmo hospedeiro
+RESTRICAO_PERIODO = "ex_tab_lar_temporario_hospedeiro_periodo"
+
+def get_all_lar_temporarios(fields=None):
     """
     Função auxiliar para retornar todos os registros de lar temporário.
     """
-    return LarTemporarioModel.query.all()
+    return query_fields(LarTemporarioModel, fields).all()
+
+def parse_periodo(data: dict):
+    """
+    Lê o período tipado (data_inicio/data_fim) enviado na requisição.
+    """
+    try:
+        data_inicio = parse_data(data["data_inicio"]) if data.get("data_inicio") else None
+        data_fim = parse_data(data["data_fim"]) if data.get("data_fim") else None
+    except ValueError:
+        raise ValidationError("As datas devem estar no formato AAAA-MM-DD ou DD/MM/AAAA.", "data_inicio")
+
+    if data_fim and not data_inicio:
+        raise ValidationError("Informe data_inicio junto com data_fim.", "data_inicio")
+
+    if data_inicio and data_fim and data_fim < data_inicio:
+        raise ValidationError("data_fim não pode ser anterior a data_inicio.", "data_fim")
+
+    return data_inicio, data_fim
+
+
+def overlapping_filter(de, ate):
+    """
+    Condição de sobreposição entre as hospedagens e o intervalo [de, ate].
+    Hospedagens sem data_fim continuam em aberto.
+    """
+    return [
+        LarTemporarioModel.data_inicio <= ate,
+        or_(LarTemporarioModel.data_fim.is_(None), LarTemporarioModel.data_fim >= de),
+    ]
+
+
+def find_conflito(hospedeiro_id: int, data_inicio, data_fim, lar_temporario_id=None):
+    """
+    Retorna uma hospedagem do mesmo hospedeiro que se sobrepõe ao período, se houver.
+    A consulta usa o índice (hospedeiro_id, data_inicio, data_fim).
+    """
+    if data_inicio is None:
+        return None
 
-def list_lar_temporarios_service():
+    query = LarTemporarioModel.query.filter(
+        LarTemporarioModel.hospedeiro_id == hospedeiro_id,
+        *overlapping_filter(data_inicio, data_fim or date.max),
+    )
+
+    if lar_temporario_id is not None:
+        query = query.filter(LarTemporarioModel.lar_temporario_id != lar_temporario_id)
+
+    return query.first()
+
+
+def is_conflito_periodo(erro: IntegrityError) -> bool:
+    """
+    Indica se a IntegrityError veio da restrição de períodos sobrepostos, e não de outra
+    violação (chave estrangeira, NOT NULL etc.).
+    """
+    return violou_restricao(erro, RESTRICAO_PERIODO)
+
+
+def conflict_response(conflito):
+    return {
+        "status": 409,
+        "message": f"O hospedeiro já possui uma hospedagem no período (lar temporário {conflito.lar_temporario_id}).",
+    }
+
+
+def list_lar_temporarios_service(fields=None):
     """
     Retorna a lista de todos os lares temporários armazenados no banco de dados.
     """
     try:
-        lares = get_all_lar_temporarios()
+        # Valida os campos pedidos em ?fields=
+        error = validate_fields(LarTemporarioModel, LarTemporarioSchema, fields)
+        if error:
+            return error
+
+        lares = get_all_lar_temporarios(fields)
 
         if not lares:
             return {
@@ -27,7 +109,7 @@ def list_lar_temporarios_service():
                 "message": "Nenhum lar temporário encontrado no banco de dados."
             }
         
-        response_list = [lar.serialize for lar in lares]
+        response_list = serialize_fields(lares, LarTemporarioSchema, fields, many=True)
 
         return {"status": 200, "data": response_list}
     except Exception as e:
@@ -44,45 +126,66 @@ def create_lar_temporario_service(data: dict):
         # Aqui poderíamos validar usando o LarTemporarioSchema, se desejado:
         # validated_data = LarTemporarioSchema().load(data)
 
+        data_inicio, data_fim = parse_periodo(data)
+
+        conflito = find_conflito(data["hospedeiro_id"], data_inicio, data_fim)
+        if conflito:
+            return conflict_response(conflito)
+
         new_lar = LarTemporarioModel(
             animal_id=data["animal_id"],
             hospedeiro_id=data["hospedeiro_id"],
             periodo=data["periodo"],
             data_hospedagem=data["data_hospedagem"],
-            data_cadastro=data["data_cadastro"]
+            data_cadastro=data["data_cadastro"],
+            data_inicio=data_inicio,
+            data_fim=data_fim,
         )
 
         db.session.add(new_lar)
         db.session.commit()
+        publish_change(new_lar, CRIADO)
 
         return {"status": 201, "data": new_lar.serialize}
 
     except ValidationError as e:
         return {"status": 400, "message": str(e)}
+    except IntegrityError as e:
+        db.session.rollback()
+        # Violação da restrição de exclusão (PostgreSQL) por uma escrita concorrente
+        if is_conflito_periodo(e):
+            return {"status": 409, "message": "O hospedeiro já possui uma hospedagem no período."}
+        error_message = f"Erro ao criar lar temporário: {str(e)}"
+        traceback_message = traceback.format_exc()
+        return {"status": 500, "message": error_message, "traceback": traceback_message}
     except Exception as e:
         error_message = f"Erro ao criar lar temporário: {str(e)}"
         traceback_message = traceback.format_exc()
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
-def get_lar_temporario_service(lar_temporario_id: int):
+def get_lar_temporario_service(lar_temporario_id: int, fields=None):
     """
     Retorna um lar temporário específico do banco de dados.
     """
     try:
-        lar = LarTemporarioModel.query.get(lar_temporario_id)
+        error = validate_fields(LarTemporarioModel, LarTemporarioSchema, fields)
+        if error:
+            return error
+
+        lar = query_fields(LarTemporarioModel, fields).get(lar_temporario_id)
 
         if not lar:
             return {"status": 404, "message": "Lar temporário não encontrado."}
         
-        return {"status": 200, "data": lar.serialize}
+        return {"status": 200, "data": serialize_fields(lar, LarTemporarioSchema, fields)}
     except Exception as e:
         error_message = f"Erro ao buscar lar temporário: {str(e)}"
         traceback_message = traceback.format_exc()
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
-def update_lar_temporario_service(lar_temporario_id: int, data: dict):
+def update_lar_temporario_service(lar_temporario_id: int, data: dict, if_match=None):
     """
     Atualiza um lar temporário específico no banco de dados.
     """
@@ -91,27 +194,51 @@ def update_lar_temporario_service(lar_temporario_id: int, data: dict):
 
         if not lar_to_update:
             return {"status": 404, "message": "Lar temporário não encontrado."}
+
+        if not version_matches(lar_to_update, if_match):
+            return precondition_failed()
         
+        data_inicio, data_fim = parse_periodo(data)
+
+        conflito = find_conflito(data["hospedeiro_id"], data_inicio, data_fim, lar_temporario_id)
+        if conflito:
+            return conflict_response(conflito)
+
         # Atualização dos campos
         lar_to_update.animal_id = data["animal_id"]
         lar_to_update.hospedeiro_id = data["hospedeiro_id"]
         lar_to_update.periodo = data["periodo"]
         lar_to_update.data_hospedagem = data["data_hospedagem"]
         lar_to_update.data_cadastro = data["data_cadastro"]
+        lar_to_update.data_inicio = data_inicio
+        lar_to_update.data_fim = data_fim
 
         db.session.commit()
+        publish_change(lar_to_update, ATUALIZADO)
 
         return {"status": 200, "data": lar_to_update.serialize}
     
     except ValidationError as e:
         return {"status": 400, "message": str(e)}
+    except IntegrityError as e:
+        db.session.rollback()
+        # Violação da restrição de exclusão (PostgreSQL) por uma escrita concorrente
+        if is_conflito_periodo(e):
+            return {"status": 409, "message": "O hospedeiro já possui uma hospedagem no período."}
+        error_message = f"Erro ao atualizar lar temporário: {str(e)}"
+        traceback_message = traceback.format_exc()
+        return {"status": 500, "message": error_message, "traceback": traceback_message}
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
+
     except Exception as e:
         error_message = f"Erro ao atualizar lar temporário: {str(e)}"
         traceback_message = traceback.format_exc()
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
-def delete_lar_temporario_service(lar_temporario_id: int):
+def delete_lar_temporario_service(lar_temporario_id: int, if_match=None):
     """
     Deleta um lar temporário específico do banco de dados.
     """
@@ -120,11 +247,19 @@ def delete_lar_temporario_service(lar_temporario_id: int):
 
         if not lar_to_delete:
             return {"status": 404, "message": "Lar temporário não encontrado."}
+
+        if not version_matches(lar_to_delete, if_match):
+            return precondition_failed()
         
-        db.session.delete(lar_to_delete)
+        soft_delete(lar_to_delete)
         db.session.commit()
+        publish_change(lar_to_delete, REMOVIDO)
 
         return {"status": 204, "message": "Lar temporário deletado com sucesso."}
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
+
     except Exception as e:
         error_message = f"Erro ao deletar lar temporário: {str(e)}"
         traceback_message = traceback.format_exc()
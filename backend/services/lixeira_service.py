@@ -0,0 +1,153 @@
+import logging
+from datetime import timedelta
+
+from flask import current_app
+from sqlalchemy import delete, exists, inspect, select
+
+from backend.db import db
+from backend.external.model import (
+    AdocaoModel,
+    AdotanteModel,
+    AnimalModel,
+    ApadrinhamentoModel,
+    CampanhaModel,
+    CustoAnimalModel,
+    DespesaModel,
+    DoacaoModel,
+    EstoqueModel,
+    HospedeiroModel,
+    LarTemporarioModel,
+    MovimentoEstoqueModel,
+    ProcedimentoModel,
+    ProgressoCampanhaModel,
+    TarefaModel,
+    TarefaRecorrenteModel,
+    VoluntarioModel,
+)
+from backend.utils.auditoria import PURGADO, auditar_em_massa
+from backend.utils.soft_delete import INCLUIR_REMOVIDOS
+from backend.utils.utils import agora_utc
+
+# Create logger for this module
+logger = logging.getLogger(__name__)
+
+# Ordem da limpeza: registros que referenciam outros vêm antes dos referenciados
+PURGE_MODELS = [
+    AdocaoModel,
+    ApadrinhamentoModel,
+    DespesaModel,
+    DoacaoModel,
+    LarTemporarioModel,
+    MovimentoEstoqueModel,
+    ProcedimentoModel,
+    TarefaModel,
+    TarefaRecorrenteModel,
+    AdotanteModel,
+    AnimalModel,
+    CampanhaModel,
+    EstoqueModel,
+    HospedeiroModel,
+    VoluntarioModel,
+]
+
+# Colunas que referenciam cada tabela (não há chaves estrangeiras no banco). Um registro
+# removido só é purgado quando nenhuma linha, removida ou não, aponta mais para ele.
+REFERENCIAS = {
+    AnimalModel: [
+        AdocaoModel.animal_id,
+        ApadrinhamentoModel.animal_id,
+        DespesaModel.animal_id,
+        DoacaoModel.animal_id,
+        LarTemporarioModel.animal_id,
+        ProcedimentoModel.animal_id,
+        TarefaModel.animal_id,
+        TarefaRecorrenteModel.animal_id,
+    ],
+    AdotanteModel: [AdocaoModel.adotante_id],
+    CampanhaModel: [DoacaoModel.companha_id],
+    EstoqueModel: [MovimentoEstoqueModel.estoque_id],
+    HospedeiroModel: [LarTemporarioModel.hospedeiro_id],
+    VoluntarioModel: [
+        ProcedimentoModel.voluntario_id,
+        TarefaModel.voluntario_id,
+        TarefaRecorrenteModel.voluntario_id,
+    ],
+}
+
+# Resumos materializados apagados junto com o registro de origem
+DERIVADOS = {
+    AnimalModel: CustoAnimalModel.animal_id,
+    CampanhaModel: ProgressoCampanhaModel.campanha_id,
+}
+
+
+def _purge_lote(model, limite, lote: int) -> int:
+    """
+    Apaga de vez até `lote` registros removidos antes de `limite`, em uma transação curta.
+    """
+    chave = inspect(model).primary_key[0]
+
+    candidatos = select(chave).where(model.deleted_at.is_not(None), model.deleted_at < limite)
+    for coluna in REFERENCIAS.get(model, []):
+        candidatos = candidatos.where(~exists().where(coluna == chave))
+
+    ids = db.session.execute(
+        candidatos.order_by(model.deleted_at).limit(lote).execution_options(**{INCLUIR_REMOVIDOS: True})
+    ).scalars().all()
+
+    if not ids:
+        return 0
+
+    # deleted_at é conferido de novo: o registro pode ter sido restaurado entre as duas consultas
+    apagados = db.session.execute(
+        delete(model)
+        .where(chave.in_(ids), model.deleted_at.is_not(None))
+        .returning(chave, model.deleted_at)
+        .execution_options(synchronize_session=False, **{INCLUIR_REMOVIDOS: True})
+    ).all()
+
+    # DELETE em massa não passa pelo after_flush da auditoria
+    auditar_em_massa(
+        db.session,
+        model,
+        {registro_id: {"deleted_at": [deleted_at, None]} for registro_id, deleted_at in apagados},
+        operacao=PURGADO,
+        origem="lixeira.purge",
+    )
+
+    if model in DERIVADOS:
+        db.session.execute(delete(DERIVADOS[model].class_).where(DERIVADOS[model].in_(ids)))
+
+    db.session.commit()
+    return len(apagados)
+
+
+def purge_lixeira(retencao_dias=None, lote=None) -> dict:
+    """
+    Apaga de vez os registros removidos há mais de `retencao_dias`, em lotes de `lote`
+    linhas com um commit por lote, para não segurar locks por muito tempo. Retorna a
+    quantidade apagada por tabela. Os erros são propagados para o comando ou job.
+    """
+    retencao_dias = current_app.config["LIXEIRA_RETENCAO_DIAS"] if retencao_dias is None else retencao_dias
+    lote = current_app.config["LIXEIRA_LOTE"] if lote is None else lote
+    # Com lote 0 nenhum lote ficaria "incompleto" e o laço abaixo não terminaria
+    if lote < 1:
+        raise ValueError(f"O lote da lixeira precisa ser de ao menos 1 registro (recebido: {lote}).")
+
+    limite = agora_utc() - timedelta(days=retencao_dias)
+
+    apagados = {}
+    for model in PURGE_MODELS:
+        total = 0
+        while True:
+            quantidade = _purge_lote(model, limite, lote)
+            total += quantidade
+
+            if quantidade < lote:
+                break
+
+        if total:
+            logger.info(f"Lixeira: {total} registros apagados de {model.__tablename__}.")
+        apagados[model.__tablename__] = total
+
+    return apagados
@@ -1,26 +1,38 @@
 import logging
 import traceback
 from marshmallow import ValidationError
+from sqlalchemy.orm.exc import StaleDataError
 
 from backend.db import db
 from backend.external.schemas import ProcedimentoSchema
 from backend.external.model import ProcedimentoModel
+from backend.services.custo_animal_service import upsert_custo_animal
+from backend.utils.events import ATUALIZADO, CRIADO, REMOVIDO, publish_change
+from backend.utils.soft_delete import soft_delete
+from backend.utils.concurrency import precondition_failed, version_matches
+from backend.utils.projection import query_fields, serialize_fields, validate_fields
+from backend.utils.counters import valor_em_centavos
 
 logger = logging.getLogger(__name__)
 
-def get_all_procedimentos():
+def get_all_procedimentos(fields=None):
     """
     Consulta todos os procedimentos no banco de dados.
     """
-    return ProcedimentoModel.query.all()
+    return query_fields(ProcedimentoModel, fields).all()
 
 
-def list_procedimentos_service():
+def list_procedimentos_service(fields=None):
     """
     Retorna a lista de todos os procedimentos armazenados no banco de dados.
     """
     try:
-        procedimentos = get_all_procedimentos()
+        # Valida os campos pedidos em ?fields=
+        error = validate_fields(ProcedimentoModel, ProcedimentoSchema, fields)
+        if error:
+            return error
+
+        procedimentos = get_all_procedimentos(fields)
 
         if not procedimentos:
             return {
@@ -28,7 +40,7 @@ def list_procedimentos_service():
                 "message": "Nenhum procedimento encontrado no banco de dados."
             }
 
-        response_list = [p.serialize for p in procedimentos]
+        response_list = serialize_fields(procedimentos, ProcedimentoSchema, fields, many=True)
         return {"status": 200, "data": response_list}
 
     except Exception as e:
@@ -38,16 +50,20 @@ def list_procedimentos_service():
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
-def get_procedimento_service(procedimento_id: int):
+def get_procedimento_service(procedimento_id: int, fields=None):
     """
     Retorna um procedimento específico do banco de dados.
     """
     try:
-        procedimento = ProcedimentoModel.query.get(procedimento_id)
+        error = validate_fields(ProcedimentoModel, ProcedimentoSchema, fields)
+        if error:
+            return error
+
+        procedimento = query_fields(ProcedimentoModel, fields).get(procedimento_id)
         if not procedimento:
             return {"status": 404, "message": "Procedimento não encontrado."}
 
-        return {"status": 200, "data": procedimento.serialize}
+        return {"status": 200, "data": serialize_fields(procedimento, ProcedimentoSchema, fields)}
 
     except Exception as e:
         error_message = f"Erro ao consultar procedimento: {str(e)}"
@@ -75,7 +91,9 @@ def create_procedimento_service(data: dict):
         )
         
         db.session.add(new_procedimento)
+        upsert_custo_animal(new_procedimento.animal_id, procedimentos=valor_em_centavos(new_procedimento.valor))
         db.session.commit()
+        publish_change(new_procedimento, CRIADO)
 
         return {"status": 201, "data": new_procedimento.serialize}
 
@@ -90,7 +108,7 @@ def create_procedimento_service(data: dict):
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
-def update_procedimento_service(procedimento_id: int, data: dict):
+def update_procedimento_service(procedimento_id: int, data: dict, if_match=None):
     """
     Atualiza um procedimento específico no banco de dados.
     """
@@ -99,9 +117,15 @@ def update_procedimento_service(procedimento_id: int, data: dict):
         if not procedimento:
             return {"status": 404, "message": "Procedimento não encontrado."}
 
+        if not version_matches(procedimento, if_match):
+            return precondition_failed()
+
         procedimento_schema = ProcedimentoSchema()
         procedimento_validado = procedimento_schema.load(data, partial=True)
 
+        animal_id_antigo = procedimento.animal_id
+        valor_antigo = valor_em_centavos(procedimento.valor, strict=False)
+
         procedimento.tipo = procedimento_validado.get("tipo", procedimento.tipo)
         procedimento.descricao = procedimento_validado.get("descricao", procedimento.descricao)
         procedimento.valor = procedimento_validado.get("valor", procedimento.valor)
@@ -109,13 +133,22 @@ def update_procedimento_service(procedimento_id: int, data: dict):
         procedimento.animal_id = procedimento_validado.get("animal_id", procedimento.animal_id)
         procedimento.voluntario_id = procedimento_validado.get("voluntario_id", procedimento.voluntario_id)
 
+        # Move o valor antigo para fora do resumo de custos e aplica o novo
+        valor_novo = valor_em_centavos(procedimento.valor, strict="valor" in procedimento_validado)
+        upsert_custo_animal(animal_id_antigo, procedimentos=-valor_antigo)
+        upsert_custo_animal(procedimento.animal_id, procedimentos=valor_novo)
         db.session.commit()
+        publish_change(procedimento, ATUALIZADO)
         return {"status": 200, "data": procedimento.serialize}
 
     except ValidationError as e:
         logger.error(f"Erro de validação ao atualizar procedimento: {e}")
         return {"status": 400, "message": str(e)}
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
+
     except Exception as e:
         error_message = f"Erro ao atualizar procedimento: {str(e)}"
         traceback_message = traceback.format_exc()
@@ -123,7 +156,7 @@ def update_procedimento_service(procedimento_id: int, data: dict):
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
-def delete_procedimento_service(procedimento_id: int):
+def delete_procedimento_service(procedimento_id: int, if_match=None):
     """
     Deleta um procedimento específico do banco de dados.
     """
@@ -132,11 +165,23 @@ def delete_procedimento_service(procedimento_id: int):
         if not procedimento:
             return {"status": 404, "message": "Procedimento não encontrado."}
 
-        db.session.delete(procedimento)
+        if not version_matches(procedimento, if_match):
+            return precondition_failed()
+
+        upsert_custo_animal(
+            procedimento.animal_id,
+            procedimentos=-valor_em_centavos(procedimento.valor, strict=False),
+        )
+        soft_delete(procedimento)
         db.session.commit()
+        publish_change(procedimento, REMOVIDO)
 
         return {"status": 204, "message": "Procedimento deletado com sucesso."}
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
+
     except Exception as e:
         error_message = f"Erro ao deletar procedimento: {str(e)}"
         traceback_message = traceback.format_exc()
@@ -0,0 +1,125 @@
+import logging
+import traceback
+from collections import defaultdict
+
+from backend.db import db
+from backend.external.model import CampanhaModel, DoacaoModel, ProgressoCampanhaModel
+from backend.external.schemas import centavos_para_reais
+from backend.utils.counters import upsert_increment
+from backend.utils.utils import parse_valor_centavos
+
+# Create logger for this module
+logger = logging.getLogger(__name__)
+
+
+def upsert_progresso_campanha(campanha_id: int, valor: int, quantidade: int):
+    """
+    Soma (ou subtrai) uma doação aos contadores da campanha.
+    Deve ser chamada dentro da transação da escrita de doação; não faz commit.
+    """
+    upsert_increment(
+        ProgressoCampanhaModel.__table__,
+        "campanha_id",
+        campanha_id,
+        {"total_arrecadado": valor, "quantidade_doacoes": quantidade},
+    )
+
+
+def get_progresso_campanha_service(campanha_id: int):
+    """
+    Retorna quanto uma campanha já arrecadou, a partir dos contadores.
+    """
+    try:
+        campanha = CampanhaModel.query.get(campanha_id)
+
+        if not campanha:
+            return {"status": 404, "message": "Campanha não encontrada no banco de dados."}
+
+        progresso = ProgressoCampanhaModel.query.get(campanha_id)
+
+        # Campanha sem doações ainda não tem linha de contadores
+        if not progresso:
+            progresso = ProgressoCampanhaModel(campanha_id=campanha_id)
+
+        data = progresso.serialize
+        data["nome"] = campanha.nome
+
+        return {"status": 200, "data": data}
+
+    except Exception as e:
+        error_message = f"Erro ao consultar o progresso da campanha: {str(e)}"
+        traceback_message = traceback.format_exc()
+        return {"status": 500, "message": error_message, "traceback": traceback_message}
+
+
+def list_progresso_campanhas_service():
+    """
+    Retorna o progresso de arrecadação de todas as campanhas.
+    """
+    try:
+        rows = (
+            db.session.query(
+                CampanhaModel.campanha_id,
+                CampanhaModel.nome,
+                ProgressoCampanhaModel.total_arrecadado,
+                ProgressoCampanhaModel.quantidade_doacoes,
+            )
+            .outerjoin(ProgressoCampanhaModel, ProgressoCampanhaModel.campanha_id == CampanhaModel.campanha_id)
+            .order_by(CampanhaModel.campanha_id)
+            .all()
+        )
+
+        if not rows:
+            return {
+                "status": 404,
+                "message": "Nenhuma campanha encontrada no banco de dados.",
+            }
+
+        response_list = [
+            {
+                "campanha_id": campanha_id,
+                "nome": nome,
+                "total_arrecadado": centavos_para_reais(total_arrecadado or 0),
+                "quantidade_doacoes": quantidade_doacoes or 0,
+            }
+            for campanha_id, nome, total_arrecadado, quantidade_doacoes in rows
+        ]
+
+        return {"status": 200, "data": response_list}
+
+    except Exception as e:
+        error_message = f"Erro ao listar o progresso das campanhas: {str(e)}"
+        traceback_message = traceback.format_exc()
+        return {"status": 500, "message": error_message, "traceback": traceback_message}
+
+
+def rebuild_progresso_campanhas():
+    """
+    Recalcula os contadores de todas as campanhas a partir das doações.
+    Retorna a quantidade de campanhas com doações.
+    """
+    totais = defaultdict(int)
+    quantidades = defaultdict(int)
+
+    for campanha_id, valor in db.session.query(DoacaoModel.companha_id, DoacaoModel.valor).yield_per(1000):
+        try:
+            totais[campanha_id] += parse_valor_centavos(valor)
+        except ValueError:
+            logger.warning(f"Valor de doação inválido ignorado para a campanha {campanha_id}: {valor!r}")
+        quantidades[campanha_id] += 1
+
+    rows = [
+        {
+            "campanha_id": campanha_id,
+            "total_arrecadado": totais[campanha_id],
+            "quantidade_doacoes": quantidades[campanha_id],
+        }
+        for campanha_id in quantidades
+    ]
+
+    db.session.execute(ProgressoCampanhaModel.__table__.delete())
+    if rows:
+        db.session.execute(ProgressoCampanhaModel.__table__.insert(), rows)
+    db.session.commit()
+
+    return len(rows)
@@ -0,0 +1,206 @@
+import logging
+import traceback
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import and_, inspect, or_, select
+
+from backend.db import db
+from backend.external.model import (
+    AdocaoModel,
+    AdotanteModel,
+    AnimalModel,
+    ApadrinhamentoModel,
+    CampanhaModel,
+    DespesaModel,
+    DoacaoModel,
+    EstoqueModel,
+    HospedeiroModel,
+    LarTemporarioModel,
+    MovimentoEstoqueModel,
+    ProcedimentoModel,
+    TarefaModel,
+    TarefaRecorrenteModel,
+    VoluntarioModel,
+)
+from backend.utils.soft_delete import INCLUIR_REMOVIDOS
+from backend.utils.utils import agora_utc
+
+# Create logger for this module
+logger = logging.getLogger(__name__)
+
+# Tabelas sincronizadas, pelo nome usado no cursor e na resposta
+SYNC_MODELS = {
+    model.__tablename__: model
+    for model in (
+        AdocaoModel,
+        AdotanteModel,
+        AnimalModel,
+        ApadrinhamentoModel,
+        CampanhaModel,
+        DespesaModel,
+        DoacaoModel,
+        EstoqueModel,
+        HospedeiroModel,
+        LarTemporarioModel,
+        MovimentoEstoqueModel,
+        ProcedimentoModel,
+        TarefaModel,
+        TarefaRecorrenteModel,
+        VoluntarioModel,
+    )
+}
+
+
+def parse_cursor(since):
+    """
+    Converte o parâmetro `since` em (updated_at, tabela, id). Aceita o cursor devolvido
+    em `next_since` ("<updated_at>|<tabela>|<id>") ou apenas uma data e hora ISO 8601,
+    que inclui as alterações feitas a partir dela. Lança ValueError se for inválido.
+    """
+    if not since:
+        return datetime.min, "", 0
+
+    partes = since.split("|")
+    if len(partes) not in (1, 3):
+        raise ValueError(since)
+
+    updated_at = datetime.fromisoformat(partes[0])
+    if updated_at.tzinfo is not None:
+        updated_at = updated_at.astimezone(timezone.utc).replace(tzinfo=None)
+
+    if len(partes) == 1:
+        return updated_at, "", 0
+
+    tabela, id = partes[1], int(partes[2])
+    if tabela not in SYNC_MODELS:
+        raise ValueError(since)
+
+    return updated_at, tabela, id
+
+
+def format_cursor(updated_at: datetime, tabela: str, id: int) -> str:
+    return f"{updated_at.isoformat()}|{tabela}|{id}"
+
+
+def _changed_keys(model, cursor, ate: datetime, limit: int):
+    """
+    (updated_at, tabela, id) das linhas alteradas depois do cursor, na ordem (updated_at, id),
+    lidos só do índice ix_<tabela>_updated_at. Tabelas empatadas no mesmo updated_at são
+    ordenadas pelo nome.
+    """
+    updated_at, tabela, id = cursor
+    chave = inspect(model).primary_key[0]
+
+    if model.__tablename__ > tabela:
+        depois = model.updated_at >= updated_at
+    elif model.__tablename__ == tabela:
+        depois = or_(model.updated_at > updated_at, and_(model.updated_at == updated_at, chave > id))
+    else:
+        depois = model.updated_at > updated_at
+
+    rows = db.session.execute(
+        select(model.updated_at, chave)
+        .where(depois, model.updated_at <= ate)
+        .order_by(model.updated_at, chave)
+        .limit(limit)
+        .execution_options(**{INCLUIR_REMOVIDOS: True})
+    ).all()
+
+    return [(row[0], model.__tablename__, row[1]) for row in rows]
+
+
+def _load(chaves):
+    # Carrega as linhas completas só da página, uma consulta por tabela
+    ids_por_tabela = {}
+    for _, tabela, id in chaves:
+        ids_por_tabela.setdefault(tabela, []).append(id)
+
+    objetos = {}
+    for tabela, ids in ids_por_tabela.items():
+        model = SYNC_MODELS[tabela]
+        chave = inspect(model).primary_key[0]
+
+        for obj in model.query.filter(chave.in_(ids)).execution_options(**{INCLUIR_REMOVIDOS: True}).all():
+            objetos[(tabela, inspect(obj).identity[0])] = obj
+
+    # Linhas removidas (purgadas) entre as duas consultas ficam de fora
+    return [objetos[(tabela, id)] for _, tabela, id in chaves if (tabela, id) in objetos]
+
+
+def _change(obj):
+    chave = inspect(obj).identity[0]
+    removido = obj.deleted_at is not None
+
+    return {
+        "tabela": obj.__tablename__,
+        "id": chave,
+        "op": "delete" if removido else "upsert",
+        "version": getattr(obj, "version", None),
+        "updated_at": obj.updated_at.isoformat(),
+        "data": None if removido else obj.serialize,
+    }
+
+
+def get_sync_service(since=None, tabelas=None, limit=None):
+    """
+    Retorna as alterações de todas as tabelas sincronizadas desde o cursor `since`,
+    em ordem de updated_at, no máximo `limit` por página. Registros removidos aparecem
+    com op "delete" e sem dados. Alterações dos últimos SYNC_MARGEM_SEGUNDOS ficam para
+    a próxima página, para que transações ainda em andamento não sejam puladas.
+    """
+    try:
+        limite_maximo = current_app.config["SYNC_LIMITE_MAXIMO"]
+        limit = current_app.config["SYNC_LIMITE_PADRAO"] if limit is None else limit
+
+        if not 1 <= limit <= limite_maximo:
+            return {"status": 400, "message": f"`limit` deve estar entre 1 e {limite_maximo}."}
+
+        try:
+            cursor = parse_cursor(since)
+        except ValueError:
+            return {"status": 400, "message": "`since` inválido. Use o valor de `next_since` ou uma data e hora ISO 8601."}
+
+        # Registros removidos antes do checkpoint podem já ter sido purgados da lixeira
+        retencao = timedelta(days=current_app.config["LIXEIRA_RETENCAO_DIAS"])
+        if since and cursor[0] < agora_utc() - retencao:
+            return {
+                "status": 410,
+                "message": "Checkpoint mais antigo que a retenção da lixeira. Sincronize do zero, sem `since`.",
+            }
+
+        if tabelas is None:
+            tabelas = list(SYNC_MODELS)
+
+        invalidas = [tabela for tabela in tabelas if tabela not in SYNC_MODELS]
+        if invalidas:
+            return {
+                "status": 400,
+                "message": f"Tabelas inválidas: {', '.join(invalidas)}. Use: {', '.join(SYNC_MODELS)}.",
+            }
+
+        ate = agora_utc() - timedelta(seconds=current_app.config["SYNC_MARGEM_SEGUNDOS"])
+
+        # Cada tabela contribui com até limit + 1 chaves; a página é o início da junção ordenada
+        chaves = []
+        for tabela in tabelas:
+            chaves.extend(_changed_keys(SYNC_MODELS[tabela], cursor, ate, limit + 1))
+
+        chaves.sort()
+        pagina = chaves[:limit]
+
+        return {
+            "status": 200,
+            "data": {
+                "changes": [_change(obj) for obj in _load(pagina)],
+                "next_since": format_cursor(*pagina[-1]) if pagina else since,
+                "has_more": len(chaves) > limit,
+            },
+        }
+
+    except Exception as e:
+        # Se ocorrer qualquer erro, retorna um dicionário com o erro e o traceback
+        error_message = f"Erro ao consultar as alterações: {str(e)}"
+        traceback_message = traceback.format_exc()
+        logger.error(error_message)
+        return {"status": 500, "message": error_message, "traceback": traceback_message}
@@ -1,25 +1,91 @@
 import logging
 import traceback
 from marshmallow import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
 
 from backend.external.schemas import TarefaSchema
 from backend.db import db
 from backend.external.model import TarefaModel
+from backend.services.agenda_service import conflict_response_recorrente, find_conflito_recorrente
+from backend.services.dashboard_service import invalidate_dashboard
+from backend.utils.events import ATUALIZADO, CRIADO, REMOVIDO, publish_change
+from backend.utils.soft_delete import soft_delete
+from backend.utils.concurrency import precondition_failed, version_matches
+from backend.utils.projection import query_fields, serialize_fields, validate_fields
+from backend.utils.utils import parse_data_hora, violou_restricao
 
 # Logger para o módulo
 logger = logging.getLogger(__name__)
 
-def get_all_tarefas():
+# Restrição de exclusão (só no PostgreSQL) que impede horários sobrepostos por voluntário
+RESTRICAO_HORARIO = "ex_tab_tarefa_voluntario_horario"
+
+def get_all_tarefas(fields=None):
     # Consulta ao banco de dados para obter todas as tarefas
-    tarefa_list = TarefaModel.query.all()
+    tarefa_list = query_fields(TarefaModel, fields).all()
     return tarefa_list
 
-def list_tarefas_service():
+def parse_horario(tarefa: dict):
+    """
+    Lê o horário tipado (inicio/fim) enviado na requisição.
+    """
+    try:
+        inicio = parse_data_hora(tarefa["inicio"]) if tarefa.get("inicio") else None
+        fim = parse_data_hora(tarefa["fim"]) if tarefa.get("fim") else None
+    except ValueError:
+        raise ValidationError("Os horários devem estar no formato AAAA-MM-DDTHH:MM.", "inicio")
+
+    if (inicio is None) != (fim is None):
+        raise ValidationError("Informe inicio e fim juntos.", "inicio")
+
+    if inicio and fim <= inicio:
+        raise ValidationError("fim deve ser posterior a inicio.", "fim")
+
+    return inicio, fim
+
+def find_conflito_tarefa(voluntario_id: int, inicio, fim, tarefa_id=None):
+    """
+    Retorna uma tarefa do mesmo voluntário cujo horário se sobrepõe a [inicio, fim), se houver.
+    A consulta usa o índice (voluntario_id, inicio, fim).
+    """
+    if inicio is None:
+        return None
+
+    query = TarefaModel.query.filter(
+        TarefaModel.voluntario_id == voluntario_id,
+        TarefaModel.inicio < fim,
+        TarefaModel.fim > inicio,
+    )
+
+    if tarefa_id is not None:
+        query = query.filter(TarefaModel.tarefa_id != tarefa_id)
+
+    return query.first()
+
+def is_conflito_horario(erro: IntegrityError) -> bool:
+    """
+    Indica se a IntegrityError veio da restrição de horários sobrepostos.
+    """
+    return violou_restricao(erro, RESTRICAO_HORARIO)
+
+def conflict_response(conflito):
+    return {
+        "status": 409,
+        "message": f"O voluntário já possui uma tarefa nesse horário (tarefa {conflito.tarefa_id}).",
+    }
+
+def list_tarefas_service(fields=None):
     """
     Retorna a lista de todas as tarefas armazenadas no banco de dados.
     """
     try:
-        tarefa_list = get_all_tarefas()
+        # Valida os campos pedidos em ?fields=
+        error = validate_fields(TarefaModel, TarefaSchema, fields)
+        if error:
+            return error
+
+        tarefa_list = get_all_tarefas(fields)
 
         if not tarefa_list:
             return {
@@ -27,7 +93,7 @@ def list_tarefas_service():
                 "message": "Nenhuma tarefa encontrada no banco de dados.",
             }
 
-        response_list = [tarefa.serialize for tarefa in tarefa_list]
+        response_list = serialize_fields(tarefa_list, TarefaSchema, fields, many=True)
         return {"status": 200, "data": response_list}
 
     except Exception as e:
@@ -35,17 +101,21 @@ def list_tarefas_service():
         traceback_message = traceback.format_exc()
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
-def get_tarefa_service(tarefa_id: int):
+def get_tarefa_service(tarefa_id: int, fields=None):
     """
     Retorna uma tarefa específica do banco de dados.
     """
     try:
-        tarefa = TarefaModel.query.get(tarefa_id)
+        error = validate_fields(TarefaModel, TarefaSchema, fields)
+        if error:
+            return error
+
+        tarefa = query_fields(TarefaModel, fields).get(tarefa_id)
 
         if not tarefa:
             return {"status": 404, "message": "Tarefa não encontrada no banco de dados."}
 
-        return {"status": 200, "data": tarefa.serialize}
+        return {"status": 200, "data": serialize_fields(tarefa, TarefaSchema, fields)}
 
     except Exception as e:
         error_message = f"Erro ao consultar a tarefa: {str(e)}"
@@ -57,28 +127,52 @@ def create_tarefa_service(tarefa: TarefaSchema):
     Cria uma nova tarefa no banco de dados.
     """
     try:
+        inicio, fim = parse_horario(tarefa)
+
+        conflito = find_conflito_tarefa(tarefa["voluntario_id"], inicio, fim)
+        if conflito:
+            return conflict_response(conflito)
+
+        # Ocorrências dos modelos recorrentes do voluntário no mesmo horário
+        conflito = find_conflito_recorrente(tarefa["voluntario_id"], inicio, fim)
+        if conflito:
+            return conflict_response_recorrente(conflito)
+
         new_tarefa = TarefaModel(
             tipo=tarefa["tipo"],
             descricao=tarefa["descricao"],
             data_tarefa=tarefa["data_tarefa"],
             voluntario_id=tarefa["voluntario_id"],
             animal_id=tarefa["animal_id"],
+            inicio=inicio,
+            fim=fim,
         )
 
         db.session.add(new_tarefa)
         db.session.commit()
+        invalidate_dashboard("tarefas")
+        publish_change(new_tarefa, CRIADO)
 
         return {"status": 201, "data": new_tarefa.serialize}
 
     except ValidationError as e:
         return {"status": 400, "message": str(e)}
 
+    except IntegrityError as e:
+        db.session.rollback()
+        # Violação da restrição de exclusão (PostgreSQL) por uma escrita concorrente
+        if is_conflito_horario(e):
+            return {"status": 409, "message": "O voluntário já possui uma tarefa nesse horário."}
+        error_message = f"Erro ao criar uma nova tarefa: {str(e)}"
+        traceback_message = traceback.format_exc()
+        return {"status": 500, "message": error_message, "traceback": traceback_message}
+
     except Exception as e:
         error_message = f"Erro ao criar uma nova tarefa: {str(e)}"
         traceback_message = traceback.format_exc()
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
-def update_tarefa_service(tarefa_id: int, tarefa: TarefaSchema):
+def update_tarefa_service(tarefa_id: int, tarefa: TarefaSchema, if_match=None):
     """
     Atualiza uma tarefa específica no banco de dados.
     """
@@ -88,25 +182,55 @@ def update_tarefa_service(tarefa_id: int, tarefa: TarefaSchema):
         if not tarefa_to_update:
             return {"status": 404, "message": "Tarefa não encontrada no banco de dados."}
 
+        if not version_matches(tarefa_to_update, if_match):
+            return precondition_failed()
+
+        inicio, fim = parse_horario(tarefa)
+
+        conflito = find_conflito_tarefa(tarefa["voluntario_id"], inicio, fim, tarefa_id=tarefa_id)
+        if conflito:
+            return conflict_response(conflito)
+
+        # Ocorrências dos modelos recorrentes do voluntário no mesmo horário
+        conflito = find_conflito_recorrente(tarefa["voluntario_id"], inicio, fim)
+        if conflito:
+            return conflict_response_recorrente(conflito)
+
         tarefa_to_update.tipo = tarefa["tipo"]
         tarefa_to_update.descricao = tarefa["descricao"]
         tarefa_to_update.data_tarefa = tarefa["data_tarefa"]
         tarefa_to_update.voluntario_id = tarefa["voluntario_id"]
         tarefa_to_update.animal_id = tarefa["animal_id"]
+        tarefa_to_update.inicio = inicio
+        tarefa_to_update.fim = fim
 
         db.session.commit()
+        invalidate_dashboard("tarefas")
+        publish_change(tarefa_to_update, ATUALIZADO)
 
         return {"status": 200, "data": tarefa_to_update.serialize}
 
     except ValidationError as e:
         return {"status": 400, "message": str(e)}
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
+
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_conflito_horario(e):
+            return {"status": 409, "message": "O voluntário já possui uma tarefa nesse horário."}
+        error_message = f"Erro ao atualizar a tarefa: {str(e)}"
+        traceback_message = traceback.format_exc()
+        return {"status": 500, "message": error_message, "traceback": traceback_message}
+
     except Exception as e:
         error_message = f"Erro ao atualizar a tarefa: {str(e)}"
         traceback_message = traceback.format_exc()
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
-def delete_tarefa_service(tarefa_id: int):
+def delete_tarefa_service(tarefa_id: int, if_match=None):
     """
     Deleta uma tarefa específica do banco de dados.
     """
@@ -116,11 +240,20 @@ def delete_tarefa_service(tarefa_id: int):
         if not tarefa_to_delete:
             return {"status": 404, "message": "Tarefa não encontrada no banco de dados."}
 
-        db.session.delete(tarefa_to_delete)
+        if not version_matches(tarefa_to_delete, if_match):
+            return precondition_failed()
+
+        soft_delete(tarefa_to_delete)
         db.session.commit()
+        invalidate_dashboard("tarefas")
+        publish_change(tarefa_to_delete, REMOVIDO)
 
         return {"status": 204, "message": "Tarefa deletada com sucesso."}
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
+
     except Exception as e:
         error_message = f"Erro ao deletar a tarefa: {str(e)}"
         traceback_message = traceback.format_exc()
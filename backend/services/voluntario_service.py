@@ -1,28 +1,38 @@
 import logging
 import traceback
 from marshmallow import ValidationError
+from sqlalchemy.orm.exc import StaleDataError
 
 from backend.external.schemas import VoluntarioSchema
 from backend.db import db
 from backend.external.model import VoluntarioModel
+from backend.utils.events import ATUALIZADO, CRIADO, REMOVIDO, publish_change
+from backend.utils.soft_delete import soft_delete
+from backend.utils.concurrency import precondition_failed, version_matches
+from backend.utils.projection import query_fields, serialize_fields, validate_fields
 
 # Create logger for this module
 logger = logging.getLogger(__name__)
 
 
-def get_all_voluntarios():
+def get_all_voluntarios(fields=None):
     # Consulta ao banco de dados para obter todos os voluntários
-    voluntario_list = VoluntarioModel.query.all()
+    voluntario_list = query_fields(VoluntarioModel, fields).all()
     return voluntario_list
 
 
-def list_voluntarios_service():
+def list_voluntarios_service(fields=None):
     """
     Retorna a lista de todos os voluntários armazenados no banco de dados.
     """
     try:
+        # Valida os campos pedidos em ?fields=
+        error = validate_fields(VoluntarioModel, VoluntarioSchema, fields)
+        if error:
+            return error
+
         # Consulta ao banco de dados para obter todos os voluntários
-        voluntario_list = get_all_voluntarios()
+        voluntario_list = get_all_voluntarios(fields)
 
         # Verifica se a lista está vazia
         if not voluntario_list:
@@ -32,7 +42,7 @@ def list_voluntarios_service():
             }
 
         # Serializa os voluntários
-        response_list = [voluntario.serialize for voluntario in voluntario_list]
+        response_list = serialize_fields(voluntario_list, VoluntarioSchema, fields, many=True)
 
         # Retorna os dados serializados e o status de sucesso
         return {"status": 200, "data": response_list}
@@ -60,6 +70,7 @@ def create_voluntario_service(voluntario: VoluntarioSchema):
         # Adiciona o novo voluntário ao banco de dados
         db.session.add(new_voluntario)
         db.session.commit()
+        publish_change(new_voluntario, CRIADO)
 
         # Retorna o voluntário criado com sucesso
         return {"status": 201, "data": new_voluntario.serialize}
@@ -75,20 +86,24 @@ def create_voluntario_service(voluntario: VoluntarioSchema):
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
-def get_voluntario_service(voluntario_id: int):
+def get_voluntario_service(voluntario_id: int, fields=None):
     """
     Retorna um voluntário específico do banco de dados.
     """
     try:
+        error = validate_fields(VoluntarioModel, VoluntarioSchema, fields)
+        if error:
+            return error
+
         # Consulta ao banco de dados para obter o voluntário com o ID fornecido
-        voluntario = VoluntarioModel.query.get(voluntario_id)
+        voluntario = query_fields(VoluntarioModel, fields).get(voluntario_id)
 
         # Verifica se o voluntário existe
         if not voluntario:
             return {"status": 404, "message": "Voluntário não encontrado no banco de dados."}
 
         # Retorna o voluntário encontrado e o status de sucesso
-        return {"status": 200, "data": voluntario.serialize}
+        return {"status": 200, "data": serialize_fields(voluntario, VoluntarioSchema, fields)}
 
     except Exception as e:
         # Se ocorrer qualquer erro, retorna uma mensagem de erro com o traceback
@@ -97,7 +112,7 @@ def get_voluntario_service(voluntario_id: int):
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
-def update_voluntario_service(voluntario_id: int, voluntario: VoluntarioSchema):
+def update_voluntario_service(voluntario_id: int, voluntario: VoluntarioSchema, if_match=None):
     """
     Atualiza um voluntário específico no banco de dados.
     """
@@ -109,6 +124,9 @@ def update_voluntario_service(voluntario_id: int, voluntario: VoluntarioSchema):
         if not voluntario_to_update:
             return {"status": 404, "message": "Voluntário não encontrado no banco de dados."}
 
+        if not version_matches(voluntario_to_update, if_match):
+            return precondition_failed()
+
         # Atualiza os dados do voluntário
         voluntario_to_update.nome = voluntario["nome"]
         voluntario_to_update.foto = voluntario["foto"]
@@ -117,6 +135,7 @@ def update_voluntario_service(voluntario_id: int, voluntario: VoluntarioSchema):
 
         # Salva as alterações no banco de dados
         db.session.commit()
+        publish_change(voluntario_to_update, ATUALIZADO)
 
         # Retorna o voluntário atualizado e o status de sucesso
         return {"status": 200, "data": voluntario_to_update.serialize}
@@ -125,6 +144,10 @@ def update_voluntario_service(voluntario_id: int, voluntario: VoluntarioSchema):
         # Se ocorrer um erro de validação, retorna uma mensagem de erro
         return {"status": 400, "message": str(e)}
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
+
     except Exception as e:
         # Se ocorrer qualquer outro erro, retorna uma mensagem de erro com o traceback
         error_message = f"Erro ao atualizar o voluntário: {str(e)}"
@@ -132,7 +155,7 @@ def update_voluntario_service(voluntario_id: int, voluntario: VoluntarioSchema):
         return {"status": 500, "message": error_message, "traceback": traceback_message}
 
 
-def delete_voluntario_service(voluntario_id: int):
+def delete_voluntario_service(voluntario_id: int, if_match=None):
     """
     Deleta um voluntário específico do banco de dados.
     """
@@ -144,13 +167,21 @@ def delete_voluntario_service(voluntario_id: int):
         if not voluntario_to_delete:
             return {"status": 404, "message": "Voluntário não encontrado no banco de dados."}
 
-        # Deleta o voluntário do banco de dados
-        db.session.delete(voluntario_to_delete)
+        if not version_matches(voluntario_to_delete, if_match):
+            return precondition_failed()
+
+        # Marca o voluntário como removido (vai para a lixeira)
+        soft_delete(voluntario_to_delete)
         db.session.commit()
+        publish_change(voluntario_to_delete, REMOVIDO)
 
         # Retorna o status de sucesso
         return {"status": 204, "message": "Voluntário deletado com sucesso."}
 
+    except StaleDataError:
+        db.session.rollback()
+        return precondition_failed()
+
     except Exception as e:
         # Se ocorrer qualquer erro, retorna uma mensagem de erro com o traceback
         error_message = f"Erro ao deletar o voluntário: {str(e)}"
@@ -0,0 +1,48 @@
+from flask import current_app
+
+from backend.db import db
+from backend.services.animal_service import update_foto_animal
+from backend.services.dedup_service import DEDUP_MODELS, find_duplicados
+from backend.services.lixeira_service import purge_lixeira
+from backend.utils.jobs import enqueue, job_task, purge_jobs
+
+
+@job_task("animais.foto")
+def processar_foto_animal(payload):
+    """
+    Decodifica e grava a foto enviada para o animal.
+    """
+    return update_foto_animal(payload["animal_id"], payload["foto"])
+
+
+@job_task("lixeira.purge")
+def purge_lixeira_agendada(payload):
+    """
+    Agenda a próxima execução para daqui a LIXEIRA_INTERVALO_SEGUNDOS e apaga de vez os
+    registros removidos há mais tempo que a retenção, além dos jobs finalizados há mais
+    de JOBS_TTL_SEGUNDOS. A próxima execução é agendada antes, para que uma falha na
+    limpeza não interrompa o ciclo, e com chave única: um `agendar` repetido ou a
+    repetição do job após uma falha do worker não criam outro ciclo em paralelo.
+    """
+    intervalo = current_app.config["LIXEIRA_INTERVALO_SEGUNDOS"]
+    if intervalo > 0:
+        enqueue("lixeira.purge", payload, atraso_segundos=intervalo, chave_unica="lixeira.purge")
+        db.session.commit()
+
+    apagados = purge_lixeira(payload.get("retencao_dias"), payload.get("lote"))
+    # Jobs finalizados da fila no banco (com o payload, ex.: fotos) também não ficam para sempre
+    apagados["tab_job"] = purge_jobs(payload.get("lote"))
+    return apagados
+
+
+@job_task("dedup.duplicados")
+def buscar_duplicados(payload):
+    """
+    Procura pares de cadastros provavelmente duplicados na tabela do payload. O resultado
+    traz o total e os DEDUP_PARES_MAXIMO pares mais prováveis.
+    """
+    model = DEDUP_MODELS[payload["tabela"]]
+    pares = find_duplicados(model, payload.get("limiar"))
+
+    limite = current_app.config["DEDUP_PARES_MAXIMO"]
+    return {"tabela": payload["tabela"], "total": len(pares), "pares": pares[:limite]}
@@ -0,0 +1,323 @@
+import atexit
+import glob
+import gzip
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import current_app, has_request_context, request
+from sqlalchemy import event, inspect, insert
+
+from backend.utils.auth import usuario_atual
+from backend.utils.events import ATUALIZADO, CRIADO, REMOVIDO
+from backend.utils.utils import agora_utc
+
+logger = logging.getLogger(__name__)
+
+# Colunas mantidas pelo próprio banco/ORM ou derivadas de outras, que não entram no diff
+IGNORADOS = {"version", "updated_at", "email_normalizado", "telefone_normalizado", "geohash"}
+
+# Remoção definitiva de um registro que estava na lixeira
+PURGADO = "purge"
+
+
+def _valor(valor):
+    # Valores do diff em formato JSON; conteúdos binários (foto) viram só o tamanho
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    if isinstance(valor, bytes):
+        return f"<{len(valor)} bytes>"
+    if isinstance(valor, str) and len(valor) > 1024:
+        return f"<{len(valor)} caracteres>"
+    return valor
+
+
+def _entrada(obj, operacao: str, criado_em: datetime, usuario, origem) -> dict:
+    estado = inspect(obj)
+    alteracoes = {}
+
+    for atributo in estado.mapper.column_attrs:
+        if atributo.key in IGNORADOS:
+            continue
+
+        historico = estado.attrs[atributo.key].history
+        if operacao == CRIADO:
+            if historico.added and historico.added[0] is not None:
+                alteracoes[atributo.key] = [None, _valor(historico.added[0])]
+
+        elif historico.added:
+            antes = historico.deleted[0] if historico.deleted else None
+            depois = historico.added[0]
+
+            if antes != depois:
+                alteracoes[atributo.key] = [_valor(antes), _valor(depois)]
+
+    return {
+        "auditoria_id": uuid.uuid4().hex,
+        "criado_em": criado_em,
+        "tabela": obj.__tablename__,
+        "registro_id": estado.mapper.primary_key_from_instance(obj)[0],
+        "operacao": operacao,
+        "usuario": usuario,
+        "origem": origem,
+        "version": getattr(obj, "version", None),
+        "alteracoes": alteracoes,
+    }
+
+
+def _auditado(obj) -> bool:
+    # Mesmos modelos da lixeira e do GET /sync: os que têm deleted_at
+    return "deleted_at" in inspect(obj).mapper.columns
+
+
+def entradas_do_flush(session) -> list:
+    """
+    Diffs das alterações do flush em andamento, um por registro inserido, alterado ou removido.
+    """
+    criado_em = agora_utc()
+    usuario = usuario_atual()
+    origem = f"{request.method} {request.path}" if has_request_context() else None
+
+    entradas = []
+    for obj in session.new:
+        if _auditado(obj):
+            entradas.append(_entrada(obj, CRIADO, criado_em, usuario, origem))
+
+    for obj in session.dirty:
+        if not _auditado(obj) or not session.is_modified(obj):
+            continue
+
+        # Soft delete: deleted_at preenchido agora
+        historico = inspect(obj).attrs.deleted_at.history
+        removido = bool(historico.added) and historico.added[0] is not None and not any(historico.deleted)
+
+        entrada = _entrada(obj, REMOVIDO if removido else ATUALIZADO, criado_em, usuario, origem)
+        if entrada["alteracoes"]:
+            entradas.append(entrada)
+
+    for obj in session.deleted:
+        if _auditado(obj):
+            entradas.append(_entrada(obj, REMOVIDO, criado_em, usuario, origem))
+
+    return entradas
+
+
+def auditar_em_massa(session, model, alteracoes: dict, operacao: str = ATUALIZADO, versoes=None, origem=None):
+    """
+    Registra a auditoria das escritas em massa (update()/delete() e Query.update), que não
+    passam pelo after_flush. `alteracoes` mapeia o id de cada registro para o diff
+    {coluna: [antes, depois]} e `versoes`, opcional, o id para a versão gravada.
+    """
+    if not alteracoes:
+        return
+
+    criado_em = agora_utc()
+    usuario = usuario_atual()
+    if origem is None and has_request_context():
+        origem = f"{request.method} {request.path}"
+
+    entradas = [
+        {
+            "auditoria_id": uuid.uuid4().hex,
+            "criado_em": criado_em,
+            "tabela": model.__tablename__,
+            "registro_id": registro_id,
+            "operacao": operacao,
+            "usuario": usuario,
+            "origem": origem,
+            "version": (versoes or {}).get(registro_id),
+            "alteracoes": {coluna: [_valor(antes), _valor(depois)] for coluna, (antes, depois) in diff.items()},
+        }
+        for registro_id, diff in alteracoes.items()
+    ]
+
+    _registrar(session, entradas)
+
+
+def _registrar(session, entradas: list):
+    # Destino transacional: na mesma transação; senão, guardadas até o commit
+    sink = get_sink()
+    if sink.transacional:
+        sink.write(entradas, session.connection())
+    else:
+        session.info.setdefault("auditoria", []).extend(entradas)
+
+
+def _ordenar(entradas: list) -> list:
+    # Mais recentes primeiro, como na consulta ao banco
+    return sorted(entradas, key=lambda entrada: (entrada["criado_em"], entrada["auditoria_id"]), reverse=True)
+
+
+class DatabaseAuditSink:
+    """
+    Grava na tab_auditoria, na mesma transação da alteração: um único INSERT com todas as
+    entradas de cada flush. Se a gravação falhar, a alteração também é desfeita.
+    """
+
+    transacional = True
+
+    def __init__(self, config):
+        pass
+
+    def write(self, entradas: list, connection=None):
+        # Importado aqui para não criar um ciclo com backend.external.model
+        from backend.external.model import AuditoriaModel
+
+        connection.execute(insert(AuditoriaModel.__table__), entradas)
+
+    def query(self, filtros: dict, cursor, limit: int) -> list:
+        from backend.db import db
+        from backend.external.model import AuditoriaModel
+
+        query = AuditoriaModel.query
+
+        for campo in ("tabela", "registro_id", "usuario"):
+            if filtros.get(campo) is not None:
+                query = query.filter(getattr(AuditoriaModel, campo) == filtros[campo])
+        if filtros.get("de") is not None:
+            query = query.filter(AuditoriaModel.criado_em >= filtros["de"])
+        if filtros.get("ate") is not None:
+            query = query.filter(AuditoriaModel.criado_em < filtros["ate"])
+
+        if cursor is not None:
+            query = query.filter(
+                db.tuple_(AuditoriaModel.criado_em, AuditoriaModel.auditoria_id) < db.tuple_(*cursor)
+            )
+
+        registros = query.order_by(AuditoriaModel.criado_em.desc(), AuditoriaModel.auditoria_id.desc()).limit(limit)
+        return [registro.serialize for registro in registros]
+
+
+class FileAuditSink:
+    """
+    Arquivos JSONL comprimidos com gzip em AUDITORIA_DIRETORIO, um por dia, para execuções
+    locais. As entradas são gravadas depois do commit, em lotes de AUDITORIA_LOTE; o que
+    estiver pendente é gravado antes de cada consulta e ao encerrar o processo.
+    """
+
+    transacional = False
+
+    def __init__(self, config):
+        self.diretorio = config["AUDITORIA_DIRETORIO"]
+        self.lote = config["AUDITORIA_LOTE"]
+        self.pendentes = []
+        self.lock = threading.Lock()
+
+        os.makedirs(self.diretorio, exist_ok=True)
+        atexit.register(self.flush)
+
+    def write(self, entradas: list, connection=None):
+        with self.lock:
+            self.pendentes.extend(entradas)
+
+            if len(self.pendentes) >= self.lote:
+                self._gravar()
+
+    def flush(self):
+        with self.lock:
+            self._gravar()
+
+    def _gravar(self):
+        por_dia = {}
+        for entrada in self.pendentes:
+            linha = json.dumps({**entrada, "criado_em": entrada["criado_em"].isoformat()}, ensure_ascii=False)
+            por_dia.setdefault(entrada["criado_em"].date(), []).append(linha + "\n")
+
+        # Cada lote vira um novo membro gzip no fim do arquivo do dia (append-only)
+        for dia, linhas in por_dia.items():
+            caminho = os.path.join(self.diretorio, f"auditoria-{dia.isoformat()}.jsonl.gz")
+            with gzip.open(caminho, "at", encoding="utf-8") as arquivo:
+                arquivo.writelines(linhas)
+
+        self.pendentes = []
+
+    def query(self, filtros: dict, cursor, limit: int) -> list:
+        self.flush()
+
+        de, ate = filtros.get("de"), filtros.get("ate")
+        entradas = []
+
+        for caminho in glob.glob(os.path.join(self.diretorio, "auditoria-*.jsonl.gz")):
+            # Só abre os arquivos dos dias dentro do período pedido
+            dia = date.fromisoformat(os.path.basename(caminho)[len("auditoria-"):-len(".jsonl.gz")])
+            if (de is not None and dia < de.date()) or (ate is not None and dia > ate.date()):
+                continue
+
+            with gzip.open(caminho, "rt", encoding="utf-8") as arquivo:
+                for linha in arquivo:
+                    entrada = json.loads(linha)
+                    entrada["criado_em"] = datetime.fromisoformat(entrada["criado_em"])
+
+                    if any(
+                        filtros.get(campo) is not None and entrada[campo] != filtros[campo]
+                        for campo in ("tabela", "registro_id", "usuario")
+                    ):
+                        continue
+                    if (de is not None and entrada["criado_em"] < de) or (ate is not None and entrada["criado_em"] >= ate):
+                        continue
+                    if cursor is not None and (entrada["criado_em"], entrada["auditoria_id"]) >= cursor:
+                        continue
+
+                    entradas.append(entrada)
+
+        return [
+            {**entrada, "criado_em": entrada["criado_em"].isoformat()}
+            for entrada in _ordenar(entradas)[:limit]
+        ]
+
+
+AUDIT_SINKS = {
+    "database": DatabaseAuditSink,
+    "arquivo": FileAuditSink,
+}
+
+
+def get_sink():
+    """
+    Retorna o destino configurado em AUDITORIA_BACKEND, criado uma vez por aplicação.
+    """
+    app = current_app._get_current_object()
+
+    if "auditoria" not in app.extensions:
+        backend = app.config["AUDITORIA_BACKEND"]
+
+        if backend not in AUDIT_SINKS:
+            raise ValueError(f"AUDITORIA_BACKEND inválido: {backend!r}")
+
+        app.extensions["auditoria"] = AUDIT_SINKS[backend](app.config)
+
+    return app.extensions["auditoria"]
+
+
+def register_auditoria(session_class):
+    """
+    Registra na sessão os eventos que geram a trilha de auditoria de cada flush.
+    """
+
+    def auditar_flush(session, flush_context):
+        entradas = entradas_do_flush(session)
+        if entradas:
+            _registrar(session, entradas)
+
+    def gravar_apos_commit(session):
+        entradas = session.info.pop("auditoria", None)
+        if not entradas:
+            return
+
+        try:
+            get_sink().write(entradas)
+        except Exception as e:
+            logger.error(f"Erro ao gravar {len(entradas)} entradas de auditoria: {str(e)}")
+
+    def descartar(session):
+        session.info.pop("auditoria", None)
+
+    event.listen(session_class, "after_flush", auditar_flush)
+    event.listen(session_class, "after_commit", gravar_apos_commit)
+    event.listen(session_class, "after_rollback", descartar)
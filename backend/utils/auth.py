@@ -1,25 +1,51 @@
+import logging
+
 import jwt
+from flask import g, has_request_context, request
 from backend.config import get_config
 
+logger = logging.getLogger(__name__)
+
 def validate_token(token):
     config,_ = get_config()
     try:
         data = jwt.decode(
             token, 
             key=config.SECRET_KEY, 
-            algorithms=["HS256", "RS256"],
-            verify=True, 
+            algorithms=["HS256"],
             audience=config.AUDIENCE,
             options={
-                "verify_signature": False, # Validação da assinatura
+                "verify_signature": True, # Validação da assinatura (o usuário vai para a auditoria)
                 "verify_iss": False, # Validação de issuer
                 "verify_nbf": True, # Verifica se o token está experiado
-                "verify_aud": True, # Validação de audiencia
+                "verify_aud": bool(config.AUDIENCE), # Validação de audiencia, quando configurada
                 "verify_exp": True, # Validação do tempo de expiração usando UTC
             }
         )
 
         return True, {'current_user': data['username']}
     except Exception as err:
-        print(err)
+        logger.warning(f"Token JWT inválido: {str(err)}")
         return False, {'message':'token is invalid or expired'}
+
+
+def usuario_atual():
+    """
+    Usuário do token JWT da requisição: o validado por @jwt_required ou, nas rotas sem
+    o decorator, o do cabeçalho Authorization quando presente e válido. None fora de
+    requisições (worker de jobs, comandos) ou sem token.
+    """
+    if not has_request_context():
+        return None
+
+    if "usuario" not in g:
+        usuario = None
+        bearer, _, token = request.headers.get("Authorization", "").partition(" ")
+
+        if bearer == "Bearer" and token:
+            valido, payload = validate_token(token)
+            usuario = payload["current_user"] if valido else None
+
+        g.usuario = usuario
+
+    return g.usuario
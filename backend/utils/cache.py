@@ -0,0 +1,124 @@
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Cache em memória com prazo de validade por entrada. Cada processo (worker) tem o seu:
+    a invalidação é só do melhor esforço, vale para o worker que atendeu a escrita e os
+    demais continuam com o valor antigo até o TTL expirar. Com vários workers, use o
+    RedisTTLCache.
+    """
+
+    def __init__(self, config=None, namespace=None):
+        self.entries = {}
+        # Contador de invalidações por seção, para não gravar um valor calculado antes de uma escrita
+        self.generations = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return None
+
+            return value
+
+    def set(self, key, value, ttl: float):
+        if ttl <= 0:
+            return
+
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + ttl)
+
+    def get_or_set(self, key, factory, ttl: float):
+        """
+        Retorna o valor em cache ou calcula com `factory()` e guarda por `ttl` segundos.
+        """
+        value = self.get(key)
+
+        if value is None:
+            generation = self.generations.get(key[0], 0)
+            value = factory()
+
+            if self.generations.get(key[0], 0) == generation:
+                self.set(key, value, ttl)
+
+        return value
+
+    def invalidate(self, section):
+        """
+        Remove as entradas de uma seção, o primeiro elemento das chaves (tuplas).
+        """
+        with self.lock:
+            self.generations[section] = self.generations.get(section, 0) + 1
+
+            for key in [key for key in self.entries if key[0] == section]:
+                del self.entries[key]
+
+
+class RedisTTLCache:
+    """
+    Cache no Redis, compartilhado entre os workers, com a mesma interface do TTLCache. Cada
+    seção tem um contador de geração que faz parte das chaves: invalidar é incrementar o
+    contador, e as entradas da geração anterior deixam de ser lidas e expiram pelo TTL.
+    Valores precisam ser serializáveis em JSON. Se o Redis falhar, o valor é calculado sem
+    cache.
+    """
+
+    def __init__(self, config, namespace: str):
+        # Importado só quando o backend Redis está em uso
+        import redis
+
+        self.redis = redis.Redis.from_url(config["REDIS_URL"], decode_responses=True)
+        self.prefixo = f"cache:{namespace}:"
+
+    def _geracao(self, section) -> str:
+        return f"{self.prefixo}{section}:geracao"
+
+    def get_or_set(self, key, factory, ttl: float):
+        """
+        Retorna o valor em cache ou calcula com `factory()` e guarda por `ttl` segundos.
+        """
+        try:
+            geracao = self.redis.get(self._geracao(key[0])) or "0"
+            chave = f"{self.prefixo}{key[0]}:{geracao}:" + ":".join(str(parte) for parte in key[1:])
+
+            valor = self.redis.get(chave)
+            if valor is not None:
+                return json.loads(valor)
+        except Exception as e:
+            logger.warning(f"Cache indisponível, calculando sem cache: {str(e)}")
+            return factory()
+
+        value = factory()
+
+        if ttl > 0:
+            try:
+                self.redis.set(chave, json.dumps(value), px=int(ttl * 1000))
+            except Exception as e:
+                logger.warning(f"Erro ao gravar no cache: {str(e)}")
+
+        return value
+
+    def invalidate(self, section):
+        """
+        Descarta as entradas de uma seção em todos os workers.
+        """
+        self.redis.incr(self._geracao(section))
+
+
+CACHES = {
+    "memoria": TTLCache,
+    "redis": RedisTTLCache,
+}
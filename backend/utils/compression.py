@@ -0,0 +1,169 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+from flask import request
+
+# brotli e zstandard são opcionais: sem eles, apenas gzip é negociado
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE_MIMETYPES = frozenset(
+    (
+        "application/json",
+        "application/javascript",
+        "text/javascript",
+        "text/css",
+        "text/html",
+        "text/plain",
+        "image/svg+xml",
+    )
+)
+
+
+def available_encodings():
+    """
+    Codificações suportadas com as bibliotecas instaladas.
+    """
+    encodings = {"gzip"}
+
+    if brotli is not None:
+        encodings.add("br")
+    if zstandard is not None:
+        encodings.add("zstd")
+
+    return encodings
+
+
+def compress_body(body: bytes, encoding: str, level: int) -> bytes:
+    if encoding == "gzip":
+        # mtime fixo para que o mesmo corpo gere sempre os mesmos bytes
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(body)
+
+    raise ValueError(f"Codificação não suportada: {encoding!r}")
+
+
+class CompressedCache:
+    """
+    Cache LRU de corpos já comprimidos, indexado pelo hash do corpo original e pela
+    codificação. Respostas repetidas (ex.: listagens sem alteração) não são comprimidas de novo.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value: bytes):
+        if len(value) > self.max_bytes:
+            return
+
+        with self.lock:
+            if key in self.entries:
+                return
+
+            self.entries[key] = value
+            self.size += len(value)
+
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                _, removed = self.entries.popitem(last=False)
+                self.size -= len(removed)
+
+
+class Compress:
+    """
+    Comprime as respostas conforme o Accept-Encoding do cliente (zstd, br ou gzip),
+    a partir de COMPRESS_MIN_SIZE bytes e com o nível configurado para cada algoritmo.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        available = available_encodings()
+
+        # Ordem de preferência do servidor, usada quando o cliente aceita vários com a mesma qualidade
+        self.encodings = [
+            encoding.strip()
+            for encoding in config["COMPRESS_ALGORITHMS"].split(",")
+            if encoding.strip() in available
+        ]
+        self.levels = {
+            "gzip": config["COMPRESS_LEVEL_GZIP"],
+            "br": config["COMPRESS_LEVEL_BR"],
+            "zstd": config["COMPRESS_LEVEL_ZSTD"],
+        }
+        self.min_size = config["COMPRESS_MIN_SIZE"]
+        self.cache = (
+            CompressedCache(config["COMPRESS_CACHE_SIZE"], config["COMPRESS_CACHE_MAX_BYTES"])
+            if config["COMPRESS_CACHE_SIZE"] > 0
+            else None
+        )
+
+        if self.encodings:
+            app.after_request(self.after_request)
+
+        app.extensions["compress"] = self
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if self.cache is None:
+            return compress_body(body, encoding, self.levels[encoding])
+
+        key = (hashlib.blake2b(body, digest_size=16).digest(), encoding)
+        compressed = self.cache.get(key)
+
+        if compressed is None:
+            compressed = compress_body(body, encoding, self.levels[encoding])
+            self.cache.set(key, compressed)
+
+        return compressed
+
+    def after_request(self, response):
+        if (
+            response.direct_passthrough
+            or response.is_streamed
+            or response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        # A resposta varia com o Accept-Encoding mesmo quando não é comprimida
+        response.vary.add("Accept-Encoding")
+
+        if (response.content_length or 0) < self.min_size:
+            return response
+
+        encoding = request.accept_encodings.best_match(self.encodings)
+        if encoding is None:
+            return response
+
+        # O ETag (versão do registro) é mantido para não invalidar os If-Match dos clientes
+        response.set_data(self.compress(response.get_data(), encoding))
+        response.headers["Content-Encoding"] = encoding
+
+        return response
@@ -0,0 +1,44 @@
+from flask import request
+
+
+def get_if_match():
+    """
+    Retorna as ETags enviadas no cabeçalho If-Match da requisição.
+    Retorna None quando o cabeçalho não foi enviado ou é `*`.
+    """
+    if_match = request.if_match
+
+    if not if_match or if_match.star_tag:
+        return None
+
+    return if_match
+
+
+def version_matches(obj, if_match) -> bool:
+    """
+    Verifica se a versão atual do registro corresponde ao If-Match recebido.
+    """
+    if if_match is None:
+        return True
+
+    return if_match.contains(str(obj.version))
+
+
+def precondition_failed():
+    """
+    Resposta padrão dos serviços quando a versão do registro não confere.
+    """
+    return {
+        "status": 412,
+        "message": "O registro foi alterado por outra requisição. Recarregue os dados e tente novamente.",
+    }
+
+
+def with_etag(response, data):
+    """
+    Adiciona a versão do registro serializado como ETag da resposta.
+    """
+    if isinstance(data, dict) and data.get("version") is not None:
+        response.set_etag(str(data["version"]))
+
+    return response
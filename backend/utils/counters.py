@@ -0,0 +1,39 @@
+from marshmallow import ValidationError
+
+from backend.db import db
+from backend.utils.utils import parse_valor_centavos
+
+
+def valor_em_centavos(valor, strict: bool = True) -> int:
+    """
+    Converte o valor (texto) de um registro financeiro para centavos.
+    Com strict=False, valores inválidos já gravados contam como zero, como nos rebuilds.
+    """
+    try:
+        return parse_valor_centavos(valor)
+    except ValueError:
+        if not strict:
+            return 0
+        raise ValidationError("O valor informado não é um valor monetário válido.", "valor")
+
+
+def upsert_increment(table, key_column: str, key, increments: dict):
+    """
+    Incrementa contadores de uma tabela de resumo com INSERT ... ON CONFLICT DO UPDATE,
+    criando a linha quando ela ainda não existe. Não faz commit.
+    """
+    if not any(increments.values()):
+        return
+
+    # Importa apenas o dialeto em uso
+    if db.session.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    stmt = insert(table).values({key_column: key, **increments})
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c[key_column]],
+        set_={column: table.c[column] + value for column, value in increments.items()},
+    )
+    db.session.execute(stmt)
@@ -1,5 +1,5 @@
 from functools import wraps
-from flask import jsonify, request
+from flask import g, jsonify, request
 
 from backend.utils.auth import validate_token
 
@@ -20,6 +20,8 @@ def jwt_required(f):
             is_valid, payload = validate_token(token)
 
             if is_valid:
+                # Usuário das alterações registradas na auditoria
+                g.usuario = payload['current_user']
                 return f(payload, *args, **kwargs)
             
             return jsonify(payload), 401
@@ -0,0 +1,74 @@
+import re
+import unicodedata
+
+# Provedores que ignoram pontos na parte local do e-mail
+PROVEDORES_SEM_PONTOS = {"gmail.com", "googlemail.com"}
+
+
+def normalizar_email(email):
+    """
+    Chave de comparação do e-mail: sem espaços, em minúsculas e sem o sufixo "+tag" da
+    parte local (no Gmail, também sem pontos). Retorna None se não houver e-mail.
+    """
+    if not email:
+        return None
+
+    email = email.strip().lower()
+    local, separador, dominio = email.rpartition("@")
+    if not separador:
+        return email or None
+
+    local = local.split("+", 1)[0]
+    if dominio in PROVEDORES_SEM_PONTOS:
+        local = local.replace(".", "")
+        dominio = "gmail.com"
+
+    return f"{local}@{dominio}"
+
+
+def normalizar_telefone(telefone):
+    """
+    Chave de comparação do telefone: só os dígitos do DDD e do número, sem o código do
+    país (55), o prefixo de discagem (0) e o código da operadora. Retorna None se não
+    houver dígitos.
+    """
+    digitos = re.sub(r"\D", "", telefone or "")
+
+    if digitos.startswith("00"):
+        digitos = digitos[2:]
+    if len(digitos) > 11 and digitos.startswith("55"):
+        digitos = digitos[2:]
+    digitos = digitos.lstrip("0")
+
+    # "0 15 11 9xxxx-xxxx": sobra o código da operadora na frente do DDD
+    return digitos[-11:] or None
+
+
+def normalizar_nome(nome) -> str:
+    """
+    Nome sem acentos, pontuação e espaços repetidos, em minúsculas.
+    """
+    nome = unicodedata.normalize("NFKD", nome or "")
+    nome = "".join(caractere for caractere in nome if not unicodedata.combining(caractere))
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", nome.lower()).split())
+
+
+def trigramas(texto: str) -> set:
+    """
+    Trigramas de cada palavra, completadas com dois espaços no início e um no fim (como
+    no pg_trgm).
+    """
+    resultado = set()
+    for palavra in texto.split():
+        palavra = f"  {palavra} "
+        resultado.update(palavra[i:i + 3] for i in range(len(palavra) - 2))
+    return resultado
+
+
+def similaridade(a: set, b: set) -> float:
+    """
+    Similaridade entre dois conjuntos de trigramas: compartilhados / total (0 a 1).
+    """
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
@@ -0,0 +1,147 @@
+import json
+import logging
+import queue
+import threading
+
+from flask import current_app
+from sqlalchemy import inspect
+
+logger = logging.getLogger(__name__)
+
+CRIADO = "create"
+ATUALIZADO = "update"
+REMOVIDO = "delete"
+
+
+class MemoryEventBroker:
+    """
+    Distribui os eventos entre as conexões do próprio processo. Sem serviço extra, mas com
+    vários workers do Gunicorn cada cliente só recebe as alterações feitas no worker em que
+    está conectado; use o backend Redis nesses casos.
+    """
+
+    def __init__(self, config):
+        self.max_pendentes = config["EVENTS_MAX_PENDENTES"]
+        self.assinantes = set()
+        self.lock = threading.Lock()
+
+    def publish(self, evento: dict):
+        with self.lock:
+            assinantes = list(self.assinantes)
+
+        for fila in assinantes:
+            try:
+                fila.put_nowait(evento)
+            except queue.Full:
+                # Cliente lento: descarta o evento em vez de acumular memória
+                pass
+
+    def subscribe(self):
+        return MemoryAssinatura(self)
+
+
+class MemoryAssinatura:
+    def __init__(self, broker: MemoryEventBroker):
+        self.broker = broker
+        self.fila = queue.Queue(broker.max_pendentes)
+
+        with broker.lock:
+            broker.assinantes.add(self.fila)
+
+    def get(self, timeout: float):
+        """
+        Retorna o próximo evento, ou None se nenhum chegar em `timeout` segundos.
+        """
+        try:
+            return self.fila.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        with self.broker.lock:
+            self.broker.assinantes.discard(self.fila)
+
+
+class RedisEventBroker:
+    """
+    Eventos publicados no canal `eventos` do Redis (pub/sub), recebidos por todas as
+    conexões de todos os workers. Eventos publicados sem ninguém conectado são perdidos.
+    """
+
+    CANAL = "eventos"
+
+    def __init__(self, config):
+        # Importado só quando o backend Redis está em uso
+        import redis
+
+        self.redis = redis.Redis.from_url(config["REDIS_URL"], decode_responses=True)
+
+    def publish(self, evento: dict):
+        self.redis.publish(self.CANAL, json.dumps(evento))
+
+    def subscribe(self):
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.CANAL)
+        return RedisAssinatura(pubsub)
+
+
+class RedisAssinatura:
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    def get(self, timeout: float):
+        mensagem = self.pubsub.get_message(timeout=timeout)
+        return json.loads(mensagem["data"]) if mensagem else None
+
+    def close(self):
+        self.pubsub.close()
+
+
+EVENT_BACKENDS = {
+    "memoria": MemoryEventBroker,
+    "redis": RedisEventBroker,
+}
+
+
+def get_broker():
+    """
+    Retorna o broker configurado em EVENTS_BACKEND, criado uma vez por aplicação.
+    """
+    app = current_app._get_current_object()
+
+    if "events" not in app.extensions:
+        backend = app.config["EVENTS_BACKEND"]
+
+        if backend not in EVENT_BACKENDS:
+            raise ValueError(f"EVENTS_BACKEND inválido: {backend!r}")
+
+        app.extensions["events"] = EVENT_BACKENDS[backend](app.config)
+
+    return app.extensions["events"]
+
+
+def publish_event(tabela: str, id, op: str, version=None):
+    """
+    Publica a alteração de um registro para os clientes conectados em `/events`. Deve ser
+    chamada depois do commit; uma falha na publicação é registrada no log e não desfaz a escrita.
+    """
+    try:
+        get_broker().publish({"tabela": tabela, "id": id, "op": op, "version": version})
+
+    except Exception as e:
+        logger.warning(f"Erro ao publicar o evento de alteração de {tabela} {id}: {str(e)}")
+
+
+def publish_change(obj, op: str):
+    """
+    `publish_event` a partir da instância do modelo (tabela, chave primária e versão).
+    """
+    try:
+        chave = inspect(obj).identity
+        version = getattr(obj, "version", None)
+
+    except Exception as e:
+        logger.warning(f"Erro ao publicar o evento de alteração de {obj.__tablename__}: {str(e)}")
+        return
+
+    publish_event(obj.__tablename__, chave[0] if len(chave) == 1 else list(chave), op, version)
@@ -0,0 +1,19 @@
+from backend.db import db
+
+
+def reset_after_fork(app):
+    """
+    Descarta recursos herdados do processo master após o fork de um worker.
+    Os pools de conexão do SQLAlchemy são descartados sem fechar as conexões do
+    master (dispose(close=False)) e os clientes da fila de jobs, dos eventos, da
+    auditoria, da idempotência e do cache do painel são recriados sob demanda.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+    app.extensions.pop("jobs", None)
+    app.extensions.pop("events", None)
+    app.extensions.pop("auditoria", None)
+    app.extensions.pop("idempotencia", None)
+    app.extensions.pop("dashboard_cache", None)
@@ -0,0 +1,210 @@
+import math
+
+from flask import current_app
+from marshmallow import ValidationError
+
+from backend.utils.dedup import normalizar_nome
+
+# Geohash guardado em cada registro (~5 m); as buscas usam prefixos mais curtos
+GEOHASH_PRECISAO = 9
+GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+KM_POR_GRAU = 111.32
+RAIO_TERRA_KM = 6371.0088
+
+
+def codificar_geohash(latitude: float, longitude: float, precisao: int = GEOHASH_PRECISAO) -> str:
+    """
+    Codifica a coordenada em geohash. Coordenadas próximas dividem o mesmo prefixo, então
+    uma célula do grid é um intervalo contínuo no índice da coluna.
+    """
+    lat_min, lat_max = -90.0, 90.0
+    lon_min, lon_max = -180.0, 180.0
+    resultado = []
+    bits, valor, longitude_da_vez = 0, 0, True
+
+    while len(resultado) < precisao:
+        if longitude_da_vez:
+            meio = (lon_min + lon_max) / 2
+            valor = valor * 2 + (longitude >= meio)
+            lon_min, lon_max = (meio, lon_max) if longitude >= meio else (lon_min, meio)
+        else:
+            meio = (lat_min + lat_max) / 2
+            valor = valor * 2 + (latitude >= meio)
+            lat_min, lat_max = (meio, lat_max) if latitude >= meio else (lat_min, meio)
+
+        longitude_da_vez = not longitude_da_vez
+        bits += 1
+        if bits == 5:
+            resultado.append(GEOHASH_BASE32[valor])
+            bits, valor = 0, 0
+
+    return "".join(resultado)
+
+
+def tamanho_celula(precisao: int):
+    """
+    Altura e largura, em graus, de uma célula de geohash com `precisao` caracteres.
+    """
+    bits = 5 * precisao
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+
+def proximo_prefixo(prefixo: str):
+    """
+    Menor geohash depois de todos os que começam com `prefixo`, para a busca por intervalo
+    (geohash >= prefixo AND geohash < próximo). Retorna None se não houver.
+    """
+    while prefixo:
+        indice = GEOHASH_BASE32.index(prefixo[-1])
+        if indice + 1 < len(GEOHASH_BASE32):
+            return prefixo[:-1] + GEOHASH_BASE32[indice + 1]
+        prefixo = prefixo[:-1]
+
+    return None
+
+
+def celulas_no_raio(latitude: float, longitude: float, raio_km: float):
+    """
+    Prefixos de geohash (a célula do ponto e as 8 vizinhas) que cobrem o círculo de
+    `raio_km`, na maior precisão em que cada célula é maior que o raio. Retorna None
+    quando nenhuma precisão serve (raio muito grande ou perto dos polos).
+    """
+    for precisao in range(GEOHASH_PRECISAO, 0, -1):
+        altura, largura = tamanho_celula(precisao)
+
+        # A largura das células diminui com a latitude: vale a do ponto mais longe do equador
+        latitude_borda = min(90.0, abs(latitude) + raio_km / KM_POR_GRAU + altura)
+        largura_km = largura * KM_POR_GRAU * math.cos(math.radians(latitude_borda))
+
+        if altura * KM_POR_GRAU >= raio_km and largura_km >= raio_km:
+            return sorted({
+                codificar_geohash(
+                    max(-90.0, min(90.0, latitude + i * altura)),
+                    (longitude + j * largura + 180.0) % 360.0 - 180.0,
+                    precisao,
+                )
+                for i in (-1, 0, 1)
+                for j in (-1, 0, 1)
+            })
+
+    return None
+
+
+def distancia_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Distância em linha reta (haversine) entre duas coordenadas, em km.
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    delta_phi = math.radians(lat2 - lat1)
+    delta_lambda = math.radians(lon2 - lon1)
+
+    a = math.sin(delta_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2) ** 2
+    return 2 * RAIO_TERRA_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class OfflineGeocoder:
+    """
+    Geocodificador sem serviço externo: procura no endereço o nome de um local conhecido
+    (bairros usados pela ONG e capitais) e devolve a coordenada aproximada dele. O
+    endereço sem local conhecido fica sem coordenada, até ser informada manualmente.
+    """
+
+    LOCAIS = {
+        "Centro": (-23.5475, -46.6361),
+        "Jardim América": (-23.5670, -46.6772),
+        "Vila Nova": (-23.5870, -46.6400),
+        "Boa Vista": (-23.5430, -46.6330),
+        "Santa Cruz": (-23.5990, -46.6370),
+        "São José": (-23.6100, -46.6600),
+        "Primavera": (-23.6380, -46.7000),
+        "São Paulo": (-23.5505, -46.6333),
+        "Rio de Janeiro": (-22.9068, -43.1729),
+        "Belo Horizonte": (-19.9167, -43.9345),
+        "Curitiba": (-25.4284, -49.2733),
+        "Porto Alegre": (-30.0346, -51.2177),
+        "Salvador": (-12.9777, -38.5016),
+        "Recife": (-8.0476, -34.8770),
+        "Fortaleza": (-3.7319, -38.5267),
+        "Brasília": (-15.7939, -47.8828),
+    }
+
+    def __init__(self, config):
+        # Nomes mais longos primeiro: "Jardim América" antes de "América"
+        self.locais = sorted(
+            ((normalizar_nome(nome), coordenada) for nome, coordenada in self.LOCAIS.items()),
+            key=lambda local: len(local[0]),
+            reverse=True,
+        )
+
+    def geocode(self, endereco):
+        endereco = f" {normalizar_nome(endereco)} "
+        for nome, coordenada in self.locais:
+            if f" {nome} " in endereco:
+                return coordenada
+        return None
+
+
+class NullGeocoder:
+    """
+    Sem geocodificação: as coordenadas vêm só da entrada manual.
+    """
+
+    def __init__(self, config):
+        pass
+
+    def geocode(self, endereco):
+        return None
+
+
+GEOCODERS = {
+    "offline": OfflineGeocoder,
+    "nenhum": NullGeocoder,
+}
+
+
+def get_geocoder():
+    """
+    Retorna o geocodificador configurado em GEOCODER, criado uma vez por aplicação.
+    """
+    app = current_app._get_current_object()
+
+    if "geocoder" not in app.extensions:
+        backend = app.config["GEOCODER"]
+
+        if backend not in GEOCODERS:
+            raise ValueError(f"GEOCODER inválido: {backend!r}")
+
+        app.extensions["geocoder"] = GEOCODERS[backend](app.config)
+
+    return app.extensions["geocoder"]
+
+
+def parse_coordenada(latitude, longitude):
+    """
+    Valida latitude e longitude (graus decimais). Lança ValidationError se forem inválidas.
+    """
+    try:
+        latitude, longitude = float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        raise ValidationError("latitude e longitude devem ser números (graus decimais).", "latitude")
+
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValidationError("latitude deve estar entre -90 e 90 e longitude entre -180 e 180.", "latitude")
+
+    return latitude, longitude
+
+
+def aplicar_localizacao(registro, data: dict, endereco: str, endereco_alterado: bool = True):
+    """
+    Preenche latitude/longitude do registro: com os valores enviados em `data` (null
+    apaga a coordenada) ou, sem eles, geocodificando o endereço quando ele muda.
+    """
+    if "latitude" in data or "longitude" in data:
+        if data.get("latitude") is None and data.get("longitude") is None:
+            registro.latitude, registro.longitude = None, None
+        else:
+            registro.latitude, registro.longitude = parse_coordenada(data.get("latitude"), data.get("longitude"))
+
+    elif endereco_alterado:
+        registro.latitude, registro.longitude = get_geocoder().geocode(endereco) or (None, None)
@@ -0,0 +1,256 @@
+import base64
+import hashlib
+import json
+import logging
+import random
+from datetime import timedelta
+from functools import wraps
+
+from flask import current_app, jsonify, make_response, request
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+
+from backend.db import db
+from backend.external.model import IdempotenciaModel
+from backend.utils.auth import usuario_atual
+from backend.utils.utils import agora_utc
+
+logger = logging.getLogger(__name__)
+
+PROCESSANDO = "processando"
+CONCLUIDO = "concluido"
+
+# Cabeçalhos da resposta original repetidos nas respostas guardadas
+HEADERS_GUARDADOS = ("Content-Type", "ETag", "Location")
+
+
+class DatabaseIdempotencyStore:
+    """
+    Respostas guardadas na tabela tab_idempotencia. A reserva da chave é um INSERT (ou um
+    UPDATE condicional de uma reserva vencida), então duas requisições com a mesma chave
+    nunca executam a criação ao mesmo tempo.
+    """
+
+    # Fração das reservas que também apaga um lote de registros vencidos
+    LIMPEZA_CHANCE = 0.01
+    LIMPEZA_LOTE = 1000
+
+    def __init__(self, config):
+        self.ttl = timedelta(seconds=config["IDEMPOTENCIA_TTL_SEGUNDOS"])
+        self.reserva = timedelta(seconds=config["IDEMPOTENCIA_RESERVA_SEGUNDOS"])
+
+    def reserve(self, chave: str, fingerprint: str):
+        """
+        Reserva a chave para esta requisição. Retorna None quando reservada, ou o registro
+        existente (fingerprint, status e resposta guardada).
+        """
+        agora = agora_utc()
+
+        if random.random() < self.LIMPEZA_CHANCE:
+            self._limpar(agora)
+
+        try:
+            db.session.add(IdempotenciaModel(
+                chave=chave, fingerprint=fingerprint, status=PROCESSANDO, criado_em=agora, expira_em=agora + self.reserva
+            ))
+            db.session.commit()
+            return None
+        except IntegrityError:
+            db.session.rollback()
+
+        # Registro vencido (ou reserva abandonada) é assumido por esta requisição
+        assumido = db.session.execute(
+            update(IdempotenciaModel)
+            .where(IdempotenciaModel.chave == chave, IdempotenciaModel.expira_em <= agora)
+            .values(
+                fingerprint=fingerprint, status=PROCESSANDO, status_code=None, corpo=None, headers=None,
+                criado_em=agora, expira_em=agora + self.reserva,
+            )
+        ).rowcount
+        db.session.commit()
+
+        if assumido:
+            return None
+
+        registro = db.session.get(IdempotenciaModel, chave)
+        return {
+            "fingerprint": registro.fingerprint,
+            "status": registro.status,
+            "status_code": registro.status_code,
+            "corpo": registro.corpo,
+            "headers": registro.headers,
+        }
+
+    def complete(self, chave: str, fingerprint: str, status_code: int, corpo: bytes, headers: dict):
+        db.session.rollback()
+        db.session.execute(
+            update(IdempotenciaModel)
+            .where(IdempotenciaModel.chave == chave)
+            .values(status=CONCLUIDO, status_code=status_code, corpo=corpo, headers=headers, expira_em=agora_utc() + self.ttl)
+        )
+        db.session.commit()
+
+    def release(self, chave: str):
+        db.session.rollback()
+        db.session.execute(
+            delete(IdempotenciaModel).where(IdempotenciaModel.chave == chave, IdempotenciaModel.status == PROCESSANDO)
+        )
+        db.session.commit()
+
+    def _limpar(self, agora):
+        vencidos = select(IdempotenciaModel.chave).where(IdempotenciaModel.expira_em <= agora).limit(self.LIMPEZA_LOTE)
+        db.session.execute(delete(IdempotenciaModel).where(IdempotenciaModel.chave.in_(vencidos)))
+        db.session.commit()
+
+
+class RedisIdempotencyStore:
+    """
+    Respostas guardadas no Redis em `idempotencia:<chave>`, com expiração do próprio Redis.
+    A reserva é um SET NX com prazo curto, trocado pela resposta (com TTL longo) no fim.
+    """
+
+    PREFIXO = "idempotencia:"
+
+    def __init__(self, config):
+        # Importado só quando o backend Redis está em uso
+        import redis
+
+        self.redis = redis.Redis.from_url(config["REDIS_URL"], decode_responses=True)
+        self.ttl = config["IDEMPOTENCIA_TTL_SEGUNDOS"]
+        self.reserva = config["IDEMPOTENCIA_RESERVA_SEGUNDOS"]
+
+    def _key(self, chave: str) -> str:
+        return f"{self.PREFIXO}{chave}"
+
+    def reserve(self, chave: str, fingerprint: str):
+        reserva = json.dumps({"fingerprint": fingerprint, "status": PROCESSANDO})
+        if self.redis.set(self._key(chave), reserva, nx=True, ex=self.reserva):
+            return None
+
+        valor = self.redis.get(self._key(chave))
+        if valor is None:
+            # Expirou entre os dois comandos
+            return self.reserve(chave, fingerprint)
+
+        registro = json.loads(valor)
+        if registro.get("corpo") is not None:
+            registro["corpo"] = base64.b64decode(registro["corpo"])
+        return registro
+
+    def complete(self, chave: str, fingerprint: str, status_code: int, corpo: bytes, headers: dict):
+        self.redis.set(
+            self._key(chave),
+            json.dumps({
+                "fingerprint": fingerprint,
+                "status": CONCLUIDO,
+                "status_code": status_code,
+                "corpo": base64.b64encode(corpo).decode(),
+                "headers": headers,
+            }),
+            ex=self.ttl,
+        )
+
+    def release(self, chave: str):
+        self.redis.delete(self._key(chave))
+
+
+IDEMPOTENCY_STORES = {
+    "database": DatabaseIdempotencyStore,
+    "redis": RedisIdempotencyStore,
+}
+
+
+def get_store():
+    """
+    Retorna o armazenamento configurado em IDEMPOTENCIA_BACKEND, criado uma vez por aplicação.
+    """
+    app = current_app._get_current_object()
+
+    if "idempotencia" not in app.extensions:
+        backend = app.config["IDEMPOTENCIA_BACKEND"]
+
+        if backend not in IDEMPOTENCY_STORES:
+            raise ValueError(f"IDEMPOTENCIA_BACKEND inválido: {backend!r}")
+
+        app.extensions["idempotencia"] = IDEMPOTENCY_STORES[backend](app.config)
+
+    return app.extensions["idempotencia"]
+
+
+def _fingerprint() -> str:
+    # Mesma rota, mesma query string e mesmo corpo
+    digest = hashlib.sha256()
+    digest.update(f"{request.method} {request.full_path}\n".encode())
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+def _replay(registro: dict):
+    response = make_response(registro["corpo"] or b"", registro["status_code"])
+    for header, valor in (registro["headers"] or {}).items():
+        response.headers[header] = valor
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+def idempotent(f):
+    """
+    Suporte ao cabeçalho Idempotency-Key em rotas de criação. A primeira requisição com a
+    chave executa a rota e a resposta fica guardada por IDEMPOTENCIA_TTL_SEGUNDOS; as
+    repetições (mesma chave, mesmo usuário e mesmo corpo) recebem a resposta guardada sem
+    executar a rota. Sem o cabeçalho, a rota funciona como antes.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        chave_cliente = request.headers.get("Idempotency-Key")
+
+        if not chave_cliente:
+            return f(*args, **kwargs)
+
+        if len(chave_cliente) > 255:
+            return jsonify({"message": "Idempotency-Key deve ter no máximo 255 caracteres."}), 400
+
+        # A chave vale por usuário (ou cliente anônimo) e por rota
+        chave = hashlib.sha256(f"{usuario_atual() or ''}|{request.endpoint}|{chave_cliente}".encode()).hexdigest()
+        fingerprint = _fingerprint()
+
+        try:
+            store = get_store()
+            registro = store.reserve(chave, fingerprint)
+        except Exception as e:
+            # Sem o armazenamento, a requisição segue sem proteção contra repetição
+            db.session.rollback()
+            logger.warning(f"Erro ao consultar a Idempotency-Key: {str(e)}")
+            return f(*args, **kwargs)
+
+        if registro is not None:
+            if registro["fingerprint"] != fingerprint:
+                return jsonify({"message": "Idempotency-Key já usada com outra requisição."}), 422
+
+            if registro["status"] == PROCESSANDO:
+                response = jsonify({"message": "Requisição com esta Idempotency-Key ainda em andamento."})
+                response.status_code = 409
+                response.headers["Retry-After"] = "1"
+                return response
+
+            return _replay(registro)
+
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            store.release(chave)
+            raise
+
+        try:
+            # Erros do servidor e conflitos temporários liberam a chave para uma nova tentativa
+            if response.status_code >= 500 or response.status_code in (409, 429) or response.is_streamed:
+                store.release(chave)
+            else:
+                headers = {header: response.headers[header] for header in HEADERS_GUARDADOS if header in response.headers}
+                store.complete(chave, fingerprint, response.status_code, response.get_data(), headers)
+        except Exception as e:
+            logger.warning(f"Erro ao guardar a resposta da Idempotency-Key: {str(e)}")
+
+        return response
+
+    return decorated
@@ -0,0 +1,458 @@
+import json
+import logging
+import os
+import threading
+import traceback
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from marshmallow import ValidationError
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from backend.db import db
+from backend.external.model import JobModel
+
+logger = logging.getLogger(__name__)
+
+PENDENTE = "pendente"
+EXECUTANDO = "executando"
+CONCLUIDO = "concluido"
+FALHOU = "falhou"
+
+# Funções executadas pelos workers, registradas com @job_task
+TASKS = {}
+
+
+def job_task(nome: str):
+    """
+    Registra a função como tarefa de segundo plano. A função recebe o payload
+    enviado no `enqueue` e o valor retornado (serializável em JSON) vira o resultado do job.
+    """
+    def decorator(func):
+        TASKS[nome] = func
+        return func
+
+    return decorator
+
+
+def _agora() -> datetime:
+    # Datas dos jobs são gravadas em UTC, sem fuso
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class DatabaseJobQueue:
+    """
+    Fila guardada na tabela tab_job do banco da aplicação. Substitui o Redis em
+    execuções locais (SQLite) e não exige nenhum serviço extra. Jobs finalizados ficam
+    sem o payload e são apagados por `purge` depois de JOBS_TTL_SEGUNDOS.
+    """
+
+    def __init__(self, config):
+        self.timeout = timedelta(seconds=config["JOBS_TIMEOUT_SEGUNDOS"])
+        self.ttl = timedelta(seconds=config["JOBS_TTL_SEGUNDOS"])
+
+    def enqueue(self, job: JobModel):
+        if job.chave_unica is not None:
+            pendente = self._pendente(job.chave_unica)
+            if pendente is not None:
+                return pendente
+
+        # Só um flush, dentro de um savepoint: o job é gravado no commit de quem chamou, junto
+        # com o resto da transação, e um conflito de chave única não desfaz o que já estava nela
+        try:
+            with db.session.begin_nested():
+                db.session.add(job)
+        except IntegrityError:
+            if job.chave_unica is None:
+                raise
+
+            # Outro processo criou ao mesmo tempo o job pendente da mesma chave (índice único parcial)
+            return self._pendente(job.chave_unica)
+
+        return job
+
+    def _pendente(self, chave_unica: str):
+        return JobModel.query.filter_by(chave_unica=chave_unica, status=PENDENTE).first()
+
+    def get(self, job_id: str):
+        return JobModel.query.get(job_id)
+
+    def claim(self):
+        """
+        Reserva o próximo job disponível. A reserva é um UPDATE condicional, então
+        dois workers nunca executam o mesmo job.
+        """
+        agora = _agora()
+        disponivel = or_(
+            and_(JobModel.status == PENDENTE, JobModel.disponivel_em <= agora),
+            and_(JobModel.status == EXECUTANDO, JobModel.iniciado_em < agora - self.timeout),
+        )
+
+        candidatos = db.session.execute(
+            db.select(JobModel.job_id).where(disponivel).order_by(JobModel.disponivel_em).limit(10)
+        ).scalars().all()
+
+        for job_id in candidatos:
+            reservado = db.session.execute(
+                update(JobModel)
+                .where(JobModel.job_id == job_id, disponivel)
+                .values(status=EXECUTANDO, iniciado_em=agora, tentativas=JobModel.tentativas + 1)
+            ).rowcount
+            db.session.commit()
+
+            if reservado:
+                return JobModel.query.get(job_id)
+
+        return None
+
+    def complete(self, job: JobModel, resultado):
+        job.status = CONCLUIDO
+        job.resultado = json.dumps(resultado)
+        job.concluido_em = _agora()
+        # O payload (ex.: a foto em base64) não é mais necessário
+        job.payload = "{}"
+        db.session.commit()
+
+    def fail(self, job: JobModel, erro: str, nova_tentativa_em=None):
+        job.erro = erro
+
+        # Já existe outro job pendente da mesma chave, que faz o mesmo trabalho
+        if nova_tentativa_em and job.chave_unica is not None and self._pendente(job.chave_unica) is not None:
+            nova_tentativa_em = None
+
+        if nova_tentativa_em:
+            job.status = PENDENTE
+            job.disponivel_em = nova_tentativa_em
+        else:
+            job.status = FALHOU
+            job.concluido_em = _agora()
+            job.payload = "{}"
+
+        db.session.commit()
+
+    def purge(self, lote: int) -> int:
+        """
+        Apaga, em lotes de `lote` linhas, os jobs finalizados há mais de JOBS_TTL_SEGUNDOS.
+        """
+        limite = _agora() - self.ttl
+        total = 0
+
+        while True:
+            ids = select(JobModel.job_id).where(
+                JobModel.status.in_([CONCLUIDO, FALHOU]), JobModel.concluido_em < limite
+            ).limit(lote)
+            apagados = db.session.execute(
+                delete(JobModel).where(JobModel.job_id.in_(ids)).execution_options(synchronize_session=False)
+            ).rowcount
+            db.session.commit()
+            total += apagados
+
+            if apagados < lote:
+                return total
+
+
+class RedisJobQueue:
+    """
+    Fila no Redis. Cada job é um hash `jobs:<id>`; `jobs:fila` ordena os pendentes pelo
+    horário em que ficam disponíveis e `jobs:executando` guarda o prazo de cada reserva.
+    `jobs:unico:<chave>` aponta para o job pendente de cada chave única.
+    """
+
+    PREFIXO = "jobs:"
+    FILA = "jobs:fila"
+    EXECUTANDO = "jobs:executando"
+    UNICOS = "jobs:unico:"
+
+    # Cria o job, a menos que já exista um pendente com a mesma chave única (devolve o id dele)
+    ENQUEUE_SCRIPT = """
+    if ARGV[3] == '1' then
+        local existente = redis.call('GET', KEYS[3])
+        if existente then
+            return existente
+        end
+        redis.call('SET', KEYS[3], ARGV[1])
+    end
+    redis.call('HSET', KEYS[2], unpack(ARGV, 4))
+    redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+    return ARGV[1]
+    """
+
+    # Devolve à fila as reservas vencidas e reserva o próximo job disponível, de forma atômica
+    CLAIM_SCRIPT = """
+    local agora = tonumber(ARGV[1])
+    for _, id in ipairs(redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', agora)) do
+        redis.call('ZREM', KEYS[2], id)
+        redis.call('ZADD', KEYS[1], agora, id)
+    end
+    local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', agora, 'LIMIT', 0, 1)
+    if #ids == 0 then
+        return false
+    end
+    local id = ids[1]
+    redis.call('ZREM', KEYS[1], id)
+    redis.call('ZADD', KEYS[2], agora + tonumber(ARGV[2]), id)
+    redis.call('HINCRBY', ARGV[3] .. id, 'tentativas', 1)
+    redis.call('HSET', ARGV[3] .. id, 'status', 'executando', 'iniciado_em', ARGV[4])
+    local chave = redis.call('HGET', ARGV[3] .. id, 'chave_unica')
+    if chave and redis.call('GET', ARGV[5] .. chave) == id then
+        redis.call('DEL', ARGV[5] .. chave)
+    end
+    return id
+    """
+
+    def __init__(self, config):
+        # Importado só quando o backend Redis está em uso
+        import redis
+
+        self.redis = redis.Redis.from_url(config["REDIS_URL"], decode_responses=True)
+        self.timeout = config["JOBS_TIMEOUT_SEGUNDOS"]
+        self.ttl = config["JOBS_TTL_SEGUNDOS"]
+        self.claim_script = self.redis.register_script(self.CLAIM_SCRIPT)
+        self.enqueue_script = self.redis.register_script(self.ENQUEUE_SCRIPT)
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.PREFIXO}{job_id}"
+
+    def _unico(self, chave_unica: str) -> str:
+        return f"{self.UNICOS}{chave_unica}"
+
+    def enqueue(self, job: JobModel):
+        campos = {
+            "job_id": job.job_id,
+            "nome": job.nome,
+            "payload": job.payload,
+            "status": job.status,
+            "tentativas": job.tentativas,
+            "max_tentativas": job.max_tentativas,
+            "criado_em": job.criado_em.isoformat(),
+            "disponivel_em": job.disponivel_em.isoformat(),
+        }
+        if job.chave_unica is not None:
+            campos["chave_unica"] = job.chave_unica
+
+        job_id = self.enqueue_script(
+            keys=[self.FILA, self._key(job.job_id), self._unico(job.chave_unica or "")],
+            args=[
+                job.job_id,
+                job.disponivel_em.replace(tzinfo=timezone.utc).timestamp(),
+                "1" if job.chave_unica is not None else "0",
+                *(item for campo in campos.items() for item in campo),
+            ],
+        )
+
+        return job if job_id == job.job_id else self.get(job_id)
+
+    def get(self, job_id: str):
+        dados = self.redis.hgetall(self._key(job_id))
+
+        if not dados:
+            return None
+
+        for campo in ("criado_em", "disponivel_em", "iniciado_em", "concluido_em"):
+            if dados.get(campo):
+                dados[campo] = datetime.fromisoformat(dados[campo])
+
+        dados["tentativas"] = int(dados["tentativas"])
+        dados["max_tentativas"] = int(dados["max_tentativas"])
+
+        # Instância transitória, nunca adicionada à sessão do banco
+        return JobModel(**dados)
+
+    def claim(self):
+        agora = _agora()
+        job_id = self.claim_script(
+            keys=[self.FILA, self.EXECUTANDO],
+            args=[
+                agora.replace(tzinfo=timezone.utc).timestamp(), self.timeout, self.PREFIXO, agora.isoformat(), self.UNICOS
+            ],
+        )
+
+        return self.get(job_id) if job_id else None
+
+    def _finalizar(self, pipe, job: JobModel, campos: dict):
+        pipe.hset(self._key(job.job_id), mapping=campos)
+        pipe.zrem(self.EXECUTANDO, job.job_id)
+        pipe.expire(self._key(job.job_id), self.ttl)
+
+    def complete(self, job: JobModel, resultado):
+        pipe = self.redis.pipeline()
+        self._finalizar(
+            pipe, job, {"status": CONCLUIDO, "resultado": json.dumps(resultado), "concluido_em": _agora().isoformat()}
+        )
+        pipe.execute()
+
+    def purge(self, lote: int) -> int:
+        # Jobs finalizados expiram sozinhos (JOBS_TTL_SEGUNDOS)
+        return 0
+
+    def fail(self, job: JobModel, erro: str, nova_tentativa_em=None):
+        # Já existe outro job pendente da mesma chave, que faz o mesmo trabalho
+        if nova_tentativa_em and job.chave_unica is not None:
+            if not self.redis.set(self._unico(job.chave_unica), job.job_id, nx=True):
+                nova_tentativa_em = None
+
+        pipe = self.redis.pipeline()
+
+        if nova_tentativa_em:
+            pipe.hset(
+                self._key(job.job_id),
+                mapping={"status": PENDENTE, "erro": erro, "disponivel_em": nova_tentativa_em.isoformat()},
+            )
+            pipe.zrem(self.EXECUTANDO, job.job_id)
+            pipe.zadd(self.FILA, {job.job_id: nova_tentativa_em.replace(tzinfo=timezone.utc).timestamp()})
+        else:
+            self._finalizar(pipe, job, {"status": FALHOU, "erro": erro, "concluido_em": _agora().isoformat()})
+
+        pipe.execute()
+
+
+QUEUE_BACKENDS = {
+    "database": DatabaseJobQueue,
+    "redis": RedisJobQueue,
+}
+
+
+def get_queue():
+    """
+    Retorna a fila configurada em JOBS_BACKEND, criada uma vez por aplicação.
+    """
+    app = current_app._get_current_object()
+
+    if "jobs" not in app.extensions:
+        backend = app.config["JOBS_BACKEND"]
+
+        if backend not in QUEUE_BACKENDS:
+            raise ValueError(f"JOBS_BACKEND inválido: {backend!r}")
+
+        app.extensions["jobs"] = QUEUE_BACKENDS[backend](app.config)
+
+    return app.extensions["jobs"]
+
+
+def enqueue(nome: str, payload: dict, max_tentativas=None, atraso_segundos: int = 0, chave_unica=None) -> JobModel:
+    """
+    Coloca uma tarefa registrada com @job_task na fila e retorna o job criado. Com
+    `atraso_segundos`, o job só fica disponível para os workers depois desse tempo. Com
+    `chave_unica`, se já houver um job pendente com a mesma chave, ele é retornado e
+    nenhum outro é criado. No backend "database" o job entra na transação da sessão e
+    só vai para a fila no commit de quem chamou.
+    """
+    if nome not in TASKS:
+        raise ValueError(f"Tarefa de segundo plano desconhecida: {nome!r}")
+
+    agora = _agora()
+    job = JobModel(
+        job_id=uuid.uuid4().hex,
+        nome=nome,
+        payload=json.dumps(payload),
+        status=PENDENTE,
+        max_tentativas=max_tentativas or current_app.config["JOBS_MAX_TENTATIVAS"],
+        criado_em=agora,
+        disponivel_em=agora + timedelta(seconds=atraso_segundos),
+        chave_unica=chave_unica,
+    )
+
+    job = get_queue().enqueue(job)
+
+    if current_app.config["JOBS_WORKER_INPROCESS"]:
+        start_inprocess_worker(current_app._get_current_object())
+
+    return job
+
+
+def purge_jobs(lote=None) -> int:
+    """
+    Apaga os jobs finalizados há mais de JOBS_TTL_SEGUNDOS da fila configurada e
+    retorna a quantidade apagada. No Redis eles já expiram sozinhos.
+    """
+    lote = current_app.config["LIXEIRA_LOTE"] if lote is None else lote
+    if lote < 1:
+        raise ValueError(f"O lote precisa ser de ao menos 1 registro (recebido: {lote}).")
+
+    return get_queue().purge(lote)
+
+
+def process_next_job(queue) -> bool:
+    """
+    Executa o próximo job disponível. Retorna False quando a fila está vazia.
+    """
+    job = queue.claim()
+
+    if job is None:
+        return False
+
+    # Reserva vencida de um job que já esgotou as tentativas
+    if job.tentativas > job.max_tentativas:
+        queue.fail(job, "Tempo limite de execução excedido.")
+        return True
+
+    try:
+        task = TASKS.get(job.nome)
+        if task is None:
+            raise LookupError(f"Tarefa de segundo plano desconhecida: {job.nome!r}")
+
+        resultado = task(json.loads(job.payload))
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Erro ao executar o job {job.job_id} ({job.nome}): {str(e)}\n{traceback.format_exc()}")
+
+        # Dados inválidos não melhoram com uma nova tentativa
+        nova_tentativa_em = None
+        if job.tentativas < job.max_tentativas and not isinstance(e, ValidationError):
+            espera = current_app.config["JOBS_BACKOFF_SEGUNDOS"] * 2 ** (job.tentativas - 1)
+            nova_tentativa_em = _agora() + timedelta(seconds=espera)
+
+        queue.fail(job, str(e), nova_tentativa_em)
+        return True
+
+    queue.complete(job, resultado)
+    return True
+
+
+def run_worker(app, parar: threading.Event, intervalo: float = 1.0):
+    """
+    Laço do worker: executa jobs até `parar` ser sinalizado, aguardando `intervalo`
+    segundos sempre que a fila estiver vazia.
+    """
+    with app.app_context():
+        queue = get_queue()
+        logger.info(f"Worker de jobs iniciado (pid {os.getpid()}, backend {app.config['JOBS_BACKEND']}).")
+
+        while not parar.is_set():
+            try:
+                processou = process_next_job(queue)
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Erro no worker de jobs: {str(e)}")
+                processou = False
+            finally:
+                db.session.remove()
+
+            if not processou:
+                parar.wait(intervalo)
+
+        logger.info(f"Worker de jobs finalizado (pid {os.getpid()}).")
+
+
+_inprocess_lock = threading.Lock()
+_inprocess_pid = None
+
+
+def start_inprocess_worker(app):
+    """
+    Inicia, uma única vez por processo, uma thread que processa os jobs em segundo plano.
+    """
+    global _inprocess_pid
+
+    with _inprocess_lock:
+        if _inprocess_pid == os.getpid():
+            return
+
+        thread = threading.Thread(
+            target=run_worker, args=(app, threading.Event()), name="jobs-worker", daemon=True
+        )
+        thread.start()
+        _inprocess_pid = os.getpid()
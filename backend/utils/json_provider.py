@@ -0,0 +1,168 @@
+import dataclasses
+import decimal
+import json
+import logging
+import uuid
+from datetime import date, time
+
+from flask.json.provider import DefaultJSONProvider
+
+# orjson e msgspec são opcionais: sem eles, a aplicação usa o módulo json da biblioteca padrão
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+logger = logging.getLogger(__name__)
+
+
+def _default(o):
+    """
+    Tipos não suportados pelo módulo json. Datas saem em ISO 8601 e Decimal como
+    string (sem perda de precisão), o mesmo formato gerado pelo orjson e pelo msgspec.
+    """
+    if isinstance(o, (date, time)):
+        return o.isoformat()
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+
+    raise TypeError(f"Objeto do tipo {type(o).__name__} não é serializável em JSON")
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """
+    Provider com o módulo json da biblioteca padrão, usado quando nem orjson nem msgspec
+    estão instalados. Gera a mesma saída dos demais: chaves ordenadas, UTF-8 sem escapes
+    e datas em ISO 8601 (o provider padrão do Flask usa o formato de data HTTP).
+    """
+
+    default = staticmethod(_default)
+    ensure_ascii = False
+
+    def _indent(self) -> bool:
+        return (self.compact is None and self._app.debug) or self.compact is False
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj, self._indent()), mimetype=self.mimetype)
+
+    def dumps_bytes(self, obj, indent: bool = False) -> bytes:
+        """
+        Corpo da resposta já codificado, com a quebra de linha final que o Flask adiciona.
+        """
+        if indent:
+            body = self.dumps(obj, indent=2)
+        else:
+            body = self.dumps(obj, separators=(",", ":"))
+
+        return f"{body}\n".encode()
+
+
+class OrjsonProvider(StdlibJSONProvider):
+    """
+    Provider com orjson, que serializa datetime, date, UUID e dataclasses nativamente
+    e escreve direto em bytes, sem a etapa intermediária de str.
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+
+        self.options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            self.options |= orjson.OPT_SORT_KEYS
+
+    def dumps(self, obj, **kwargs) -> str:
+        # Argumentos do módulo json (ex.: indent, cls) só existem no provider da biblioteca padrão
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+
+        return orjson.dumps(obj, default=self.default, option=self.options).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+
+        return orjson.loads(s)
+
+    def dumps_bytes(self, obj, indent: bool = False) -> bytes:
+        options = self.options | orjson.OPT_APPEND_NEWLINE
+        if indent:
+            options |= orjson.OPT_INDENT_2
+
+        return orjson.dumps(obj, default=self.default, option=options)
+
+
+class MsgspecProvider(StdlibJSONProvider):
+    """
+    Provider com msgspec, que serializa datetime, date, Decimal, UUID e dataclasses nativamente.
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+
+        self.encoder = msgspec.json.Encoder(
+            enc_hook=self.default, decimal_format="string", order="sorted" if self.sort_keys else None
+        )
+        self.decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj, **kwargs) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+
+        return self.encoder.encode(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+
+        return self.decoder.decode(s)
+
+    def dumps_bytes(self, obj, indent: bool = False) -> bytes:
+        body = self.encoder.encode(obj)
+
+        if indent:
+            body = msgspec.json.format(body, indent=2)
+
+        return body + b"\n"
+
+
+JSON_PROVIDERS = {
+    "orjson": (OrjsonProvider, orjson),
+    "msgspec": (MsgspecProvider, msgspec),
+    "stdlib": (StdlibJSONProvider, json),
+}
+
+
+def get_json_provider_class(nome: str):
+    """
+    Classe do provider configurado em JSON_PROVIDER. "auto" escolhe o primeiro
+    instalado entre orjson e msgspec; sem nenhum deles, usa a biblioteca padrão.
+    """
+    if nome == "auto":
+        for provider_class, module in JSON_PROVIDERS.values():
+            if module is not None:
+                return provider_class
+
+    if nome not in JSON_PROVIDERS:
+        raise ValueError(f"JSON_PROVIDER inválido: {nome!r}")
+
+    provider_class, module = JSON_PROVIDERS[nome]
+
+    if module is None:
+        logger.warning(f"JSON_PROVIDER={nome} não está instalado; usando o módulo json da biblioteca padrão.")
+        return StdlibJSONProvider
+
+    return provider_class
+
+
+def init_json_provider(app):
+    app.json = get_json_provider_class(app.config["JSON_PROVIDER"])(app)
@@ -0,0 +1,94 @@
+from functools import lru_cache
+
+from flask import request
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+
+
+def get_fields():
+    """
+    Lê o parâmetro `fields` da requisição (ex.: `?fields=animal_id,nome,status`).
+    Retorna None quando o parâmetro não foi enviado, ou seja, todos os campos.
+    """
+    value = request.args.get("fields")
+
+    if value is None:
+        return None
+
+    # Remove espaços e repetições mantendo a ordem pedida
+    return tuple(dict.fromkeys(field.strip() for field in value.split(",") if field.strip()))
+
+
+@lru_cache(maxsize=64)
+def _campos_permitidos(model, schema_class):
+    # Campos serializados pelo schema que são colunas do modelo, na ordem do schema
+    columns = inspect(model).column_attrs
+    return tuple(field for field in schema_class().dump_fields if field in columns)
+
+
+def validate_fields(model, schema_class, fields, extras=()):
+    """
+    Retorna a resposta de erro dos serviços quando `fields` tem campos que não são, ao
+    mesmo tempo, do schema e colunas do modelo (ou de `extras`, campos calculados pelo
+    serviço), ou None se estiver tudo certo.
+    """
+    if fields is None:
+        return None
+
+    allowed = list(_campos_permitidos(model, schema_class)) + list(extras)
+
+    if not fields:
+        return {"status": 400, "message": f"Informe ao menos um campo em `fields`. Use: {', '.join(allowed)}."}
+
+    invalid = [field for field in fields if field not in allowed]
+
+    if invalid:
+        return {
+            "status": 400,
+            "message": f"Campos inválidos em `fields`: {', '.join(invalid)}. Use: {', '.join(allowed)}.",
+        }
+
+    return None
+
+
+def load_only_fields(model, fields):
+    """
+    Opção `load_only` com as colunas dos campos pedidos, para que colunas grandes não
+    pedidas (ex.: `foto`) nem sejam lidas do banco. A chave primária é sempre carregada.
+    """
+    mapper = inspect(model)
+    attributes = [getattr(model, field) for field in fields if field in mapper.column_attrs]
+
+    if not attributes:
+        attributes = [mapper.get_property_by_column(column).class_attribute for column in mapper.primary_key]
+
+    return load_only(*attributes)
+
+
+def query_fields(model, fields):
+    """
+    `model.query` restrito às colunas dos campos pedidos, quando há `fields`.
+    """
+    if fields is None:
+        return model.query
+
+    return model.query.options(load_only_fields(model, fields))
+
+
+@lru_cache(maxsize=256)
+def _schema(schema_class, fields, many):
+    return schema_class(only=fields, many=many)
+
+
+def serialize_fields(obj, schema_class, fields, many=False):
+    """
+    Serializa o registro (ou a lista, com `many=True`) apenas com os campos pedidos.
+    Sem `fields`, usa a serialização completa do modelo.
+    """
+    if fields is None:
+        return [item.serialize for item in obj] if many else obj.serialize
+
+    # Campos calculados pelo serviço (extras) não pertencem ao schema
+    only = tuple(field for field in fields if field in schema_class._declared_fields)
+
+    return _schema(schema_class, only, many).dump(obj)
@@ -0,0 +1,252 @@
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from flask import g, jsonify, request
+
+from backend.utils.auth import usuario_atual
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBucketStore:
+    """
+    Baldes de tokens guardados no próprio processo. Sem serviço extra, mas com vários
+    workers do Gunicorn cada um tem os seus baldes (o limite efetivo é multiplicado
+    pelo número de workers); use o backend Redis nesses casos.
+    """
+
+    # Acima disso, os baldes usados há mais tempo são descartados (como se estivessem cheios)
+    MAX_BALDES = 100_000
+
+    def __init__(self, config):
+        # Ordem de uso: o primeiro é o balde consultado há mais tempo
+        self.baldes = OrderedDict()
+        self.contadores = {}
+        self.lock = threading.Lock()
+
+    def consume(self, chave: str, capacidade: float, taxa: float, custo: float, endpoint: str):
+        """
+        Retira `custo` tokens do balde. Retorna (permitido, tokens restantes, segundos até
+        haver tokens suficientes).
+        """
+        agora = time.monotonic()
+
+        with self.lock:
+            tokens, ultimo, _, _ = self.baldes.get(chave, (capacidade, agora, capacidade, taxa))
+            tokens = min(capacidade, tokens + (agora - ultimo) * taxa)
+
+            permitido = tokens >= custo
+            if permitido:
+                tokens -= custo
+
+            self.baldes[chave] = (tokens, agora, capacidade, taxa)
+            self.baldes.move_to_end(chave)
+            self._contar(endpoint, permitido, custo)
+
+            if len(self.baldes) > self.MAX_BALDES:
+                self.baldes.popitem(last=False)
+
+        espera = 0 if permitido else (custo - tokens) / taxa
+        return permitido, tokens, espera
+
+    def _contar(self, endpoint: str, permitido: bool, custo: float):
+        contador = self.contadores.setdefault(endpoint, {"permitidas": 0, "bloqueadas": 0, "custo": 0})
+        if permitido:
+            contador["permitidas"] += 1
+            contador["custo"] += custo
+        else:
+            contador["bloqueadas"] += 1
+
+    def counters(self) -> dict:
+        with self.lock:
+            return {endpoint: dict(contador) for endpoint, contador in self.contadores.items()}
+
+
+class RedisBucketStore:
+    """
+    Baldes de tokens no Redis (`ratelimit:<balde>:<cliente>`), compartilhados por todos os
+    workers. Cada requisição é um único script Lua, que também atualiza os contadores
+    (`ratelimit:contadores`).
+    """
+
+    PREFIXO = "ratelimit:"
+    CONTADORES = "ratelimit:contadores"
+
+    # Reabastece, consome e conta de forma atômica; a chave expira quando o balde enche
+    CONSUME_SCRIPT = """
+    local capacidade = tonumber(ARGV[1])
+    local taxa = tonumber(ARGV[2])
+    local custo = tonumber(ARGV[3])
+    local tempo = redis.call('TIME')
+    local agora = tonumber(tempo[1]) + tonumber(tempo[2]) / 1000000
+
+    local balde = redis.call('HMGET', KEYS[1], 'tokens', 'ultimo')
+    local tokens = tonumber(balde[1]) or capacidade
+    local ultimo = tonumber(balde[2]) or agora
+    tokens = math.min(capacidade, tokens + (agora - ultimo) * taxa)
+
+    local permitido = 0
+    if tokens >= custo then
+        tokens = tokens - custo
+        permitido = 1
+        redis.call('HINCRBY', KEYS[2], ARGV[4] .. ':permitidas', 1)
+        redis.call('HINCRBYFLOAT', KEYS[2], ARGV[4] .. ':custo', custo)
+    else
+        redis.call('HINCRBY', KEYS[2], ARGV[4] .. ':bloqueadas', 1)
+    end
+
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ultimo', agora)
+    redis.call('PEXPIRE', KEYS[1], math.ceil((capacidade - tokens) / taxa * 1000) + 1000)
+    return {permitido, tostring(tokens)}
+    """
+
+    def __init__(self, config):
+        # Importado só quando o backend Redis está em uso
+        import redis
+
+        self.redis = redis.Redis.from_url(config["REDIS_URL"], decode_responses=True)
+        self.consume_script = self.redis.register_script(self.CONSUME_SCRIPT)
+
+    def consume(self, chave: str, capacidade: float, taxa: float, custo: float, endpoint: str):
+        permitido, tokens = self.consume_script(
+            keys=[f"{self.PREFIXO}{chave}", self.CONTADORES], args=[capacidade, taxa, custo, endpoint]
+        )
+        tokens = float(tokens)
+
+        espera = 0 if permitido else (custo - tokens) / taxa
+        return bool(permitido), tokens, espera
+
+    def counters(self) -> dict:
+        contadores = {}
+        for campo, valor in self.redis.hgetall(self.CONTADORES).items():
+            endpoint, _, nome = campo.rpartition(":")
+            contador = contadores.setdefault(endpoint, {"permitidas": 0, "bloqueadas": 0, "custo": 0})
+            contador[nome] = float(valor) if nome == "custo" else int(valor)
+
+        return contadores
+
+
+BUCKET_STORES = {
+    "memoria": MemoryBucketStore,
+    "redis": RedisBucketStore,
+}
+
+
+class RateLimiter:
+    """
+    Limite de requisições por balde de tokens (token bucket). Cada cliente (usuário do
+    JWT ou, sem token, o IP) tem um balde por orçamento, que enche a `taxa` tokens por
+    segundo até `capacidade`; cada requisição retira o custo do endpoint. Sem tokens
+    suficientes, a resposta é 429 com Retry-After.
+
+    O orçamento padrão vem de RATE_LIMIT_CAPACIDADE e RATE_LIMIT_POR_SEGUNDO; endpoints ou
+    blueprints podem ter custo maior ou orçamento próprio com `limit`.
+    """
+
+    # Rotas da documentação e arquivos estáticos não contam
+    ISENTOS = ("static", "flasgger.")
+
+    def __init__(self, app=None):
+        self.regras = {}
+        self.store = None
+        self.store_lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self.ativo = config["RATE_LIMIT_ENABLED"]
+        self.padrao = ("api", config["RATE_LIMIT_CAPACIDADE"], config["RATE_LIMIT_POR_SEGUNDO"], 1, False)
+        self.config = config
+
+        # RATE_LIMIT_CUSTOS="animal.list_animals=10,sync.get_sync=5" sobrescreve os custos do código
+        self.custos = {}
+        for item in filter(None, (parte.strip() for parte in config["RATE_LIMIT_CUSTOS"].split(","))):
+            endpoint, _, custo = item.partition("=")
+            self.custos[endpoint.strip()] = float(custo)
+
+        if config["RATE_LIMIT_BACKEND"] not in BUCKET_STORES:
+            raise ValueError(f"RATE_LIMIT_BACKEND inválido: {config['RATE_LIMIT_BACKEND']!r}")
+
+        app.before_request(self.check)
+        app.after_request(self.add_headers)
+        app.extensions["rate_limit"] = self
+
+    def limit(self, name: str, custo: float = 1, balde=None, capacidade=None, por_segundo=None, por_ip: bool = False):
+        """
+        Define o custo e, opcionalmente, um orçamento próprio (`balde`, `capacidade` e
+        `por_segundo`) para um blueprint (ex.: "auth") ou endpoint (ex.: "auth.login").
+        Com `por_ip`, o balde é sempre do IP, mesmo com token.
+        """
+        nome_balde, capacidade_padrao, taxa_padrao, _, _ = self.padrao
+
+        self.regras[name] = (
+            balde or nome_balde,
+            capacidade if capacidade is not None else capacidade_padrao,
+            por_segundo if por_segundo is not None else taxa_padrao,
+            custo,
+            por_ip,
+        )
+
+    def get_store(self):
+        # Criado no primeiro uso, depois do fork dos workers do Gunicorn
+        if self.store is None:
+            with self.store_lock:
+                # As threads do worker gthread chegam juntas na primeira requisição
+                if self.store is None:
+                    self.store = BUCKET_STORES[self.config["RATE_LIMIT_BACKEND"]](self.config)
+        return self.store
+
+    def _regra(self):
+        return self.regras.get(request.endpoint) or self.regras.get(request.blueprint) or self.padrao
+
+    def check(self):
+        endpoint = request.endpoint
+        if not self.ativo or endpoint is None or request.method == "OPTIONS" or endpoint.startswith(self.ISENTOS):
+            return None
+
+        balde, capacidade, taxa, custo, por_ip = self._regra()
+        custo = self.custos.get(endpoint, custo)
+
+        usuario = None if por_ip else usuario_atual()
+        cliente = f"usuario:{usuario}" if usuario else f"ip:{request.remote_addr}"
+
+        try:
+            permitido, restantes, espera = self.get_store().consume(
+                f"{balde}:{cliente}", capacidade, taxa, custo, endpoint
+            )
+        except Exception as e:
+            # Falha no Redis não derruba a API: a requisição passa sem limite
+            logger.warning(f"Erro ao consultar o limite de requisições: {str(e)}")
+            return None
+
+        g.rate_limit = (capacidade, restantes)
+
+        if permitido:
+            return None
+
+        logger.warning(f"Limite de requisições excedido em {endpoint} por {cliente}.")
+        response = jsonify({"message": "Limite de requisições excedido. Tente novamente mais tarde."})
+        response.status_code = 429
+        response.headers["Retry-After"] = str(max(1, math.ceil(espera)))
+        return response
+
+    def add_headers(self, response):
+        rate_limit = g.get("rate_limit")
+
+        if rate_limit is not None:
+            capacidade, restantes = rate_limit
+            response.headers["RateLimit-Limit"] = str(int(capacidade))
+            response.headers["RateLimit-Remaining"] = str(int(restantes))
+
+        return response
+
+    def counters(self) -> dict:
+        """
+        Requisições permitidas, bloqueadas e custo consumido por endpoint.
+        """
+        return self.get_store().counters()
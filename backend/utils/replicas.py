@@ -0,0 +1,148 @@
+import logging
+import random
+import time
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Métodos atendidos pelas réplicas de leitura (o preflight de CORS nunca escreve)
+READ_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+
+# Cookie com o instante (epoch) até o qual o cliente lê do primário após uma escrita
+STICKY_COOKIE = "leitura_primaria_ate"
+
+# O mesmo instante em cabeçalho, para clientes que não guardam cookies (app, scripts):
+# a resposta da escrita o envia e o cliente o repete nas leituras seguintes
+STICKY_HEADER = "Leitura-Primaria-Ate"
+
+
+class ReadReplicas:
+    """
+    Réplicas de leitura configuradas em DATABASE_REPLICA_URLS. Cada réplica é checada
+    com `SELECT 1` no máximo a cada REPLICA_HEALTH_INTERVAL segundos; réplicas com erro
+    de conexão ficam fora do rodízio até a próxima checagem.
+    """
+
+    def __init__(self, engines, health_interval: int):
+        self.engines = engines
+        self.health_interval = health_interval
+        self.status = {engine: (True, 0.0) for engine in engines}
+
+        for engine in engines:
+            event.listen(engine, "handle_error", self._on_error)
+
+    def _on_error(self, context):
+        if context.is_disconnect or context.connection is None:
+            self.mark_unhealthy(context.engine)
+
+    def mark_unhealthy(self, engine):
+        logger.warning(f"Réplica de leitura indisponível: {engine.url.render_as_string(hide_password=True)}")
+        self.status[engine] = (False, time.monotonic())
+
+    def is_healthy(self, engine) -> bool:
+        healthy, checked_at = self.status[engine]
+
+        if time.monotonic() - checked_at < self.health_interval:
+            return healthy
+
+        try:
+            with engine.connect() as connection:
+                connection.exec_driver_sql("SELECT 1")
+        except Exception:
+            # O evento handle_error normalmente já marcou a falha
+            if self.status[engine][0]:
+                self.mark_unhealthy(engine)
+            return False
+
+        self.status[engine] = (True, time.monotonic())
+        return True
+
+    def choose(self):
+        """
+        Escolhe uma réplica saudável ao acaso, ou None para usar o primário.
+        """
+        candidates = list(self.engines)
+        random.shuffle(candidates)
+
+        for engine in candidates:
+            if self.is_healthy(engine):
+                return engine
+
+        return None
+
+
+class RoutingSession(Session):
+    """
+    Sessão que envia os SELECTs de requisições de leitura para uma réplica e todo o
+    resto (flush, UPDATE/INSERT/DELETE, jobs e comandos da CLI) para o primário.
+    Em qualquer requisição, a primeira escrita marca `g.db_write`, que prende o cliente
+    ao primário por alguns segundos; POSTs que só leem (/login, dedup-check) não prendem.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            if self._flushing or clause is None or not getattr(clause, "is_select", False):
+                # Depois de uma escrita, o restante da requisição lê do primário
+                g.db_read_replica = False
+                g.db_write = True
+            elif g.get("db_read_replica"):
+                engine = g.get("db_replica_engine")
+
+                if engine is None:
+                    engine = current_app.extensions["read_replicas"].choose()
+                    g.db_replica_engine = engine or False
+
+                if engine:
+                    return engine
+
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def init_read_replicas(app, db):
+    """
+    Ativa o roteamento para as réplicas definidas em SQLALCHEMY_BINDS (chaves `replica_*`).
+    """
+    with app.app_context():
+        engines = [engine for key, engine in db.engines.items() if key and key.startswith("replica_")]
+
+    if not engines:
+        return
+
+    app.extensions["read_replicas"] = ReadReplicas(engines, app.config["REPLICA_HEALTH_INTERVAL"])
+    sticky_seconds = app.config["REPLICA_STICKY_SECONDS"]
+
+    @app.before_request
+    def route_reads_to_replica():
+        if request.method not in READ_METHODS:
+            # Lê do primário; o cookie só é enviado se a requisição de fato escrever
+            return
+
+        # Read-your-writes: após uma escrita o cliente lê do primário por alguns segundos
+        primary_until = 0
+        for value in (request.cookies.get(STICKY_COOKIE), request.headers.get(STICKY_HEADER)):
+            try:
+                primary_until = max(primary_until, float(value or 0))
+            except ValueError:
+                pass
+
+        g.db_read_replica = primary_until <= time.time()
+
+    @app.after_request
+    def stick_to_primary_after_write(response):
+        if g.get("db_write") and response.status_code < 400:
+            primary_until = str(int(time.time()) + sticky_seconds)
+
+            response.headers[STICKY_HEADER] = primary_until
+            response.set_cookie(
+                STICKY_COOKIE,
+                primary_until,
+                max_age=sticky_seconds,
+                httponly=True,
+                secure=request.is_secure,
+                samesite="Lax",
+            )
+
+        return response
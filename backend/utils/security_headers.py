@@ -0,0 +1,95 @@
+import secure
+from flask import request
+
+
+def default_security_headers():
+    """
+    Monta, uma única vez, a lista de cabeçalhos de segurança aplicada a todas as respostas.
+    """
+    # change STS Security
+    # Forces the browser to communicate with the website only via HTTPS, even if the user types the address with HTTP
+    hsts_value = (
+        secure.StrictTransportSecurity().include_subdomains().preload().max_age(2592000)
+    )
+
+    # add Referrer Policy
+    # Controls the amount of information the browser sends in the Referer header when a link is clicked.
+    # The Referer indicates where the user came from, and this information can be used to track users.
+    # By default, the header will not be sent
+    referrer_value = secure.ReferrerPolicy().no_referrer()
+
+    # add X frame options
+    # Determines whether a page can be embedded in an iframe.
+    # By default, only on same-origin pages.
+    xfo_value = secure.XFrameOptions().sameorigin()
+
+    # add xxss protection
+    # Instructs the browser to enable XSS (Cross-Site Scripting) protection.
+    # This protection helps prevent malicious code from being injected into a web page.
+    xxss_value = secure.XXSSProtection().set("1")
+
+    secure_headers = secure.Secure(
+        hsts=hsts_value, referrer=referrer_value, xfo=xfo_value, xxp=xxss_value
+    )
+
+    return secure_headers.headers_tuple() + [
+        # add custom headers
+        # These are security policies that restrict how a document can be embedded or open pop-ups from other websites.
+        # By default, the site need to be in same origin.
+        ("Cross-Origin-Opener-Policy", "same-origin"),
+        ("Cross-Origin-Embedder-Policy", "require-corp"),
+        # Allows you to specify which types of resources can be accessed by other websites.
+        # This helps prevent CSRF (Cross-Site Request Forgery) attacks.
+        ("Cross-Origin-Resource-Policy", "same-origin"),
+    ]
+
+
+class SecurityHeaders:
+    """
+    Aplica os cabeçalhos de segurança pré-calculados a todas as respostas.
+
+    As listas finais de cabeçalhos (padrão e de cada override) são montadas no registro,
+    e cada resposta recebe a sua lista em uma única operação. Os valores sobrescrevem
+    cabeçalhos de mesmo nome definidos pela view, como fazia a biblioteca `secure`.
+    """
+
+    def __init__(self, app=None, headers=None):
+        self.headers = list(headers or [])
+        self.names = frozenset(name.lower() for name, _ in self.headers)
+        self.overrides = {}
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.after_request(self.apply)
+        app.extensions["security_headers"] = self
+
+    def override(self, name: str, headers: dict):
+        """
+        Substitui cabeçalhos para um blueprint (ex.: "animal") ou endpoint
+        (ex.: "animal.get_animal_foto"). Um valor None remove o cabeçalho.
+        """
+        merged = dict(self.headers)
+        merged.update(headers)
+
+        final = [(header, value) for header, value in merged.items() if value is not None]
+        self.overrides[name] = (final, frozenset(header.lower() for header, _ in final))
+
+    def apply(self, response):
+        headers, names = self.headers, self.names
+
+        if self.overrides:
+            override = self.overrides.get(request.endpoint) or self.overrides.get(request.blueprint)
+            if override:
+                headers, names = override
+
+        # Remove antes apenas se a view já definiu algum desses cabeçalhos
+        for header, _ in response.headers:
+            if header.lower() in names:
+                for name in names:
+                    response.headers.remove(name)
+                break
+
+        response.headers.extend(headers)
+        return response
@@ -0,0 +1,48 @@
+from sqlalchemy import event
+from sqlalchemy.orm import with_loader_criteria
+
+from backend.utils.utils import agora_utc
+
+# Opção de execução que desliga o filtro, para consultas que precisam ver os registros
+# removidos (sincronização e limpeza da lixeira):
+#   query.execution_options(incluir_removidos=True)
+INCLUIR_REMOVIDOS = "incluir_removidos"
+
+
+def soft_delete(obj):
+    """
+    Marca o registro como removido. A linha continua no banco (com `version` e
+    `updated_at` atualizados no flush) até ser purgada da lixeira.
+    """
+    obj.deleted_at = agora_utc()
+
+
+def register_soft_delete(session_class, registry):
+    """
+    Faz as consultas ORM (SELECT, UPDATE e DELETE em massa) da sessão ignorarem os
+    registros com `deleted_at` preenchido, em todos os modelos que têm a coluna.
+    """
+    criterios = []
+
+    def ocultar_removidos(execute_state):
+        # Recarga de atributos de um objeto já carregado (ex.: depois do commit) não é filtrada
+        if execute_state.is_column_load or execute_state.is_relationship_load:
+            return
+
+        if execute_state.execution_options.get(INCLUIR_REMOVIDOS, False):
+            return
+
+        if not (execute_state.is_select or execute_state.is_update or execute_state.is_delete):
+            return
+
+        # Montados na primeira consulta, quando todos os modelos já foram importados
+        if not criterios:
+            criterios.extend(
+                with_loader_criteria(mapper.class_, lambda cls: cls.deleted_at.is_(None), include_aliases=True)
+                for mapper in registry.mappers
+                if "deleted_at" in mapper.columns
+            )
+
+        execute_state.statement = execute_state.statement.options(*criterios)
+
+    event.listen(session_class, "do_orm_execute", ocultar_removidos)
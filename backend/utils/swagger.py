@@ -0,0 +1,72 @@
+import importlib.util
+import os
+
+from flask import Blueprint, current_app, jsonify, redirect, render_template, url_for
+
+
+def init_swagger(app, template):
+    """
+    Inicializa o flasgger na criação da aplicação (modo padrão).
+    """
+    from flasgger import Swagger
+
+    return Swagger(app, template=template)
+
+
+def init_lazy_swagger(app, template):
+    """
+    Registra as rotas da documentação sem importar o flasgger. O flasgger só é
+    carregado no primeiro acesso a `/apidocs/` ou `/apispec_1.json`, e a especificação
+    gerada a partir das docstrings fica em cache até o processo terminar.
+    """
+    # Localiza a interface do Swagger UI distribuída com o flasgger sem importá-lo
+    ui_path = os.path.join(importlib.util.find_spec("flasgger").submodule_search_locations[0], "ui3")
+
+    # Mesmo nome do blueprint do flasgger, usado pelos templates em url_for("flasgger.static")
+    swagger_bp = Blueprint(
+        "flasgger",
+        __name__,
+        template_folder=os.path.join(ui_path, "templates"),
+        static_folder=os.path.join(ui_path, "static"),
+        static_url_path="/flasgger_static",
+    )
+
+    def get_swagger():
+        swagger = current_app.extensions.get("swagger")
+
+        if swagger is None:
+            from flasgger import Swagger
+
+            swagger = Swagger(template=template)
+            swagger.app = current_app._get_current_object()
+            swagger.load_config(swagger.app)
+            current_app.extensions["swagger"] = swagger
+
+        return swagger
+
+    @swagger_bp.route("/apispec_1.json")
+    def apispec_1():
+        spec = current_app.extensions.get("swagger_spec")
+
+        if spec is None:
+            spec = get_swagger().get_apispecs("apispec_1")
+            current_app.extensions["swagger_spec"] = spec
+
+        return jsonify(spec)
+
+    @swagger_bp.route("/apidocs/")
+    def apidocs():
+        from flasgger.base import APIDocsView
+
+        view = APIDocsView.as_view("apidocs", view_args=dict(config=get_swagger().config))
+        return view()
+
+    @swagger_bp.route("/apidocs/index.html")
+    def apidocs_index():
+        return redirect(url_for("flasgger.apidocs"))
+
+    @swagger_bp.route("/oauth2-redirect.html")
+    def oauth_redirect():
+        return render_template(["flasgger/oauth2-redirect.html", "flasgger/o2c.html"])
+
+    app.register_blueprint(swagger_bp)
@@ -1,3 +1,6 @@
+from datetime import date, datetime, timezone
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
 
 def strtobool (val):
     val = val.lower()
@@ -6,4 +9,80 @@ def strtobool (val):
     elif val in ('false'):
         return False
     else:
-        raise ValueError("invalid truth value %r" % (val,))
\ No newline at end of file
+        raise ValueError("invalid truth value %r" % (val,))
+
+def parse_valor_centavos(valor) -> int:
+    """
+    Converte um valor monetário em texto ("150", "150.5", "R$ 1.234,56") para centavos.
+    """
+    texto = str(valor).replace("R$", "").replace(" ", "").strip()
+
+    # Quando há vírgula e ponto, o último separador é o decimal
+    if "," in texto and "." in texto:
+        if texto.rfind(",") > texto.rfind("."):
+            texto = texto.replace(".", "").replace(",", ".")
+        else:
+            texto = texto.replace(",", "")
+    else:
+        texto = texto.replace(",", ".")
+
+    try:
+        decimal = Decimal(texto)
+    except InvalidOperation:
+        raise ValueError("invalid monetary value %r" % (valor,))
+
+    if not decimal.is_finite():
+        raise ValueError("invalid monetary value %r" % (valor,))
+
+    return int((decimal * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+
+def parse_data(valor) -> date:
+    """
+    Converte uma data em texto nos formatos "AAAA-MM-DD" ou "DD/MM/AAAA".
+    """
+    texto = str(valor).strip()
+
+    for formato in ("%Y-%m-%d", "%d/%m/%Y"):
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+
+    raise ValueError("invalid date %r" % (valor,))
+
+
+def parse_data_hora(valor) -> datetime:
+    """
+    Converte data e hora em texto ISO 8601 ("AAAA-MM-DDTHH:MM[:SS]").
+    Uma data sem horário é interpretada como meia-noite e horários com fuso
+    são convertidos para UTC sem fuso, como ficam gravados no banco.
+    """
+    texto = str(valor).strip()
+
+    try:
+        resultado = datetime.fromisoformat(texto)
+    except ValueError:
+        return datetime.combine(parse_data(texto), datetime.min.time())
+
+    if resultado.tzinfo is not None:
+        resultado = resultado.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return resultado
+
+
+def agora_utc() -> datetime:
+    """
+    Data e hora atuais em UTC, sem fuso, como as datas de controle são gravadas no banco.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def violou_restricao(erro, restricao: str) -> bool:
+    """
+    Indica se a IntegrityError veio da restrição `restricao`, e não de outra violação
+    (chave estrangeira, NOT NULL etc.).
+    """
+    diag = getattr(erro.orig, "diag", None)
+    nome = getattr(diag, "constraint_name", None) or str(erro.orig)
+    return restricao in nome
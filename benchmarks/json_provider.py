@@ -0,0 +1,145 @@
+"""
+Mede a serialização das respostas JSON com cada provider disponível.
+
+Uso:
+    python benchmarks/json_provider.py [--linhas 1000] [--numero 50]
+
+As cargas seguem os schemas da aplicação (listagens de animais com foto em base64,
+doações e tarefas, e o detalhe de um job) e incluem uma carga com datetime e Decimal
+nativos, que o provider padrão do Flask converte pela função `default`.
+"""
+import argparse
+import base64
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+from backend.external.schemas import AnimalSchema, DoacaoSchema, JobSchema, TarefaSchema  # noqa: E402
+from backend.utils.json_provider import JSON_PROVIDERS  # noqa: E402
+
+INICIO = datetime(2024, 9, 17, 8, 30)
+
+
+def animais(linhas: int):
+    foto = base64.b64encode(os.urandom(3 * 1024)).decode()
+    return AnimalSchema(many=True).dump(
+        {
+            "animal_id": i,
+            "nome": f"Animal {i}",
+            "idade": f"{i % 15} anos",
+            "foto": foto,
+            "descricao": "Dócil, vacinado e acostumado com crianças e outros animais.",
+            "sexo": "Fêmea" if i % 2 else "Macho",
+            "castracao": "Sim",
+            "status": "Disponível",
+            "especie": "Gato" if i % 3 else "Cachorro",
+            "data_cadastro": "2024-09-17",
+            "version": 1,
+        }
+        for i in range(linhas)
+    )
+
+
+def doacoes(linhas: int):
+    return DoacaoSchema(many=True).dump(
+        {
+            "doacao_id": i,
+            "doador": f"Doador {i}",
+            "valor": str(Decimal(i * 137 % 50000).scaleb(-2)),
+            "data_doacao": "2024-09-17",
+            "animal_id": i % 200,
+            "companha_id": i % 12,
+            "comprovante": f"comprovantes/{i:06d}.pdf",
+            "version": 1,
+        }
+        for i in range(linhas)
+    )
+
+
+def tarefas(linhas: int):
+    return TarefaSchema(many=True).dump(
+        {
+            "tarefa_id": i,
+            "tipo": "Alimentação",
+            "descricao": "Ração e água fresca para o gatil",
+            "data_tarefa": "2024-09-17",
+            "voluntario_id": i % 40,
+            "animal_id": i % 200,
+            "inicio": INICIO + timedelta(hours=i),
+            "fim": INICIO + timedelta(hours=i, minutes=45),
+            "version": 1,
+        }
+        for i in range(linhas)
+    )
+
+
+def job():
+    class Job:
+        job_id = "5f1d8c0e6a7b4c2d9e3f1a2b3c4d5e6f"
+        nome = "animais.foto"
+        status = "concluido"
+        tentativas = 1
+        max_tentativas = 3
+        resultado = '{"animal_id": 42, "version": 3}'
+        erro = None
+        criado_em = INICIO
+        iniciado_em = INICIO + timedelta(seconds=1)
+        concluido_em = INICIO + timedelta(seconds=2)
+
+    return JobSchema().dump(Job())
+
+
+def nativos(linhas: int):
+    # Linhas como sairiam de uma consulta agregada, sem passar por um schema
+    return [
+        {
+            "animal_id": i,
+            "total": Decimal(i * 137 % 50000).scaleb(-2),
+            "atualizado_em": INICIO + timedelta(minutes=i),
+        }
+        for i in range(linhas)
+    ]
+
+
+def medir(provider, carga, numero: int) -> float:
+    with provider._app.app_context():
+        return min(timeit.repeat(lambda: provider.response(carga), number=numero, repeat=5)) / numero * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=1000)
+    parser.add_argument("--numero", type=int, default=50)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    providers = {"flask (padrão)": DefaultJSONProvider(app)}
+    for nome, (provider_class, module) in JSON_PROVIDERS.items():
+        if module is not None:
+            providers[nome] = provider_class(app)
+
+    cargas = {
+        f"animais ({args.linhas})": animais(args.linhas),
+        f"doações ({args.linhas})": doacoes(args.linhas),
+        f"tarefas ({args.linhas})": tarefas(args.linhas),
+        "job": job(),
+        f"datetime/Decimal ({args.linhas})": nativos(args.linhas),
+    }
+
+    print("Tempo por resposta (ms, melhor de 5):\n")
+    print(f"{'carga':<28}" + "".join(f"{nome:>16}" for nome in providers))
+
+    for nome, carga in cargas.items():
+        tempos = [medir(provider, carga, args.numero) for provider in providers.values()]
+        print(f"{nome:<28}" + "".join(f"{tempo:>16.3f}" for tempo in tempos))
+
+
+if __name__ == "__main__":
+    main()
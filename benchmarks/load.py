@@ -0,0 +1,514 @@
+"""
+Suíte de carga: semeia um banco com dados sintéticos (backend/seed.py) e exercita todas as
+rotas dos blueprints, primeiro pelo test client do Flask e depois por HTTP contra o Gunicorn.
+
+Uso:
+    python benchmarks/load.py [--perfil pequeno|producao] [--semente 42] [--database-url URL]
+                              [--modo testclient|http|ambos] [--requisicoes 50] [--concorrencia 8]
+                              [--workers 2] [--saida resultados.json]
+    python benchmarks/load.py --comparar antes.json depois.json
+
+Sem --database-url o banco é um SQLite temporário. Com um PostgreSQL local, as tabelas são
+criadas se não existirem e precisam estar vazias. O perfil "producao" gera 50 mil animais
+com fotos de 40 a 160 KB e 500 mil doações.
+
+Para cada rota o resultado (JSON) traz requisições por segundo, latências p50/p95/p99 e os
+códigos de status. No test client, a memória é o pico alocado por requisição (tracemalloc)
+e o RSS do processo; no modo HTTP, o PSS somado do master e dos workers do Gunicorn.
+Rotas de escrita alteram o banco, então as rodadas só são comparáveis com o mesmo perfil e semente.
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import platform
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from http.client import HTTPConnection
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from memory import filhos, ler_smaps, porta_livre  # noqa: E402
+
+USUARIO = {"username": "benchmark", "password": "benchmark123", "email": "benchmark@exemplo.com.br"}
+
+
+def criar_app():
+    """
+    Aplicação usada nas medições (também é o alvo do Gunicorn no modo HTTP): sem modo
+    debug, para que o JSON saia compacto como em produção, e sem os logs INFO por requisição.
+    """
+    from backend import create_app
+
+    app = create_app()
+    app.config["DEBUG"] = False
+    logging.disable(logging.INFO)
+    return app
+
+
+def _json(valor):
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    return valor
+
+
+class Cenarios:
+    """
+    Requisição de cada rota (endpoint do Flask). GET e PUT usam ids da primeira metade de
+    cada tabela e DELETE consome ids a partir do fim, para que as leituras sempre encontrem registros.
+    """
+
+    def __init__(self, volumes: dict, semente: int):
+        from backend.seed import BAIRROS, DATA_REFERENCIA, Gerador
+
+        self.volumes = volumes
+        self.bairros = BAIRROS
+        self.gerador = Gerador(volumes, semente + 1, (1024, 4 * 1024))
+        self.rng = self.gerador.rng
+        self.lock = threading.Lock()
+        self.proximo_delete = dict(volumes)
+        self.contador = itertools.count(1)
+        self.job_id = None
+        self.token = None
+        self.especiais = self._especiais()
+
+        de = DATA_REFERENCIA
+        self.periodo = f"de={de.isoformat()}&ate={(de + timedelta(days=30)).isoformat()}"
+
+    def _id(self, tabela):
+        with self.lock:
+            return self.rng.randint(1, max(1, self.volumes[tabela] // 2))
+
+    def _id_delete(self, tabela):
+        with self.lock:
+            self.proximo_delete[tabela] -= 1
+            return self.proximo_delete[tabela] + 1
+
+    def _corpo(self, tabela, *remover):
+        with self.lock:
+            row = getattr(self.gerador, tabela)(0)
+
+        chave = next(iter(row))
+        return {campo: _json(valor) for campo, valor in row.items() if campo != chave and campo not in remover}
+
+    def _especiais(self):
+        # Rotas fora do CRUD padrão, por endpoint
+        return {
+            "home.index": lambda: ("GET", "/", None),
+            "dashboard.get_dashboard": lambda: ("GET", "/dashboard", None),
+            "auth.register": lambda: ("POST", "/register", self._usuario()),
+            "auth.login": lambda: ("POST", "/login", {"email": USUARIO["email"], "password": USUARIO["password"]}),
+            "job.get_job": lambda: ("GET", f"/jobs/{self.job_id}", None),
+            "animal.get_animal_custos": lambda: ("GET", f"/animals/{self._id('tab_animal')}/custos", None),
+            "animal.get_animal_foto": lambda: ("GET", f"/animals/{self._id('tab_animal')}/foto", None),
+            "animal.update_animal_foto": lambda: (
+                "PUT", f"/animals/{self._id('tab_animal')}/foto", {"foto": self.rng.choice(self.gerador.avatares)}
+            ),
+            "campanha.get_progresso_campanha": lambda: ("GET", f"/campanhas/{self._id('tab_campanha')}/progresso", None),
+            "campanha.list_progresso_campanhas": lambda: ("GET", "/campanhas/progresso", None),
+            "estoque.list_estoque_baixo": lambda: ("GET", "/estoque/baixo?limite=10", None),
+            "estoque.list_movimentos": lambda: ("GET", f"/estoque/{self._id('tab_estoque')}/movimentos", None),
+            "estoque.create_movimento": lambda: (
+                "POST", f"/estoque/{self._id('tab_estoque')}/movimentos", {"tipo": "entrada", "quantidade": 5}
+            ),
+            "hospedeiro.list_hospedeiros_disponiveis": lambda: ("GET", f"/hospedeiros/disponiveis?{self.periodo}", None),
+            "voluntario.get_agenda_voluntario": lambda: (
+                "GET", f"/voluntarios/{self._id('tab_voluntario')}/agenda?{self.periodo}", None
+            ),
+            "tarefa.list_tarefas_recorrentes": lambda: ("GET", "/tarefas/recorrentes", None),
+            "tarefa.create_tarefa_recorrente": lambda: ("POST", "/tarefas/recorrentes", self._corpo("tab_tarefa_recorrente")),
+            "tarefa.delete_tarefa_recorrente": lambda: (
+                "DELETE", f"/tarefas/recorrentes/{self._id_delete('tab_tarefa_recorrente')}", None
+            ),
+            "adotante.dedup_check_adotante": lambda: ("POST", "/adotantes/dedup-check", self._contato("tab_adotante")),
+            "adotante.find_duplicados_adotante": lambda: ("POST", "/adotantes/duplicados", None),
+            "hospedeiro.dedup_check_hospedeiro": lambda: ("POST", "/hospedeiros/dedup-check", self._contato("tab_hospedeiro")),
+            "hospedeiro.find_duplicados_hospedeiro": lambda: ("POST", "/hospedeiros/duplicados", None),
+            "hospedeiro.list_hospedeiros_proximos": lambda: ("GET", f"/hospedeiros/proximos?{self._ponto()}&limit=10", None),
+            "hospedeiro.list_hospedeiros_no_raio": lambda: ("GET", f"/hospedeiros/raio?{self._ponto()}&raio_km=5", None),
+            "campanha.list_campanhas_proximas": lambda: ("GET", f"/campanhas/proximos?{self._ponto()}&limit=10", None),
+            "campanha.list_campanhas_no_raio": lambda: ("GET", f"/campanhas/raio?{self._ponto()}&raio_km=5", None),
+            "sync.get_sync": lambda: ("GET", "/sync?limit=100", None),
+            "auditoria.get_auditoria": lambda: ("GET", "/auditoria?tabela=tab_animal&limit=50", None),
+            "rate_limit.get_rate_limit_contadores": lambda: ("GET", "/rate-limit/contadores", None),
+            # Fluxo limitado por EVENTS_STREAM_SEGUNDOS (ver main)
+            "events.stream_events": lambda: ("GET", "/events", None),
+        }
+
+    def _contato(self, tabela):
+        # E-mail e telefone de um cadastro gerado, no formato digitado (a normalização é do serviço)
+        corpo = self._corpo(tabela)
+        return {"email": corpo["email"], "telefone": corpo["telefone"]}
+
+    def _ponto(self):
+        # Coordenadas perto de um dos bairros usados pelo gerador
+        with self.lock:
+            bairro = self.rng.choice(self.bairros)
+            ponto = self.gerador._coordenada(bairro)
+
+        return f"latitude={ponto['latitude']:.6f}&longitude={ponto['longitude']:.6f}"
+
+    def _usuario(self):
+        with self.lock:
+            n = next(self.contador)
+
+        return {"username": f"carga{n}", "password": USUARIO["password"], "email": f"carga{n}@exemplo.com.br"}
+
+    def requisicao(self, endpoint, metodo, regra):
+        """
+        Retorna (método, caminho, corpo JSON) da próxima requisição da rota, ou None sem cenário.
+        """
+        recurso = RECURSOS.get(endpoint.split(".")[0])
+
+        # Rotas de CRUD: "<prefixo>/" e "<prefixo>/<int:id>"
+        if recurso:
+            prefixo, tabela, remover = recurso
+            if regra == f"{prefixo}/":
+                if metodo == "GET":
+                    return "GET", f"{prefixo}/", None
+                return "POST", f"{prefixo}/", self._corpo(tabela, *remover)
+
+            if regra.startswith(f"{prefixo}/<int:") and regra.count("/") == prefixo.count("/") + 1:
+                if metodo == "GET":
+                    return "GET", f"{prefixo}/{self._id(tabela)}", None
+                if metodo == "PUT":
+                    return "PUT", f"{prefixo}/{self._id(tabela)}", self._corpo(tabela, *remover)
+                return "DELETE", f"{prefixo}/{self._id_delete(tabela)}", None
+
+        cenario = self.especiais.get(endpoint)
+        return cenario() if cenario else None
+
+    def tem_cenario(self, endpoint, metodo, regra):
+        # Mesmas regras de CRUD de requisicao()
+        recurso = RECURSOS.get(endpoint.split(".")[0])
+        if recurso:
+            prefixo = recurso[0]
+            if regra == f"{prefixo}/":
+                return True
+            if regra.startswith(f"{prefixo}/<int:") and regra.count("/") == prefixo.count("/") + 1:
+                return True
+
+        return endpoint in self.especiais
+
+    def cabecalhos(self, endpoint):
+        # Token do usuário do benchmark nas rotas com @jwt_required
+        if endpoint in AUTENTICADAS:
+            return {"Authorization": f"Bearer {self.token}"}
+        return {}
+
+    def quantidade(self, endpoint, requisicoes):
+        return min(requisicoes, LIMITE_REQUISICOES.get(endpoint, requisicoes))
+
+
+# Blueprints de CRUD: prefixo, tabela e campos removidos do corpo (horários tipados geram 409 por sobreposição)
+RECURSOS = {
+    "animal": ("/animals", "tab_animal", ()),
+    "adocao": ("/adocoes", "tab_adocao", ()),
+    "adotante": ("/adotantes", "tab_adotante", ()),
+    "lar_temporario": ("/temporary_shelters", "tab_lar_temporario", ("data_inicio", "data_fim")),
+    "hospedeiro": ("/hospedeiros", "tab_hospedeiro", ()),
+    "apadrinhamento": ("/apadrinhamentos", "tab_apadrinhamento", ()),
+    "procedimento": ("/procedimentos", "tab_procedimento", ()),
+    "campanha": ("/campanhas", "tab_campanha", ()),
+    "doacao": ("/doacoes", "tab_doacao", ()),
+    "despesa": ("/despesas", "tab_despesa", ()),
+    "estoque": ("/estoque", "tab_estoque", ("saldo",)),
+    "tarefa": ("/tarefas", "tab_tarefa", ("inicio", "fim")),
+    "voluntario": ("/voluntarios", "tab_voluntario", ()),
+}
+
+
+# Rotas que exigem o token JWT
+AUTENTICADAS = {"auditoria.get_auditoria", "rate_limit.get_rate_limit_contadores"}
+
+# Cada conexão do SSE dura EVENTS_STREAM_SEGUNDOS; poucas bastam para medir o custo de abrir o fluxo
+LIMITE_REQUISICOES = {"events.stream_events": 3}
+
+
+def rotas(app):
+    """
+    Endpoints dos blueprints da aplicação (sem Swagger e arquivos estáticos), com o método de cada um.
+    """
+    encontradas = []
+    for regra in app.url_map.iter_rules():
+        if regra.endpoint == "static" or regra.endpoint.startswith("flasgger."):
+            continue
+
+        for metodo in sorted(regra.methods - {"HEAD", "OPTIONS"}):
+            encontradas.append((regra.endpoint, metodo, regra.rule))
+
+    # Leituras antes das escritas, e DELETE por último
+    ordem = {"GET": 0, "POST": 1, "PUT": 2, "DELETE": 3}
+    return sorted(encontradas, key=lambda rota: (ordem[rota[1]], rota[2]))
+
+
+def resumo(latencias, duracao, status):
+    latencias_ms = sorted(latencia * 1000 for latencia in latencias)
+    percentis = statistics.quantiles(latencias_ms, n=100, method="inclusive") if len(latencias_ms) > 1 else latencias_ms * 99
+
+    return {
+        "requisicoes": len(latencias_ms),
+        "throughput_rps": round(len(latencias_ms) / duracao, 2) if duracao else None,
+        "p50_ms": round(percentis[49], 3),
+        "p95_ms": round(percentis[94], 3),
+        "p99_ms": round(percentis[98], 3),
+        "status": {str(codigo): status.count(codigo) for codigo in sorted(set(status))},
+    }
+
+
+def rss_kib():
+    with open("/proc/self/status") as arquivo:
+        for linha in arquivo:
+            if linha.startswith("VmRSS:"):
+                return int(linha.split()[1])
+
+    return None
+
+
+def medir_testclient(app, cenarios, rotas_medidas, requisicoes):
+    cliente = app.test_client()
+    resultados = {}
+
+    def executar(rota):
+        metodo, caminho, corpo = cenarios.requisicao(*rota)
+        resposta = cliente.open(caminho, method=metodo, json=corpo, headers=cenarios.cabecalhos(rota[0]))
+        # Lê o corpo inteiro (fluxos como o SSE só terminam aqui) e libera a resposta
+        resposta.get_data()
+        resposta.close()
+        return resposta.status_code
+
+    for rota in rotas_medidas:
+        nome = f"{rota[1]} {rota[2]}"
+        quantidade = cenarios.quantidade(rota[0], requisicoes)
+
+        # Aquecimento (primeiro acesso, caches de schema e de consultas)
+        executar(rota)
+
+        latencias, status = [], []
+        inicio = time.perf_counter()
+        for _ in range(quantidade):
+            antes = time.perf_counter()
+            status.append(executar(rota))
+            latencias.append(time.perf_counter() - antes)
+        duracao = time.perf_counter() - inicio
+
+        # Pico de memória alocada por requisição, em uma rodada separada (tracemalloc é lento)
+        tracemalloc.start()
+        pico = 0
+        for _ in range(min(5, quantidade)):
+            tracemalloc.reset_peak()
+            executar(rota)
+            pico = max(pico, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+        resultados[nome] = {**resumo(latencias, duracao, status), "memoria_pico_kib": pico // 1024, "rss_kib": rss_kib()}
+        print(f"  {nome:<52}{resultados[nome]['p50_ms']:>10.2f} ms  {resultados[nome]['throughput_rps']:>9.1f} req/s", flush=True)
+
+    return resultados
+
+
+def medir_http(cenarios, rotas_medidas, requisicoes, concorrencia, workers, database_url):
+    porta = porta_livre()
+    env = dict(
+        os.environ,
+        DATABASE_URL=database_url,
+        GUNICORN_BIND=f"127.0.0.1:{porta}",
+        GUNICORN_WORKERS=str(workers),
+        PYTHONPATH=os.pathsep.join([RAIZ, os.path.dirname(os.path.abspath(__file__))]),
+    )
+    master = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "load:criar_app()"],
+        cwd=RAIZ, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+    def enviar(metodo, caminho, corpo, cabecalhos=None):
+        conexao = HTTPConnection("127.0.0.1", porta, timeout=120)
+        try:
+            dados = json.dumps(corpo) if corpo is not None else None
+            cabecalhos = dict(cabecalhos or {})
+            if dados is not None:
+                cabecalhos["Content-Type"] = "application/json"
+            conexao.request(metodo, caminho, body=dados, headers=cabecalhos)
+            resposta = conexao.getresponse()
+            resposta.read()
+            return resposta.status
+        finally:
+            conexao.close()
+
+    try:
+        for _ in range(200):
+            try:
+                enviar("GET", "/", None)
+                break
+            except OSError:
+                time.sleep(0.1)
+
+        resultados = {}
+        with ThreadPoolExecutor(concorrencia) as executor:
+            for rota in rotas_medidas:
+                nome = f"{rota[1]} {rota[2]}"
+
+                def executar(_, rota=rota):
+                    requisicao = cenarios.requisicao(*rota)
+                    antes = time.perf_counter()
+                    codigo = enviar(*requisicao, cenarios.cabecalhos(rota[0]))
+                    return time.perf_counter() - antes, codigo
+
+                quantidade = cenarios.quantidade(rota[0], requisicoes)
+                list(executor.map(executar, range(min(concorrencia, quantidade))))
+
+                inicio = time.perf_counter()
+                medidas = list(executor.map(executar, range(quantidade)))
+                duracao = time.perf_counter() - inicio
+
+                pss = ler_smaps(master.pid)["pss"] + sum(ler_smaps(pid)["pss"] for pid in filhos(master.pid))
+                resultados[nome] = {
+                    **resumo([latencia for latencia, _ in medidas], duracao, [codigo for _, codigo in medidas]),
+                    "pss_total_kib": pss,
+                }
+                print(f"  {nome:<52}{resultados[nome]['p50_ms']:>10.2f} ms  {resultados[nome]['throughput_rps']:>9.1f} req/s", flush=True)
+
+        return resultados
+
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait()
+
+
+def commit_atual():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(antes_caminho, depois_caminho):
+    with open(antes_caminho) as arquivo:
+        antes = json.load(arquivo)
+    with open(depois_caminho) as arquivo:
+        depois = json.load(arquivo)
+
+    print(f"{antes['commit']} -> {depois['commit']} (p95 em ms e req/s)\n")
+    for modo, rotas_depois in depois["resultados"].items():
+        rotas_antes = antes["resultados"].get(modo, {})
+        print(f"[{modo}]")
+        for nome, medida in rotas_depois.items():
+            anterior = rotas_antes.get(nome)
+            if not anterior:
+                print(f"  {nome:<52}{'':>24}{medida['p95_ms']:>10.2f}  (nova)")
+                continue
+
+            variacao = (medida["p95_ms"] / anterior["p95_ms"] - 1) * 100 if anterior["p95_ms"] else 0
+            print(
+                f"  {nome:<52}{anterior['p95_ms']:>10.2f} -> {medida['p95_ms']:>10.2f} ({variacao:+6.1f}%)"
+                f"  {anterior['throughput_rps']:>9.1f} -> {medida['throughput_rps']:>9.1f} req/s"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--perfil", default="pequeno", choices=["pequeno", "producao"])
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--database-url")
+    parser.add_argument("--modo", default="ambos", choices=["testclient", "http", "ambos"])
+    parser.add_argument("--requisicoes", type=int, default=50, help="Requisições medidas por rota.")
+    parser.add_argument("--concorrencia", type=int, default=8, help="Clientes simultâneos no modo HTTP.")
+    parser.add_argument("--workers", type=int, default=2, help="Workers do Gunicorn no modo HTTP.")
+    parser.add_argument("--saida", help="Arquivo JSON com os resultados (padrão: saída padrão).")
+    parser.add_argument("--comparar", nargs=2, metavar=("ANTES", "DEPOIS"))
+    args = parser.parse_args()
+
+    if args.comparar:
+        comparar(*args.comparar)
+        return
+
+    banco_temporario = None
+    if args.database_url is None:
+        banco_temporario = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        args.database_url = f"sqlite:///{banco_temporario.name}"
+
+    # A configuração lê DATABASE_URL na importação do pacote backend
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("JOBS_WORKER_INPROCESS", "false")
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    # Todas as requisições saem do mesmo IP; o limite de requisições mediria só os 429
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    # Cada requisição do GET /events mantém a conexão aberta por esse tempo
+    os.environ.setdefault("EVENTS_STREAM_SEGUNDOS", "1")
+    os.environ.setdefault("EVENTS_KEEPALIVE_SEGUNDOS", "1")
+
+    from backend.db import db
+    from backend.seed import PERFIS, TAMANHO_FOTO, seed_database
+
+    try:
+        app = criar_app()
+        volumes = PERFIS[args.perfil]
+
+        with app.app_context():
+            db.create_all()
+            print(f"Gerando o perfil {args.perfil} em {db.engine.url.render_as_string(hide_password=True)}...", flush=True)
+            inicio = time.perf_counter()
+            seed_database(volumes, args.semente, TAMANHO_FOTO[args.perfil])
+            tempo_seed = time.perf_counter() - inicio
+            dialeto = db.engine.dialect.name
+
+        cenarios = Cenarios(volumes, args.semente)
+        rotas_medidas = [rota for rota in rotas(app) if cenarios.tem_cenario(*rota)]
+
+        sem_cenario = [f"{metodo} {regra}" for endpoint, metodo, regra in rotas(app) if not cenarios.tem_cenario(endpoint, metodo, regra)]
+        if sem_cenario:
+            print(f"Rotas sem cenário (ignoradas): {', '.join(sem_cenario)}", file=sys.stderr)
+
+        # Usuário do POST /login (e token das rotas autenticadas) e job do GET /jobs/<job_id>
+        cliente = app.test_client()
+        cliente.post("/register", json=USUARIO)
+        cenarios.token = cliente.post("/login", json={"email": USUARIO["email"], "password": USUARIO["password"]}).json["token"]
+        cenarios.job_id = cliente.put("/animals/1/foto", json={"foto": cenarios.gerador.avatares[0]}).json["job_id"]
+
+        resultados = {}
+        if args.modo in ("testclient", "ambos"):
+            print("Test client:")
+            resultados["testclient"] = medir_testclient(app, cenarios, rotas_medidas, args.requisicoes)
+        if args.modo in ("http", "ambos"):
+            print(f"HTTP (Gunicorn, {args.workers} workers, {args.concorrencia} clientes):")
+            resultados["http"] = medir_http(
+                cenarios, rotas_medidas, args.requisicoes, args.concorrencia, args.workers, args.database_url
+            )
+
+        relatorio = {
+            "commit": commit_atual(),
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "banco": dialeto,
+            "perfil": args.perfil,
+            "semente": args.semente,
+            "volumes": volumes,
+            "tempo_seed_s": round(tempo_seed, 2),
+            "requisicoes_por_rota": args.requisicoes,
+            "resultados": resultados,
+        }
+
+        if args.saida:
+            with open(args.saida, "w") as arquivo:
+                json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+            print(f"Resultados gravados em {args.saida}")
+        else:
+            print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+
+    finally:
+        if banco_temporario is not None:
+            os.unlink(banco_temporario.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Mede a memória residente por worker do Gunicorn com e sem preload (Linux).
+
+Uso:
+    python benchmarks/memory.py [--workers 4] [--requisicoes 200]
+
+Para cada modo o Gunicorn é iniciado com gunicorn.conf.py, recebe requisições para
+aquecer os workers e então são lidos os valores de /proc/<pid>/smaps_rollup de cada
+worker. RSS conta as páginas compartilhadas com o master em todos os processos; PSS
+divide essas páginas entre eles e "privado" é o que cada worker ocupa sozinho.
+"""
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def porta_livre():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def ler_smaps(pid):
+    valores = {}
+    with open(f"/proc/{pid}/smaps_rollup") as arquivo:
+        for linha in arquivo:
+            partes = linha.split()
+            if len(partes) == 3 and partes[2] == "kB":
+                valores[partes[0].rstrip(":")] = int(partes[1])
+
+    return {
+        "rss": valores["Rss"],
+        "pss": valores["Pss"],
+        "privado": valores["Private_Clean"] + valores["Private_Dirty"],
+    }
+
+
+def filhos(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as arquivo:
+        return [int(filho) for filho in arquivo.read().split()]
+
+
+def medir(preload: bool, workers: int, requisicoes: int):
+    porta = porta_livre()
+    banco = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    env = dict(
+        os.environ,
+        GUNICORN_PRELOAD=str(preload).lower(),
+        GUNICORN_WORKERS=str(workers),
+        GUNICORN_BIND=f"127.0.0.1:{porta}",
+        DATABASE_URL=f"sqlite:///{banco.name}",
+    )
+    master = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "backend:create_app()"],
+        cwd=RAIZ, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+    try:
+        url = f"http://127.0.0.1:{porta}"
+        for _ in range(100):
+            try:
+                urllib.request.urlopen(url + "/").read()
+                break
+            except OSError:
+                time.sleep(0.1)
+
+        while len(filhos(master.pid)) < workers:
+            time.sleep(0.1)
+
+        # Aquece os workers, incluindo a geração da especificação do Swagger
+        for i in range(requisicoes):
+            urllib.request.urlopen(url + ("/apispec_1.json" if i % 2 else "/")).read()
+
+        amostras = [ler_smaps(pid) for pid in filhos(master.pid)]
+        return {
+            "master": ler_smaps(master.pid),
+            "worker": {chave: sum(a[chave] for a in amostras) / len(amostras) for chave in amostras[0]},
+            "total_pss": ler_smaps(master.pid)["pss"] + sum(a["pss"] for a in amostras),
+        }
+
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait()
+        os.unlink(banco.name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requisicoes", type=int, default=200)
+    args = parser.parse_args()
+
+    resultados = {
+        "sem preload": medir(False, args.workers, args.requisicoes),
+        "preload": medir(True, args.workers, args.requisicoes),
+    }
+
+    print(f"Memória em MiB ({args.workers} workers, média por worker):\n")
+    print(f"{'':<22}" + "".join(f"{modo:>14}" for modo in resultados))
+    for chave in ("rss", "pss", "privado"):
+        print(f"{'worker ' + chave:<22}" + "".join(f"{r['worker'][chave] / 1024:>14.1f}" for r in resultados.values()))
+    print(f"{'master pss':<22}" + "".join(f"{r['master']['pss'] / 1024:>14.1f}" for r in resultados.values()))
+    print(f"{'pss total':<22}" + "".join(f"{r['total_pss'] / 1024:>14.1f}" for r in resultados.values()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Mede o custo por resposta do hook de cabeçalhos de segurança.
+
+Uso:
+    python benchmarks/security_headers.py [--numero 20000]
+
+Compara o hook antigo (biblioteca `secure` chamada a cada resposta, seguida de três
+`headers.set`) com o SecurityHeaders, que aplica a lista pré-calculada de uma vez.
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import secure  # noqa: E402
+from flask import Flask, Response  # noqa: E402
+
+from backend.utils.security_headers import SecurityHeaders, default_security_headers  # noqa: E402
+
+
+def hook_antigo():
+    secure_headers = secure.Secure(
+        hsts=secure.StrictTransportSecurity().include_subdomains().preload().max_age(2592000),
+        referrer=secure.ReferrerPolicy().no_referrer(),
+        xfo=secure.XFrameOptions().sameorigin(),
+        xxp=secure.XXSSProtection().set("1"),
+    )
+
+    def set_secure_headers(response):
+        secure_headers.framework.flask(response)
+        response.headers.set("Cross-Origin-Opener-Policy", "same-origin")
+        response.headers.set("Cross-Origin-Embedder-Policy", "require-corp")
+        response.headers.set("Cross-Origin-Resource-Policy", "same-origin")
+        return response
+
+    return set_secure_headers
+
+
+def medir(hook, numero: int):
+    app = Flask(__name__)
+
+    @app.route("/")
+    def index():
+        return "ok"
+
+    with app.test_request_context("/"):
+        def resposta_sem_hook():
+            Response("{}", mimetype="application/json")
+
+        def resposta_com_hook():
+            hook(Response("{}", mimetype="application/json"))
+
+        base = min(timeit.repeat(resposta_sem_hook, number=numero, repeat=5)) / numero
+        total = min(timeit.repeat(resposta_com_hook, number=numero, repeat=5)) / numero
+
+    return (total - base) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--numero", type=int, default=20000)
+    args = parser.parse_args()
+
+    novo = SecurityHeaders(headers=default_security_headers())
+    com_override = SecurityHeaders(headers=default_security_headers())
+    com_override.override("index", {"Cross-Origin-Resource-Policy": "cross-origin"})
+
+    print("Custo do hook por resposta (µs, melhor de 5):\n")
+    print(f"{'secure por resposta (antigo)':<34}{medir(hook_antigo(), args.numero):>8.2f}")
+    print(f"{'SecurityHeaders':<34}{medir(novo.apply, args.numero):>8.2f}")
+    print(f"{'SecurityHeaders com override':<34}{medir(com_override.apply, args.numero):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
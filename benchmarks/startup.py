@@ -0,0 +1,73 @@
+"""
+Mede o tempo de inicialização da aplicação em processos novos (cold start), como
+acontece a cada worker do gunicorn e a cada `flask db upgrade`.
+
+Uso:
+    python benchmarks/startup.py [--repeticoes 10]
+
+Para cada modo (padrão e LAZY_STARTUP) são medidos: importação do pacote `backend`,
+`create_app()`, a primeira requisição a `/` e o primeiro acesso a `/apispec_1.json`.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executado em um interpretador novo a cada repetição
+FILHO = """
+import json, sys, time
+inicio = time.perf_counter()
+from backend import create_app
+importado = time.perf_counter()
+app = create_app()
+criado = time.perf_counter()
+client = app.test_client()
+client.get("/")
+primeira = time.perf_counter()
+client.get("/apispec_1.json")
+spec = time.perf_counter()
+print(json.dumps({
+    "import": importado - inicio,
+    "create_app": criado - importado,
+    "primeira_requisicao": primeira - criado,
+    "apispec": spec - primeira,
+    "total_ate_pronto": criado - inicio,
+    "modulos": len(sys.modules),
+}))
+"""
+
+
+def medir(lazy: bool, repeticoes: int):
+    env = dict(os.environ, LAZY_STARTUP=str(lazy).lower(), DATABASE_URL="sqlite:///:memory:", PYTHONPATH=RAIZ)
+    amostras = []
+
+    for _ in range(repeticoes):
+        saida = subprocess.run(
+            [sys.executable, "-c", FILHO], env=env, cwd=RAIZ, capture_output=True, text=True, check=True
+        )
+        amostras.append(json.loads(saida.stdout.strip().splitlines()[-1]))
+
+    return {chave: statistics.median(amostra[chave] for amostra in amostras) for chave in amostras[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=10)
+    args = parser.parse_args()
+
+    resultados = {"padrão": medir(False, args.repeticoes), "lazy": medir(True, args.repeticoes)}
+
+    print(f"Mediana de {args.repeticoes} processos (segundos):\n")
+    print(f"{'métrica':<22}" + "".join(f"{modo:>12}" for modo in resultados))
+    for metrica in resultados["padrão"]:
+        valores = [resultados[modo][metrica] for modo in resultados]
+        formato = "{:>12.0f}" if metrica == "modulos" else "{:>12.3f}"
+        print(f"{metrica:<22}" + "".join(formato.format(valor) for valor in valores))
+
+
+if __name__ == "__main__":
+    main()
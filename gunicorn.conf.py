@@ -0,0 +1,45 @@
+"""
+Configuração do Gunicorn, carregada automaticamente a partir do diretório de trabalho.
+
+Com GUNICORN_PRELOAD=true (padrão) a aplicação é criada uma única vez no master e os
+workers são criados por fork, compartilhando as páginas de memória do código já
+importado (copy-on-write). Seguindo a documentação do módulo `gc`, a coleta de lixo fica
+desligada no master e os objetos são congelados antes de cada fork, para que os workers
+não escrevam nessas páginas ao percorrê-los.
+"""
+import gc
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8080")
+workers = int(os.getenv("GUNICORN_WORKERS", "4"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "100"))
+# Workers gthread: cada conexão longa (como o GET /events) ocupa uma thread, não o worker
+# inteiro. Com workers síncronos (GUNICORN_WORKER_CLASS=sync), poucos painéis abertos
+# bloqueiam a API
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    # Evita "buracos" nas páginas que serão compartilhadas com os workers
+    if server.cfg.preload_app:
+        gc.disable()
+
+
+def pre_fork(server, worker):
+    if server.cfg.preload_app:
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if not server.cfg.preload_app:
+        return
+
+    from backend.utils.forking import reset_after_fork
+
+    # Com preload, wsgi() devolve a aplicação já criada no master
+    reset_after_fork(server.app.wsgi())
+    gc.enable()
@@ -0,0 +1,204 @@
+"""Adicionando período tipado em lar temporário
+
+Revision ID: 1d6e8b3f9a42
+Revises: e2b94f6a7c15
+Create Date: 2026-10-19 13:15:52.660198
+
+"""
+import calendar
+import logging
+import re
+from datetime import timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+# Mesmo formato de datas aceito pela aplicação
+from backend.utils.utils import parse_data
+
+
+# revision identifiers, used by Alembic.
+revision = '1d6e8b3f9a42'
+down_revision = 'e2b94f6a7c15'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+# Linhas preenchidas por UPDATE em lote
+LOTE = 5000
+
+DATAS = re.compile(r'\d{4}-\d{2}-\d{2}|\d{2}/\d{2}/\d{4}')
+DURACAO = re.compile(r'(\d+)\s*(dia|semana|m[eê]s|meses|ano)', re.IGNORECASE)
+
+
+def _lista(ids, maximo=50):
+    # Ids para o log, sem despejar milhares de linhas
+    texto = ', '.join(map(str, ids[:maximo]))
+    return texto + (f' e mais {len(ids) - maximo}' if len(ids) > maximo else '')
+
+
+def _somar_meses(data, meses):
+    mes = data.month - 1 + meses
+    ano, mes = data.year + mes // 12, mes % 12 + 1
+    return data.replace(year=ano, month=mes, day=min(data.day, calendar.monthrange(ano, mes)[1]))
+
+
+def _periodo(periodo, data_hospedagem):
+    """
+    Converte o período em texto livre ("30 dias", "2 meses", "01/03/2024 a 15/04/2024")
+    e a data de hospedagem em (data_inicio, data_fim). Retorna None se não entender.
+    """
+    datas = []
+    for texto in DATAS.findall(periodo or ''):
+        try:
+            datas.append(parse_data(texto))
+        except ValueError:
+            return None
+
+    try:
+        inicio = parse_data(data_hospedagem)
+    except ValueError:
+        inicio = datas[0] if len(datas) == 2 else None
+
+    if inicio is None:
+        return None
+
+    # Intervalo explícito, ou só a data de saída
+    if datas:
+        fim = datas[-1]
+        return (inicio, fim) if fim >= inicio else None
+
+    duracao = DURACAO.search(periodo or '')
+    if not duracao:
+        return None
+
+    quantidade, unidade = int(duracao.group(1)), duracao.group(2).lower()
+    if unidade == 'dia':
+        return inicio, inicio + timedelta(days=quantidade)
+    if unidade == 'semana':
+        return inicio, inicio + timedelta(weeks=quantidade)
+    if unidade == 'ano':
+        return inicio, _somar_meses(inicio, 12 * quantidade)
+    return inicio, _somar_meses(inicio, quantidade)
+
+
+def _preencher():
+    """
+    Preenche data_inicio/data_fim das hospedagens existentes a partir de `periodo` e
+    `data_hospedagem`. As que não puderem ser lidas ficam sem período (e de fora da
+    verificação de sobreposição) e são listadas no log da migração.
+    """
+    bind = op.get_bind()
+    tabela = sa.table(
+        'tab_lar_temporario',
+        sa.column('lar_temporario_id'),
+        sa.column('periodo'),
+        sa.column('data_hospedagem'),
+        sa.column('data_inicio', sa.Date()),
+        sa.column('data_fim', sa.Date()),
+    )
+    chave = tabela.c.lar_temporario_id
+
+    ignorados = []
+    ultimo = None
+    while True:
+        consulta = sa.select(chave, tabela.c.periodo, tabela.c.data_hospedagem).order_by(chave).limit(LOTE)
+        if ultimo is not None:
+            consulta = consulta.where(chave > ultimo)
+
+        linhas = bind.execute(consulta).all()
+        if not linhas:
+            break
+
+        valores = []
+        for lar_temporario_id, periodo, data_hospedagem in linhas:
+            datas = _periodo(periodo, data_hospedagem)
+            if datas is None:
+                ignorados.append(lar_temporario_id)
+            else:
+                valores.append({'_id': lar_temporario_id, '_inicio': datas[0], '_fim': datas[1]})
+
+        if valores:
+            bind.execute(
+                tabela.update().where(chave == sa.bindparam('_id')).values(
+                    data_inicio=sa.bindparam('_inicio'), data_fim=sa.bindparam('_fim')
+                ),
+                valores,
+            )
+        ultimo = linhas[-1][0]
+
+    if ignorados:
+        logger.warning(
+            f'{len(ignorados)} hospedagens sem período reconhecível ficaram sem data_inicio/data_fim: '
+            f'{_lista(ignorados)}'
+        )
+
+    return tabela
+
+
+def _descartar_sobrepostos(tabela):
+    """
+    Hospedagens antigas do mesmo hospedeiro que se sobrepõem a uma anterior ficam sem
+    período, para que a restrição de exclusão possa ser criada; os ids vão para o log.
+    """
+    bind = op.get_bind()
+    chave = tabela.c.lar_temporario_id
+    hospedeiro_id = sa.column('hospedeiro_id')
+
+    consulta = (
+        sa.select(chave, hospedeiro_id, tabela.c.data_inicio, tabela.c.data_fim)
+        .select_from(tabela)
+        .where(tabela.c.data_inicio.is_not(None))
+        .order_by(hospedeiro_id, tabela.c.data_inicio, chave)
+    )
+
+    sobrepostos = []
+    atual, fim_anterior = None, None
+    for lar_temporario_id, hospedeiro, data_inicio, data_fim in bind.execute(consulta):
+        # Intervalos fechados ('[]'), como na restrição
+        if hospedeiro == atual and data_inicio <= fim_anterior:
+            sobrepostos.append(lar_temporario_id)
+            continue
+
+        atual, fim_anterior = hospedeiro, data_fim
+
+    for inicio in range(0, len(sobrepostos), LOTE):
+        bind.execute(
+            tabela.update().where(chave.in_(sobrepostos[inicio:inicio + LOTE])).values(data_inicio=None, data_fim=None)
+        )
+
+    if sobrepostos:
+        logger.warning(
+            f'{len(sobrepostos)} hospedagens sobrepostas a outra do mesmo hospedeiro ficaram sem período: '
+            f'{_lista(sobrepostos)}'
+        )
+
+
+def upgrade():
+    with op.batch_alter_table('tab_lar_temporario', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('data_inicio', sa.Date(), nullable=True))
+        batch_op.add_column(sa.Column('data_fim', sa.Date(), nullable=True))
+        batch_op.create_index('ix_tab_lar_temporario_hospedeiro_periodo', ['hospedeiro_id', 'data_inicio', 'data_fim'], unique=False)
+
+    # Hospedagens existentes: período tirado dos campos em texto
+    _descartar_sobrepostos(_preencher())
+
+    # No PostgreSQL a sobreposição também é barrada pelo banco com uma restrição de exclusão GiST
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+        op.execute(
+            "ALTER TABLE tab_lar_temporario ADD CONSTRAINT ex_tab_lar_temporario_hospedeiro_periodo "
+            "EXCLUDE USING gist (hospedeiro_id WITH =, daterange(data_inicio, data_fim, '[]') WITH &&) "
+            "WHERE (data_inicio IS NOT NULL)"
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('ALTER TABLE tab_lar_temporario DROP CONSTRAINT ex_tab_lar_temporario_hospedeiro_periodo')
+
+    with op.batch_alter_table('tab_lar_temporario', schema=None) as batch_op:
+        batch_op.drop_index('ix_tab_lar_temporario_hospedeiro_periodo')
+        batch_op.drop_column('data_fim')
+        batch_op.drop_column('data_inicio')
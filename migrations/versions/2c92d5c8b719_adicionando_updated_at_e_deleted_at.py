@@ -0,0 +1,54 @@
+"""Adicionando updated_at e deleted_at para sincronização
+
+Revision ID: 2c92d5c8b719
+Revises: 9d4e2a6c8b31
+Create Date: 2026-10-19 14:05:23.566264
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2c92d5c8b719'
+down_revision = '9d4e2a6c8b31'
+branch_labels = None
+depends_on = None
+
+# Tabela e chave primária, que completa o índice de updated_at (paginação do GET /sync)
+TABLES = [
+    ('tab_adocao', 'adocao_id'),
+    ('tab_adotante', 'adotante_id'),
+    ('tab_animal', 'animal_id'),
+    ('tab_apadrinhamento', 'apadrinhamento_id'),
+    ('tab_campanha', 'campanha_id'),
+    ('tab_despesa', 'despesa_id'),
+    ('tab_doacao', 'doacao_id'),
+    ('tab_estoque', 'estoque_id'),
+    ('tab_hospedeiro', 'hospedeiro_id'),
+    ('tab_lar_temporario', 'lar_temporario_id'),
+    ('tab_movimento_estoque', 'movimento_id'),
+    ('tab_procedimento', 'procedimento_id'),
+    ('tab_tarefa', 'tarefa_id'),
+    ('tab_tarefa_recorrente', 'tarefa_recorrente_id'),
+    ('tab_voluntario', 'voluntario_id'),
+]
+
+
+def upgrade():
+    for table, primary_key in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            # Registros existentes recebem a data da migração
+            batch_op.add_column(
+                sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP'))
+            )
+            batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+            batch_op.create_index(f'ix_{table}_updated_at', ['updated_at', primary_key], unique=False)
+
+
+def downgrade():
+    for table, _ in reversed(TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(f'ix_{table}_updated_at')
+            batch_op.drop_column('deleted_at')
+            batch_op.drop_column('updated_at')
@@ -0,0 +1,43 @@
+"""Adicionando fila de jobs
+
+Revision ID: 3b8f1c7e5d24
+Revises: 7a3c5e9d2b18
+Create Date: 2026-10-19 15:20:44.902113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b8f1c7e5d24'
+down_revision = '7a3c5e9d2b18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('tab_job',
+    sa.Column('job_id', sa.String(), nullable=False),
+    sa.Column('nome', sa.String(), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('tentativas', sa.Integer(), nullable=False),
+    sa.Column('max_tentativas', sa.Integer(), nullable=False),
+    sa.Column('resultado', sa.Text(), nullable=True),
+    sa.Column('erro', sa.Text(), nullable=True),
+    sa.Column('criado_em', sa.DateTime(), nullable=False),
+    sa.Column('disponivel_em', sa.DateTime(), nullable=False),
+    sa.Column('iniciado_em', sa.DateTime(), nullable=True),
+    sa.Column('concluido_em', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('job_id')
+    )
+    with op.batch_alter_table('tab_job', schema=None) as batch_op:
+        batch_op.create_index('ix_tab_job_status_disponivel_em', ['status', 'disponivel_em'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tab_job', schema=None) as batch_op:
+        batch_op.drop_index('ix_tab_job_status_disponivel_em')
+
+    op.drop_table('tab_job')
@@ -0,0 +1,39 @@
+"""Criando a tab_idempotencia (respostas das requisições com Idempotency-Key)
+
+Revision ID: 3d7f2a9c6e18
+Revises: b47e0c93a1f5
+Create Date: 2026-10-19 17:24:40.118302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d7f2a9c6e18'
+down_revision = 'b47e0c93a1f5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('tab_idempotencia',
+    sa.Column('chave', sa.String(), nullable=False),
+    sa.Column('fingerprint', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('status_code', sa.Integer(), nullable=True),
+    sa.Column('corpo', sa.LargeBinary(), nullable=True),
+    sa.Column('headers', sa.JSON(), nullable=True),
+    sa.Column('criado_em', sa.DateTime(), nullable=False),
+    sa.Column('expira_em', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('chave')
+    )
+    with op.batch_alter_table('tab_idempotencia', schema=None) as batch_op:
+        batch_op.create_index('ix_tab_idempotencia_expira_em', ['expira_em'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tab_idempotencia', schema=None) as batch_op:
+        batch_op.drop_index('ix_tab_idempotencia_expira_em')
+
+    op.drop_table('tab_idempotencia')
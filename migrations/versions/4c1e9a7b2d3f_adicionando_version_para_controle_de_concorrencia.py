@@ -0,0 +1,44 @@
+"""Adicionando version para controle de concorrência
+
+Revision ID: 4c1e9a7b2d3f
+Revises: b72d72797061
+Create Date: 2026-10-19 09:12:41.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c1e9a7b2d3f'
+down_revision = 'b72d72797061'
+branch_labels = None
+depends_on = None
+
+TABLES = [
+    'tab_adocao',
+    'tab_adotante',
+    'tab_animal',
+    'tab_apadrinhamento',
+    'tab_campanha',
+    'tab_despesa',
+    'tab_doacao',
+    'tab_estoque',
+    'tab_hospedeiro',
+    'tab_lar_temporario',
+    'tab_procedimento',
+    'tab_tarefa',
+    'tab_voluntario',
+]
+
+
+def upgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('version')
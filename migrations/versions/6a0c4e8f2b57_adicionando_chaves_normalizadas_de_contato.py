@@ -0,0 +1,89 @@
+"""Adicionando e-mail e telefone normalizados em adotante e hospedeiro
+
+Revision ID: 6a0c4e8f2b57
+Revises: 3d7f2a9c6e18
+Create Date: 2026-10-19 18:05:31.402117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# As mesmas regras da aplicação, para que as chaves antigas e as novas sejam comparáveis
+from backend.utils.dedup import normalizar_email, normalizar_telefone
+
+
+# revision identifiers, used by Alembic.
+revision = '6a0c4e8f2b57'
+down_revision = '3d7f2a9c6e18'
+branch_labels = None
+depends_on = None
+
+ATIVOS = sa.text('deleted_at IS NULL')
+
+# Tabela e chave primária
+TABLES = [
+    ('tab_adotante', 'adotante_id'),
+    ('tab_hospedeiro', 'hospedeiro_id'),
+]
+
+# Linhas preenchidas por UPDATE em lote
+LOTE = 5000
+
+
+def _preencher(table, primary_key):
+    bind = op.get_bind()
+    tabela = sa.table(
+        table,
+        sa.column(primary_key),
+        sa.column('email'),
+        sa.column('telefone'),
+        sa.column('email_normalizado'),
+        sa.column('telefone_normalizado'),
+    )
+    chave = tabela.c[primary_key]
+
+    ultimo = None
+    while True:
+        consulta = sa.select(chave, tabela.c.email, tabela.c.telefone).order_by(chave).limit(LOTE)
+        if ultimo is not None:
+            consulta = consulta.where(chave > ultimo)
+
+        linhas = bind.execute(consulta).all()
+        if not linhas:
+            break
+
+        bind.execute(
+            tabela.update().where(chave == sa.bindparam('_id')).values(
+                email_normalizado=sa.bindparam('_email'),
+                telefone_normalizado=sa.bindparam('_telefone'),
+            ),
+            [
+                {'_id': linha[0], '_email': normalizar_email(linha[1]), '_telefone': normalizar_telefone(linha[2])}
+                for linha in linhas
+            ],
+        )
+        ultimo = linhas[-1][0]
+
+
+def upgrade():
+    for table, primary_key in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('email_normalizado', sa.String(), nullable=True))
+            batch_op.add_column(sa.Column('telefone_normalizado', sa.String(), nullable=True))
+
+        _preencher(table, primary_key)
+
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for column in ('email_normalizado', 'telefone_normalizado'):
+                batch_op.create_index(
+                    f'ix_{table}_{column}', [column], unique=False, postgresql_where=ATIVOS, sqlite_where=ATIVOS
+                )
+
+
+def downgrade():
+    for table, _ in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(f'ix_{table}_telefone_normalizado')
+            batch_op.drop_index(f'ix_{table}_email_normalizado')
+            batch_op.drop_column('telefone_normalizado')
+            batch_op.drop_column('email_normalizado')
@@ -0,0 +1,178 @@
+"""Adicionando agenda de voluntários
+
+Revision ID: 7a3c5e9d2b18
+Revises: 1d6e8b3f9a42
+Create Date: 2026-10-19 14:02:31.418775
+
+"""
+import logging
+from datetime import datetime, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+# Mesmos formatos de data e horário aceitos pela aplicação
+from backend.utils.utils import parse_data, parse_data_hora
+
+
+# revision identifiers, used by Alembic.
+revision = '7a3c5e9d2b18'
+down_revision = '1d6e8b3f9a42'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+# Linhas preenchidas por UPDATE em lote
+LOTE = 5000
+
+# Duração das tarefas antigas com horário em data_tarefa; as que só têm a data ocupam o dia
+DURACAO_PADRAO = timedelta(hours=1)
+
+
+def _lista(ids, maximo=50):
+    # Ids para o log, sem despejar milhares de linhas
+    texto = ', '.join(map(str, ids[:maximo]))
+    return texto + (f' e mais {len(ids) - maximo}' if len(ids) > maximo else '')
+
+
+def _horario(data_tarefa):
+    """
+    Converte data_tarefa em (inicio, fim): o dia inteiro para uma data sem horário, ou
+    DURACAO_PADRAO a partir do horário informado. Retorna None se não entender.
+    """
+    try:
+        dia = parse_data(data_tarefa)
+        inicio = datetime.combine(dia, datetime.min.time())
+        return inicio, inicio + timedelta(days=1)
+    except ValueError:
+        pass
+
+    try:
+        inicio = parse_data_hora(data_tarefa)
+    except ValueError:
+        return None
+
+    return inicio, inicio + DURACAO_PADRAO
+
+
+def _preencher():
+    """
+    Preenche inicio/fim das tarefas existentes a partir de data_tarefa. As que não puderem
+    ser lidas ficam sem horário (e de fora da verificação de sobreposição) e são listadas
+    no log da migração.
+    """
+    bind = op.get_bind()
+    tabela = sa.table(
+        'tab_tarefa',
+        sa.column('tarefa_id'),
+        sa.column('voluntario_id'),
+        sa.column('data_tarefa'),
+        sa.column('inicio', sa.DateTime()),
+        sa.column('fim', sa.DateTime()),
+    )
+    chave = tabela.c.tarefa_id
+
+    ignorados = []
+    ultimo = None
+    while True:
+        consulta = sa.select(chave, tabela.c.data_tarefa).order_by(chave).limit(LOTE)
+        if ultimo is not None:
+            consulta = consulta.where(chave > ultimo)
+
+        linhas = bind.execute(consulta).all()
+        if not linhas:
+            break
+
+        valores = []
+        for tarefa_id, data_tarefa in linhas:
+            horario = _horario(data_tarefa)
+            if horario is None:
+                ignorados.append(tarefa_id)
+            else:
+                valores.append({'_id': tarefa_id, '_inicio': horario[0], '_fim': horario[1]})
+
+        if valores:
+            bind.execute(
+                tabela.update().where(chave == sa.bindparam('_id')).values(
+                    inicio=sa.bindparam('_inicio'), fim=sa.bindparam('_fim')
+                ),
+                valores,
+            )
+        ultimo = linhas[-1][0]
+
+    if ignorados:
+        logger.warning(f'{len(ignorados)} tarefas com data_tarefa não reconhecida ficaram sem horário: {_lista(ignorados)}')
+
+    return tabela
+
+
+def _descartar_sobrepostos(tabela):
+    """
+    Tarefas antigas do mesmo voluntário que se sobrepõem a uma anterior (ex.: duas no
+    mesmo dia, sem horário) ficam sem horário, para que a restrição de exclusão possa ser
+    criada; os ids vão para o log.
+    """
+    bind = op.get_bind()
+    chave = tabela.c.tarefa_id
+
+    consulta = (
+        sa.select(chave, tabela.c.voluntario_id, tabela.c.inicio, tabela.c.fim)
+        .where(tabela.c.inicio.is_not(None))
+        .order_by(tabela.c.voluntario_id, tabela.c.inicio, chave)
+    )
+
+    sobrepostos = []
+    atual, fim_anterior = None, None
+    for tarefa_id, voluntario_id, inicio, fim in bind.execute(consulta).all():
+        # Intervalos semiabertos [inicio, fim), como na aplicação
+        if voluntario_id == atual and inicio < fim_anterior:
+            sobrepostos.append(tarefa_id)
+            continue
+
+        atual, fim_anterior = voluntario_id, fim
+
+    for inicio in range(0, len(sobrepostos), LOTE):
+        bind.execute(tabela.update().where(chave.in_(sobrepostos[inicio:inicio + LOTE])).values(inicio=None, fim=None))
+
+    if sobrepostos:
+        logger.warning(
+            f'{len(sobrepostos)} tarefas sobrepostas a outra do mesmo voluntário ficaram sem horário: {_lista(sobrepostos)}'
+        )
+
+
+def upgrade():
+    op.create_table('tab_tarefa_recorrente',
+    sa.Column('tarefa_recorrente_id', sa.Integer(), nullable=False),
+    sa.Column('tipo', sa.String(), nullable=False),
+    sa.Column('descricao', sa.String(), nullable=False),
+    sa.Column('voluntario_id', sa.Integer(), nullable=False),
+    sa.Column('animal_id', sa.Integer(), nullable=False),
+    sa.Column('inicio', sa.DateTime(), nullable=False),
+    sa.Column('duracao_minutos', sa.Integer(), nullable=False),
+    sa.Column('intervalo_dias', sa.Integer(), nullable=False),
+    sa.Column('data_termino', sa.Date(), nullable=True),
+    sa.PrimaryKeyConstraint('tarefa_recorrente_id')
+    )
+    with op.batch_alter_table('tab_tarefa_recorrente', schema=None) as batch_op:
+        batch_op.create_index('ix_tab_tarefa_recorrente_voluntario_inicio', ['voluntario_id', 'inicio'], unique=False)
+
+    with op.batch_alter_table('tab_tarefa', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('inicio', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('fim', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_tab_tarefa_voluntario_inicio', ['voluntario_id', 'inicio', 'fim'], unique=False)
+
+    # Tarefas existentes: horário tirado de data_tarefa
+    _descartar_sobrepostos(_preencher())
+
+
+def downgrade():
+    with op.batch_alter_table('tab_tarefa', schema=None) as batch_op:
+        batch_op.drop_index('ix_tab_tarefa_voluntario_inicio')
+        batch_op.drop_column('fim')
+        batch_op.drop_column('inicio')
+
+    with op.batch_alter_table('tab_tarefa_recorrente', schema=None) as batch_op:
+        batch_op.drop_index('ix_tab_tarefa_recorrente_voluntario_inicio')
+
+    op.drop_table('tab_tarefa_recorrente')
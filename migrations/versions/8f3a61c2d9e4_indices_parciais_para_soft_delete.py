@@ -0,0 +1,72 @@
+"""Índices parciais para soft delete (deleted_at)
+
+Revision ID: 8f3a61c2d9e4
+Revises: 2c92d5c8b719
+Create Date: 2026-10-19 15:12:40.118302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f3a61c2d9e4'
+down_revision = '2c92d5c8b719'
+branch_labels = None
+depends_on = None
+
+ATIVOS = sa.text('deleted_at IS NULL')
+REMOVIDOS = sa.text('deleted_at IS NOT NULL')
+
+# Índices das consultas da aplicação, recriados cobrindo só os registros não removidos
+INDEXES = [
+    ('tab_animal', 'ix_tab_animal_status_especie', ['status', 'especie']),
+    ('tab_lar_temporario', 'ix_tab_lar_temporario_hospedeiro_periodo', ['hospedeiro_id', 'data_inicio', 'data_fim']),
+    ('tab_movimento_estoque', 'ix_tab_movimento_estoque_estoque_id', ['estoque_id', 'movimento_id']),
+    ('tab_tarefa', 'ix_tab_tarefa_voluntario_inicio', ['voluntario_id', 'inicio', 'fim']),
+    ('tab_tarefa', 'ix_tab_tarefa_data_tarefa', ['data_tarefa']),
+    ('tab_tarefa_recorrente', 'ix_tab_tarefa_recorrente_voluntario_inicio', ['voluntario_id', 'inicio']),
+]
+
+# Tabelas com lixeira, que ganham um índice só dos registros removidos (limpeza)
+TABLES = [
+    'tab_adocao',
+    'tab_adotante',
+    'tab_animal',
+    'tab_apadrinhamento',
+    'tab_campanha',
+    'tab_despesa',
+    'tab_doacao',
+    'tab_estoque',
+    'tab_hospedeiro',
+    'tab_lar_temporario',
+    'tab_movimento_estoque',
+    'tab_procedimento',
+    'tab_tarefa',
+    'tab_tarefa_recorrente',
+    'tab_voluntario',
+]
+
+
+def upgrade():
+    for table, name, columns in INDEXES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(name)
+            batch_op.create_index(name, columns, unique=False, postgresql_where=ATIVOS, sqlite_where=ATIVOS)
+
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.create_index(
+                f'ix_{table}_deleted_at', ['deleted_at'], unique=False, postgresql_where=REMOVIDOS, sqlite_where=REMOVIDOS
+            )
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(f'ix_{table}_deleted_at')
+
+    for table, name, columns in reversed(INDEXES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(name)
+            batch_op.create_index(name, columns, unique=False)
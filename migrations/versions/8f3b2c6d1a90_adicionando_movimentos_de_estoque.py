@@ -0,0 +1,55 @@
+"""Adicionando movimentos de estoque
+
+Revision ID: 8f3b2c6d1a90
+Revises: 4c1e9a7b2d3f
+Create Date: 2026-10-19 10:03:27.540119
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f3b2c6d1a90'
+down_revision = '4c1e9a7b2d3f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('tab_movimento_estoque',
+    sa.Column('movimento_id', sa.Integer(), nullable=False),
+    sa.Column('estoque_id', sa.Integer(), nullable=False),
+    sa.Column('tipo', sa.String(), nullable=False),
+    sa.Column('quantidade', sa.Integer(), nullable=False),
+    sa.Column('saldo_apos', sa.Integer(), nullable=False),
+    sa.Column('observacao', sa.String(), nullable=True),
+    sa.Column('data_movimento', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('movimento_id')
+    )
+    with op.batch_alter_table('tab_movimento_estoque', schema=None) as batch_op:
+        batch_op.create_index('ix_tab_movimento_estoque_estoque_id', ['estoque_id', 'movimento_id'], unique=False)
+
+    with op.batch_alter_table('tab_estoque', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('saldo', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.create_index(batch_op.f('ix_tab_estoque_saldo'), ['saldo'], unique=False)
+
+    # Preenche o saldo a partir da quantidade (texto) dos itens já cadastrados
+    connection = op.get_bind()
+    estoque = sa.table('tab_estoque', sa.column('estoque_id', sa.Integer), sa.column('quantidade', sa.String), sa.column('saldo', sa.Integer))
+    for estoque_id, quantidade in connection.execute(sa.select(estoque.c.estoque_id, estoque.c.quantidade)):
+        if quantidade is not None and quantidade.strip().isdigit():
+            connection.execute(
+                estoque.update().where(estoque.c.estoque_id == estoque_id).values(saldo=int(quantidade.strip()))
+            )
+
+
+def downgrade():
+    with op.batch_alter_table('tab_estoque', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_tab_estoque_saldo'))
+        batch_op.drop_column('saldo')
+
+    with op.batch_alter_table('tab_movimento_estoque', schema=None) as batch_op:
+        batch_op.drop_index('ix_tab_movimento_estoque_estoque_id')
+
+    op.drop_table('tab_movimento_estoque')
@@ -0,0 +1,32 @@
+"""Adicionando índices do painel
+
+Revision ID: 9d4e2a6c8b31
+Revises: 3b8f1c7e5d24
+Create Date: 2026-10-19 16:41:07.226431
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d4e2a6c8b31'
+down_revision = '3b8f1c7e5d24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('tab_animal', schema=None) as batch_op:
+        batch_op.create_index('ix_tab_animal_status_especie', ['status', 'especie'], unique=False)
+
+    with op.batch_alter_table('tab_tarefa', schema=None) as batch_op:
+        batch_op.create_index('ix_tab_tarefa_data_tarefa', ['data_tarefa'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tab_tarefa', schema=None) as batch_op:
+        batch_op.drop_index('ix_tab_tarefa_data_tarefa')
+
+    with op.batch_alter_table('tab_animal', schema=None) as batch_op:
+        batch_op.drop_index('ix_tab_animal_status_especie')
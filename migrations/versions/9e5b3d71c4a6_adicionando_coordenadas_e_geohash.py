@@ -0,0 +1,43 @@
+"""Adicionando coordenadas e geohash em adotante, hospedeiro e campanha
+
+Revision ID: 9e5b3d71c4a6
+Revises: 6a0c4e8f2b57
+Create Date: 2026-10-19 18:52:14.903561
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e5b3d71c4a6'
+down_revision = '6a0c4e8f2b57'
+branch_labels = None
+depends_on = None
+
+ATIVOS = sa.text('deleted_at IS NULL')
+
+# Os registros existentes são geocodificados depois, com `flask localizacao geocodificar`
+TABLES = [
+    'tab_adotante',
+    'tab_hospedeiro',
+    'tab_campanha',
+]
+
+
+def upgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('latitude', sa.Float(), nullable=True))
+            batch_op.add_column(sa.Column('longitude', sa.Float(), nullable=True))
+            batch_op.add_column(sa.Column('geohash', sa.String(), nullable=True))
+            batch_op.create_index(f'ix_{table}_geohash', ['geohash'], unique=False, postgresql_where=ATIVOS, sqlite_where=ATIVOS)
+
+
+def downgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(f'ix_{table}_geohash')
+            batch_op.drop_column('geohash')
+            batch_op.drop_column('longitude')
+            batch_op.drop_column('latitude')
@@ -0,0 +1,35 @@
+"""Restrição de horários sobrepostos em tarefas do mesmo voluntário
+
+Revision ID: a7d3e9c1f4b6
+Revises: f4b9a2d6e153
+Create Date: 2026-10-19 21:34:12.508331
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3e9c1f4b6'
+down_revision = 'f4b9a2d6e153'
+branch_labels = None
+depends_on = None
+
+RESTRICAO = 'ex_tab_tarefa_voluntario_horario'
+
+
+def upgrade():
+    # Duas requisições simultâneas podem passar pela verificação da aplicação; no PostgreSQL
+    # o banco barra a segunda. Tarefas na lixeira não bloqueiam o horário
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+        op.execute(
+            f"ALTER TABLE tab_tarefa ADD CONSTRAINT {RESTRICAO} "
+            "EXCLUDE USING gist (voluntario_id WITH =, tsrange(inicio, fim) WITH &&) "
+            "WHERE (inicio IS NOT NULL AND deleted_at IS NULL)"
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(f'ALTER TABLE tab_tarefa DROP CONSTRAINT {RESTRICAO}')
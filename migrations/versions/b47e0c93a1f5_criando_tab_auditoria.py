@@ -0,0 +1,88 @@
+"""Criando a tab_auditoria (trilha de auditoria particionada)
+
+Revision ID: b47e0c93a1f5
+Revises: 8f3a61c2d9e4
+Create Date: 2026-10-19 16:02:11.734905
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b47e0c93a1f5'
+down_revision = '8f3a61c2d9e4'
+branch_labels = None
+depends_on = None
+
+# Partições mensais criadas junto com a tabela; as seguintes vêm de `flask auditoria particoes`
+MESES_INICIAIS = 3
+
+
+def _inicio_do_mes(dia, meses=0):
+    indice = dia.year * 12 + dia.month - 1 + meses
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def upgrade():
+    postgresql = op.get_bind().dialect.name == 'postgresql'
+
+    op.create_table('tab_auditoria',
+    sa.Column('criado_em', sa.DateTime(), nullable=False),
+    sa.Column('auditoria_id', sa.String(), nullable=False),
+    sa.Column('tabela', sa.String(), nullable=False),
+    sa.Column('registro_id', sa.Integer(), nullable=False),
+    sa.Column('operacao', sa.String(), nullable=False),
+    sa.Column('usuario', sa.String(), nullable=True),
+    sa.Column('origem', sa.String(), nullable=True),
+    sa.Column('version', sa.Integer(), nullable=True),
+    sa.Column('alteracoes', sa.JSON(), nullable=False),
+    sa.PrimaryKeyConstraint('criado_em', 'auditoria_id'),
+    postgresql_partition_by='RANGE (criado_em)'
+    )
+    with op.batch_alter_table('tab_auditoria', schema=None) as batch_op:
+        batch_op.create_index('ix_tab_auditoria_registro', ['tabela', 'registro_id', 'criado_em'], unique=False)
+
+    if not postgresql:
+        return
+
+    # Partição padrão para datas ainda sem partição mensal, para que nenhuma escrita falhe
+    op.execute('CREATE TABLE tab_auditoria_padrao PARTITION OF tab_auditoria DEFAULT')
+
+    hoje = date.today()
+    for mes in range(MESES_INICIAIS + 1):
+        inicio, fim = _inicio_do_mes(hoje, mes), _inicio_do_mes(hoje, mes + 1)
+        op.execute(
+            f"CREATE TABLE tab_auditoria_p{inicio:%Y%m} PARTITION OF tab_auditoria "
+            f"FOR VALUES FROM ('{inicio.isoformat()}') TO ('{fim.isoformat()}')"
+        )
+
+    # Só inserção: UPDATE e DELETE são recusados (partições antigas podem ser removidas com DROP TABLE)
+    op.execute("""
+        CREATE FUNCTION tab_auditoria_somente_insercao() RETURNS trigger AS $$
+        BEGIN
+            RAISE EXCEPTION 'tab_auditoria aceita apenas inserções';
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER tab_auditoria_somente_insercao
+        BEFORE UPDATE OR DELETE ON tab_auditoria
+        FOR EACH ROW EXECUTE FUNCTION tab_auditoria_somente_insercao()
+    """)
+
+
+def downgrade():
+    postgresql = op.get_bind().dialect.name == 'postgresql'
+
+    if postgresql:
+        op.execute('DROP TRIGGER IF EXISTS tab_auditoria_somente_insercao ON tab_auditoria')
+        op.execute('DROP FUNCTION IF EXISTS tab_auditoria_somente_insercao()')
+
+    with op.batch_alter_table('tab_auditoria', schema=None) as batch_op:
+        batch_op.drop_index('ix_tab_auditoria_registro')
+
+    # No PostgreSQL, as partições são removidas junto com a tabela
+    op.drop_table('tab_auditoria')
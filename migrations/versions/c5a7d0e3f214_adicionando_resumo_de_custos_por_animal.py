@@ -0,0 +1,37 @@
+"""Adicionando resumo de custos por animal
+
+Revision ID: c5a7d0e3f214
+Revises: 8f3b2c6d1a90
+Create Date: 2026-10-19 11:20:05.873411
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5a7d0e3f214'
+down_revision = '8f3b2c6d1a90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('tab_custo_animal',
+    sa.Column('animal_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('total_despesas', sa.Integer(), nullable=False),
+    sa.Column('total_procedimentos', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('animal_id')
+    )
+    with op.batch_alter_table('tab_custo_animal', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_tab_custo_animal_total'), ['total'], unique=False)
+
+    # O preenchimento inicial é feito com `flask custos rebuild`
+
+
+def downgrade():
+    with op.batch_alter_table('tab_custo_animal', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_tab_custo_animal_total'))
+
+    op.drop_table('tab_custo_animal')
@@ -0,0 +1,38 @@
+"""Restrição de períodos sobrepostos em lar temporário ignorando os removidos
+
+Revision ID: c8e1f4a7d2b9
+Revises: 9e5b3d71c4a6
+Create Date: 2026-10-19 20:41:07.385612
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8e1f4a7d2b9'
+down_revision = '9e5b3d71c4a6'
+branch_labels = None
+depends_on = None
+
+RESTRICAO = 'ex_tab_lar_temporario_hospedeiro_periodo'
+
+
+def _recriar_restricao(where):
+    op.execute(f'ALTER TABLE tab_lar_temporario DROP CONSTRAINT {RESTRICAO}')
+    op.execute(
+        f"ALTER TABLE tab_lar_temporario ADD CONSTRAINT {RESTRICAO} "
+        "EXCLUDE USING gist (hospedeiro_id WITH =, daterange(data_inicio, data_fim, '[]') WITH &&) "
+        f"WHERE ({where})"
+    )
+
+
+def upgrade():
+    # Hospedagens na lixeira não bloqueiam o período do hospedeiro (a restrição só existe no PostgreSQL)
+    if op.get_bind().dialect.name == 'postgresql':
+        _recriar_restricao('data_inicio IS NOT NULL AND deleted_at IS NULL')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        _recriar_restricao('data_inicio IS NOT NULL')
@@ -0,0 +1,31 @@
+"""Adicionando progresso de campanhas
+
+Revision ID: e2b94f6a7c15
+Revises: c5a7d0e3f214
+Create Date: 2026-10-19 12:02:48.301276
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b94f6a7c15'
+down_revision = 'c5a7d0e3f214'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('tab_progresso_campanha',
+    sa.Column('campanha_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('total_arrecadado', sa.Integer(), nullable=False),
+    sa.Column('quantidade_doacoes', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('campanha_id')
+    )
+
+    # O preenchimento inicial é feito com `flask campanhas rebuild`
+
+
+def downgrade():
+    op.drop_table('tab_progresso_campanha')
@@ -0,0 +1,33 @@
+"""Adicionando chave única de jobs pendentes
+
+Revision ID: f4b9a2d6e153
+Revises: c8e1f4a7d2b9
+Create Date: 2026-10-19 20:58:23.914470
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4b9a2d6e153'
+down_revision = 'c8e1f4a7d2b9'
+branch_labels = None
+depends_on = None
+
+PENDENTES = sa.text("status = 'pendente'")
+
+
+def upgrade():
+    with op.batch_alter_table('tab_job', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('chave_unica', sa.String(), nullable=True))
+        batch_op.create_index(
+            'ix_tab_job_chave_unica_pendente', ['chave_unica'], unique=True,
+            postgresql_where=PENDENTES, sqlite_where=PENDENTES,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('tab_job', schema=None) as batch_op:
+        batch_op.drop_index('ix_tab_job_chave_unica_pendente')
+        batch_op.drop_column('chave_unica')
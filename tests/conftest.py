@@ -0,0 +1,29 @@
+import os
+import tempfile
+
+import pytest
+
+# A configuração é lida do ambiente na importação de backend.config
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'patas.db')}"
+os.environ["AUDITORIA_BACKEND"] = "database"
+os.environ.pop("REDIS_URL", None)
+
+from backend import create_app  # noqa: E402
+from backend.db import db  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config["TESTING"] = True
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,39 @@
+import base64
+
+import pytest
+
+from backend.db import db
+from backend.external.model import AnimalModel
+
+FOTO = b"\xff\xd8\xff\xe0\x00\x10JFIF\xff\xd9"
+
+
+@pytest.fixture
+def animal(app):
+    # Sem margem, a alteração recém-gravada já entra na primeira página
+    app.config["SYNC_MARGEM_SEGUNDOS"] = 0
+
+    animal = AnimalModel(
+        nome="Rex",
+        idade="2 anos",
+        foto=FOTO,
+        descricao="Vira-lata caramelo",
+        sexo="M",
+        castracao="Sim",
+        status="Disponível",
+        especie="Cachorro",
+        data_cadastro="2024-09-17",
+    )
+    db.session.add(animal)
+    db.session.commit()
+    return animal
+
+
+@pytest.mark.parametrize("query", ["", "?tabelas=tab_animal"])
+def test_sync_animal_com_foto(client, animal, query):
+    response = client.get(f"/sync{query}")
+
+    assert response.status_code == 200
+    alteracoes = [a for a in response.get_json()["changes"] if a["tabela"] == "tab_animal"]
+    assert alteracoes[0]["id"] == animal.animal_id
+    assert base64.b64decode(alteracoes[0]["data"]["foto"]) == FOTO